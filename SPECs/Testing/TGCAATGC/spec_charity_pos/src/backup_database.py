@@ -1,28 +1,57 @@
 """
 Charity Shop POS - Database Backup Utility
-Automated backup functionality with timestamped copies
+Automated backup functionality with timestamped copies, plus incremental
+backups that store only pages changed since earlier backups
 """
 
+import gzip
+import hashlib
+import json
 import os
 import shutil
 import sqlite3
+import zlib
 from datetime import datetime
 from pathlib import Path
 
 
+MANIFEST_SUFFIX = '.manifest'  # Incremental backup: gzipped JSON list of page hashes
+PAGES_DIR = 'pages'            # Compressed page packs shared by incremental backups
+
+
+def _page_hash(page):
+    """Content hash identifying a database page"""
+    return hashlib.blake2b(page, digest_size=16).hexdigest()
+
+
+def _read_json(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
 class DatabaseBackup:
     """Handles database backup operations"""
     
-    def __init__(self, db_path='charity_pos.db', backup_dir='backups'):
+    def __init__(self, db_path='charity_pos.db', backup_dir='backups', pages_per_step=1024, step_sleep=0.01):
         """
         Initialize backup manager
         
         Args:
             db_path: Path to source database file
             backup_dir: Directory to store backups
+            pages_per_step: Pages copied per backup step (-1 copies everything in one step)
+            step_sleep: Seconds to pause between steps, letting tills write
         """
         self.db_path = Path(db_path)
         self.backup_dir = Path(backup_dir)
+        self.pages_dir = self.backup_dir / PAGES_DIR
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
         
         # Create backup directory if it doesn't exist
         self.backup_dir.mkdir(parents=True, exist_ok=True)
@@ -68,17 +97,181 @@ class DatabaseBackup:
         """
         Create backup using SQLite backup API
         This method is safer for active databases
+        
+        Copies pages_per_step pages at a time and sleeps between steps, so
+        the source is only locked briefly and tills keep working during
+        the backup.
         """
         source_conn = sqlite3.connect(str(self.db_path))
         backup_conn = sqlite3.connect(str(backup_path))
         
         try:
             with backup_conn:
-                source_conn.backup(backup_conn)
+                source_conn.backup(backup_conn, pages=self.pages_per_step, sleep=self.step_sleep)
         finally:
             source_conn.close()
             backup_conn.close()
     
+    def create_incremental_backup(self, backup_name=None):
+        """
+        Create a backup storing only pages not already in the backup directory
+        
+        A consistent snapshot is taken with the paged online backup, split
+        into database pages and hashed. Pages no earlier backup holds are
+        compressed into a new pack; the manifest lists every page's hash,
+        so each incremental backup restores on its own, without a chain.
+        
+        Args:
+            backup_name: Optional custom manifest name (default: auto-generated timestamp)
+        
+        Returns:
+            Path to created manifest file
+        """
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"Source database not found: {self.db_path}")
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        if backup_name is None:
+            backup_name = f"charity_pos_incremental_{timestamp}{MANIFEST_SUFFIX}"
+        manifest_path = self.backup_dir / backup_name
+        
+        self.pages_dir.mkdir(exist_ok=True)
+        pack_name = f"{timestamp}.pack"
+        pack_path = self.pages_dir / pack_name
+        snapshot_path = self.backup_dir / f".snapshot_{timestamp}.db"
+        
+        try:
+            self._sqlite_backup(snapshot_path)
+            known = self._page_index()
+            packed = {}
+            page_hashes = []
+            whole = hashlib.sha256()
+            
+            conn = sqlite3.connect(str(snapshot_path))
+            try:
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            finally:
+                conn.close()
+            
+            with open(snapshot_path, 'rb') as snapshot, open(pack_path, 'wb') as pack:
+                for page in iter(lambda: snapshot.read(page_size), b''):
+                    whole.update(page)
+                    digest = _page_hash(page)
+                    page_hashes.append(digest)
+                    if digest not in known and digest not in packed:
+                        data = zlib.compress(page)
+                        packed[digest] = [pack.tell(), len(data)]
+                        pack.write(data)
+            
+            if packed:
+                _write_json(pack_path.with_suffix('.idx'), packed)
+            else:
+                pack_path.unlink()
+            
+            _write_json(manifest_path, {
+                'format': 1,
+                'source': str(self.db_path),
+                'created': datetime.now().isoformat(),
+                'page_size': page_size,
+                'pages': page_hashes,
+                'sha256': whole.hexdigest()
+            })
+        except Exception:
+            for path in (pack_path, pack_path.with_suffix('.idx')):
+                if path.exists():
+                    path.unlink()
+            raise
+        finally:
+            if snapshot_path.exists():
+                snapshot_path.unlink()
+        
+        new_bytes = sum(length for _, length in packed.values())
+        print(f"✓ Incremental backup created: {manifest_path}")
+        print(f"  {len(packed)} of {len(page_hashes)} pages new ({new_bytes / 1024:.1f} KB compressed)")
+        return manifest_path
+    
+    def _page_index(self):
+        """Map of page hash -> (pack path, offset, length) for every stored page"""
+        index = {}
+        for idx_path in self.pages_dir.glob('*.idx'):
+            pack_path = idx_path.with_suffix('.pack')
+            for digest, (offset, length) in _read_json(idx_path).items():
+                index[digest] = (pack_path, offset, length)
+        return index
+    
+    def _assemble(self, manifest_path, target_path):
+        """
+        Rebuild a database file from an incremental backup, checking every
+        page hash and the whole-file checksum
+        """
+        manifest = _read_json(manifest_path)
+        index = self._page_index()
+        whole = hashlib.sha256()
+        packs = {}
+        
+        try:
+            with open(target_path, 'wb') as target:
+                for number, digest in enumerate(manifest['pages'], start=1):
+                    if digest not in index:
+                        raise ValueError(f"Page {number} missing from backup store")
+                    pack_path, offset, length = index[digest]
+                    if pack_path not in packs:
+                        packs[pack_path] = open(pack_path, 'rb')
+                    pack = packs[pack_path]
+                    pack.seek(offset)
+                    page = zlib.decompress(pack.read(length))
+                    if _page_hash(page) != digest:
+                        raise ValueError(f"Page {number} is corrupt")
+                    whole.update(page)
+                    target.write(page)
+        finally:
+            for pack in packs.values():
+                pack.close()
+        
+        if whole.hexdigest() != manifest['sha256']:
+            raise ValueError("Database checksum mismatch")
+    
+    def verify_backup(self, backup_name):
+        """
+        Check that a backup restores to a sound database
+        
+        Incremental backups are rebuilt page by page against their hashes;
+        both kinds then pass SQLite's integrity check.
+        
+        Args:
+            backup_name: Name of backup file (.db or manifest)
+        
+        Returns:
+            True if the backup is intact
+        """
+        backup_path = self.backup_dir / backup_name
+        
+        if not backup_path.exists():
+            raise FileNotFoundError(f"Backup file not found: {backup_path}")
+        
+        check_path = backup_path
+        try:
+            if backup_path.suffix == MANIFEST_SUFFIX:
+                check_path = self.backup_dir / f".verify_{backup_path.stem}.db"
+                self._assemble(backup_path, check_path)
+            
+            conn = sqlite3.connect(str(check_path))
+            try:
+                result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+            finally:
+                conn.close()
+            if result != 'ok':
+                raise ValueError(f"Integrity check failed: {result}")
+        except Exception as e:
+            print(f"✗ Backup verification failed for {backup_name}: {e}")
+            return False
+        finally:
+            if check_path != backup_path and check_path.exists():
+                check_path.unlink()
+        
+        print(f"✓ Backup verified: {backup_name}")
+        return True
+    
     def list_backups(self):
         """
         List all available backups
@@ -88,7 +281,7 @@ class DatabaseBackup:
         """
         backups = []
         
-        for backup_file in self.backup_dir.glob('*.db'):
+        for backup_file in self._backup_files():
             stats = backup_file.stat()
             size_mb = stats.st_size / (1024 * 1024)
             created_time = datetime.fromtimestamp(stats.st_mtime)
@@ -132,11 +325,23 @@ class DatabaseBackup:
         if self.db_path.exists():
             safety_backup = f"before_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
             safety_path = self.backup_dir / safety_backup
-            shutil.copy2(self.db_path, safety_path)
+            self._sqlite_backup(safety_path)  # Includes changes still in the WAL file
             print(f"✓ Created safety backup: {safety_path}")
         
         # Restore backup
-        shutil.copy2(backup_path, self.db_path)
+        restore_path = self.db_path.with_name(self.db_path.name + '.restore')
+        if backup_path.suffix == MANIFEST_SUFFIX:
+            self._assemble(backup_path, restore_path)
+        else:
+            shutil.copy2(backup_path, restore_path)
+        
+        # A WAL left from the old database must not be applied to the restored one
+        for suffix in ('-wal', '-shm'):
+            stale = self.db_path.with_name(self.db_path.name + suffix)
+            if stale.exists():
+                stale.unlink()
+        
+        os.replace(restore_path, self.db_path)
         print(f"✓ Database restored from: {backup_name}")
         return True
     
@@ -150,7 +355,7 @@ class DatabaseBackup:
         Returns:
             Number of backups deleted
         """
-        backups = list(self.backup_dir.glob('*.db'))
+        backups = self._backup_files()
         
         if len(backups) <= keep_count:
             print(f"Only {len(backups)} backups found. Nothing to delete.")
@@ -171,12 +376,31 @@ class DatabaseBackup:
             except Exception as e:
                 print(f"✗ Failed to delete {backup_path.name}: {e}")
         
+        self._delete_unused_packs()
+        
         return deleted
     
+    def _backup_files(self):
+        """Full copies and incremental manifests in the backup directory"""
+        return list(self.backup_dir.glob('*.db')) + list(self.backup_dir.glob(f'*{MANIFEST_SUFFIX}'))
+    
+    def _delete_unused_packs(self):
+        """Delete page packs holding no page referenced by a remaining manifest"""
+        referenced = set()
+        for manifest_path in self.backup_dir.glob(f'*{MANIFEST_SUFFIX}'):
+            referenced.update(_read_json(manifest_path)['pages'])
+        
+        for idx_path in self.pages_dir.glob('*.idx'):
+            if referenced.isdisjoint(_read_json(idx_path)):
+                idx_path.with_suffix('.pack').unlink(missing_ok=True)
+                idx_path.unlink()
+                print(f"✓ Deleted unused page pack: {idx_path.stem}")
+    
     def get_backup_info(self):
         """Get information about backup directory and backups"""
-        total_size = sum(f.stat().st_size for f in self.backup_dir.glob('*.db'))
-        backup_count = len(list(self.backup_dir.glob('*.db')))
+        total_size = sum(f.stat().st_size for f in self._backup_files())
+        total_size += sum(f.stat().st_size for f in self.pages_dir.glob('*'))
+        backup_count = len(self._backup_files())
         
         return {
             'backup_dir': str(self.backup_dir.absolute()),
@@ -185,15 +409,16 @@ class DatabaseBackup:
         }
 
 
-def automated_backup(db_path='charity_pos.db', backup_dir='backups', keep_count=10):
+def automated_backup(db_path='charity_pos.db', backup_dir='backups', keep_count=10, incremental=False):
     """
     Perform automated backup with old backup cleanup
-    Suitable for scheduled tasks (e.g., daily cron job)
+    Suitable for scheduled tasks (e.g., daily cron job, or hourly with incremental=True)
     
     Args:
         db_path: Path to database file
         backup_dir: Directory for backups
         keep_count: Number of backups to retain
+        incremental: Store only pages changed since earlier backups
     
     Returns:
         Path to created backup
@@ -201,7 +426,10 @@ def automated_backup(db_path='charity_pos.db', backup_dir='backups', keep_count=
     backup_manager = DatabaseBackup(db_path, backup_dir)
     
     # Create new backup
-    backup_path = backup_manager.create_backup()
+    if incremental:
+        backup_path = backup_manager.create_incremental_backup()
+    else:
+        backup_path = backup_manager.create_backup()
     
     # Clean up old backups
     deleted = backup_manager.delete_old_backups(keep_count)
@@ -234,9 +462,11 @@ def main():
         print("  3. Restore backup")
         print("  4. Delete old backups")
         print("  5. Backup info")
-        print("  6. Exit")
+        print("  6. Create incremental backup")
+        print("  7. Verify backup")
+        print("  8. Exit")
         
-        choice = input("\nSelect option (1-6): ").strip()
+        choice = input("\nSelect option (1-8): ").strip()
         
         if choice == '1':
             # Create backup
@@ -299,11 +529,37 @@ def main():
             print(f"Total Size: {info['total_size_mb']:.2f} MB")
         
         elif choice == '6':
+            # Create incremental backup
+            try:
+                backup_manager.create_incremental_backup()
+            except Exception as e:
+                print(f"\n✗ Error creating incremental backup: {e}")
+        
+        elif choice == '7':
+            # Verify backup
+            backups = backup_manager.list_backups()
+            if not backups:
+                print("\nNo backups available to verify.")
+            else:
+                print("\nAvailable backups:")
+                for i, (name, size, created) in enumerate(backups, 1):
+                    print(f"  {i}. {name} ({size}) - {created}")
+                
+                try:
+                    selection = int(input("\nSelect backup number to verify: "))
+                    if 1 <= selection <= len(backups):
+                        backup_manager.verify_backup(backups[selection - 1][0])
+                    else:
+                        print("Invalid selection.")
+                except ValueError:
+                    print("Invalid input.")
+        
+        elif choice == '8':
             print("\nExiting...")
             break
         
         else:
-            print("\nInvalid option. Please select 1-6.")
+            print("\nInvalid option. Please select 1-8.")
 
 
 if __name__ == '__main__':
@@ -6,15 +6,27 @@ SQLAlchemy ORM models for all system entities
 from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Text, DateTime, Date,
+    create_engine, event, Column, Integer, String, Text, DateTime, Date,
     ForeignKey, DECIMAL, Boolean, Index
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+# Storage profile for shops running several tills on one database file.
+# WAL lets tills read while another writes; FULL sync makes every commit
+# survive power loss (the group-commit queue spreads that fsync over a
+# batch); the busy timeout waits for the write lock instead of raising
+# "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'FULL',
+}
+BUSY_TIMEOUT_SECONDS = 5.0
+
 
 class User(Base):
     """Staff and volunteer user accounts"""
@@ -201,13 +213,82 @@ class Receipt(Base):
         return f"<Receipt(number='{self.receipt_number}', format='{self.format}')>"
 
 
+class DailySalesRollup(Base):
+    """Daily completed-sale totals per payment method (maintained by sales_rollup)"""
+    __tablename__ = 'daily_sales_rollup'
+    
+    sale_date = Column(Date, primary_key=True)
+    payment_method = Column(String(20), primary_key=True)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    items_sold = Column(Integer, nullable=False, default=0)
+    total_sales = Column(DECIMAL(12, 2), nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<DailySalesRollup(date='{self.sale_date}', method='{self.payment_method}', total={self.total_sales})>"
+
+
+class DailyCategorySales(Base):
+    """Daily completed-sale totals per item category (maintained by sales_rollup)"""
+    __tablename__ = 'daily_category_sales'
+    
+    sale_date = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)  # 0 for uncategorised items
+    items_sold = Column(Integer, nullable=False, default=0)
+    total_sales = Column(DECIMAL(12, 2), nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<DailyCategorySales(date='{self.sale_date}', category_id={self.category_id}, total={self.total_sales})>"
+
+
+def create_pos_engine(db_path='transactions.db', pool_size=5, max_overflow=10, begin_immediate=False):
+    """
+    Create a thread-safe pooled engine with the storage profile applied
+    
+    Args:
+        db_path: Database file (':memory:' keeps SQLAlchemy's single-connection pool)
+        pool_size: Connections kept open for tills and report sessions
+        max_overflow: Extra connections allowed under load
+        begin_immediate: Take the write lock when a transaction begins, so a
+            read-then-write transaction waits for other writers rather than
+            failing when it upgrades its lock
+    
+    Returns:
+        SQLAlchemy Engine
+    """
+    options = {'connect_args': {'timeout': BUSY_TIMEOUT_SECONDS}}
+    if db_path != ':memory:':
+        options.update(
+            poolclass=QueuePool, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True
+        )
+        options['connect_args']['check_same_thread'] = False
+    
+    engine = create_engine(f'sqlite:///{db_path}', echo=False, **options)
+    
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        if begin_immediate:
+            # Let SQLAlchemy emit BEGIN (and SAVEPOINT) instead of the driver
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+        cursor.close()
+    
+    if begin_immediate:
+        @event.listens_for(engine, 'begin')
+        def begin_write(connection):
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+    
+    return engine
+
+
 class DatabaseManager:
     """Database connection and session management"""
     
-    def __init__(self, db_path='transactions.db'):
+    def __init__(self, db_path='transactions.db', pool_size=5, max_overflow=10):
         """Initialize database connection"""
         self.db_path = db_path
-        self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
+        self.engine = create_pos_engine(db_path, pool_size=pool_size, max_overflow=max_overflow)
         self.Session = sessionmaker(bind=self.engine)
         
     def create_tables(self):
@@ -222,6 +303,11 @@ class DatabaseManager:
         """Get new database session"""
         return self.Session()
     
+    def group_commit_queue(self, max_delay=0.005, max_batch=100):
+        """Start a group-commit queue writing to this database (see group_commit.py)"""
+        from group_commit import GroupCommitQueue
+        return GroupCommitQueue(self.db_path, max_delay=max_delay, max_batch=max_batch)
+    
     def backup_database(self, backup_path):
         """Create backup of database file"""
         import shutil
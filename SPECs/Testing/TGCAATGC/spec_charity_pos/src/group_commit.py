@@ -0,0 +1,120 @@
+"""
+Charity Shop POS - Group Commit Queue
+Batches writes from several tills into one transaction, so they share a
+single write lock and a single fsync instead of queueing for the lock
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import create_pos_engine
+
+
+class GroupCommitQueue:
+    """
+    Background writer that commits queued work in batches
+    
+    Work is a callable taking a Session. The writer thread collects work
+    for up to max_delay seconds (or max_batch items), runs each item in its
+    own savepoint and commits the batch once. An item that raises is rolled
+    back and its exception is returned to its caller; the rest of the batch
+    still commits.
+    """
+    
+    def __init__(self, db_path: str, max_delay: float = 0.005, max_batch: int = 100):
+        """
+        Start the writer thread
+        
+        Args:
+            db_path: Database file (the queue opens its own connection)
+            max_delay: Longest a write waits for others to join its batch (seconds)
+            max_batch: Most writes committed together
+        """
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.engine = create_pos_engine(db_path, pool_size=1, max_overflow=0, begin_immediate=True)
+        # Objects returned by work stay readable after the batch commits
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        self.batches_committed = 0
+        
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+        self._thread.start()
+    
+    def submit(self, work: Callable[[Session], Any]) -> Future:
+        """
+        Queue work for the next batch
+        
+        Args:
+            work: Callable run with the writer's session; it must not commit
+        
+        Returns:
+            Future resolving to the work's return value once committed
+        """
+        future = Future()
+        self._queue.put((work, future))
+        return future
+    
+    def run(self, work: Callable[[Session], Any]) -> Any:
+        """Queue work and wait for its batch to commit (re-raises its exception)"""
+        return self.submit(work).result()
+    
+    def close(self):
+        """Commit anything still queued and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+        self.engine.dispose()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _run(self):
+        """Writer thread: gather a batch, commit it, repeat until closed"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while batch[-1] is not None and len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            if batch:
+                self._commit(batch)
+            if stop:
+                return
+    
+    def _commit(self, batch):
+        """Run a batch in one transaction, one savepoint per item"""
+        session = self.Session()
+        results = []
+        try:
+            for work, future in batch:
+                try:
+                    with session.begin_nested():
+                        results.append((future, work(session), None))
+                except Exception as e:
+                    results.append((future, None, e))
+            session.commit()
+            self.batches_committed += 1
+        except Exception as e:
+            session.rollback()
+            results = [(future, None, e) for _, future in batch]
+        finally:
+            session.close()
+        
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
@@ -14,6 +14,7 @@ from database import (
     init_database, User, Category, Item, Donation,
     Transaction, TransactionItem, Receipt
 )
+from sales_rollup import rebuild_sales_rollups
 
 
 def hash_password(password):
@@ -202,6 +203,11 @@ def create_seed_data(session):
     session.commit()
     print(f"   Created: {receipt1}")
     
+    # 7. Backfill daily sales rollups for the sample transaction
+    print("\n7. Building daily sales rollups...")
+    counts = rebuild_sales_rollups(session)
+    print(f"   Rollup rows: {counts['payment_rows']} payment method, {counts['category_rows']} category")
+    
     print("\n✓ Seed data creation completed successfully!")
 
 
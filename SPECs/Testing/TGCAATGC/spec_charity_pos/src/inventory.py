@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 
 from database import Item, Category, Donation, get_session
+from inventory_aggregates import inventory_totals, stock_level_counts
 
 
 class InventoryManager:
@@ -425,38 +426,28 @@ class InventoryManager:
     
     def get_inventory_value(self) -> Dict[str, Decimal]:
         """
-        Calculate total inventory value
+        Calculate total inventory value over all items (aggregated in the database)
         
         Returns:
             Dict with total_value and in_stock_value
         """
-        items = self.list_all_items()
-        
-        total_value = sum(item.price * item.stock_quantity for item in items)
-        in_stock_value = sum(
-            item.price * item.stock_quantity 
-            for item in items 
-            if item.stock_quantity > 0
-        )
+        totals = inventory_totals(self.session)
         
         return {
-            'total_value': Decimal(str(total_value)),
-            'in_stock_value': Decimal(str(in_stock_value)),
-            'total_items': len(items),
-            'in_stock_items': sum(1 for item in items if item.stock_quantity > 0)
+            'total_value': totals['total_value'],
+            'in_stock_value': totals['in_stock_value'],
+            'total_items': totals['total_items'],
+            'in_stock_items': totals['in_stock_items']
         }
     
     def get_inventory_summary(self) -> Dict[str, Any]:
         """Get comprehensive inventory summary"""
         value_info = self.get_inventory_value()
-        low_stock = self.get_low_stock_items()
-        out_of_stock = self.get_out_of_stock_items()
         
         return {
             **value_info,
-            'low_stock_count': len(low_stock),
-            'out_of_stock_count': len(out_of_stock),
-            'categories_count': len(self.list_all_categories())
+            **stock_level_counts(self.session),
+            'categories_count': self.session.query(Category).count()
         }
 
 
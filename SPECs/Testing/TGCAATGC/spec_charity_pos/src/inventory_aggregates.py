@@ -0,0 +1,107 @@
+"""
+Charity Shop POS - Inventory Aggregates
+Set-based stock and value totals computed in the database
+"""
+
+from decimal import Decimal
+from typing import Dict, Any
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, cast, Integer
+
+from database import Item, Category
+
+
+# Line value in whole pence. Prices are stored as DECIMAL(10, 2), which
+# SQLite keeps as a float, so summing pence keeps totals exact
+ITEM_VALUE_PENCE = cast(func.round(Item.price * 100), Integer) * Item.stock_quantity
+
+IN_STOCK = Item.stock_quantity > 0
+
+
+def _pence_to_decimal(pence) -> Decimal:
+    """Convert a summed pence value (or NULL) to pounds"""
+    return Decimal(int(pence or 0)) / 100
+
+
+def inventory_totals(session: Session) -> Dict[str, Any]:
+    """
+    Item counts, stock quantity and value over all items in one query
+    
+    Args:
+        session: SQLAlchemy session
+    
+    Returns:
+        Dict with total_items, in_stock_items, out_of_stock_items,
+        total_stock_quantity, total_value and in_stock_value (Decimal)
+    """
+    row = session.query(
+        func.count(Item.id),
+        func.sum(case((IN_STOCK, 1), else_=0)),
+        func.sum(case((Item.stock_quantity == 0, 1), else_=0)),
+        func.sum(Item.stock_quantity),
+        func.sum(ITEM_VALUE_PENCE),
+        func.sum(case((IN_STOCK, ITEM_VALUE_PENCE), else_=0))
+    ).one()
+    
+    total_items, in_stock, out_of_stock, quantity, value_pence, in_stock_pence = row
+    
+    return {
+        'total_items': total_items,
+        'in_stock_items': int(in_stock or 0),
+        'out_of_stock_items': int(out_of_stock or 0),
+        'total_stock_quantity': int(quantity or 0),
+        'total_value': _pence_to_decimal(value_pence),
+        'in_stock_value': _pence_to_decimal(in_stock_pence)
+    }
+
+
+def category_breakdown(session: Session) -> Dict[str, Dict[str, Any]]:
+    """
+    Item count, stock quantity and value per category name (GROUP BY join)
+    
+    Items without a category are not included, and categories sharing a
+    name are reported together, as in the inventory report.
+    
+    Args:
+        session: SQLAlchemy session
+    
+    Returns:
+        Dict of category name -> {'item_count', 'stock_quantity', 'value'}
+    """
+    rows = session.query(
+        Category.name,
+        func.count(Item.id),
+        func.sum(Item.stock_quantity),
+        func.sum(ITEM_VALUE_PENCE)
+    ).join(Item, Item.category_id == Category.id).group_by(Category.name)
+    
+    return {
+        name: {
+            'item_count': item_count,
+            'stock_quantity': int(quantity or 0),
+            'value': float(_pence_to_decimal(value_pence))
+        }
+        for name, item_count, quantity, value_pence in rows
+    }
+
+
+def stock_level_counts(session: Session, low_stock_threshold: int = 5) -> Dict[str, int]:
+    """
+    Count low-stock and out-of-stock items without loading them
+    
+    Args:
+        session: SQLAlchemy session
+        low_stock_threshold: Stock level at or below which an in-stock item is low
+    
+    Returns:
+        Dict with low_stock_count and out_of_stock_count
+    """
+    low, out = session.query(
+        func.sum(case((IN_STOCK & (Item.stock_quantity <= low_stock_threshold), 1), else_=0)),
+        func.sum(case((Item.stock_quantity == 0, 1), else_=0))
+    ).one()
+    
+    return {
+        'low_stock_count': int(low or 0),
+        'out_of_stock_count': int(out or 0)
+    }
@@ -14,6 +14,7 @@ from cart import ShoppingCart
 from payment_processor import PaymentManager, PaymentMethod
 from receipt_generator import ReceiptGenerator, ReceiptData
 from reports import ReportGenerator
+from sales_rollup import record_sale
 from auth import AuthManager
 
 
@@ -224,8 +225,14 @@ class CharityPOSApp:
                 print(f"\n✓ Payment successful!")
                 print(f"   Change: £{change:.2f}")
                 
+                # Record sale (updates the daily sales rollups in the same commit)
+                transaction = record_sale(
+                    self.session, self.current_user.id, 'cash', self.cart.get_all_items(),
+                    cash_given=cash_given, change_returned=Decimal(str(change))
+                )
+                
                 # Generate receipt
-                self.generate_receipt('cash', cash_given, Decimal(str(change)))
+                self.generate_receipt('cash', cash_given, Decimal(str(change)), transaction_id=transaction.id)
                 self.cart.clear()
                 return True
             else:
@@ -253,8 +260,11 @@ class CharityPOSApp:
             print(f"\n✓ Payment successful!")
             print(f"   Transaction ID: {result.transaction_id}")
             
+            # Record sale (updates the daily sales rollups in the same commit)
+            transaction = record_sale(self.session, self.current_user.id, 'card', self.cart.get_all_items())
+            
             # Generate receipt
-            self.generate_receipt('card')
+            self.generate_receipt('card', transaction_id=transaction.id)
             self.cart.clear()
             return True
         else:
@@ -262,10 +272,10 @@ class CharityPOSApp:
             return False
     
     def generate_receipt(self, payment_method: str, cash_given: Decimal = None,
-                        change: Decimal = None):
+                        change: Decimal = None, transaction_id: int = None):
         """Generate and save receipt"""
         receipt_data = ReceiptData(
-            transaction_id=1,  # Would be actual transaction ID
+            transaction_id=transaction_id,
             items=[
                 {
                     'name': item.name,
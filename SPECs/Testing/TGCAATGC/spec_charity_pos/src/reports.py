@@ -4,12 +4,16 @@ Generate sales, inventory, and donation reports
 """
 
 from decimal import Decimal
-from datetime import datetime, date, timedelta
+from datetime import date, timedelta
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 
-from database import Transaction, TransactionItem, Item, Category, Donation, get_session
+from database import (
+    Transaction, TransactionItem, Item, Category, Donation, DailySalesRollup, DailyCategorySales, get_session
+)
+from inventory_aggregates import inventory_totals, category_breakdown
+from sales_rollup import UNCATEGORISED
 
 
 class ReportGenerator:
@@ -36,6 +40,9 @@ class ReportGenerator:
         """
         Generate daily sales summary report
         
+        Read from the daily sales rollup (see sales_rollup.py), so the cost
+        does not depend on the number of transactions.
+        
         Args:
             report_date: Date to report on (default: today)
         
@@ -44,51 +51,130 @@ class ReportGenerator:
         """
         report_date = report_date or date.today()
         
-        # Get transactions for the day
-        start_time = datetime.combine(report_date, datetime.min.time())
-        end_time = datetime.combine(report_date, datetime.max.time())
+        return {
+            'date': report_date.strftime('%Y-%m-%d'),
+            **self._sales_summary(report_date, report_date)
+        }
+    
+    def generate_sales_report(self, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Generate sales report for a date range from the daily rollups
         
-        transactions = self.session.query(Transaction).filter(
-            and_(
-                Transaction.timestamp >= start_time,
-                Transaction.timestamp <= end_time,
-                Transaction.status == 'completed'
-            )
-        ).all()
+        Args:
+            start_date: First day of the period
+            end_date: Last day of the period (inclusive)
         
-        # Calculate totals
-        total_sales = sum(t.total_amount for t in transactions)
-        transaction_count = len(transactions)
+        Returns:
+            Dict with the daily report's totals plus per-category and per-day breakdowns
+        """
+        summary = self._sales_summary(start_date, end_date)
+        
+        # Category breakdown (items sold and sales per category name)
+        categories = {}
+        category_rows = self.session.query(
+            DailyCategorySales.category_id,
+            Category.name,
+            func.sum(DailyCategorySales.items_sold),
+            func.sum(DailyCategorySales.total_sales)
+        ).outerjoin(
+            Category, Category.id == DailyCategorySales.category_id
+        ).filter(
+            DailyCategorySales.sale_date.between(start_date, end_date)
+        ).group_by(DailyCategorySales.category_id, Category.name)
+        
+        for category_id, name, items_sold, total in category_rows:
+            if not items_sold and not total:
+                continue
+            cat_name = name if category_id != UNCATEGORISED and name else 'Uncategorised'
+            data = categories.setdefault(cat_name, {'items_sold': 0, 'total_sales': 0.0})
+            data['items_sold'] += int(items_sold)
+            data['total_sales'] = round(data['total_sales'] + float(total), 2)
+        
+        # Per-day totals
+        daily_rows = self.session.query(
+            DailySalesRollup.sale_date,
+            func.sum(DailySalesRollup.transaction_count),
+            func.sum(DailySalesRollup.total_sales)
+        ).filter(
+            DailySalesRollup.sale_date.between(start_date, end_date)
+        ).group_by(DailySalesRollup.sale_date).order_by(DailySalesRollup.sale_date)
+        
+        summary.update({
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            'categories': categories,
+            'daily': [
+                {
+                    'date': sale_date.strftime('%Y-%m-%d'),
+                    'transaction_count': int(count),
+                    'total_sales': round(float(total), 2)
+                }
+                for sale_date, count, total in daily_rows if count
+            ]
+        })
         
-        # Payment method breakdown
-        cash_transactions = [t for t in transactions if t.payment_method == 'cash']
-        card_transactions = [t for t in transactions if t.payment_method == 'card']
+        return summary
+    
+    def generate_weekly_sales_report(self, week_start: date = None) -> Dict[str, Any]:
+        """
+        Generate sales report for a Monday-to-Sunday week
         
-        cash_total = sum(t.total_amount for t in cash_transactions)
-        card_total = sum(t.total_amount for t in card_transactions)
+        Args:
+            week_start: Any day of the week to report on (default: this week)
         
-        # Item count
-        total_items_sold = sum(
-            sum(ti.quantity for ti in t.transaction_items)
-            for t in transactions
-        )
+        Returns:
+            Dict as generate_sales_report
+        """
+        week_start = week_start or date.today()
+        week_start -= timedelta(days=week_start.weekday())
+        
+        return self.generate_sales_report(week_start, week_start + timedelta(days=6))
+    
+    def _sales_summary(self, start_date: date, end_date: date) -> Dict[str, Any]:
+        """
+        Totals and payment breakdown for a period from the payment-method rollup
+        
+        Args:
+            start_date: First day
+            end_date: Last day (inclusive)
+        
+        Returns:
+            Dict with transaction_count, total_sales, total_items_sold,
+            average_transaction and payment_breakdown
+        """
+        rows = self.session.query(
+            DailySalesRollup.payment_method,
+            func.sum(DailySalesRollup.transaction_count),
+            func.sum(DailySalesRollup.items_sold),
+            func.sum(DailySalesRollup.total_sales)
+        ).filter(
+            DailySalesRollup.sale_date.between(start_date, end_date)
+        ).group_by(DailySalesRollup.payment_method).all()
+        
+        # Payment method breakdown (cash and card always listed)
+        payment_breakdown = {
+            'cash': {'count': 0, 'total': 0.0},
+            'card': {'count': 0, 'total': 0.0}
+        }
+        transaction_count = 0
+        total_items_sold = 0
+        total_sales = Decimal('0')
+        
+        for method, count, items_sold, total in rows:
+            total = Decimal(str(round(float(total or 0), 2)))
+            if not count and method not in payment_breakdown:
+                continue
+            payment_breakdown[method] = {'count': int(count), 'total': float(total)}
+            transaction_count += int(count)
+            total_items_sold += int(items_sold)
+            total_sales += total
         
         return {
-            'date': report_date.strftime('%Y-%m-%d'),
             'transaction_count': transaction_count,
             'total_sales': float(total_sales),
             'total_items_sold': total_items_sold,
             'average_transaction': float(total_sales / transaction_count) if transaction_count > 0 else 0,
-            'payment_breakdown': {
-                'cash': {
-                    'count': len(cash_transactions),
-                    'total': float(cash_total)
-                },
-                'card': {
-                    'count': len(card_transactions),
-                    'total': float(card_total)
-                }
-            }
+            'payment_breakdown': payment_breakdown
         }
     
     def format_daily_sales_report(self, report_date: date = None) -> str:
@@ -127,41 +213,21 @@ class ReportGenerator:
         """
         Generate inventory summary report
         
+        Totals and the category breakdown are aggregated in the database
+        (two queries), so memory use does not grow with the item count.
+        
         Returns:
             Dict with inventory data
         """
-        items = self.session.query(Item).all()
-        
-        # Calculate totals
-        total_items = len(items)
-        in_stock_items = sum(1 for item in items if item.stock_quantity > 0)
-        out_of_stock_items = sum(1 for item in items if item.stock_quantity == 0)
-        
-        total_stock_quantity = sum(item.stock_quantity for item in items)
-        total_value = sum(item.price * item.stock_quantity for item in items)
-        
-        # Category breakdown
-        category_data = {}
-        for item in items:
-            if item.category:
-                cat_name = item.category.name
-                if cat_name not in category_data:
-                    category_data[cat_name] = {
-                        'item_count': 0,
-                        'stock_quantity': 0,
-                        'value': 0
-                    }
-                category_data[cat_name]['item_count'] += 1
-                category_data[cat_name]['stock_quantity'] += item.stock_quantity
-                category_data[cat_name]['value'] += float(item.price * item.stock_quantity)
+        totals = inventory_totals(self.session)
         
         return {
-            'total_items': total_items,
-            'in_stock_items': in_stock_items,
-            'out_of_stock_items': out_of_stock_items,
-            'total_stock_quantity': total_stock_quantity,
-            'total_value': float(total_value),
-            'categories': category_data
+            'total_items': totals['total_items'],
+            'in_stock_items': totals['in_stock_items'],
+            'out_of_stock_items': totals['out_of_stock_items'],
+            'total_stock_quantity': totals['total_stock_quantity'],
+            'total_value': float(totals['total_value']),
+            'categories': category_breakdown(self.session)
         }
     
     def format_inventory_report(self) -> str:
@@ -228,24 +294,35 @@ class ReportGenerator:
         total_donations = len(donations)
         total_value = sum(d.total_value or Decimal('0') for d in donations)
         
-        # Count items from donations
-        items_from_donations = self.session.query(Item).filter(
+        # Count items from donations (all donations, and per donation in the period)
+        items_from_donations = self.session.query(func.count(Item.id)).filter(
             Item.donation_id.isnot(None)
-        ).all()
+        ).scalar()
+        
+        item_counts = dict(
+            self.session.query(Item.donation_id, func.count(Item.id)).join(
+                Donation, Donation.id == Item.donation_id
+            ).filter(
+                and_(
+                    Donation.donation_date >= start_date,
+                    Donation.donation_date <= end_date
+                )
+            ).group_by(Item.donation_id)
+        )
         
         return {
             'start_date': start_date.strftime('%Y-%m-%d'),
             'end_date': end_date.strftime('%Y-%m-%d'),
             'total_donations': total_donations,
             'total_value': float(total_value),
-            'items_from_donations': len(items_from_donations),
+            'items_from_donations': items_from_donations,
             'donations': [
                 {
                     'id': d.id,
                     'donor_name': d.donor_name or 'Anonymous',
                     'donation_date': d.donation_date.strftime('%Y-%m-%d'),
                     'total_value': float(d.total_value) if d.total_value else 0,
-                    'item_count': len([i for i in items_from_donations if i.donation_id == d.id])
+                    'item_count': item_counts.get(d.id, 0)
                 }
                 for d in donations
             ]
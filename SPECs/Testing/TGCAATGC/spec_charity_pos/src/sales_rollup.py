@@ -0,0 +1,281 @@
+"""
+Charity Shop POS - Daily Sales Rollups
+Per-day sales totals by payment method and by category, kept current as
+sales complete so reports read one row per day instead of every transaction
+"""
+
+import argparse
+from collections import defaultdict
+from concurrent.futures import Future
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import (
+    Item, Transaction, TransactionItem, DailySalesRollup, DailyCategorySales, init_database
+)
+from group_commit import GroupCommitQueue
+
+
+UNCATEGORISED = 0  # DailyCategorySales.category_id for items without a category
+
+
+def _add_to_rollup(session: Session, model, key: Dict[str, Any], values: Dict[str, Any]):
+    """Insert a rollup row or add values to the existing one"""
+    statement = sqlite_insert(model).values(**key, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(key),
+        set_={column: getattr(model, column) + getattr(statement.excluded, column) for column in values}
+    )
+    session.execute(statement)
+
+
+def apply_transaction(session: Session, transaction: Transaction, sign: int = 1):
+    """
+    Add a completed transaction to the rollups (sign=-1 takes it out again)
+    
+    Runs in the caller's session, so the rollups commit or roll back with
+    the sale itself.
+    
+    Args:
+        session: SQLAlchemy session holding the transaction
+        transaction: Transaction with its transaction_items
+        sign: 1 to add, -1 to remove
+    """
+    sale_date = (transaction.timestamp or datetime.utcnow()).date()
+    lines = transaction.transaction_items
+    
+    category_of = dict(session.query(Item.id, Item.category_id).filter(
+        Item.id.in_({line.item_id for line in lines})
+    ))
+    
+    by_category = defaultdict(lambda: [0, Decimal('0')])
+    for line in lines:
+        totals = by_category[category_of.get(line.item_id) or UNCATEGORISED]
+        totals[0] += line.quantity
+        totals[1] += Decimal(line.subtotal)
+    
+    _add_to_rollup(session, DailySalesRollup, {
+        'sale_date': sale_date,
+        'payment_method': transaction.payment_method
+    }, {
+        'transaction_count': sign,
+        'items_sold': sign * sum(line.quantity for line in lines),
+        'total_sales': sign * Decimal(transaction.total_amount)
+    })
+    
+    for category_id, (quantity, subtotal) in by_category.items():
+        _add_to_rollup(session, DailyCategorySales, {
+            'sale_date': sale_date,
+            'category_id': category_id
+        }, {
+            'items_sold': sign * quantity,
+            'total_sales': sign * subtotal
+        })
+
+
+def add_sale(session: Session, user_id: int, payment_method: str, lines: Iterable,
+             cash_given: Decimal = None, change_returned: Decimal = None,
+             timestamp: datetime = None) -> Transaction:
+    """
+    Add a completed sale and its rollup updates to the session without committing
+    
+    Args: as for record_sale
+    
+    Returns:
+        Created Transaction object (flushed, so it has an ID)
+    """
+    lines = list(lines)
+    transaction = Transaction(
+        timestamp=timestamp or datetime.utcnow(),
+        user_id=user_id,
+        payment_method=payment_method,
+        total_amount=sum((line.subtotal for line in lines), Decimal('0.00')),
+        cash_given=cash_given,
+        change_returned=change_returned,
+        status='completed',
+        transaction_items=[
+            TransactionItem(
+                item_id=line.item_id,
+                quantity=line.quantity,
+                unit_price=line.unit_price,
+                subtotal=line.subtotal
+            )
+            for line in lines
+        ]
+    )
+    
+    session.add(transaction)
+    session.flush()
+    apply_transaction(session, transaction)
+    
+    return transaction
+
+
+def record_sale(session: Session, user_id: int, payment_method: str, lines: Iterable,
+                cash_given: Decimal = None, change_returned: Decimal = None,
+                timestamp: datetime = None) -> Transaction:
+    """
+    Record a completed sale and update the daily rollups in one commit
+    
+    Args:
+        session: SQLAlchemy session
+        user_id: Cashier user ID
+        payment_method: 'cash', 'card' or 'other'
+        lines: Cart lines with item_id, quantity, unit_price and subtotal (e.g. CartItem)
+        cash_given: Cash tendered (cash sales)
+        change_returned: Change given (cash sales)
+        timestamp: Sale time (default: now, UTC)
+    
+    Returns:
+        Created Transaction object
+    """
+    try:
+        transaction = add_sale(session, user_id, payment_method, lines,
+                               cash_given, change_returned, timestamp)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    
+    return transaction
+
+
+def submit_sale(commit_queue: GroupCommitQueue, user_id: int, payment_method: str, lines: Iterable,
+                cash_given: Decimal = None, change_returned: Decimal = None,
+                timestamp: datetime = None) -> Future:
+    """
+    Queue a completed sale on a group-commit queue (see record_sale for arguments)
+    
+    The sale and its rollup updates commit with the other tills' sales in
+    the same batch, or not at all.
+    
+    Returns:
+        Future resolving to the committed Transaction
+    """
+    lines = list(lines)
+    return commit_queue.submit(lambda session: add_sale(
+        session, user_id, payment_method, lines, cash_given, change_returned, timestamp
+    ))
+
+
+def void_transaction(session: Session, transaction_id: int, status: str = 'refunded') -> Optional[Transaction]:
+    """
+    Cancel or refund a transaction, taking a completed one out of the rollups
+    
+    Args:
+        session: SQLAlchemy session
+        transaction_id: Transaction ID
+        status: New status ('refunded' or 'cancelled')
+    
+    Returns:
+        Updated Transaction object or None if not found
+    """
+    transaction = session.query(Transaction).filter(Transaction.id == transaction_id).first()
+    if not transaction:
+        return None
+    
+    try:
+        if transaction.status == 'completed':
+            apply_transaction(session, transaction, sign=-1)
+        transaction.status = status
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    
+    return transaction
+
+
+def rebuild_sales_rollups(session: Session, start_date: date = None, end_date: date = None) -> Dict[str, int]:
+    """
+    Recompute the rollups from the transactions (backfill or repair)
+    
+    Args:
+        session: SQLAlchemy session
+        start_date: First day to rebuild (default: all history)
+        end_date: Last day to rebuild, inclusive (default: all history)
+    
+    Returns:
+        Dict with the number of payment-method and category rows written
+    """
+    sale_date = func.date(Transaction.timestamp)
+    completed = [Transaction.status == 'completed']
+    if start_date:
+        completed.append(Transaction.timestamp >= datetime.combine(start_date, time.min))
+    if end_date:
+        completed.append(Transaction.timestamp < datetime.combine(end_date + timedelta(days=1), time.min))
+    
+    items_per_transaction = select(
+        TransactionItem.transaction_id,
+        func.sum(TransactionItem.quantity).label('quantity')
+    ).group_by(TransactionItem.transaction_id).subquery()
+    
+    payment_rows = select(
+        sale_date,
+        Transaction.payment_method,
+        func.count(Transaction.id),
+        func.coalesce(func.sum(items_per_transaction.c.quantity), 0),
+        func.sum(Transaction.total_amount)
+    ).outerjoin(
+        items_per_transaction, items_per_transaction.c.transaction_id == Transaction.id
+    ).where(*completed).group_by(sale_date, Transaction.payment_method)
+    
+    category_id = func.coalesce(Item.category_id, UNCATEGORISED)
+    category_rows = select(
+        sale_date,
+        category_id,
+        func.sum(TransactionItem.quantity),
+        func.sum(TransactionItem.subtotal)
+    ).select_from(TransactionItem).join(
+        Transaction, Transaction.id == TransactionItem.transaction_id
+    ).outerjoin(
+        Item, Item.id == TransactionItem.item_id
+    ).where(*completed).group_by(sale_date, category_id)
+    
+    try:
+        for model in (DailySalesRollup, DailyCategorySales):
+            stale = session.query(model)
+            if start_date:
+                stale = stale.filter(model.sale_date >= start_date)
+            if end_date:
+                stale = stale.filter(model.sale_date <= end_date)
+            stale.delete(synchronize_session=False)
+        
+        payment_count = session.execute(insert(DailySalesRollup).from_select(
+            ['sale_date', 'payment_method', 'transaction_count', 'items_sold', 'total_sales'], payment_rows
+        )).rowcount
+        category_count = session.execute(insert(DailyCategorySales).from_select(
+            ['sale_date', 'category_id', 'items_sold', 'total_sales'], category_rows
+        )).rowcount
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    
+    return {'payment_rows': payment_count, 'category_rows': category_count}
+
+
+def main():
+    """Rebuild the daily sales rollups from the command line"""
+    parser = argparse.ArgumentParser(description="Rebuild the daily sales rollup tables")
+    parser.add_argument('--db', default='charity_pos.db', help='Database file (default: charity_pos.db)')
+    parser.add_argument('--from', dest='start_date', type=date.fromisoformat, help='First day (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='end_date', type=date.fromisoformat, help='Last day (YYYY-MM-DD)')
+    args = parser.parse_args()
+    
+    session = init_database(args.db).get_session()  # Creates the rollup tables if missing
+    try:
+        counts = rebuild_sales_rollups(session, args.start_date, args.end_date)
+    finally:
+        session.close()
+    
+    print(f"✓ Rebuilt sales rollups: {counts['payment_rows']} payment-method rows, "
+          f"{counts['category_rows']} category rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Tests for Database Backups
+"""
+
+import pytest
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from backup_database import DatabaseBackup, PAGES_DIR
+
+
+def query(db_path, sql):
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def backup_manager(tmp_path):
+    """Backup manager for a WAL database of a few hundred pages, copied 8 pages per step"""
+    db_path = tmp_path / 'charity_pos.db'
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO items (name) VALUES (?)", [(f"Item {i} " + "x" * 200,) for i in range(5000)])
+    conn.commit()
+    conn.close()
+    return DatabaseBackup(db_path, tmp_path / 'backups', pages_per_step=8, step_sleep=0)
+
+
+def test_paged_backup_copies_everything(backup_manager):
+    """A backup taken a few pages at a time is complete and passes verification"""
+    backup_path = backup_manager.create_backup()
+    
+    assert query(backup_path, "SELECT COUNT(*) FROM items") == [(5000,)]
+    assert backup_manager.verify_backup(backup_path.name)
+
+
+def test_incremental_stores_changed_pages_only(backup_manager):
+    """A second incremental backup packs only the pages that changed, and both restore"""
+    first = backup_manager.create_incremental_backup()
+    pages = backup_manager.pages_dir
+    first_size = sum(f.stat().st_size for f in pages.glob('*.pack'))
+    
+    conn = sqlite3.connect(str(backup_manager.db_path))
+    conn.execute("UPDATE items SET name = 'Sold' WHERE id = 1")
+    conn.commit()
+    conn.close()
+    second = backup_manager.create_incremental_backup()
+    
+    second_size = sum(f.stat().st_size for f in pages.glob('*.pack')) - first_size
+    assert 0 < second_size < first_size / 20
+    assert backup_manager.verify_backup(second.name)
+    
+    backup_manager.restore_backup(first.name, confirm=False)
+    assert query(backup_manager.db_path, "SELECT name FROM items WHERE id = 1")[0][0].startswith('Item 0')
+    backup_manager.restore_backup(second.name, confirm=False)
+    assert query(backup_manager.db_path, "SELECT name FROM items WHERE id = 1") == [('Sold',)]
+    assert query(backup_manager.db_path, "PRAGMA integrity_check") == [('ok',)]
+
+
+def test_verify_detects_damaged_pages(backup_manager):
+    """A flipped byte in a page pack fails verification"""
+    manifest = backup_manager.create_incremental_backup()
+    pack = next(backup_manager.pages_dir.glob('*.pack'))
+    data = bytearray(pack.read_bytes())
+    data[len(data) // 2] ^= 0xFF
+    pack.write_bytes(bytes(data))
+    
+    assert not backup_manager.verify_backup(manifest.name)
+
+
+def test_rotation_keeps_packs_still_referenced(backup_manager):
+    """Deleting old manifests removes only page packs no remaining backup uses"""
+    for _ in range(3):
+        conn = sqlite3.connect(str(backup_manager.db_path))
+        conn.execute("INSERT INTO items (name) VALUES ('New')")
+        conn.commit()
+        conn.close()
+        latest = backup_manager.create_incremental_backup()
+    
+    assert backup_manager.delete_old_backups(keep_count=1) == 2
+    assert len(list((backup_manager.backup_dir / PAGES_DIR).glob('*.pack'))) < 3
+    assert backup_manager.verify_backup(latest.name)
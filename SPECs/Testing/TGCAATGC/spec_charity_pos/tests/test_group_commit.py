@@ -0,0 +1,98 @@
+"""
+Tests for the Storage Profile and Group Commit Queue
+"""
+
+import pytest
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from sqlalchemy.pool import QueuePool
+from database import init_database, User, Item, Transaction
+from cart import CartItem
+from reports import ReportGenerator
+from sales_rollup import submit_sale
+
+DAY = date(2026, 3, 2)
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """File database with a cashier and two items"""
+    db_manager = init_database(str(tmp_path / 'pos.db'))
+    session = db_manager.get_session()
+    session.add_all([
+        User(username='volunteer', password_hash='x', role='volunteer'),
+        Item(name='Novel', price=Decimal('3.50'), stock_quantity=50),
+        Item(name='Teddy', price=Decimal('5.00'), stock_quantity=50)
+    ])
+    session.commit()
+    session.close()
+    yield db_manager
+    db_manager.engine.dispose()
+
+
+def novel(quantity=1):
+    return [CartItem(1, 'Novel', Decimal('3.50'), quantity)]
+
+
+def test_storage_profile(db_manager):
+    """File databases get a pooled engine in WAL mode with full sync"""
+    with db_manager.engine.connect() as connection:
+        assert connection.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        assert connection.exec_driver_sql('PRAGMA synchronous').scalar() == 2  # FULL
+    assert isinstance(db_manager.engine.pool, QueuePool)
+
+
+def test_concurrent_tills_share_batches(db_manager):
+    """Sales from several tills all commit, in fewer transactions than sales"""
+    futures = []
+    
+    with db_manager.group_commit_queue(max_delay=0.02) as commit_queue:
+        def till():
+            for _ in range(25):
+                futures.append(submit_sale(
+                    commit_queue, 1, 'card', novel(), timestamp=datetime(2026, 3, 2, 12)
+                ))
+        
+        tills = [threading.Thread(target=till) for _ in range(4)]
+        for thread in tills:
+            thread.start()
+        for thread in tills:
+            thread.join()
+        
+        sales = [future.result() for future in futures]
+        batches = commit_queue.batches_committed
+    
+    assert len({sale.id for sale in sales}) == 100
+    assert batches < 100
+    session = db_manager.get_session()
+    report = ReportGenerator(session).generate_daily_sales_report(DAY)
+    assert report['transaction_count'] == 100
+    assert report['total_sales'] == 350.0
+    session.close()
+
+
+def test_failed_write_leaves_batch_intact(db_manager):
+    """A write that raises is rolled back alone and its caller sees the error"""
+    def bad_sale(session):
+        session.add(Transaction(user_id=1, payment_method='cash', total_amount=Decimal('1.00')))
+        session.flush()
+        raise ValueError("Till declined")
+    
+    with db_manager.group_commit_queue(max_delay=0.05) as commit_queue:
+        failed = commit_queue.submit(bad_sale)
+        sold = submit_sale(commit_queue, 1, 'cash', novel(2), timestamp=datetime(2026, 3, 2, 9))
+        
+        with pytest.raises(ValueError):
+            failed.result()
+        assert sold.result().total_amount == Decimal('7.00')
+    
+    session = db_manager.get_session()
+    assert session.query(Transaction).count() == 1
+    session.close()
@@ -0,0 +1,115 @@
+"""
+Tests for Reporting and Inventory Aggregates
+"""
+
+import pytest
+import random
+from decimal import Decimal
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database import init_database, Item, Category
+from inventory import InventoryManager
+from reports import ReportGenerator
+
+
+@pytest.fixture
+def session():
+    """Session on an in-memory database"""
+    db_manager = init_database(':memory:')
+    session = db_manager.get_session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def stocked_session(session):
+    """250 items across three categories (two sharing a name), some uncategorised or out of stock"""
+    rng = random.Random(21)
+    categories = [Category(name='Books'), Category(name='Clothing'), Category(name='Books')]
+    session.add_all(categories)
+    session.flush()
+    
+    for i in range(250):
+        category = rng.choice(categories + [None])
+        session.add(Item(
+            name=f"Item {i}",
+            price=Decimal(rng.randint(1, 5000)) / 100,
+            stock_quantity=rng.choice([0, 1, 2, 3, 7, 12]),
+            category_id=category.id if category else None
+        ))
+    session.commit()
+    return session
+
+
+def expected_inventory(session):
+    """The inventory report computed item by item"""
+    items = session.query(Item).all()
+    categories = {}
+    for item in items:
+        if item.category:
+            data = categories.setdefault(item.category.name, {'item_count': 0, 'stock_quantity': 0, 'value': Decimal('0')})
+            data['item_count'] += 1
+            data['stock_quantity'] += item.stock_quantity
+            data['value'] += item.price * item.stock_quantity
+    
+    return {
+        'total_items': len(items),
+        'in_stock_items': sum(1 for item in items if item.stock_quantity > 0),
+        'out_of_stock_items': sum(1 for item in items if item.stock_quantity == 0),
+        'total_stock_quantity': sum(item.stock_quantity for item in items),
+        'total_value': sum(item.price * item.stock_quantity for item in items),
+        'categories': categories
+    }
+
+
+def test_inventory_report_matches_item_scan(stocked_session):
+    """Aggregated report equals the per-item computation"""
+    report = ReportGenerator(stocked_session).generate_inventory_report()
+    expected = expected_inventory(stocked_session)
+    
+    for key in ('total_items', 'in_stock_items', 'out_of_stock_items', 'total_stock_quantity'):
+        assert report[key] == expected[key]
+    assert report['total_value'] == float(expected['total_value'])
+    assert set(report['categories']) == {'Books', 'Clothing'}
+    for name, data in expected['categories'].items():
+        assert report['categories'][name] == {
+            'item_count': data['item_count'],
+            'stock_quantity': data['stock_quantity'],
+            'value': float(data['value'])
+        }
+
+
+def test_inventory_value_covers_all_items(stocked_session):
+    """Inventory value is exact and not limited to the first page of items"""
+    value_info = InventoryManager(stocked_session).get_inventory_value()
+    expected = expected_inventory(stocked_session)
+    
+    assert value_info['total_items'] == 250
+    assert value_info['total_value'] == expected['total_value']
+    assert value_info['in_stock_value'] == expected['total_value']
+    assert value_info['in_stock_items'] == expected['in_stock_items']
+
+
+def test_inventory_summary_counts(stocked_session):
+    """Summary stock-level counts equal the item lists"""
+    manager = InventoryManager(stocked_session)
+    
+    summary = manager.get_inventory_summary()
+    
+    assert summary['low_stock_count'] == len(manager.get_low_stock_items())
+    assert summary['out_of_stock_count'] == len(manager.get_out_of_stock_items())
+    assert summary['categories_count'] == 3
+
+
+def test_empty_inventory(session):
+    """An empty shop reports zeros"""
+    report = ReportGenerator(session).generate_inventory_report()
+    
+    assert report['total_items'] == 0
+    assert report['total_value'] == 0.0
+    assert report['categories'] == {}
+    assert InventoryManager(session).get_inventory_value()['total_value'] == Decimal('0')
@@ -0,0 +1,143 @@
+"""
+Tests for Daily Sales Rollups
+"""
+
+import pytest
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database import init_database, User, Category, Item, Donation, Transaction, DailySalesRollup
+from cart import CartItem
+from reports import ReportGenerator
+from sales_rollup import record_sale, void_transaction, rebuild_sales_rollups
+
+DAY = date(2026, 3, 2)  # A Monday
+
+
+@pytest.fixture
+def session():
+    """Session with a cashier, two categories and a few items"""
+    db_manager = init_database(':memory:')
+    session = db_manager.get_session()
+    session.add_all([
+        User(username='volunteer', password_hash='x', role='volunteer'),
+        Category(name='Books'),
+        Category(name='Toys')
+    ])
+    session.flush()
+    session.add_all([
+        Item(name='Novel', price=Decimal('3.50'), category_id=1, stock_quantity=50),
+        Item(name='Teddy', price=Decimal('5.00'), category_id=2, stock_quantity=50),
+        Item(name='Vase', price=Decimal('6.10'), stock_quantity=50)
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def sell(session, day, payment_method, quantities, hour=10):
+    """Record a sale of (item_id, quantity) pairs on a given day"""
+    items = {item.id: item for item in session.query(Item).all()}
+    lines = [CartItem(item_id, items[item_id].name, items[item_id].price, quantity)
+             for item_id, quantity in quantities]
+    timestamp = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour)
+    return record_sale(session, 1, payment_method, lines, timestamp=timestamp)
+
+
+def random_sales(session, seed=22):
+    """A week of random sales"""
+    rng = random.Random(seed)
+    for _ in range(60):
+        day = DAY + timedelta(days=rng.randint(0, 6))
+        quantities = [(item_id, rng.randint(1, 3)) for item_id in rng.sample([1, 2, 3], rng.randint(1, 3))]
+        sell(session, day, rng.choice(['cash', 'card', 'other']), quantities, hour=rng.randint(0, 23))
+
+
+def test_daily_report_from_rollup(session):
+    """Totals, item counts and payment breakdown come from the rollup"""
+    sell(session, DAY, 'cash', [(1, 2), (2, 1)])
+    sell(session, DAY, 'card', [(3, 1)], hour=23)
+    sell(session, DAY + timedelta(days=1), 'cash', [(1, 1)], hour=0)
+    
+    report = ReportGenerator(session).generate_daily_sales_report(DAY)
+    
+    assert report['date'] == '2026-03-02'
+    assert report['transaction_count'] == 2
+    assert report['total_sales'] == 18.10
+    assert report['total_items_sold'] == 4
+    assert report['payment_breakdown'] == {
+        'cash': {'count': 1, 'total': 12.0},
+        'card': {'count': 1, 'total': 6.10}
+    }
+
+
+def test_void_removes_sale(session):
+    """Refunding a completed sale takes it out of the rollup"""
+    sale = sell(session, DAY, 'cash', [(1, 2)])
+    sell(session, DAY, 'cash', [(2, 1)])
+    
+    void_transaction(session, sale.id)
+    void_transaction(session, sale.id, status='cancelled')  # Already out of the rollup
+    
+    report = ReportGenerator(session).generate_daily_sales_report(DAY)
+    assert report['transaction_count'] == 1
+    assert report['total_sales'] == 5.0
+    assert session.get(Transaction, sale.id).status == 'cancelled'
+
+
+def test_rebuild_matches_incremental(session):
+    """A rebuild from the transactions reproduces the incrementally maintained rollups"""
+    random_sales(session)
+    void_transaction(session, 5)
+    generator = ReportGenerator(session)
+    incremental = generator.generate_weekly_sales_report(DAY + timedelta(days=3))
+    
+    session.query(DailySalesRollup).delete()
+    session.commit()
+    assert generator.generate_sales_report(DAY, DAY + timedelta(days=6))['transaction_count'] == 0
+    
+    rebuild_sales_rollups(session)
+    assert generator.generate_weekly_sales_report(DAY + timedelta(days=3)) == incremental
+    
+    rebuild_sales_rollups(session, DAY + timedelta(days=2), DAY + timedelta(days=3))
+    assert generator.generate_weekly_sales_report(DAY) == incremental
+
+
+def test_range_report_matches_transactions(session):
+    """Range totals and category breakdown equal a scan of the transactions"""
+    random_sales(session)
+    completed = session.query(Transaction).filter(Transaction.status == 'completed').all()
+    
+    report = ReportGenerator(session).generate_sales_report(DAY, DAY + timedelta(days=6))
+    
+    assert report['transaction_count'] == len(completed)
+    assert report['total_sales'] == float(sum(t.total_amount for t in completed))
+    assert sum(day['transaction_count'] for day in report['daily']) == len(completed)
+    lines = [line for t in completed for line in t.transaction_items]
+    for name, category_id in (('Books', 1), ('Toys', 2), ('Uncategorised', None)):
+        category_lines = [line for line in lines if line.item.category_id == category_id]
+        assert report['categories'][name] == {
+            'items_sold': sum(line.quantity for line in category_lines),
+            'total_sales': float(sum(line.subtotal for line in category_lines))
+        }
+
+
+def test_donation_item_counts(session):
+    """Per-donation item counts come from one grouped query"""
+    donation = Donation(donor_name='Ann', donation_date=DAY)
+    session.add(donation)
+    session.flush()
+    for item in session.query(Item).filter(Item.id.in_([1, 2])):
+        item.donation_id = donation.id
+    session.commit()
+    
+    report = ReportGenerator(session).generate_donation_report(DAY, DAY)
+    
+    assert report['items_from_donations'] == 2
+    assert report['donations'][0]['item_count'] == 2
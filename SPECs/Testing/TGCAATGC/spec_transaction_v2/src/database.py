@@ -6,25 +6,190 @@ Backup: CSV file if database fails
 
 import sqlite3
 import csv
-from datetime import datetime, date
-from typing import Dict, List, Optional
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 import json
 
+# Storage profile: WAL lets tills read while one writes, and FULL sync
+# makes every commit survive power loss (group commit spreads its fsync
+# over a batch). busy_timeout waits out another writer instead of failing
+# with "database is locked".
+BUSY_TIMEOUT_SECONDS = 5.0
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'FULL',
+}
+
+INSERT_TRANSACTION = """
+    INSERT INTO transactions 
+    (transaction_id, timestamp, amount, payment_method, status, tendered, change_given, description)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Schema migrations, applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    # 1: Index range scans on timestamp. The covering index answers the
+    #    completed-sales totals (status = ? AND timestamp range, grouped by
+    #    payment_method, summing amount) without touching the table
+    [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_status_timestamp "
+        "ON transactions(status, timestamp, payment_method, amount)",
+        "CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions(timestamp)",
+        "ANALYZE transactions",
+    ],
+]
+
+
+def timestamp_range(start: Union[date, datetime], end: Union[date, datetime]) -> Tuple[str, str]:
+    """
+    Half-open range [start, end) as timestamp column bounds
+    
+    Timestamps are stored as ISO 8601 text (datetime.isoformat()), so
+    comparing the column against ISO strings is chronological and lets
+    SQLite use the timestamp indexes, unlike WHERE DATE(timestamp) = ?.
+    A date bound means midnight at the start of that day.
+    """
+    return start.isoformat(), end.isoformat()
+
+
+def day_range(target_date: date) -> Tuple[date, date]:
+    """The day as a half-open range [target_date, next day)"""
+    return target_date, target_date + timedelta(days=1)
+
+
+def connect(db_path: str, **kwargs) -> sqlite3.Connection:
+    """Open a connection with the storage profile pragmas applied"""
+    connection = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False, **kwargs)
+    connection.row_factory = sqlite3.Row
+    for pragma, value in SQLITE_PRAGMAS.items():
+        connection.execute(f"PRAGMA {pragma} = {value}")
+    return connection
+
+
+class GroupCommitWriter:
+    """
+    Batches inserts from many threads into one transaction
+    
+    A writer thread collects statements for up to max_delay seconds (or
+    max_batch statements) and commits them together, so concurrent tills
+    share one lock acquisition and one fsync. Each statement runs in its
+    own savepoint: a failing insert is rolled back and reported to its
+    caller without affecting the rest of the batch.
+    """
+    
+    def __init__(self, db_path: str, max_delay: float = 0.005, max_batch: int = 100):
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        # Autocommit mode: the writer issues BEGIN IMMEDIATE / SAVEPOINT itself
+        self.connection = connect(db_path, isolation_level=None)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+    
+    def submit(self, sql: str, params: tuple = ()) -> Future:
+        """Queue a statement; the future resolves to its lastrowid once committed"""
+        future = Future()
+        self._queue.put((sql, params, future))
+        return future
+    
+    def execute(self, sql: str, params: tuple = ()) -> int:
+        """Queue a statement and wait for its commit (raises sqlite3.Error on failure)"""
+        return self.submit(sql, params).result()
+    
+    def close(self):
+        """Commit anything queued, stop the writer thread and close its connection"""
+        self._queue.put(None)
+        self._thread.join()
+        self.connection.close()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while batch[-1] is not None and len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            
+            stop = batch[-1] is None
+            if stop:
+                batch.pop()
+            if batch:
+                self._commit(batch)
+            if stop:
+                return
+    
+    def _commit(self, batch):
+        results = []
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+            for sql, params, future in batch:
+                self.connection.execute("SAVEPOINT item")
+                try:
+                    results.append((future, self.connection.execute(sql, params).lastrowid, None))
+                except sqlite3.Error as e:
+                    self.connection.execute("ROLLBACK TO item")
+                    results.append((future, None, e))
+                self.connection.execute("RELEASE item")
+            self.connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            if self.connection.in_transaction:
+                self.connection.execute("ROLLBACK")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        
+        for future, rowid, error in results:
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(rowid)
+
+
 class TransactionDatabase:
     """Handles persistent storage of all transactions"""
     
-    def __init__(self, db_path: str = "transactions.db", backup_csv: str = "transactions_backup.csv"):
+    def __init__(self, db_path: str = "transactions.db", backup_csv: str = "transactions_backup.csv",
+                 group_commit: bool = False, group_commit_delay: float = 0.005):
         self.db_path = db_path
         self.backup_csv = backup_csv
-        self.connection = None
+        # Connection pool: one connection per thread, so tills can share the database object
+        self._local = threading.local()
+        self._connections = []
+        self._pool_lock = threading.Lock()
+        self.writer = None
         self._init_database()
+        
+        if group_commit and self.connection:
+            try:
+                self.writer = GroupCommitWriter(self.db_path, max_delay=group_commit_delay)
+            except sqlite3.Error as e:
+                print(f"⚠ Group commit unavailable, committing each write: {e}")
+    
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """This thread's connection (None if the database cannot be opened)"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            try:
+                connection = connect(self.db_path)
+            except sqlite3.Error as e:
+                print(f"⚠ Database connection failed: {e}")
+                return None
+            self._local.connection = connection
+            with self._pool_lock:
+                self._connections.append(connection)
+        return connection
     
     def _init_database(self):
         """Initialize database schema"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row
             cursor = self.connection.cursor()
             
             # Create transactions table per spec
@@ -44,12 +209,24 @@ class TransactionDatabase:
             """)
             
             self.connection.commit()
+            self._migrate()
             print(f"✓ Database initialized: {self.db_path}")
             
         except sqlite3.Error as e:
             print(f"⚠ Database initialization failed: {e}")
             print(f"  Backup mode: Will use CSV file {self.backup_csv}")
     
+    def _migrate(self):
+        """Apply schema migrations the database has not seen yet"""
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            with self.connection:
+                for statement in statements:
+                    self.connection.execute(statement)
+                self.connection.execute(f"PRAGMA user_version = {number}")
+            print(f"✓ Database migrated to schema version {number}")
+    
     def store_transaction(self, transaction: Dict) -> bool:
         """
         Step 1.4: Store transaction
@@ -58,23 +235,24 @@ class TransactionDatabase:
         """
         try:
             # Primary method: SQLite
-            if self.connection:
-                cursor = self.connection.cursor()
-                cursor.execute("""
-                    INSERT INTO transactions 
-                    (transaction_id, timestamp, amount, payment_method, status, tendered, change_given, description)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    transaction.get('transaction_id'),
-                    transaction.get('timestamp'),
-                    transaction.get('amount'),
-                    transaction.get('payment_method'),
-                    'completed' if transaction.get('success') else 'failed',
-                    transaction.get('tendered'),
-                    transaction.get('change'),
-                    transaction.get('description', '')
-                ))
-                self.connection.commit()
+            params = (
+                transaction.get('transaction_id'),
+                transaction.get('timestamp'),
+                transaction.get('amount'),
+                transaction.get('payment_method'),
+                'completed' if transaction.get('success') else 'failed',
+                transaction.get('tendered'),
+                transaction.get('change'),
+                transaction.get('description', '')
+            )
+            
+            if self.writer:
+                # Committed with whatever other tills queued in the same few milliseconds
+                self.writer.execute(INSERT_TRANSACTION, params)
+                return True
+            elif self.connection:
+                with self.connection:
+                    self.connection.execute(INSERT_TRANSACTION, params)
                 return True
             else:
                 raise sqlite3.Error("No database connection")
@@ -119,16 +297,21 @@ class TransactionDatabase:
         if target_date is None:
             target_date = date.today()
         
-        date_str = target_date.isoformat()
-        
+        return self.get_total(*day_range(target_date))
+    
+    def get_total(self, start: Union[date, datetime], end: Union[date, datetime]) -> float:
+        """
+        Total of completed transactions with start <= timestamp < end
+        (a range scan on the covering status/timestamp index)
+        """
         try:
             cursor = self.connection.cursor()
             cursor.execute("""
                 SELECT SUM(amount) as total
                 FROM transactions
-                WHERE DATE(timestamp) = ?
-                AND status = 'completed'
-            """, (date_str,))
+                WHERE status = 'completed'
+                AND timestamp >= ? AND timestamp < ?
+            """, timestamp_range(start, end))
             
             result = cursor.fetchone()
             return result['total'] if result['total'] else 0.0
@@ -142,15 +325,17 @@ class TransactionDatabase:
         if target_date is None:
             target_date = date.today()
         
-        date_str = target_date.isoformat()
-        
+        return self.get_transactions(*day_range(target_date))
+    
+    def get_transactions(self, start: Union[date, datetime], end: Union[date, datetime]) -> List[Dict]:
+        """Get all transactions (any status) with start <= timestamp < end, oldest first"""
         try:
             cursor = self.connection.cursor()
             cursor.execute("""
                 SELECT * FROM transactions
-                WHERE DATE(timestamp) = ?
+                WHERE timestamp >= ? AND timestamp < ?
                 ORDER BY timestamp
-            """, (date_str,))
+            """, timestamp_range(start, end))
             
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
@@ -160,9 +345,16 @@ class TransactionDatabase:
             return []
     
     def close(self):
-        """Close database connection"""
-        if self.connection:
-            self.connection.close()
+        """Flush the group-commit queue and close every pooled connection"""
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+        
+        with self._pool_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
 
 
 # Verification tests per spec
@@ -200,6 +392,41 @@ if __name__ == "__main__":
     print(f"Retrieved: {len(all_txns)} transactions")
     print(f"No duplicates: {len(all_txns) == len(test_transactions)}")
     
+    # Test 4: Date queries use the timestamp indexes
+    print("\n=== Test 4: Index range scan ===")
+    plan = test_db.connection.execute("""
+        EXPLAIN QUERY PLAN
+        SELECT SUM(amount) FROM transactions
+        WHERE status = 'completed' AND timestamp >= ? AND timestamp < ?
+    """, timestamp_range(*day_range(date.today()))).fetchall()
+    details = " ".join(row['detail'] for row in plan)
+    print(f"Plan: {details}")
+    print(f"Covering index used: {'COVERING INDEX idx_transactions_status_timestamp' in details}")
+    
+    # Test 5: Concurrent tills through the group-commit queue
+    print("\n=== Test 5: Concurrent tills (group commit) ===")
+    shared_db = TransactionDatabase(db_path="test_transactions.db", group_commit=True)
+    
+    def till(number):
+        for i in range(50):
+            shared_db.store_transaction({
+                "transaction_id": f"till{number}_{i}", "timestamp": datetime.now().isoformat(),
+                "amount": 1.00, "payment_method": "card", "success": True
+            })
+    
+    tills = [threading.Thread(target=till, args=(n,)) for n in range(4)]
+    for thread in tills:
+        thread.start()
+    for thread in tills:
+        thread.join()
+    
+    journal_mode = shared_db.connection.execute("PRAGMA journal_mode").fetchone()[0]
+    till_total = shared_db.get_daily_total() - expected_total
+    print(f"Journal mode: {journal_mode}")
+    print(f"Stored from 4 tills: {len(shared_db.get_all_transactions()) - len(test_transactions)} (expected: 200)")
+    print(f"Match: {abs(till_total - 200.00) < 0.01}")
+    shared_db.close()
+    
     test_db.close()
     print("\n✓ Step 1.4 verification complete")
     
@@ -4,10 +4,12 @@ Implements Steps 3.1, 3.2 from spec_transaction_v2.md
 """
 
 from datetime import date, datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 from pathlib import Path
 import csv
 
+from database import day_range, timestamp_range
+
 class DailyReconciliation:
     """Handles end-of-day reporting and till reconciliation"""
     
@@ -26,10 +28,27 @@ class DailyReconciliation:
         if target_date is None:
             target_date = date.today()
         
+        totals = self.calculate_totals(*day_range(target_date))
+        totals['date'] = target_date.isoformat()
+        
+        return totals
+    
+    def calculate_month_totals(self, year: int, month: int) -> Dict:
+        """Totals by payment method for a calendar month (month-end reconciliation)"""
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        
+        return self.calculate_totals(start, end)
+    
+    def calculate_totals(self, start: Union[date, datetime], end: Union[date, datetime]) -> Dict:
+        """
+        Totals by payment method for completed transactions with
+        start <= timestamp < end (dates mean midnight)
+        Primary method: SQL GROUP BY over the covering timestamp index
+        Backup: Manual iteration
+        """
         try:
             # Primary method: SQL GROUP BY
-            date_str = target_date.isoformat()
-            
             cursor = self.database.connection.cursor()
             cursor.execute("""
                 SELECT 
@@ -37,10 +56,10 @@ class DailyReconciliation:
                     SUM(amount) as total,
                     COUNT(*) as count
                 FROM transactions
-                WHERE DATE(timestamp) = ?
-                AND status = 'completed'
+                WHERE status = 'completed'
+                AND timestamp >= ? AND timestamp < ?
                 GROUP BY payment_method
-            """, (date_str,))
+            """, timestamp_range(start, end))
             
             results = cursor.fetchall()
             
@@ -55,27 +74,22 @@ class DailyReconciliation:
             for row in results:
                 method = row['payment_method'].lower()
                 if method == 'cash':
-                    totals['cash'] = float(row['total'])
-                    totals['cash_count'] = row['count']
+                    totals['cash'] += float(row['total'])
+                    totals['cash_count'] += row['count']
                 elif method == 'card':
-                    totals['card'] = float(row['total'])
-                    totals['card_count'] = row['count']
+                    totals['card'] += float(row['total'])
+                    totals['card_count'] += row['count']
             
-            totals['total'] = totals['cash'] + totals['card']
-            totals['transaction_count'] = totals['cash_count'] + totals['card_count']
-            totals['expected_till_cash'] = self.opening_float + totals['cash']
-            totals['date'] = target_date.isoformat()
-            
-            return totals
+            return self._finish_totals(totals, start, end)
             
         except Exception as e:
             print(f"⚠ SQL GROUP BY failed: {e}")
             # Backup method: Manual iteration
-            return self._calculate_totals_manually(target_date)
+            return self._calculate_totals_manually(start, end)
     
-    def _calculate_totals_manually(self, target_date: date) -> Dict:
+    def _calculate_totals_manually(self, start: Union[date, datetime], end: Union[date, datetime]) -> Dict:
         """Backup method: Iterate through transactions manually"""
-        transactions = self.database.get_all_transactions(target_date)
+        transactions = self.database.get_transactions(start, end)
         
         totals = {
             'cash': 0.0,
@@ -96,10 +110,14 @@ class DailyReconciliation:
                     totals['card'] += amount
                     totals['card_count'] += 1
         
+        return self._finish_totals(totals, start, end)
+    
+    def _finish_totals(self, totals: Dict, start: Union[date, datetime], end: Union[date, datetime]) -> Dict:
+        """Add the overall figures and the period to per-method totals"""
         totals['total'] = totals['cash'] + totals['card']
         totals['transaction_count'] = totals['cash_count'] + totals['card_count']
         totals['expected_till_cash'] = self.opening_float + totals['cash']
-        totals['date'] = target_date.isoformat()
+        totals['start'], totals['end'] = timestamp_range(start, end)
         
         return totals
     
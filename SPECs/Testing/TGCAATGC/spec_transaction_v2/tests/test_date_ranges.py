@@ -0,0 +1,106 @@
+"""
+Tests for Timestamp Indexes and Half-Open Date Ranges
+"""
+
+import pytest
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from database import TransactionDatabase, day_range, timestamp_range
+from reconciliation import DailyReconciliation
+
+DAY = date(2026, 3, 2)
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Empty database in a temporary directory (reports are written to the working directory)"""
+    monkeypatch.chdir(tmp_path)
+    database = TransactionDatabase(db_path=str(tmp_path / 'transactions.db'),
+                                   backup_csv=str(tmp_path / 'backup.csv'))
+    yield database
+    database.close()
+
+
+def store(database, transaction_id, timestamp, amount, payment_method='cash', success=True):
+    assert database.store_transaction({
+        'transaction_id': transaction_id, 'timestamp': timestamp.isoformat(),
+        'amount': amount, 'payment_method': payment_method, 'success': success
+    })
+
+
+def test_indexes_exist_after_init(database):
+    """init_database runs the migration that creates both timestamp indexes"""
+    indexes = {row['name'] for row in database.connection.execute("PRAGMA index_list(transactions)")}
+    
+    assert {'idx_transactions_status_timestamp', 'idx_transactions_timestamp'} <= indexes
+    assert database.connection.execute("PRAGMA user_version").fetchone()[0] == 1
+
+
+def test_daily_total_uses_covering_index(database):
+    """The daily total query is a range scan on the covering index"""
+    plan = database.connection.execute("""
+        EXPLAIN QUERY PLAN
+        SELECT SUM(amount) FROM transactions
+        WHERE status = 'completed' AND timestamp >= ? AND timestamp < ?
+    """, timestamp_range(*day_range(DAY))).fetchall()
+    
+    assert 'COVERING INDEX idx_transactions_status_timestamp' in " ".join(row['detail'] for row in plan)
+
+
+def test_midnight_belongs_to_the_day_it_starts(database):
+    """Midnight at the start of the range is in it; midnight at the end is in the next day"""
+    store(database, 'start', datetime(2026, 3, 2, 0, 0), 1.00)
+    store(database, 'end', datetime(2026, 3, 3, 0, 0), 10.00)
+    
+    assert database.get_daily_total(DAY) == 1.00
+    assert database.get_daily_total(date(2026, 3, 3)) == 10.00
+    assert [txn['transaction_id'] for txn in database.get_all_transactions(DAY)] == ['start']
+
+
+def test_last_microsecond_of_the_day(database):
+    """A transaction at 23:59:59.999999 counts towards that day, not the next"""
+    store(database, 'late', datetime(2026, 3, 2, 23, 59, 59, 999999), 5.00)
+    store(database, 'before', datetime(2026, 3, 1, 23, 59, 59, 999999), 7.00)
+    
+    assert database.get_daily_total(DAY) == 5.00
+    assert database.get_daily_total(date(2026, 3, 3)) == 0.0
+    assert [txn['transaction_id'] for txn in database.get_all_transactions(DAY)] == ['late']
+
+
+def test_reconciliation_day_and_month_bounds(database):
+    """Daily and monthly reconciliation use the same half-open bounds"""
+    store(database, 'first', datetime(2026, 3, 1, 0, 0), 10.00, 'cash')
+    store(database, 'day', datetime(2026, 3, 2, 0, 0), 20.00, 'card')
+    store(database, 'last', datetime(2026, 3, 31, 23, 59, 59, 999999), 30.00, 'cash')
+    store(database, 'april', datetime(2026, 4, 1, 0, 0), 40.00, 'cash')
+    store(database, 'failed', datetime(2026, 3, 2, 12, 0), 50.00, 'card', success=False)
+    reconciliation = DailyReconciliation(database, opening_float=100.00)
+    
+    daily = reconciliation.calculate_daily_totals(DAY)
+    assert (daily['cash'], daily['card'], daily['transaction_count']) == (0.0, 20.00, 1)
+    assert (daily['start'], daily['end']) == ('2026-03-02', '2026-03-03')
+    
+    month = reconciliation.calculate_month_totals(2026, 3)
+    assert (month['cash'], month['card'], month['transaction_count']) == (40.00, 20.00, 3)
+    assert month['expected_till_cash'] == 140.00
+    
+    december = reconciliation.calculate_month_totals(2026, 12)
+    assert (december['start'], december['end']) == ('2026-12-01', '2027-01-01')
+
+
+def test_manual_fallback_matches_sql(database):
+    """The manual iteration backup applies the same range"""
+    store(database, 'start', datetime(2026, 3, 2, 0, 0), 1.00)
+    store(database, 'late', datetime(2026, 3, 2, 23, 59, 59, 999999), 2.00, 'card')
+    store(database, 'end', datetime(2026, 3, 3, 0, 0), 4.00)
+    reconciliation = DailyReconciliation(database)
+    
+    manual = reconciliation._calculate_totals_manually(*day_range(DAY))
+    
+    assert manual == reconciliation.calculate_totals(*day_range(DAY))
+    assert (manual['cash'], manual['card'], manual['transaction_count']) == (1.00, 2.00, 2)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark RuleFileMatcher against the per-pattern loops it replaced.
+
+Runs both implementations over the same tree, checks they agree, and
+reports the time per pass. Trees can come from:
+
+    python benchmark_rule_matcher.py --synthetic 100000       # generated monorepo
+    git -C ~/src/big-monorepo ls-files > paths.txt
+    python benchmark_rule_matcher.py --paths-file paths.txt    # a real checkout
+    python benchmark_rule_matcher.py --repo kubernetes/kubernetes   # GitHub tree API
+"""
+
+import fnmatch
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+from dotenv import load_dotenv
+
+from ide_rule_library.quality_scorer import RepoQualityScorer
+from ide_rule_library.rule_file_matcher import PRIORITY_KEYS, RuleFileMatcher
+
+
+def legacy_rule_files(config: Dict, paths: List[str]) -> List[Dict]:
+    """Scanner matching before RuleFileMatcher: every pattern over every path."""
+    file_paths = set(paths)
+    found = []
+    for priority, key in PRIORITY_KEYS:
+        for pattern in config.get(key, []):
+            for path in file_paths:
+                if '*' in pattern:
+                    hit = fnmatch.fnmatch(path, pattern)
+                elif pattern.endswith('/'):
+                    hit = path.startswith(pattern)
+                else:
+                    hit = path == pattern
+                if hit:
+                    found.append({'path': path, 'priority': priority, 'type': 'file'})
+    return found
+
+
+def legacy_signals(scorer: RepoQualityScorer, paths: List[str]) -> Dict[str, List[str]]:
+    """Scorer matching before RuleFileMatcher: every signal over every path."""
+    signals = {}
+    for category, patterns in scorer.PRODUCTION_SIGNALS.items():
+        hits = [pattern for pattern in patterns if scorer._pattern_matches_files(pattern, paths)]
+        if hits:
+            signals[category] = hits
+    return signals
+
+
+def synthetic_tree(size: int, seed: int = 0) -> List[str]:
+    """Monorepo-shaped tree: deep service/package dirs, few rule or signal files."""
+    rng = random.Random(seed)
+    top = ['services', 'packages', 'libs', 'apps', 'vendor', 'third_party', 'src']
+    words = ['core', 'api', 'auth', 'billing', 'search', 'storage', 'ui', 'worker', 'common', 'utils',
+             'client', 'server', 'model', 'schema', 'handler', 'router', 'cache', 'queue']
+    exts = ['.go', '.py', '.ts', '.tsx', '.java', '.rs', '.json', '.proto', '.md', '.yaml']
+
+    paths = ['README.md', 'LICENSE', '.cursorrules', 'Makefile', '.github/workflows/ci.yml',
+             '.cursor/rules/backend.mdc', 'docs/index.md', 'services/api/Dockerfile']
+    while len(paths) < size:
+        depth = rng.randint(2, 7)
+        parts = [rng.choice(top)] + [rng.choice(words) for _ in range(depth)]
+        paths.append('/'.join(parts) + '/' + rng.choice(words) + rng.choice(exts))
+    return paths[:size]
+
+
+def github_tree(full_name: str) -> List[str]:
+    """Blob paths of a repository's default-branch tree (one API call)."""
+    from github import Github
+
+    load_dotenv(override=True)
+    token = os.getenv('GITHUB_TOKEN')
+    gh = Github(token) if token else Github()
+    tree = gh.get_repo(full_name, lazy=True).get_git_tree('HEAD', recursive=True)
+    if tree.raw_data.get('truncated'):
+        print("Note: GitHub truncated this tree; benchmarking the returned part")
+    return [item.path for item in tree.tree if item.type == 'blob']
+
+
+def best_of(func, repeat: int) -> float:
+    """Fastest of `repeat` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def run_benchmark(paths: List[str], config: Dict, repeat: int = 3) -> Dict:
+    """
+    Time legacy and compiled matching over one tree and check they agree.
+
+    Returns:
+        Dict with path count, timings (ms) and speedup
+    """
+    scorer = RepoQualityScorer()
+    matcher = RuleFileMatcher.from_config(config)
+
+    legacy = (legacy_rule_files(config, paths), legacy_signals(scorer, paths))
+    compiled = matcher.match(paths)
+    key = lambda r: (r['priority'], r['path'])
+    if sorted(legacy[0], key=key) != sorted(compiled['rule_files'], key=key) or legacy[1] != compiled['signals']:
+        raise AssertionError("RuleFileMatcher disagrees with the per-pattern implementation")
+
+    legacy_ms = best_of(lambda: (legacy_rule_files(config, paths), legacy_signals(scorer, paths)), repeat)
+    compiled_ms = best_of(lambda: matcher.match(paths), repeat)
+    return {
+        'paths': len(paths),
+        'rule_files': len(compiled['rule_files']),
+        'signal_hits': compiled['signal_hits'],
+        'legacy_ms': round(legacy_ms, 1),
+        'compiled_ms': round(compiled_ms, 1),
+        'speedup': round(legacy_ms / max(compiled_ms, 1e-6), 1)
+    }
+
+
+def main():
+    """CLI entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark compiled rule-file matching')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--synthetic', type=int, metavar='N', help='Generated monorepo tree with N paths (default 100000)')
+    source.add_argument('--paths-file', help='File with one tree path per line (e.g. git ls-files output)')
+    source.add_argument('--repo', help='GitHub owner/name to fetch the tree of')
+    parser.add_argument('--config', default=str(Path(__file__).parent / 'config.yaml'))
+    parser.add_argument('--repeat', type=int, default=3)
+
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = yaml.safe_load(f)
+
+    if args.paths_file:
+        with open(args.paths_file, 'r') as f:
+            paths = [line.strip() for line in f if line.strip()]
+        label = args.paths_file
+    elif args.repo:
+        paths = github_tree(args.repo)
+        label = args.repo
+    else:
+        paths = synthetic_tree(args.synthetic or 100000)
+        label = 'synthetic monorepo'
+
+    result = run_benchmark(paths, config, repeat=args.repeat)
+
+    print("\n" + "="*60)
+    print(f"RULE FILE MATCHER BENCHMARK: {label}")
+    print("="*60)
+    print(f"Paths:              {result['paths']:,}")
+    print(f"Rule files found:   {result['rule_files']}")
+    print(f"Signals found:      {result['signal_hits']}")
+    print(f"Per-pattern loops:  {result['legacy_ms']:,.1f} ms")
+    print(f"Compiled matcher:   {result['compiled_ms']:,.1f} ms")
+    print(f"Speedup:            {result['speedup']}x")
+    print("="*60 + "\n")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
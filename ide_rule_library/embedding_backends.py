@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Pluggable embedding backends.
+
+Every embedding in the system (Pattern and IDERule vectors, query vectors)
+used to come from Gemini text-embedding-004 through a rate-limited remote
+API. An EmbeddingBackend declares what it produces (model name, version,
+dimensions, batch size, whether it is remote) and embeds a list of texts
+per call, so callers can swap the remote model for a local one:
+
+- GeminiEmbeddingBackend: text-embedding-004, one batchEmbedContents request
+  per call. Callers keep their own retry and quota handling around it.
+- HashedTfidfBackend: CPU-only, offline, deterministic. Unigrams and bigrams
+  are hashed (signed) into `dimensions` buckets with sublinear TF and,
+  once fitted, IDF weights, then L2-normalised. A batch is one NumPy
+  scatter-add, so tens of thousands of texts embed in seconds.
+
+Vectors from different backends (or versions) are not comparable. Stored
+vectors carry embedding_model / embedding_version, and re-indexing
+re-embeds everything whose tags differ from the active backend
+(generate_pattern_embeddings.py).
+
+Select with the EMBEDDING_BACKEND environment variable ('gemini', the
+default, or 'hashed-tfidf' / 'local'), or pass a backend explicitly.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+class EmbeddingBackend:
+    """
+    Interface: embed a batch of texts into fixed-width vectors.
+
+    Subclasses set the class attributes and implement embed().
+    """
+
+    name = 'base'
+    model_name = ''
+    model_version = ''
+    dimensions = 0
+    batch_size = 1    # Texts per embed() call
+    remote = False    # True when embed() goes over the network (rate limits apply)
+
+    @property
+    def model_id(self) -> str:
+        """'<model>@<version>': vectors are only comparable within one model_id."""
+        return f"{self.model_name}@{self.model_version}"
+
+    def embed(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        """
+        Embed up to batch_size texts.
+
+        Args:
+            texts: Texts to embed
+            task_type: Gemini task type ('retrieval_document', 'semantic_similarity', ...);
+                       backends without task types ignore it
+
+        Returns:
+            One vector (dimensions floats) per text, in input order
+        """
+        raise NotImplementedError
+
+    def describe(self) -> Dict:
+        """Backend, model, version and dimensions, e.g. for stats output."""
+        return {
+            'backend': self.name,
+            'model': self.model_name,
+            'model_version': self.model_version,
+            'dimensions': self.dimensions
+        }
+
+
+class GeminiEmbeddingBackend(EmbeddingBackend):
+    """Gemini text-embedding-004 over the API (one request per embed() call)."""
+
+    name = 'gemini'
+    remote = True
+
+    def __init__(
+        self,
+        model_name: str = "models/text-embedding-004",
+        dimensions: int = 768,
+        model_version: str = "2026-01",
+        batch_size: int = 100
+    ):
+        """
+        Initialize backend (genai must already be configured with an API key).
+
+        Args:
+            model_name: Gemini embedding model
+            dimensions: Vector width the model returns
+            model_version: Version tag stored next to the vectors
+            batch_size: Texts per request (batchEmbedContents maximum is 100)
+        """
+        self.model_name = model_name
+        self.dimensions = dimensions
+        self.model_version = model_version
+        self.batch_size = batch_size
+
+    def embed(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        import google.generativeai as genai
+
+        # A list is sent as one batchEmbedContents request
+        content = texts[0] if len(texts) == 1 else texts
+        result = genai.embed_content(model=self.model_name, content=content, task_type=task_type)
+        embeddings = result['embedding']
+        return [embeddings] if len(texts) == 1 else embeddings
+
+
+class HashedTfidfBackend(EmbeddingBackend):
+    """
+    Local hashed TF-IDF projection.
+
+    Example:
+        >>> backend = HashedTfidfBackend(idf_path="embedding_cache/idf.json")
+        >>> backend.fit(corpus_texts)          # optional; changes model_version
+        >>> vectors = backend.embed_matrix(texts)
+    """
+
+    name = 'hashed-tfidf'
+    model_name = 'local/hashed-tfidf'
+    remote = False
+
+    # Bumped when tokenisation or hashing changes (invalidates stored vectors)
+    ALGORITHM_VERSION = 'v1'
+
+    def __init__(self, dimensions: int = 768, idf_path: Optional[str] = None, batch_size: int = 1000):
+        """
+        Initialize backend.
+
+        Args:
+            dimensions: Vector width (768 keeps existing vector index definitions valid)
+            idf_path: JSON file of fitted IDF weights; loaded if it exists,
+                      written by fit()
+            batch_size: Texts per embed() call
+        """
+        self.dimensions = dimensions
+        self.batch_size = batch_size
+        self.idf_path = Path(idf_path) if idf_path else None
+        self.idf: Dict[str, float] = {}
+        self.default_idf = 1.0
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+
+        if self.idf_path and self.idf_path.exists():
+            data = json.loads(self.idf_path.read_text(encoding='utf-8'))
+            self.idf = data['idf']
+            self.default_idf = data['default_idf']
+
+    @property
+    def model_version(self) -> str:
+        """Algorithm, width and IDF fingerprint: any change means re-embedding."""
+        if not self.idf:
+            fingerprint = 'tf'
+        else:
+            payload = json.dumps([self.default_idf, sorted(self.idf.items())])
+            fingerprint = 'idf-' + hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+        return f"{self.ALGORITHM_VERSION}-d{self.dimensions}-{fingerprint}"
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lowercased alphanumeric unigrams plus adjacent bigrams."""
+        words = _TOKEN.findall((text or '').lower())
+        return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+    def fit(self, texts: Iterable[str], min_df: int = 1) -> 'HashedTfidfBackend':
+        """
+        Learn smoothed IDF weights from a corpus (and save them if idf_path is set).
+
+        Args:
+            texts: Corpus, e.g. every pattern text
+            min_df: Features seen in fewer documents fall back to the unseen-term weight
+
+        Returns:
+            self (model_version now reflects the fitted weights)
+        """
+        document_frequency = Counter()
+        documents = 0
+        for text in texts:
+            documents += 1
+            document_frequency.update(set(self.tokenize(text)))
+
+        # sklearn-style smoothing: ln((1 + N) / (1 + df)) + 1
+        self.idf = {
+            token: round(math.log((1 + documents) / (1 + df)) + 1, 6)
+            for token, df in document_frequency.items() if df >= min_df
+        }
+        self.default_idf = round(math.log(1 + documents) + 1, 6)
+
+        if self.idf_path:
+            self.idf_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.idf_path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps({'default_idf': self.default_idf, 'idf': self.idf}), encoding='utf-8')
+            os.replace(tmp_path, self.idf_path)
+        return self
+
+    def embed(self, texts: List[str], task_type: str = "retrieval_document") -> List[List[float]]:
+        return self.embed_matrix(texts).tolist()
+
+    def embed_matrix(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts as one float32 matrix (rows L2-normalised; all-zero for empty text).
+
+        Args:
+            texts: Any number of texts
+
+        Returns:
+            (len(texts), dimensions) array
+        """
+        rows, columns, values = [], [], []
+        for row, text in enumerate(texts):
+            for token, count in Counter(self.tokenize(text)).items():
+                bucket, sign = self._bucket(token)
+                rows.append(row)
+                columns.append(bucket)
+                values.append(sign * (1.0 + math.log(count)) * self.idf.get(token, self.default_idf))
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.asarray(rows), np.asarray(columns)), np.asarray(values, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def _bucket(self, token: str) -> Tuple[int, float]:
+        """Stable (bucket, sign) for a feature; Python's hash() is salted per process."""
+        cached = self._buckets.get(token)
+        if cached is None:
+            digest = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+            cached = (digest % self.dimensions, 1.0 if digest >> 63 else -1.0)
+            self._buckets[token] = cached
+        return cached
+
+
+BACKENDS = {
+    'gemini': GeminiEmbeddingBackend,
+    'hashed-tfidf': HashedTfidfBackend,
+    'local': HashedTfidfBackend
+}
+
+
+def get_embedding_backend(name: Optional[str] = None, **options) -> EmbeddingBackend:
+    """
+    Build the configured backend.
+
+    Args:
+        name: Backend name (default: EMBEDDING_BACKEND environment variable, else 'gemini')
+        **options: Constructor arguments. The local backend also reads
+                   LOCAL_EMBEDDING_DIMENSIONS and LOCAL_EMBEDDING_IDF when
+                   dimensions / idf_path are not given
+
+    Raises:
+        ValueError: For an unknown backend name
+    """
+    name = (name or os.getenv('EMBEDDING_BACKEND') or 'gemini').lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name} (expected one of {sorted(BACKENDS)})")
+
+    backend_class = BACKENDS[name]
+    if backend_class is HashedTfidfBackend:
+        options.setdefault('dimensions', int(os.getenv('LOCAL_EMBEDDING_DIMENSIONS', '768')))
+        options.setdefault('idf_path', os.getenv('LOCAL_EMBEDDING_IDF'))
+    return backend_class(**options)
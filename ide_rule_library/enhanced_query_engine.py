@@ -10,7 +10,9 @@ Prevents cargo culting by filtering based on:
 """
 
 import os
+from functools import lru_cache
 from typing import List, Dict, Optional
+import numpy as np
 import google.generativeai as genai
 from neo4j import GraphDatabase
 
@@ -22,28 +24,296 @@ from ide_rule_library.exceptions import (
     MissingEnvironmentVariableError
 )
 from ide_rule_library.retry_handler import call_gemini_embedding_with_retry
+from ide_rule_library.embedding_backends import EmbeddingBackend, GeminiEmbeddingBackend, get_embedding_backend
+from ide_rule_library.query_cache import QueryCache, result_key
+
+
+# Columns returned by the quality-filtered query and the fallback candidate pool
+QUALITY_COLUMNS = """
+    RETURN r.id AS id,
+           r.source_repo AS source_repo,
+           r.file_path AS file_path,
+           r.content AS content,
+           r.purpose AS purpose,
+           r.key_practices AS key_practices,
+           r.categories AS categories,
+           r.reasoning AS reasoning,
+           r.technologies AS technologies,
+           r.project_types AS project_types,
+           r.stars AS stars,
+           r.repo_quality_score AS repo_quality_score,
+           r.confidence_level AS confidence_level,
+           r.confidence_reasoning AS confidence_reasoning,
+           r.suitable_project_sizes AS suitable_project_sizes,
+           r.suitable_team_sizes AS suitable_team_sizes,
+           r.trade_offs AS trade_offs,
+           r.anti_patterns AS anti_patterns,
+           r.alternative_approaches AS alternative_approaches,
+           r.has_ci_cd AS has_ci_cd,
+           r.has_tests AS has_tests,
+           r.has_deployment AS has_deployment,
+           r.production_signals AS production_signals,
+           r.days_since_update AS days_since_update,
+           score
+"""
+
+QUALITY_RETURN = QUALITY_COLUMNS + """    ORDER BY r.repo_quality_score DESC, score DESC
+    LIMIT $top_k
+"""
+
+# Candidates are ranked by similarity; the ladder re-orders each level in memory
+POOL_RETURN = QUALITY_COLUMNS + """    ORDER BY score DESC
+"""
+
+# Columns returned by the similarity-only queries
+SEMANTIC_RETURN = """
+    RETURN r.id AS id,
+           r.source_repo AS source_repo,
+           r.file_path AS file_path,
+           r.content AS content,
+           r.purpose AS purpose,
+           r.key_practices AS key_practices,
+           r.categories AS categories,
+           r.reasoning AS reasoning,
+           r.technologies AS technologies,
+           r.project_types AS project_types,
+           r.stars AS stars,
+           COALESCE(r.repo_quality_score, 0) AS repo_quality_score,
+           COALESCE(r.confidence_level, 1) AS confidence_level,
+           score
+    ORDER BY score DESC
+    LIMIT $top_k
+"""
+
+
+@lru_cache(maxsize=None)
+def quality_query_template(require_production_signals: bool, project_size: bool, team_size: bool,
+                           project_type: bool, technologies: bool) -> str:
+    """
+    Quality-filtered vector query for one combination of optional filters.
+    
+    Built once per combination; the identical text also lets Neo4j reuse its
+    cached plan. Filter values are always passed as parameters.
+    """
+    conditions = [
+        "$ide_type IN r.ide_types",
+        "r.repo_quality_score >= $min_quality_score",
+        "r.confidence_level >= $min_confidence",
+        "r.days_since_update <= $max_days_since_update"
+    ]
+    if require_production_signals:
+        conditions.append("(r.has_ci_cd = true OR r.has_tests = true)")
+    if project_size:
+        conditions.append("($project_size IN r.suitable_project_sizes OR size(r.suitable_project_sizes) = 0)")
+    if team_size:
+        conditions.append("($team_size IN r.suitable_team_sizes OR size(r.suitable_team_sizes) = 0)")
+    if project_type:
+        conditions.append("$project_type IN r.project_types")
+    if technologies:
+        conditions.append("ANY(tech IN $technologies WHERE tech IN r.technologies)")
+    
+    cypher = """
+    CALL db.index.vector.queryNodes('ide_rule_embeddings', $top_k * 3, $embedding)
+    YIELD node AS r, score
+    WHERE """ + "\n      AND ".join(conditions)
+    return cypher + QUALITY_RETURN
+
+
+@lru_cache(maxsize=None)
+def semantic_query_template(project_type: bool, technologies: bool) -> str:
+    """Similarity-only vector query (v1 / no-quality fallback) for one filter combination."""
+    conditions = ["$ide_type IN r.ide_types"]
+    if project_type:
+        conditions.append("$project_type IN r.project_types")
+    if technologies:
+        conditions.append("ANY(tech IN $technologies WHERE tech IN r.technologies)")
+    
+    cypher = """
+    CALL db.index.vector.queryNodes('ide_rule_embeddings', $top_k, $embedding)
+    YIELD node AS r, score
+    WHERE """ + "\n      AND ".join(conditions)
+    return cypher + SEMANTIC_RETURN
+
+
+@lru_cache(maxsize=None)
+def candidate_pool_template(project_type: bool, technologies: bool) -> str:
+    """
+    Vector query for the fallback candidate pool.
+    
+    Only the filters every relaxation level shares are applied here; the
+    quality and context filters are applied to the pool in memory.
+    """
+    conditions = ["$ide_type IN r.ide_types"]
+    if project_type:
+        conditions.append("$project_type IN r.project_types")
+    if technologies:
+        conditions.append("ANY(tech IN $technologies WHERE tech IN r.technologies)")
+    
+    cypher = """
+    CALL db.index.vector.queryNodes('ide_rule_embeddings', $pool_size, $embedding)
+    YIELD node AS r, score
+    WHERE """ + "\n      AND ".join(conditions)
+    return cypher + POOL_RETURN
+
+
+def relaxation_ladder(min_quality_score: float, min_confidence: int, max_days_since_update: int,
+                      require_production_signals: bool, project_size: Optional[str],
+                      team_size: Optional[str]) -> List[Dict]:
+    """
+    Filter levels tried by query_rules_with_fallback, strictest first.
+    
+    A level with quality=False ranks by similarity alone and ignores every
+    quality and context filter.
+    """
+    return [
+        {
+            'name': 'strict',
+            'quality': True,
+            'min_quality_score': min_quality_score,
+            'min_confidence': min_confidence,
+            'max_days_since_update': max_days_since_update,
+            'require_production_signals': require_production_signals,
+            'project_size': project_size,
+            'team_size': team_size
+        },
+        {
+            'name': 'relaxed',
+            'quality': True,
+            'min_quality_score': max(min_quality_score - 20, 40),
+            'min_confidence': max(min_confidence - 1, 2),
+            'max_days_since_update': max_days_since_update * 2,  # Allow older repos
+            'require_production_signals': False,
+            'project_size': project_size,
+            'team_size': team_size
+        },
+        {
+            'name': 'minimal',
+            'quality': True,
+            'min_quality_score': 40.0,
+            'min_confidence': 2,
+            'max_days_since_update': None,  # No time limit
+            'require_production_signals': False,
+            'project_size': None,  # Remove context filters
+            'team_size': None
+        },
+        {'name': 'semantic', 'quality': False}
+    ]
+
+
+def _fits_context(value: Optional[str], suitable) -> bool:
+    """Cypher `$value IN list OR size(list) = 0`; a missing list never matches."""
+    if suitable is None:
+        return False
+    return value in suitable or len(suitable) == 0
+
+
+class CandidatePool:
+    """
+    Column arrays over one set of vector-search candidates.
+    
+    Each relaxation level is a boolean mask over these arrays, so checking
+    a level costs a few array comparisons instead of another vector query.
+    Missing properties are NaN/False and fail every comparison, as null
+    does in the Cypher filters.
+    """
+    
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self.score = self._numbers('score')
+        self.quality = self._numbers('repo_quality_score')
+        self.confidence = self._numbers('confidence_level')
+        self.days = self._numbers('days_since_update')
+        self.production = np.array(
+            [row.get('has_ci_cd') is True or row.get('has_tests') is True for row in rows], dtype=bool
+        )
+    
+    def _numbers(self, name: str) -> np.ndarray:
+        return np.array(
+            [np.nan if row.get(name) is None else row[name] for row in self.rows], dtype=float
+        ).reshape(len(self.rows))
+    
+    def select(self, level: Dict, top_k: int) -> List[Dict]:
+        """
+        Rules passing one level, ordered as the equivalent Cypher query would.
+        
+        Args:
+            level: Entry from relaxation_ladder()
+            top_k: Maximum rules returned
+        """
+        if not level['quality']:
+            order = np.argsort(-self.score, kind='stable')[:top_k]
+            rules = [dict(self.rows[i]) for i in order]
+            for rule in rules:
+                if rule.get('repo_quality_score') is None:
+                    rule['repo_quality_score'] = 0
+                if rule.get('confidence_level') is None:
+                    rule['confidence_level'] = 1
+            return rules
+        
+        with np.errstate(invalid='ignore'):
+            mask = (self.quality >= level['min_quality_score']) & (self.confidence >= level['min_confidence'])
+            if level['max_days_since_update'] is not None:
+                mask &= self.days <= level['max_days_since_update']
+        if level['require_production_signals']:
+            mask &= self.production
+        for value, column in ((level['project_size'], 'suitable_project_sizes'),
+                              (level['team_size'], 'suitable_team_sizes')):
+            if value:
+                mask &= np.array([_fits_context(value, row.get(column)) for row in self.rows], dtype=bool)
+        
+        index = np.flatnonzero(mask)
+        # ORDER BY repo_quality_score DESC, score DESC (lexsort: last key is primary)
+        order = index[np.lexsort((-self.score[index], -self.quality[index]))][:top_k]
+        return [dict(self.rows[i]) for i in order]
 
 
 class EnhancedRuleQueryEngine:
     """Quality-aware semantic search for IDE rules"""
     
-    def __init__(self, driver, logger, embedding_model: str = 'models/text-embedding-004'):
+    def __init__(self, driver, logger, embedding_model: str = 'models/text-embedding-004',
+                 cache: Optional[QueryCache] = None, embedding_backend: Optional[EmbeddingBackend] = None):
+        """
+        Args:
+            driver: Neo4j driver
+            logger: Logger
+            embedding_model: Gemini model for query embeddings
+            cache: Query cache (default: in-memory)
+            embedding_backend: Backend for query embeddings (default: EMBEDDING_BACKEND
+                environment variable, else Gemini with embedding_model). Must match
+                the backend the IDERule embeddings were written with
+        """
         self.driver = driver
         self.logger = logger
-        self.embedding_model = embedding_model
         self._quality_data_available = None  # Cache quality data check
         
-        # Configure Gemini
-        gemini_key = os.getenv('GEMINI_API_KEY')
-        if not gemini_key:
-            raise MissingEnvironmentVariableError(
-                "GEMINI_API_KEY not found in environment. "
-                "Please set it in your .env file or environment variables."
-            )
+        if embedding_backend is None:
+            if (os.getenv('EMBEDDING_BACKEND') or 'gemini').lower() == GeminiEmbeddingBackend.name:
+                embedding_backend = GeminiEmbeddingBackend(model_name=embedding_model)
+            else:
+                embedding_backend = get_embedding_backend()
+        self.embedding_backend = embedding_backend
+        
+        # Cache namespace for query embeddings (Gemini keeps its plain model name)
+        if embedding_backend.name == GeminiEmbeddingBackend.name:
+            self.embedding_model = embedding_backend.model_name
+        else:
+            self.embedding_model = embedding_backend.model_id
         
-        genai.configure(api_key=gemini_key)
+        # Query embeddings and recent results (in-memory unless a persistent cache is passed)
+        self.cache = cache or QueryCache()
         
-        self.logger.info("EnhancedRuleQueryEngine initialized")
+        # Configure Gemini
+        if embedding_backend.remote:
+            gemini_key = os.getenv('GEMINI_API_KEY')
+            if not gemini_key:
+                raise MissingEnvironmentVariableError(
+                    "GEMINI_API_KEY not found in environment. "
+                    "Please set it in your .env file or environment variables."
+                )
+            
+            genai.configure(api_key=gemini_key)
+        
+        self.logger.info(f"EnhancedRuleQueryEngine initialized ({embedding_backend.model_id})")
     
     def _check_quality_data_exists(self) -> bool:
         """
@@ -136,106 +406,47 @@ class EnhancedRuleQueryEngine:
         if not query or not query.strip():
             raise QueryError("Query cannot be empty")
         
-        # Generate query embedding with retry
-        try:
-            query_embedding = call_gemini_embedding_with_retry(
-                content=query,
-                embedding_model=self.embedding_model,
-                task_type="semantic_similarity",
-                max_attempts=3,
-                logger=self.logger
-            )
-        except Exception as e:
-            self.logger.error(f"Failed to generate query embedding: {e}", exc_info=True)
-            raise GeminiError(f"Failed to generate embedding for query: {e}") from e
+        filters = {
+            'ide_type': ide_type,
+            'min_quality_score': min_quality_score,
+            'min_confidence': min_confidence,
+            'max_days_since_update': max_days_since_update,
+            'require_production_signals': require_production_signals,
+            'project_size': project_size,
+            'team_size': team_size,
+            'project_type': project_type,
+            'technologies': technologies,
+            'top_k': top_k
+        }
+        cache_key = result_key('quality', query, **filters)
+        cached = self.cache.get_results(cache_key)
+        if cached is not None:
+            self.logger.info(f"Found {len(cached)} rules (cached)")
+            return cached
+        
+        query_embedding = self._embed_query(query)
+        
+        cypher = quality_query_template(
+            require_production_signals,
+            bool(project_size),
+            bool(team_size),
+            bool(project_type),
+            bool(technologies)
+        )
+        params = {
+            'embedding': query_embedding,
+            'top_k': top_k,
+            'ide_type': ide_type,
+            'min_quality_score': min_quality_score,
+            'min_confidence': min_confidence,
+            'max_days_since_update': max_days_since_update,
+            'project_size': project_size,
+            'team_size': team_size,
+            'project_type': project_type,
+            'technologies': technologies
+        }
         
         with self.driver.session() as session:
-            # Build quality-filtered query
-            cypher = """
-                CALL db.index.vector.queryNodes('ide_rule_embeddings', $top_k * 3, $embedding)
-                YIELD node AS r, score
-                WHERE $ide_type IN r.ide_types
-            """
-            
-            params = {
-                'embedding': query_embedding,
-                'top_k': top_k,
-                'ide_type': ide_type
-            }
-            
-            # Quality filters
-            cypher += """
-                AND r.repo_quality_score >= $min_quality_score
-                AND r.confidence_level >= $min_confidence
-                AND r.days_since_update <= $max_days_since_update
-            """
-            params['min_quality_score'] = min_quality_score
-            params['min_confidence'] = min_confidence
-            params['max_days_since_update'] = max_days_since_update
-            
-            # Production signals filter
-            if require_production_signals:
-                cypher += """
-                    AND (r.has_ci_cd = true OR r.has_tests = true)
-                """
-            
-            # Context filters
-            if project_size:
-                cypher += """
-                    AND ($project_size IN r.suitable_project_sizes OR size(r.suitable_project_sizes) = 0)
-                """
-                params['project_size'] = project_size
-            
-            if team_size:
-                cypher += """
-                    AND ($team_size IN r.suitable_team_sizes OR size(r.suitable_team_sizes) = 0)
-                """
-                params['team_size'] = team_size
-            
-            # Optional filters
-            if project_type:
-                cypher += """
-                    AND $project_type IN r.project_types
-                """
-                params['project_type'] = project_type
-            
-            if technologies:
-                cypher += """
-                    AND ANY(tech IN $technologies WHERE tech IN r.technologies)
-                """
-                params['technologies'] = technologies
-            
-            # Return with quality metadata
-            cypher += """
-                RETURN r.id AS id,
-                       r.source_repo AS source_repo,
-                       r.file_path AS file_path,
-                       r.content AS content,
-                       r.purpose AS purpose,
-                       r.key_practices AS key_practices,
-                       r.categories AS categories,
-                       r.reasoning AS reasoning,
-                       r.technologies AS technologies,
-                       r.project_types AS project_types,
-                       r.stars AS stars,
-                       r.repo_quality_score AS repo_quality_score,
-                       r.confidence_level AS confidence_level,
-                       r.confidence_reasoning AS confidence_reasoning,
-                       r.suitable_project_sizes AS suitable_project_sizes,
-                       r.suitable_team_sizes AS suitable_team_sizes,
-                       r.trade_offs AS trade_offs,
-                       r.anti_patterns AS anti_patterns,
-                       r.alternative_approaches AS alternative_approaches,
-                       r.has_ci_cd AS has_ci_cd,
-                       r.has_tests AS has_tests,
-                       r.has_deployment AS has_deployment,
-                       r.production_signals AS production_signals,
-                       r.days_since_update AS days_since_update,
-                       score
-                ORDER BY r.repo_quality_score DESC, score DESC
-                LIMIT $top_k
-            """
-            
             try:
                 result = session.run(cypher, **params)
                 rules = [dict(record) for record in result]
@@ -255,12 +466,67 @@ class EnhancedRuleQueryEngine:
                         f"(quality>={min_quality_score}, confidence>={min_confidence})"
                     )
                 
+                self.cache.put_results(cache_key, rules)
                 return rules
                 
             except Exception as e:
                 self.logger.error(f"Database query failed: {e}", exc_info=True)
                 raise DatabaseError(f"Failed to query rules from database: {e}") from e
     
+    def _embed_query(self, query: str) -> List[float]:
+        """
+        Embed query text, reusing cached embeddings.
+        
+        Raises:
+            GeminiError: If the embedding call fails
+        """
+        embedding = self.cache.get_embedding(self.embedding_model, query)
+        if embedding is not None:
+            return embedding
+        
+        try:
+            if self.embedding_backend.remote:
+                embedding = call_gemini_embedding_with_retry(
+                    content=query,
+                    embedding_model=self.embedding_model,
+                    task_type="semantic_similarity",
+                    max_attempts=3,
+                    logger=self.logger
+                )
+            else:
+                embedding = self.embedding_backend.embed([query], task_type="semantic_similarity")[0]
+        except Exception as e:
+            self.logger.error(f"Failed to generate query embedding: {e}", exc_info=True)
+            raise GeminiError(f"Failed to generate embedding for query: {e}") from e
+        
+        self.cache.put_embedding(self.embedding_model, query, embedding)
+        return embedding
+    
+    def _semantic_query(self, query: str, project_type: Optional[str], technologies: Optional[List[str]],
+                        ide_type: str, top_k: int) -> List[Dict]:
+        """Similarity-only vector query shared by the v1 and no-quality fallbacks."""
+        cache_key = result_key('semantic', query, project_type=project_type, technologies=technologies,
+                               ide_type=ide_type, top_k=top_k)
+        cached = self.cache.get_results(cache_key)
+        if cached is not None:
+            return cached
+        
+        query_embedding = self._embed_query(query)
+        
+        with self.driver.session() as session:
+            result = session.run(
+                semantic_query_template(bool(project_type), bool(technologies)),
+                embedding=query_embedding,
+                top_k=top_k,
+                ide_type=ide_type,
+                project_type=project_type,
+                technologies=technologies
+            )
+            rules = [dict(record) for record in result]
+        
+        self.cache.put_results(cache_key, rules)
+        return rules
+    
     def _query_v1_fallback(self,
                            query: str,
                            project_type: Optional[str] = None,
@@ -276,69 +542,16 @@ class EnhancedRuleQueryEngine:
         
         self.logger.info(f"V1 fallback query: '{query}' (no quality filters)")
         
-        # Generate query embedding
         try:
-            query_embedding = call_gemini_embedding_with_retry(
-                content=query,
-                embedding_model=self.embedding_model,
-                task_type="semantic_similarity",
-                max_attempts=3,
-                logger=self.logger
-            )
+            rules = self._semantic_query(query, project_type, technologies, ide_type, top_k)
+        except GeminiError:
+            raise
         except Exception as e:
-            raise GeminiError(f"Failed to generate embedding: {e}") from e
+            raise DatabaseError(f"V1 fallback query failed: {e}") from e
         
-        with self.driver.session() as session:
-            cypher = """
-                CALL db.index.vector.queryNodes('ide_rule_embeddings', $top_k, $embedding)
-                YIELD node AS r, score
-                WHERE $ide_type IN r.ide_types
-            """
-            
-            params = {
-                'embedding': query_embedding,
-                'top_k': top_k,
-                'ide_type': ide_type
-            }
-            
-            # Optional filters
-            if project_type:
-                cypher += " AND $project_type IN r.project_types"
-                params['project_type'] = project_type
-            
-            if technologies:
-                cypher += " AND ANY(tech IN $technologies WHERE tech IN r.technologies)"
-                params['technologies'] = technologies
-            
-            cypher += """
-                RETURN r.id AS id,
-                       r.source_repo AS source_repo,
-                       r.file_path AS file_path,
-                       r.content AS content,
-                       r.purpose AS purpose,
-                       r.key_practices AS key_practices,
-                       r.categories AS categories,
-                       r.reasoning AS reasoning,
-                       r.technologies AS technologies,
-                       r.project_types AS project_types,
-                       r.stars AS stars,
-                       COALESCE(r.repo_quality_score, 0) AS repo_quality_score,
-                       COALESCE(r.confidence_level, 1) AS confidence_level,
-                       score
-                ORDER BY score DESC
-                LIMIT $top_k
-            """
-            
-            try:
-                result = session.run(cypher, **params)
-                rules = [dict(record) for record in result]
-                
-                self.logger.info(f"V1 fallback found {len(rules)} rules")
-                
-                return rules
-                
-            except Exception as e:
-                raise DatabaseError(f"V1 fallback query failed: {e}") from e
+        self.logger.info(f"V1 fallback found {len(rules)} rules")
+        
+        return rules
     
     def validate_pattern_consensus(self, pattern: str, min_sources: int = 3) -> Dict:
         """
@@ -413,31 +626,56 @@ class EnhancedRuleQueryEngine:
                                    project_size: Optional[str] = None,
                                    team_size: Optional[str] = None,
                                    top_k: int = 15,
-                                   min_results: int = 5) -> List[Dict]:
+                                   min_results: int = 5,
+                                   pool_size: Optional[int] = None) -> List[Dict]:
         """
         Query rules with graceful degradation when too few results.
         
         Falls back through progressively relaxed filters:
-        1. Strict filters (as specified)
-        2. Relaxed quality (min_quality - 20, no production signals required)
-        3. Minimal filters (quality >= 40, confidence >= 2)
-        4. No quality filters (return best available by semantic similarity)
+        1. strict: Strict filters (as specified)
+        2. relaxed: Relaxed quality (min_quality - 20, no production signals required)
+        3. minimal: Minimal filters (quality >= 40, confidence >= 2)
+        4. semantic: No quality filters (return best available by semantic similarity)
+        
+        One embedding call and one vector query fetch a candidate pool with
+        every quality field; each level is then a vectorised filter over that
+        pool, so relaxing costs no further Gemini or Neo4j round trips.
         
         Args:
             Same as query_rules, plus:
             min_results: Minimum acceptable number of results before relaxing filters
+            pool_size: Candidates fetched from the vector index (default: top_k * 3,
+                       the candidate count of query_rules)
             
         Returns:
-            List of rules, with relaxation level logged
+            List of rules; each carries 'relaxation_level', the name of the
+            level that satisfied the request
+            
+        Raises:
+            QueryError: If query is empty
+            NoRulesFoundError: If even the semantic level finds nothing
         """
         
+        if not query or not query.strip():
+            raise QueryError("Query cannot be empty")
+        
         self.logger.info(f"Querying with fallback strategy (min_results={min_results})")
         
-        # Try strict filters first
-        rules = self.query_rules(
-            query=query,
-            project_type=project_type,
-            technologies=technologies,
+        ladder = relaxation_ladder(
+            min_quality_score, min_confidence, max_days_since_update,
+            require_production_signals, project_size, team_size
+        )
+        if not self._check_quality_data_exists():
+            self.logger.warning(
+                "No quality data available. Using semantic similarity only. "
+                "Run migrate_quality_scores.py to enable quality filtering."
+            )
+            ladder = ladder[-1:]
+        
+        pool_size = pool_size or top_k * 3
+        cache_key = result_key(
+            'fallback', query,
+            levels=[level['name'] for level in ladder],
             ide_type=ide_type,
             min_quality_score=min_quality_score,
             min_confidence=min_confidence,
@@ -445,74 +683,27 @@ class EnhancedRuleQueryEngine:
             require_production_signals=require_production_signals,
             project_size=project_size,
             team_size=team_size,
-            top_k=top_k
-        )
-        
-        if len(rules) >= min_results:
-            self.logger.info(f"Strict filters returned {len(rules)} rules")
-            return rules
-        
-        # Fallback 1: Relax quality and production signals
-        self.logger.warning(
-            f"Only {len(rules)} rules with strict filters. "
-            f"Relaxing to quality>={min_quality_score - 20}, no production requirement"
-        )
-        
-        rules = self.query_rules(
-            query=query,
-            project_type=project_type,
-            technologies=technologies,
-            ide_type=ide_type,
-            min_quality_score=max(min_quality_score - 20, 40),
-            min_confidence=max(min_confidence - 1, 2),
-            max_days_since_update=max_days_since_update * 2,  # Allow older repos
-            require_production_signals=False,
-            project_size=project_size,
-            team_size=team_size,
-            top_k=top_k
-        )
-        
-        if len(rules) >= min_results:
-            self.logger.info(f"Relaxed filters returned {len(rules)} rules")
-            return rules
-        
-        # Fallback 2: Minimal quality filters
-        self.logger.warning(
-            f"Only {len(rules)} rules with relaxed filters. "
-            f"Using minimal filters (quality>=40, confidence>=2)"
-        )
-        
-        rules = self.query_rules(
-            query=query,
             project_type=project_type,
             technologies=technologies,
-            ide_type=ide_type,
-            min_quality_score=40.0,
-            min_confidence=2,
-            max_days_since_update=999999,  # No time limit
-            require_production_signals=False,
-            project_size=None,  # Remove context filters
-            team_size=None,
-            top_k=top_k
+            top_k=top_k,
+            min_results=min_results,
+            pool_size=pool_size
         )
+        cached = self.cache.get_results(cache_key)
+        if cached is not None:
+            self.logger.info(f"Found {len(cached)} rules at level '{cached[0]['relaxation_level']}' (cached)")
+            return cached
         
-        if len(rules) >= min_results:
-            self.logger.info(f"Minimal filters returned {len(rules)} rules")
-            return rules
-        
-        # Fallback 3: No quality filters, pure semantic similarity
-        self.logger.warning(
-            f"Only {len(rules)} rules with minimal filters. "
-            f"Removing all quality filters, using pure semantic search"
-        )
+        pool = CandidatePool(self._candidate_pool(query, project_type, technologies, ide_type, pool_size))
         
-        rules = self._query_no_quality_filters(
-            query=query,
-            project_type=project_type,
-            technologies=technologies,
-            ide_type=ide_type,
-            top_k=top_k
-        )
+        for position, level in enumerate(ladder):
+            rules = pool.select(level, top_k)
+            if len(rules) >= min_results or position == len(ladder) - 1:
+                break
+            self.logger.warning(
+                f"Only {len(rules)} rules with {level['name']} filters. "
+                f"Relaxing to {ladder[position + 1]['name']} filters"
+            )
         
         if len(rules) == 0:
             raise NoRulesFoundError(
@@ -520,79 +711,41 @@ class EnhancedRuleQueryEngine:
                 f"Database may be empty or query embedding failed."
             )
         
-        self.logger.warning(f"No quality filters returned {len(rules)} rules")
+        for rule in rules:
+            rule['relaxation_level'] = level['name']
+        
+        log = self.logger.info if level is ladder[0] else self.logger.warning
+        log(f"{level['name'].capitalize()} filters returned {len(rules)} rules "
+            f"(from {len(pool.rows)} candidates)")
+        
+        self.cache.put_results(cache_key, rules)
         return rules
     
-    def _query_no_quality_filters(self,
-                                   query: str,
-                                   project_type: Optional[str] = None,
-                                   technologies: Optional[List[str]] = None,
-                                   ide_type: str = 'cursor',
-                                   top_k: int = 15) -> List[Dict]:
+    def _candidate_pool(self, query: str, project_type: Optional[str], technologies: Optional[List[str]],
+                        ide_type: str, pool_size: int) -> List[Dict]:
         """
-        Query rules without any quality filters (semantic similarity only).
+        Fetch the fallback candidate pool: one embedding, one vector query.
         
-        Used as last resort when all filtered queries return too few results.
+        Raises:
+            GeminiError: If the embedding call fails
+            DatabaseError: If the vector query fails
         """
-        
-        # Generate query embedding
-        try:
-            query_embedding = call_gemini_embedding_with_retry(
-                content=query,
-                embedding_model=self.embedding_model,
-                task_type="semantic_similarity",
-                max_attempts=3,
-                logger=self.logger
-            )
-        except Exception as e:
-            raise GeminiError(f"Failed to generate embedding: {e}") from e
+        query_embedding = self._embed_query(query)
         
         with self.driver.session() as session:
-            cypher = """
-                CALL db.index.vector.queryNodes('ide_rule_embeddings', $top_k, $embedding)
-                YIELD node AS r, score
-                WHERE $ide_type IN r.ide_types
-            """
-            
-            params = {
-                'embedding': query_embedding,
-                'top_k': top_k,
-                'ide_type': ide_type
-            }
-            
-            # Optional filters (still apply these if specified)
-            if project_type:
-                cypher += " AND $project_type IN r.project_types"
-                params['project_type'] = project_type
-            
-            if technologies:
-                cypher += " AND ANY(tech IN $technologies WHERE tech IN r.technologies)"
-                params['technologies'] = technologies
-            
-            cypher += """
-                RETURN r.id AS id,
-                       r.source_repo AS source_repo,
-                       r.file_path AS file_path,
-                       r.content AS content,
-                       r.purpose AS purpose,
-                       r.key_practices AS key_practices,
-                       r.categories AS categories,
-                       r.reasoning AS reasoning,
-                       r.technologies AS technologies,
-                       r.project_types AS project_types,
-                       r.stars AS stars,
-                       COALESCE(r.repo_quality_score, 0) AS repo_quality_score,
-                       COALESCE(r.confidence_level, 1) AS confidence_level,
-                       score
-                ORDER BY score DESC
-                LIMIT $top_k
-            """
-            
             try:
-                result = session.run(cypher, **params)
+                result = session.run(
+                    candidate_pool_template(bool(project_type), bool(technologies)),
+                    embedding=query_embedding,
+                    pool_size=pool_size,
+                    ide_type=ide_type,
+                    project_type=project_type,
+                    technologies=technologies
+                )
                 return [dict(record) for record in result]
             except Exception as e:
-                raise DatabaseError(f"No-filter query failed: {e}") from e
+                self.logger.error(f"Candidate pool query failed: {e}", exc_info=True)
+                raise DatabaseError(f"Failed to query rules from database: {e}") from e
     
     def get_quality_stats(self) -> Dict:
         """Get database quality statistics"""
@@ -17,6 +17,7 @@ from neo4j import GraphDatabase
 import google.generativeai as genai
 
 from ide_rule_library.enhanced_query_engine import EnhancedRuleQueryEngine
+from ide_rule_library.query_cache import QueryCache, cache_path
 from ide_rule_library.logger import StructuredLogger
 from ide_rule_library.exceptions import (
     NoRulesFoundError,
@@ -219,7 +220,8 @@ def generate_enhanced_cursorrules(
     output_file: str = '.cursorrules',
     min_quality: float = 60.0,
     min_confidence: int = 3,
-    top_k: int = 15
+    top_k: int = 15,
+    no_cache: bool = False
 ):
     """
     Generate enhanced .cursorrules with quality filtering.
@@ -234,6 +236,7 @@ def generate_enhanced_cursorrules(
         min_quality: Minimum quality score
         min_confidence: Minimum confidence level
         top_k: Number of examples to use
+        no_cache: Query Neo4j even if cached results exist (they may predate recent writes)
         
     Returns:
         True if successful, False otherwise
@@ -278,12 +281,22 @@ def generate_enhanced_cursorrules(
     except Exception as e:
         raise DatabaseError(f"Failed to connect to Neo4j: {e}") from e
     
+    query_cache = None
     try:
+        # Persistent query cache: repeated runs reuse embeddings and recent results
+        cache_config = config.get('query_cache', {})
+        query_cache = QueryCache(
+            db_path=str(cache_path(config)),
+            embedding_capacity=cache_config.get('embedding_cache_size', 1024),
+            result_ttl=0 if no_cache else cache_config.get('result_ttl_seconds', 600)
+        )
+        
         # Initialize enhanced query engine
         engine = EnhancedRuleQueryEngine(
             neo4j_driver,
             logger,
-            config['gemini']['embedding_model']
+            config['gemini']['embedding_model'],
+            cache=query_cache
         )
         
         # Query with quality filters and fallback
@@ -321,6 +334,7 @@ def generate_enhanced_cursorrules(
         print(f"  Min Quality Score: {min_quality}/100")
         print(f"  Min Confidence: {min_confidence}/5")
         print(f"  Production Signals: Required")
+        print(f"  Level Used: {rules[0]['relaxation_level']}")
         print(f"\nFound {len(rules)} high-quality examples")
         
         # Show quality metrics
@@ -362,6 +376,8 @@ def generate_enhanced_cursorrules(
         print(f"\n[ERROR] {e}")
         return False
     finally:
+        if query_cache is not None:
+            query_cache.close()
         neo4j_driver.close()
 
 
@@ -378,6 +394,8 @@ def main():
     parser.add_argument('--min-quality', type=float, default=60.0, help='Minimum quality score')
     parser.add_argument('--min-confidence', type=int, default=3, help='Minimum confidence level')
     parser.add_argument('--top-k', type=int, default=15, help='Number of examples to use')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Ignore cached query results (e.g. right after a pipeline run)')
     
     args = parser.parse_args()
     
@@ -390,7 +408,8 @@ def main():
         args.output,
         args.min_quality,
         args.min_confidence,
-        args.top_k
+        args.top_k,
+        args.no_cache
     )
     
     sys.exit(0 if success else 1)
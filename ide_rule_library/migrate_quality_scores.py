@@ -3,25 +3,28 @@
 Migrate existing IDERule nodes to add quality scores.
 
 Backfills quality data for all existing rules in the database by:
-1. Fetching all IDERule nodes without repo_quality_score
-2. Getting parent Pattern node for repo metadata
-3. Calculating quality scores using quality_scorer
-4. Updating Neo4j nodes with quality fields
+1. Streaming all IDERule nodes without repo_quality_score, joined to their
+   parent Pattern node's repo metadata, in one query
+2. Calculating quality scores using quality_scorer, once per distinct
+   repository (in a process pool for large libraries)
+3. Updating Neo4j nodes with quality fields in UNWIND batches
 
-Includes progress tracking, checkpointing, and resume capability.
+Includes progress tracking, per-batch checkpointing, and resume capability.
 """
 
 import os
 import json
-import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
-from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from neo4j import GraphDatabase
 import yaml
 
 from ide_rule_library.quality_scorer import RepoQualityScorer, enhance_repo_metadata
+from ide_rule_library.quality_summary import ENTRY_MAP, QualitySummary, apply_summary_delta
+from ide_rule_library.query_cache import invalidate_cached_results
 from ide_rule_library.logger import StructuredLogger
 from ide_rule_library.exceptions import (
     MigrationError,
@@ -32,6 +35,129 @@ from ide_rule_library.exceptions import (
 
 load_dotenv(override=True)
 
+# Scoring is done in-process below this many distinct repositories
+MIN_PARALLEL_REPOS = 200
+
+# Pattern properties scoring reads (the repo_data shape of enhance_repo_metadata)
+PATTERN_COLUMNS = """p.repo_name AS name,
+                           p.repo_url AS html_url,
+                           p.stars AS stars,
+                           p.forks AS forks,
+                           p.created_at AS created_at,
+                           p.updated_at AS updated_at,
+                           p.open_issues AS open_issues,
+                           p.closed_issues AS closed_issues,
+                           p.contributors AS contributors,
+                           p.files AS files,
+                           p.readme_length AS readme_length"""
+
+# Every unscored rule with its first Pattern (pattern_key is null when there is none)
+MIGRATION_QUERY = """
+    MATCH (r:IDERule)
+    WHERE r.repo_quality_score IS NULL
+    OPTIONAL MATCH (r)<-[:HAS_IDE_RULES|HAS_RULE]-(p:Pattern)
+    WITH r, head(collect(p)) AS p
+    RETURN r.id AS id,
+           elementId(p) AS pattern_key,
+           """ + PATTERN_COLUMNS + """
+    ORDER BY r.id
+"""
+
+# One row per rule; map-valued fields arrive JSON-encoded (Neo4j properties cannot be maps)
+# (previous values come back so the QualitySummary delta can swap them out)
+QUALITY_UPDATE_QUERY = """
+    UNWIND $rows AS row
+    MATCH (r:IDERule {id: row.id})
+    WITH r, row, """ + ENTRY_MAP + """ AS previous
+    SET r.repo_quality_score = row.repo_quality_score,
+        r.quality_breakdown = row.quality_breakdown,
+        r.confidence_level = row.confidence_level,
+        r.has_ci_cd = row.has_ci_cd,
+        r.has_deployment = row.has_deployment,
+        r.has_tests = row.has_tests,
+        r.has_monitoring = row.has_monitoring,
+        r.has_security = row.has_security,
+        r.production_signals = row.production_signals,
+        r.repo_age_days = row.repo_age_days,
+        r.days_since_update = row.days_since_update,
+        r.contributor_count = row.contributor_count,
+        r.quality_migrated_at = datetime()
+    RETURN row.id AS id, previous
+"""
+
+
+def parse_repo_dates(repo_data: Dict, logger=None) -> Dict:
+    """
+    Convert created_at/updated_at to timezone-aware datetimes.
+    
+    Accepts ISO strings, Neo4j temporal values and datetimes; naive values
+    are taken as UTC and unparseable ones become None.
+    """
+    for date_field in ['created_at', 'updated_at']:
+        value = repo_data.get(date_field)
+        if hasattr(value, 'to_native'):
+            value = value.to_native()
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                if logger:
+                    logger.warning(f"Invalid date format for {date_field}: {value}")
+                value = None
+        if isinstance(value, datetime) and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        repo_data[date_field] = value if isinstance(value, datetime) else None
+    return repo_data
+
+
+def score_repo(repo_data: Dict) -> Dict:
+    """
+    Quality fields for one repository, shaped for QUALITY_UPDATE_QUERY.
+    
+    Module-level so a process pool can run it.
+    """
+    # Missing Pattern properties come back as None; the scorer expects its defaults
+    repo_data = {key: value for key, value in repo_data.items() if value is not None}
+    enhanced = enhance_repo_metadata(repo_data)
+    contributors = enhanced.get('contributors')
+    
+    return {
+        'repo_quality_score': enhanced['repo_quality_score'],
+        'quality_breakdown': json.dumps(enhanced['quality_breakdown']),
+        'confidence_level': enhanced['confidence_level'],
+        'has_ci_cd': enhanced['has_ci_cd'],
+        'has_deployment': enhanced['has_deployment'],
+        'has_tests': enhanced['has_tests'],
+        'has_monitoring': enhanced['has_monitoring'],
+        'has_security': enhanced['has_security'],
+        'production_signals': json.dumps(enhanced.get('production_signals', {})),
+        'repo_age_days': enhanced.get('repo_age_days', 0),
+        'days_since_update': enhanced.get('days_since_update', 999),
+        'contributor_count': len(contributors) if isinstance(contributors, list) else 0
+    }
+
+
+def write_quality_batch(tx, rows: List[Dict]) -> int:
+    """
+    Transaction function: write quality fields for one batch of rules.
+    
+    The stored QualitySummary is updated in the same transaction: each
+    written rule's previous values are removed and its new ones added.
+    
+    Returns:
+        Number of rules updated
+    """
+    written = {record['id']: record['previous'] for record in tx.run(QUALITY_UPDATE_QUERY, rows=rows)}
+    
+    delta = QualitySummary()
+    for row in rows:
+        if row['id'] in written:
+            delta.remove(written[row['id']])
+            delta.add(row)
+    apply_summary_delta(tx, delta)
+    
+    return len(written)
+
 
 class QualityScoreMigration:
     """Migrate existing rules to add quality scores"""
@@ -75,8 +201,11 @@ class QualityScoreMigration:
             
             self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.checkpoint_file, 'w') as f:
-                json.dump(checkpoint, f, indent=2)
+            # Write then rename, so an interrupted save never leaves a truncated checkpoint
+            tmp_file = self.checkpoint_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(checkpoint, f)
+            os.replace(tmp_file, self.checkpoint_file)
             
             self.logger.debug(f"Checkpoint saved: {len(processed_ids)} rules processed")
             
@@ -126,42 +255,20 @@ class QualityScoreMigration:
         with self.driver.session() as session:
             try:
                 result = session.run("""
-                    MATCH (r:IDERule {id: $rule_id})<-[:HAS_RULE]-(p:Pattern)
-                    RETURN p.repo_name AS name,
-                           p.repo_url AS html_url,
-                           p.stars AS stars,
-                           p.forks AS forks,
-                           p.created_at AS created_at,
-                           p.updated_at AS updated_at,
-                           p.open_issues AS open_issues,
-                           p.closed_issues AS closed_issues,
-                           p.contributors AS contributors,
-                           p.files AS files,
-                           p.readme_length AS readme_length
+                    MATCH (r:IDERule {id: $rule_id})<-[:HAS_IDE_RULES|HAS_RULE]-(p:Pattern)
+                    RETURN """ + PATTERN_COLUMNS + """
+                    LIMIT 1
                 """, rule_id=rule_id)
                 
                 record = result.single()
                 
-                if not record:
-                    raise MissingDataError(f"No Pattern node found for rule {rule_id}")
-                
-                repo_data = dict(record)
-                
-                # Convert datetime strings if needed
-                for date_field in ['created_at', 'updated_at']:
-                    if date_field in repo_data and isinstance(repo_data[date_field], str):
-                        try:
-                            repo_data[date_field] = datetime.fromisoformat(
-                                repo_data[date_field].replace('Z', '+00:00')
-                            )
-                        except (ValueError, AttributeError):
-                            self.logger.warning(f"Invalid date format for {date_field}: {repo_data[date_field]}")
-                            repo_data[date_field] = None
-                
-                return repo_data
-                
             except Exception as e:
                 raise DatabaseError(f"Failed to get repo metadata for {rule_id}: {e}") from e
+            
+            if not record:
+                raise MissingDataError(f"No Pattern node found for rule {rule_id}")
+            
+            return parse_repo_dates(dict(record), self.logger)
     
     def update_rule_quality(self, rule_id: str, quality_data: Dict):
         """
@@ -169,41 +276,11 @@ class QualityScoreMigration:
         
         Args:
             rule_id: IDERule node ID
-            quality_data: Dictionary with quality fields
+            quality_data: Quality fields as returned by score_repo()
         """
         with self.driver.session() as session:
             try:
-                session.run("""
-                    MATCH (r:IDERule {id: $rule_id})
-                    SET r.repo_quality_score = $repo_quality_score,
-                        r.quality_breakdown = $quality_breakdown,
-                        r.confidence_level = $confidence_level,
-                        r.has_ci_cd = $has_ci_cd,
-                        r.has_deployment = $has_deployment,
-                        r.has_tests = $has_tests,
-                        r.has_monitoring = $has_monitoring,
-                        r.has_security = $has_security,
-                        r.production_signals = $production_signals,
-                        r.repo_age_days = $repo_age_days,
-                        r.days_since_update = $days_since_update,
-                        r.contributor_count = $contributor_count,
-                        r.quality_migrated_at = datetime()
-                """, 
-                    rule_id=rule_id,
-                    repo_quality_score=quality_data['quality_score'],
-                    quality_breakdown=quality_data['quality_breakdown'],
-                    confidence_level=quality_data['confidence_level'],
-                    has_ci_cd=quality_data['has_ci_cd'],
-                    has_deployment=quality_data['has_deployment'],
-                    has_tests=quality_data['has_tests'],
-                    has_monitoring=quality_data['has_monitoring'],
-                    has_security=quality_data['has_security'],
-                    production_signals=quality_data['production_signals'],
-                    repo_age_days=quality_data.get('repo_age_days', 0),
-                    days_since_update=quality_data.get('days_since_update', 999),
-                    contributor_count=quality_data.get('contributor_count', 0)
-                )
-                
+                session.execute_write(write_quality_batch, [{**quality_data, 'id': rule_id}])
             except Exception as e:
                 raise DatabaseError(f"Failed to update rule {rule_id}: {e}") from e
     
@@ -226,31 +303,13 @@ class QualityScoreMigration:
             # Get repo metadata from Pattern node
             repo_data = self.get_repo_metadata(rule_id)
             
-            # Calculate quality scores
-            enhanced_repo = enhance_repo_metadata(repo_data)
-            
-            # Extract quality fields
-            quality_data = {
-                'quality_score': enhanced_repo['quality_score'],
-                'quality_breakdown': enhanced_repo['quality_breakdown'],
-                'confidence_level': enhanced_repo['confidence_level'],
-                'has_ci_cd': enhanced_repo['has_ci_cd'],
-                'has_deployment': enhanced_repo['has_deployment'],
-                'has_tests': enhanced_repo['has_tests'],
-                'has_monitoring': enhanced_repo['has_monitoring'],
-                'has_security': enhanced_repo['has_security'],
-                'production_signals': enhanced_repo.get('production_signals', {}),
-                'repo_age_days': enhanced_repo.get('repo_age_days', 0),
-                'days_since_update': enhanced_repo.get('days_since_update', 999),
-                'contributor_count': len(enhanced_repo.get('contributors', []))
-            }
-            
-            # Update Neo4j
+            # Calculate quality scores and update Neo4j
+            quality_data = score_repo(repo_data)
             self.update_rule_quality(rule_id, quality_data)
             
             self.logger.info(
                 f"Migrated {rule_id}: "
-                f"quality={quality_data['quality_score']:.1f}, "
+                f"quality={quality_data['repo_quality_score']:.1f}, "
                 f"confidence={quality_data['confidence_level']}"
             )
             
@@ -266,14 +325,61 @@ class QualityScoreMigration:
             self.stats['errors'] += 1
             raise MigrationError(f"Migration failed for {rule_id}: {e}") from e
     
-    def run_migration(self, batch_size: int = 10, dry_run: bool = False):
+    def stream_migration_rows(self, session) -> Iterator[Dict]:
+        """
+        Every rule still needing scores, joined to its Pattern's metadata.
+        
+        One query; records are streamed from the driver as they are consumed.
+        
+        Args:
+            session: Open Neo4j session (must stay open while iterating)
+        """
+        try:
+            result = session.run(MIGRATION_QUERY)
+        except Exception as e:
+            raise DatabaseError(f"Failed to fetch rules: {e}") from e
+        
+        for record in result:
+            yield dict(record)
+    
+    def score_repos(self, repos: Dict[str, Dict], workers: int = 1) -> Dict[str, Dict]:
+        """
+        Score each distinct repository once.
+        
+        Args:
+            repos: pattern_key -> repo metadata
+            workers: Scoring processes (1 = in this process)
+            
+        Returns:
+            pattern_key -> quality fields (score_repo output)
+        """
+        keys = list(repos)
+        inputs = [repos[key] for key in keys]
+        
+        if workers > 1 and len(inputs) >= MIN_PARALLEL_REPOS:
+            chunksize = max(1, len(inputs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                scored = list(executor.map(score_repo, inputs, chunksize=chunksize))
+        else:
+            scored = [score_repo(repo_data) for repo_data in inputs]
+        
+        return dict(zip(keys, scored))
+    
+    def run_migration(self, batch_size: int = 500, dry_run: bool = False, workers: Optional[int] = None):
         """
         Run the migration for all rules.
         
+        Set-based: one streamed read of every rule with its Pattern metadata,
+        each distinct repository scored once (in a process pool for large
+        libraries), and results written back in UNWIND batches of
+        batch_size rules, checkpointing after each committed batch.
+        
         Args:
-            batch_size: Number of rules to process before checkpointing
+            batch_size: Rules per write transaction (and checkpoint)
             dry_run: If True, don't actually update the database
+            workers: Scoring processes (default: CPU count)
         """
+        workers = workers or os.cpu_count() or 1
         self.stats['start_time'] = datetime.utcnow().isoformat()
         
         self.logger.info("="*60)
@@ -283,65 +389,72 @@ class QualityScoreMigration:
         if dry_run:
             self.logger.info("DRY RUN MODE - No database changes will be made")
         
-        # Load checkpoint
+        # Load checkpoint (rules written earlier no longer match the query; this
+        # also remembers rules that were skipped)
         checkpoint = self.load_checkpoint()
         processed_ids = set(checkpoint['processed_ids'])
         
-        # Get rules to migrate
-        rules = self.get_rules_to_migrate()
-        self.stats['total_rules'] = len(rules)
+        # Read every rule and the metadata of its repository in one pass
+        rule_repos = []  # (rule_id, pattern_key)
+        repos = {}
+        with self.driver.session() as session:
+            for row in self.stream_migration_rows(session):
+                self.stats['total_rules'] += 1
+                rule_id = row.pop('id')
+                pattern_key = row.pop('pattern_key')
+                
+                if rule_id in processed_ids:
+                    continue
+                if pattern_key is None:
+                    self.logger.warning(f"Skipping {rule_id}: No Pattern node found")
+                    self.stats['skipped'] += 1
+                    continue
+                
+                rule_repos.append((rule_id, pattern_key))
+                if pattern_key not in repos:
+                    repos[pattern_key] = parse_repo_dates(row, self.logger)
         
-        if len(rules) == 0:
+        if self.stats['total_rules'] == 0:
             self.logger.info("No rules need migration. All rules already have quality scores.")
             return
         
-        # Filter out already processed
-        rules_to_process = [r for r in rules if r['id'] not in processed_ids]
-        
-        self.logger.info(f"Total rules: {len(rules)}")
+        self.logger.info(f"Total rules: {self.stats['total_rules']}")
         self.logger.info(f"Already processed: {len(processed_ids)}")
-        self.logger.info(f"Remaining: {len(rules_to_process)}")
-        self.logger.info(f"Batch size: {batch_size}")
+        self.logger.info(f"Remaining: {len(rule_repos)} ({len(repos)} distinct repositories)")
+        self.logger.info(f"Batch size: {batch_size}, scoring workers: {workers}")
         
-        if dry_run:
-            self.logger.info("\nDRY RUN: Processing first 3 rules as test...")
-            rules_to_process = rules_to_process[:3]
+        # Score every repository once
+        try:
+            scores = self.score_repos(repos, workers)
+        except Exception as e:
+            self.stats['errors'] += len(rule_repos)
+            raise MigrationError(f"Scoring failed: {e}") from e
         
-        # Process rules
-        for i, rule in enumerate(rules_to_process, 1):
-            try:
-                self.logger.info(f"\n[{i}/{len(rules_to_process)}] Processing {rule['id']}...")
-                
-                if not dry_run:
-                    success = self.migrate_rule(rule)
-                    if success:
-                        self.stats['migrated'] += 1
-                        processed_ids.add(rule['id'])
-                else:
-                    # Dry run: just fetch and calculate, don't update
-                    repo_data = self.get_repo_metadata(rule['id'])
-                    enhanced = enhance_repo_metadata(repo_data)
-                    self.logger.info(
-                        f"  Would set: quality={enhanced['quality_score']:.1f}, "
-                        f"confidence={enhanced['confidence_level']}"
-                    )
-                    self.stats['migrated'] += 1
-                
-                # Checkpoint every batch_size rules
-                if i % batch_size == 0 and not dry_run:
-                    self.save_checkpoint(list(processed_ids))
-                    self.logger.info(f"Checkpoint saved at {i} rules")
-                
-                # Rate limiting
-                time.sleep(0.1)
-                
-            except MigrationError as e:
-                self.logger.error(f"Migration error: {e}")
-                continue
+        rows = [{**scores[pattern_key], 'id': rule_id} for rule_id, pattern_key in rule_repos]
         
-        # Final checkpoint
-        if not dry_run:
-            self.save_checkpoint(list(processed_ids))
+        if dry_run:
+            for row in rows[:3]:
+                self.logger.info(
+                    f"  {row['id']}: would set quality={row['repo_quality_score']:.1f}, "
+                    f"confidence={row['confidence_level']}"
+                )
+            self.stats['migrated'] = len(rows)
+        else:
+            # Write back in batches; each committed batch is checkpointed
+            with self.driver.session() as session:
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    try:
+                        written = session.execute_write(write_quality_batch, batch)
+                    except Exception as e:
+                        self.logger.error(f"Failed to write batch of {len(batch)} rules: {e}", exc_info=True)
+                        self.stats['errors'] += len(batch)
+                        continue
+                    
+                    self.stats['migrated'] += written
+                    processed_ids.update(row['id'] for row in batch)
+                    self.save_checkpoint(list(processed_ids))
+                    self.logger.info(f"Checkpoint saved at {min(start + batch_size, len(rows))}/{len(rows)} rules")
         
         self.stats['end_time'] = datetime.utcnow().isoformat()
         
@@ -403,7 +516,8 @@ def main():
     
     parser = argparse.ArgumentParser(description='Migrate IDERule nodes to add quality scores')
     parser.add_argument('--dry-run', action='store_true', help='Test run without database updates')
-    parser.add_argument('--batch-size', type=int, default=10, help='Checkpoint every N rules')
+    parser.add_argument('--batch-size', type=int, default=500, help='Rules per write transaction / checkpoint')
+    parser.add_argument('--workers', type=int, default=None, help='Scoring processes (default: CPU count)')
     parser.add_argument('--verify-only', action='store_true', help='Only verify migration status')
     
     args = parser.parse_args()
@@ -441,10 +555,13 @@ def main():
         else:
             migration.run_migration(
                 batch_size=args.batch_size,
-                dry_run=args.dry_run
+                dry_run=args.dry_run,
+                workers=args.workers
             )
             
             if not args.dry_run:
+                # Cached query results hold the old scores
+                invalidate_cached_results(config)
                 migration.verify_migration()
         
         return 0
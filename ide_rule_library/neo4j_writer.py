@@ -1,8 +1,51 @@
 #!/usr/bin/env python3
 """Neo4j writer for IDERule nodes with duplicate detection"""
 
+import os
 from neo4j import GraphDatabase
-from typing import Dict, Optional
+from neo4j.exceptions import ConstraintError
+from typing import Dict, Iterable, List, Optional, Set
+
+from ide_rule_library.quality_summary import QualitySummary, apply_summary_delta
+from ide_rule_library.query_cache import invalidate_cached_results
+
+# IDERule properties written on create (everything else on the rule dict is ignored)
+RULE_PROPERTIES = [
+    'id', 'source_repo', 'file_path', 'file_format', 'content', 'content_hash',
+    'purpose', 'categories', 'key_practices', 'reasoning', 'ide_types',
+    'technologies', 'project_types', 'stars', 'embedding'
+]
+
+# One row per rule. MERGE on content_hash (unique, see setup_database_v2.py) makes
+# re-running a batch a no-op; existing rules are neither overwritten nor re-linked
+BULK_WRITE_QUERY = """
+    UNWIND $rows AS row
+    OPTIONAL MATCH (existing:IDERule {content_hash: row.content_hash})
+    WITH row, existing IS NULL AS created
+    MERGE (r:IDERule {content_hash: row.content_hash})
+    ON CREATE SET r += row.props,
+                  r.extracted_date = datetime(row.extracted_date)
+    WITH r, row, created
+    OPTIONAL MATCH (p:Pattern) WHERE p.name IN row.pattern_names
+    WITH r, row, created, [pattern IN collect(p) WHERE created] AS patterns
+    FOREACH (pattern IN patterns | MERGE (pattern)-[:HAS_IDE_RULES]->(r))
+    RETURN row.id AS id, created, size(patterns) > 0 AS linked
+"""
+
+
+def write_rule_batch(tx, rows: List[Dict]) -> List[Dict]:
+    """
+    Transaction function: create one batch of IDERule nodes and their links.
+
+    New rules carry no quality fields yet, so they only add to the stored
+    QualitySummary's rule count.
+
+    Returns:
+        One {'id', 'created', 'linked'} dict per row
+    """
+    outcomes = [dict(record) for record in tx.run(BULK_WRITE_QUERY, rows=rows)]
+    apply_summary_delta(tx, QualitySummary(rules=sum(1 for outcome in outcomes if outcome['created'])))
+    return outcomes
 
 
 class Neo4jRuleWriter:
@@ -14,6 +57,7 @@ class Neo4jRuleWriter:
         self.logger = logger
         self.batch_size = config['neo4j'].get('batch_size', 50)
         self.duplicate_check = config['neo4j'].get('duplicate_check', True)
+        self._known_hashes: Optional[Set[str]] = None  # Loaded on first bulk write
     
     def write_rule(self, rule_data: Dict, pattern_name: Optional[str] = None) -> bool:
         """Write IDERule node, skip if duplicate"""
@@ -48,6 +92,7 @@ class Neo4jRuleWriter:
                 """, **rule_data)
                 
                 self.logger.info(f"Created IDERule: {rule_data['id']}")
+                self._invalidate_query_cache()
                 
                 # Link to Pattern node if provided
                 if pattern_name:
@@ -69,6 +114,147 @@ class Neo4jRuleWriter:
                 self.logger.error(f"Failed to write rule {rule_data['id']}: {e}", exc_info=True)
                 return False
     
+    def write_rules_bulk(self, rules: Iterable[Dict], pattern_name: Optional[str] = None) -> Dict:
+        """
+        Write many IDERule nodes, one UNWIND transaction per batch_size rules.
+        
+        Duplicates are dropped client-side against the content hashes already
+        in the database (loaded once per writer) and within `rules`; the
+        MERGE on the unique content_hash catches anything written since, so
+        re-running a batch is safe. A batch that breaks a uniqueness constraint
+        (e.g. an edited rule file whose id is already stored under its old
+        hash) is retried one rule per transaction, so only those rules fail.
+        
+        Args:
+            rules: Rule dicts as built by the extractor; a rule's own
+                   'pattern_names' (or 'pattern_name') key overrides pattern_name
+            pattern_name: Pattern to link every rule to (HAS_IDE_RULES)
+            
+        Returns:
+            {
+                'created': rules written,
+                'skipped': duplicates not written,
+                'failed': rules that could not be written,
+                'linked': created rules linked to a Pattern,
+                'batches': transactions committed,
+                'skipped_ids': [...], 'failed_ids': [...]
+            }
+        """
+        stats = {'created': 0, 'skipped': 0, 'failed': 0, 'linked': 0, 'batches': 0,
+                 'skipped_ids': [], 'failed_ids': []}
+        
+        known = self.load_known_hashes() if self.duplicate_check else set()
+        rows = []
+        seen = set()
+        for rule in rules:
+            content_hash = rule['content_hash']
+            if content_hash in known or content_hash in seen:
+                stats['skipped'] += 1
+                stats['skipped_ids'].append(rule['id'])
+                continue
+            seen.add(content_hash)
+            rows.append({
+                'id': rule['id'],
+                'content_hash': content_hash,
+                'props': {key: rule.get(key) for key in RULE_PROPERTIES},
+                'extracted_date': rule.get('extracted_date'),
+                'pattern_names': self._pattern_names(rule, pattern_name)
+            })
+        
+        unlinked = 0
+        with self.driver.session() as session:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                try:
+                    # Managed transaction: transient errors are retried by the driver
+                    outcomes = session.execute_write(write_rule_batch, batch)
+                except ConstraintError as e:
+                    # Usually an edited rule file: same id, new content_hash. Write the
+                    # batch row by row so only the conflicting rules fail
+                    self.logger.warning(f"Constraint violation in batch of {len(batch)} rules, "
+                                        f"writing them one by one: {e}")
+                    outcomes = self._write_rows(session, batch, stats)
+                except Exception as e:
+                    self.logger.error(f"Failed to write batch of {len(batch)} rules: {e}", exc_info=True)
+                    stats['failed'] += len(batch)
+                    stats['failed_ids'].extend(row['id'] for row in batch)
+                    continue
+                else:
+                    stats['batches'] += 1
+                
+                wants_link = {row['id'] for row in batch if row['pattern_names']}
+                for outcome in outcomes:
+                    if outcome['created']:
+                        stats['created'] += 1
+                        if outcome['linked']:
+                            stats['linked'] += 1
+                        elif outcome['id'] in wants_link:
+                            unlinked += 1
+                    else:
+                        # Written by someone else after the hashes were loaded
+                        stats['skipped'] += 1
+                        stats['skipped_ids'].append(outcome['id'])
+                if self._known_hashes is not None:
+                    failed = set(stats['failed_ids'])
+                    self._known_hashes.update(row['content_hash'] for row in batch if row['id'] not in failed)
+        
+        self.logger.info(
+            f"Bulk write: {stats['created']} created, {stats['skipped']} skipped, "
+            f"{stats['failed']} failed in {stats['batches']} batch(es)"
+        )
+        if unlinked:
+            self.logger.warning(f"{unlinked} created rule(s) not linked: Pattern not found")
+        if stats['created']:
+            self._invalidate_query_cache()
+        return stats
+    
+    @staticmethod
+    def _pattern_names(rule: Dict, pattern_name: Optional[str]) -> List[str]:
+        """Patterns a bulk-written rule links to: its own list or name, else the call's default"""
+        if 'pattern_names' in rule:
+            return list(rule['pattern_names'])
+        name = rule.get('pattern_name', pattern_name)
+        return [name] if name else []
+    
+    def _write_rows(self, session, rows: List[Dict], stats: Dict) -> List[Dict]:
+        """Write rows one transaction each, recording failures in stats; returns the written outcomes"""
+        outcomes = []
+        for row in rows:
+            try:
+                outcomes.extend(session.execute_write(write_rule_batch, [row]))
+            except Exception as e:
+                self.logger.error(f"Failed to write rule {row['id']}: {e}")
+                stats['failed'] += 1
+                stats['failed_ids'].append(row['id'])
+            else:
+                stats['batches'] += 1
+        return outcomes
+    
+    def _invalidate_query_cache(self):
+        """Clear cached query results so the next generator run sees these writes"""
+        try:
+            invalidate_cached_results(self.config)
+        except Exception as e:
+            self.logger.warning(f"Could not clear cached query results: {e}")
+    
+    def load_known_hashes(self, refresh: bool = False) -> Set[str]:
+        """
+        Content hashes of every stored IDERule (one query, cached on the writer).
+        
+        Args:
+            refresh: Reload even if already cached
+        """
+        if self._known_hashes is None or refresh:
+            with self.driver.session() as session:
+                result = session.run("""
+                    MATCH (r:IDERule)
+                    WHERE r.content_hash IS NOT NULL
+                    RETURN r.content_hash AS hash
+                """)
+                self._known_hashes = {record['hash'] for record in result}
+            self.logger.info(f"Loaded {len(self._known_hashes)} known content hashes")
+        return self._known_hashes
+    
     def _is_duplicate(self, session, content_hash: str) -> bool:
         """Check if content hash already exists"""
         try:
@@ -131,6 +317,7 @@ class Neo4jRuleWriter:
                 deleted = result.single()['deleted']
                 if deleted:
                     self.logger.info(f"Deleted IDERule: {rule_id}")
+                    self._invalidate_query_cache()
                     return True
                 else:
                     self.logger.warning(f"IDERule not found: {rule_id}")
@@ -155,6 +342,7 @@ class Neo4jRuleWriter:
                 
                 deleted = result.single()['deleted']
                 self.logger.warning(f"Deleted {deleted} IDERule nodes")
+                self._invalidate_query_cache()
                 return deleted
                 
             except Exception as e:
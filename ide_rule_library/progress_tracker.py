@@ -2,18 +2,31 @@
 """Track scan/extraction progress with checkpoint/resume capability"""
 
 import json
+import os
+import threading
 from pathlib import Path
-from typing import Dict, Set, Optional
+from typing import Any, Dict, Set, Optional
 from datetime import datetime
 
 
 class ProgressTracker:
-    """Track scan/extraction progress with checkpoint/resume"""
+    """
+    Track scan/extraction progress with checkpoint/resume
     
-    def __init__(self, checkpoint_file: str = 'extraction_progress.json'):
+    Every mark_* call is appended to a journal next to the checkpoint
+    (one JSON line, flushed immediately), so a crash loses at most the item
+    in flight. The checkpoint itself is only rewritten on save_checkpoint()
+    or every `compact_every` items, which then empties the journal. On load
+    the checkpoint is read and the journal replayed on top of it.
+    """
+    
+    def __init__(self, checkpoint_file: str = 'extraction_progress.json', compact_every: int = 500):
         self.checkpoint_file = Path(checkpoint_file)
+        self.journal_file = self.checkpoint_file.with_suffix('.journal')
+        self.compact_every = compact_every
         self.processed: Set[str] = set()
         self.failed: Dict[str, str] = {}
+        self.results: Dict[str, Any] = {}
         self.stats = {
             'total_attempted': 0,
             'successful': 0,
@@ -21,79 +34,160 @@ class ProgressTracker:
             'skipped': 0,
             'last_update': None
         }
+        self._seq = 0  # Sequence number of the last recorded item
+        self._lock = threading.RLock()
+        self._journal = None
         self._load_checkpoint()
     
     def _load_checkpoint(self):
-        """Load progress from checkpoint file"""
+        """Load progress from checkpoint file, then replay the journal"""
         if self.checkpoint_file.exists():
             try:
                 with open(self.checkpoint_file, 'r') as f:
                     data = json.load(f)
                     self.processed = set(data.get('processed', []))
                     self.failed = data.get('failed', {})
+                    self.results = data.get('results', {})
                     self.stats = data.get('stats', self.stats)
-                    print(f"Loaded checkpoint: {len(self.processed)} already processed")
+                    self._seq = data.get('journal_seq', 0)
             except Exception as e:
                 print(f"Warning: Could not load checkpoint: {e}")
+        
+        replayed = self._replay_journal()
+        if self.processed:
+            message = f"Loaded checkpoint: {len(self.processed)} already processed"
+            if replayed:
+                message += f" ({replayed} recovered from journal)"
+            print(message)
     
-    def is_processed(self, repo_url: str, file_path: str = None) -> bool:
-        """Check if item already processed"""
-        if file_path:
-            key = f"{repo_url}:{file_path}"
-        else:
-            key = repo_url
-        return key in self.processed
-    
-    def mark_processed(self, repo_url: str, file_path: str = None, success: bool = True, error: str = None):
-        """Mark item as processed and update stats"""
-        if file_path:
-            key = f"{repo_url}:{file_path}"
-        else:
-            key = repo_url
+    def _replay_journal(self) -> int:
+        """Apply journal entries newer than the checkpoint; returns the number applied"""
+        if not self.journal_file.exists():
+            return 0
         
+        replayed = 0
+        good_offset = 0  # End of the last complete entry
+        with open(self.journal_file, 'rb+') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("Unterminated line")
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-write: cut it off so the
+                    # next run's entries are not appended onto the fragment
+                    f.truncate(good_offset)
+                    break
+                good_offset += len(line)
+                if entry['seq'] <= self._seq:
+                    continue  # Already in the checkpoint (crash between save and truncate)
+                self._apply(entry)
+                replayed += 1
+        return replayed
+    
+    def _apply(self, entry: Dict):
+        """Apply one recorded item to the in-memory state"""
+        key = entry['key']
         self.processed.add(key)
         
-        if success:
+        if entry['status'] == 'skipped':
+            self.stats['skipped'] += 1
+        elif entry['status'] == 'success':
             self.stats['successful'] += 1
         else:
             self.stats['failed'] += 1
-            if error:
-                self.failed[key] = error
+            if entry.get('error'):
+                self.failed[key] = entry['error']
+        if entry.get('result') is not None:
+            self.results[key] = entry['result']
         
         self.stats['total_attempted'] += 1
-        self.stats['last_update'] = datetime.utcnow().isoformat()
+        self.stats['last_update'] = entry['at']
+        self._seq = entry['seq']
+    
+    def _record(self, key: str, status: str, error: str = None, result: Any = None):
+        """Journal an item, then apply it"""
+        with self._lock:
+            entry = {
+                'seq': self._seq + 1,
+                'key': key,
+                'status': status,
+                'error': error,
+                'result': result,
+                'at': datetime.utcnow().isoformat()
+            }
+            if self._journal is None:
+                self._journal = open(self.journal_file, 'a')
+            self._journal.write(json.dumps(entry) + '\n')
+            self._journal.flush()
+            self._apply(entry)
+            
+            # Fold the journal into the checkpoint now and then
+            if self.stats['total_attempted'] % self.compact_every == 0:
+                self.save_checkpoint()
+    
+    @staticmethod
+    def _key(repo_url: str, file_path: str = None) -> str:
+        return f"{repo_url}:{file_path}" if file_path else repo_url
+    
+    def is_processed(self, repo_url: str, file_path: str = None) -> bool:
+        """Check if item already processed"""
+        return self._key(repo_url, file_path) in self.processed
+    
+    def get_result(self, repo_url: str, file_path: str = None) -> Any:
+        """Result payload recorded for a processed item, if any"""
+        return self.results.get(self._key(repo_url, file_path))
+    
+    def mark_processed(self, repo_url: str, file_path: str = None, success: bool = True, error: str = None,
+                       result: Any = None):
+        """
+        Mark item as processed and update stats
         
-        # Save checkpoint every 10 items
-        if self.stats['total_attempted'] % 10 == 0:
-            self.save_checkpoint()
+        Args:
+            repo_url: Repository URL
+            file_path: Optional file within the repository
+            success: Whether processing succeeded
+            error: Error message for failed items
+            result: Optional JSON-serialisable payload kept for resume (e.g. scan findings)
+        """
+        self._record(
+            self._key(repo_url, file_path),
+            'success' if success else 'failed',
+            error=error,
+            result=result
+        )
     
     def mark_skipped(self, repo_url: str, file_path: str = None):
         """Mark item as skipped (already in database)"""
-        if file_path:
-            key = f"{repo_url}:{file_path}"
-        else:
-            key = repo_url
-        
-        self.processed.add(key)
-        self.stats['skipped'] += 1
-        self.stats['total_attempted'] += 1
-        self.stats['last_update'] = datetime.utcnow().isoformat()
+        self._record(self._key(repo_url, file_path), 'skipped')
     
     def save_checkpoint(self):
-        """Save current progress to checkpoint file"""
-        try:
-            data = {
-                'processed': list(self.processed),
-                'failed': self.failed,
-                'stats': self.stats,
-                'saved_at': datetime.utcnow().isoformat()
-            }
-            
-            with open(self.checkpoint_file, 'w') as f:
-                json.dump(data, f, indent=2)
+        """Save current progress to checkpoint file and empty the journal"""
+        with self._lock:
+            try:
+                data = {
+                    'processed': list(self.processed),
+                    'failed': self.failed,
+                    'results': self.results,
+                    'stats': self.stats,
+                    'journal_seq': self._seq,
+                    'saved_at': datetime.utcnow().isoformat()
+                }
+                
+                # Write-then-rename so a crash never leaves a half-written checkpoint
+                tmp_file = self.checkpoint_file.with_suffix('.tmp')
+                with open(tmp_file, 'w') as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp_file, self.checkpoint_file)
                 
-        except Exception as e:
-            print(f"Warning: Could not save checkpoint: {e}")
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                if self.journal_file.exists():
+                    self.journal_file.unlink()
+            
+            except Exception as e:
+                print(f"Warning: Could not save checkpoint: {e}")
     
     def get_stats(self) -> Dict:
         """Get current statistics"""
@@ -104,15 +198,22 @@ class ProgressTracker:
         return self.failed.copy()
     
     def clear_checkpoint(self):
-        """Clear checkpoint file (for starting fresh)"""
-        if self.checkpoint_file.exists():
-            self.checkpoint_file.unlink()
-        self.processed = set()
-        self.failed = {}
-        self.stats = {
-            'total_attempted': 0,
-            'successful': 0,
-            'failed': 0,
-            'skipped': 0,
-            'last_update': None
-        }
+        """Clear checkpoint file and journal (for starting fresh)"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            for path in (self.checkpoint_file, self.journal_file):
+                if path.exists():
+                    path.unlink()
+            self.processed = set()
+            self.failed = {}
+            self.results = {}
+            self._seq = 0
+            self.stats = {
+                'total_attempted': 0,
+                'successful': 0,
+                'failed': 0,
+                'skipped': 0,
+                'last_update': None
+            }
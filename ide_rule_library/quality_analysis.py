@@ -2,7 +2,8 @@
 """
 Quality score distribution analysis and smart threshold calculation.
 
-Provides percentile-based thresholds instead of arbitrary hardcoded values.
+Provides percentile-based thresholds instead of arbitrary hardcoded values,
+served from the incrementally maintained QualitySummary rather than scans.
 """
 
 import os
@@ -14,16 +15,79 @@ from neo4j import GraphDatabase
 
 from ide_rule_library.logger import StructuredLogger
 from ide_rule_library.exceptions import DatabaseError, MissingDataError
+from ide_rule_library.quality_summary import (
+    LOAD_SUMMARY_QUERY,
+    RULE_COUNT_QUERY,
+    SAVE_SUMMARY_QUERY,
+    STREAM_ENTRIES_QUERY,
+    SUMMARY_NAME,
+    QualitySummary
+)
 
 load_dotenv(override=True)
 
 
 class QualityAnalyzer:
-    """Analyze quality score distribution and calculate smart thresholds"""
+    """
+    Analyze quality score distribution and calculate smart thresholds.
+    
+    Every report is served from the stored QualitySummary (see
+    quality_summary.py), which the writers keep up to date; it is read once
+    per analyzer and rebuilt in a single pass when missing or stale.
+    """
     
     def __init__(self, neo4j_driver, logger):
         self.driver = neo4j_driver
         self.logger = logger
+        self._summary: Optional[QualitySummary] = None
+    
+    def load_summary(self, refresh: bool = False) -> QualitySummary:
+        """
+        Stored quality summary, rebuilt if missing or out of date.
+        
+        The summary's rule count is compared with the IDERule label count
+        (answered from Neo4j's count store, not a scan); a mismatch means
+        rules were written or deleted outside the summary-aware writers.
+        
+        Args:
+            refresh: Re-read from the database even if already loaded
+        """
+        if self._summary is not None and not refresh:
+            return self._summary
+        
+        with self.driver.session() as session:
+            try:
+                record = session.run(LOAD_SUMMARY_QUERY, name=SUMMARY_NAME).single()
+                rules = session.run(RULE_COUNT_QUERY).single()['rules']
+            except Exception as e:
+                raise DatabaseError(f"Failed to load quality summary: {e}") from e
+        
+        if record and record['summary']:
+            summary = QualitySummary.from_json(record['summary'])
+            if summary.rules == rules:
+                self._summary = summary
+                return summary
+            self.logger.info(f"Quality summary covers {summary.rules} rules, database has {rules}: rebuilding")
+        
+        return self.rebuild_summary()
+    
+    def rebuild_summary(self) -> QualitySummary:
+        """
+        Recompute the summary in one streaming pass over IDERule and store it.
+        
+        Needed after bulk changes the writers do not track (pipeline rule
+        upserts, deletes); `python quality_analysis.py --rebuild` runs it.
+        """
+        with self.driver.session() as session:
+            try:
+                summary = QualitySummary.from_entries(session.run(STREAM_ENTRIES_QUERY))
+                session.run(SAVE_SUMMARY_QUERY, name=SUMMARY_NAME, summary=summary.to_json())
+            except Exception as e:
+                raise DatabaseError(f"Failed to rebuild quality summary: {e}") from e
+        
+        self.logger.info(f"Rebuilt quality summary: {summary.rules} rules, {summary.total} scored")
+        self._summary = summary
+        return summary
     
     def get_quality_distribution(self) -> Dict:
         """
@@ -39,57 +103,14 @@ class QualityAnalyzer:
             - p10, p25, p50, p75, p90, p95: Percentiles
             - std_dev: Standard deviation
         """
-        with self.driver.session() as session:
-            try:
-                result = session.run("""
-                    MATCH (r:IDERule)
-                    WHERE r.quality_score IS NOT NULL
-                    WITH r.quality_score AS score
-                    ORDER BY score
-                    WITH collect(score) AS scores
-                    RETURN 
-                        size(scores) AS total,
-                        reduce(sum = 0.0, x IN scores | sum + x) / size(scores) AS mean,
-                        scores[toInteger(size(scores) * 0.10)] AS p10,
-                        scores[toInteger(size(scores) * 0.25)] AS p25,
-                        scores[toInteger(size(scores) * 0.50)] AS p50,
-                        scores[toInteger(size(scores) * 0.75)] AS p75,
-                        scores[toInteger(size(scores) * 0.90)] AS p90,
-                        scores[toInteger(size(scores) * 0.95)] AS p95,
-                        scores[0] AS min,
-                        scores[size(scores) - 1] AS max
-                """)
-                
-                record = result.single()
-                
-                if not record or record['total'] == 0:
-                    raise MissingDataError("No rules with quality scores found in database")
-                
-                distribution = dict(record)
-                
-                # Calculate standard deviation
-                std_result = session.run("""
-                    MATCH (r:IDERule)
-                    WHERE r.quality_score IS NOT NULL
-                    WITH avg(r.quality_score) AS mean
-                    MATCH (r:IDERule)
-                    WHERE r.quality_score IS NOT NULL
-                    WITH sqrt(avg((r.quality_score - mean) ^ 2)) AS std_dev
-                    RETURN std_dev
-                """)
-                
-                std_record = std_result.single()
-                distribution['std_dev'] = std_record['std_dev'] if std_record else 0.0
-                
-                # Add median alias
-                distribution['median'] = distribution['p50']
-                
-                self.logger.info(f"Analyzed {distribution['total']} rules with quality scores")
-                
-                return distribution
-                
-            except Exception as e:
-                raise DatabaseError(f"Failed to calculate distribution: {e}") from e
+        distribution = self.load_summary().distribution()
+        
+        if distribution['total'] == 0:
+            raise MissingDataError("No rules with quality scores found in database")
+        
+        self.logger.info(f"Analyzed {distribution['total']} rules with quality scores")
+        
+        return distribution
     
     def get_confidence_distribution(self) -> Dict:
         """
@@ -98,22 +119,7 @@ class QualityAnalyzer:
         Returns:
             Dictionary with counts per confidence level
         """
-        with self.driver.session() as session:
-            try:
-                result = session.run("""
-                    MATCH (r:IDERule)
-                    WHERE r.confidence_level IS NOT NULL
-                    WITH r.confidence_level AS level
-                    RETURN level, count(level) AS count
-                    ORDER BY level
-                """)
-                
-                distribution = {record['level']: record['count'] for record in result}
-                
-                return distribution
-                
-            except Exception as e:
-                raise DatabaseError(f"Failed to get confidence distribution: {e}") from e
+        return self.load_summary().confidence_distribution()
     
     def get_production_signal_stats(self) -> Dict:
         """
@@ -122,25 +128,7 @@ class QualityAnalyzer:
         Returns:
             Dictionary with counts for each signal type
         """
-        with self.driver.session() as session:
-            try:
-                result = session.run("""
-                    MATCH (r:IDERule)
-                    WHERE r.quality_score IS NOT NULL
-                    RETURN 
-                        count(r) AS total,
-                        sum(CASE WHEN r.has_ci_cd THEN 1 ELSE 0 END) AS with_ci_cd,
-                        sum(CASE WHEN r.has_deployment THEN 1 ELSE 0 END) AS with_deployment,
-                        sum(CASE WHEN r.has_tests THEN 1 ELSE 0 END) AS with_tests,
-                        sum(CASE WHEN r.has_monitoring THEN 1 ELSE 0 END) AS with_monitoring,
-                        sum(CASE WHEN r.has_security THEN 1 ELSE 0 END) AS with_security,
-                        sum(CASE WHEN r.has_ci_cd OR r.has_tests THEN 1 ELSE 0 END) AS with_any_production
-                """)
-                
-                return dict(result.single())
-                
-            except Exception as e:
-                raise DatabaseError(f"Failed to get production signal stats: {e}") from e
+        return self.load_summary().production_signal_stats()
     
     def get_smart_threshold(self, percentile: int = 50, metric: str = 'quality_score') -> float:
         """
@@ -281,6 +269,8 @@ def main():
     parser.add_argument('--percentile', type=int, choices=[10, 25, 50, 75, 90, 95],
                        help='Get threshold at specific percentile')
     parser.add_argument('--json', action='store_true', help='Output as JSON')
+    parser.add_argument('--rebuild', action='store_true',
+                       help='Recompute the stored quality summary from all rules first')
     
     args = parser.parse_args()
     
@@ -306,6 +296,9 @@ def main():
     try:
         analyzer = QualityAnalyzer(driver, logger)
         
+        if args.rebuild:
+            analyzer.rebuild_summary()
+        
         if args.percentile:
             threshold = analyzer.get_smart_threshold(args.percentile)
             if args.json:
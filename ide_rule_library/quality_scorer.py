@@ -7,9 +7,41 @@ to prevent cargo culting from popular but unvalidated sources.
 """
 
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 import re
 
+import numpy as np
+
+from ide_rule_library.rule_file_matcher import RuleFileMatcher
+
+
+def _round_like_builtin(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    Elementwise round(value, digits) with the builtin's exact results.
+    
+    np.round scales by 10**digits and can land on the other side of a tie
+    than the builtin's correctly rounded decimal; only values that close to
+    a tie are re-rounded one by one.
+    """
+    rounded = np.round(values, digits)
+    scaled = values * 10 ** digits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(float(value), digits) for value in values[near_tie]]
+    return rounded
+
+
+def _days_since(value: Any, now: datetime) -> float:
+    """Whole days from a datetime or ISO string to now (NaN if unusable), as the scalar scorer counts them."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except (ValueError, AttributeError):
+            return np.nan
+    if not isinstance(value, datetime):
+        return np.nan
+    return float((now - value).days)
+
 
 class RepoQualityScorer:
     """Calculate composite quality scores for repositories"""
@@ -55,8 +87,17 @@ class RepoQualityScorer:
         ]
     }
     
+    # Compiled signal matchers, shared by every scorer in the process (keyed by signal table)
+    _signal_matchers: Dict[int, RuleFileMatcher] = {}
+    
     def __init__(self):
-        pass
+        # Compiled once: one pass over a repo's files instead of one per signal.
+        # Scorers are created per repository (enhance_repo_metadata), so the
+        # compiled matcher is reused rather than rebuilt each time
+        key = id(self.PRODUCTION_SIGNALS)
+        if key not in self._signal_matchers:
+            self._signal_matchers[key] = RuleFileMatcher(signal_patterns=self.PRODUCTION_SIGNALS)
+        self._signal_matcher = self._signal_matchers[key]
     
     def calculate_quality_score(self, repo_data: Dict[str, Any]) -> Tuple[float, Dict[str, float]]:
         """
@@ -264,27 +305,18 @@ class RepoQualityScorer:
         Returns:
             Tuple of (score 0-100, found_signals dict)
         """
-        score = 0.0
-        found_signals = {}
-        total_possible = sum(len(patterns) for patterns in self.PRODUCTION_SIGNALS.values())
-        
-        for category, patterns in self.PRODUCTION_SIGNALS.items():
-            category_hits = []
-            for pattern in patterns:
-                # Check if pattern matches any file
-                if self._pattern_matches_files(pattern, files):
-                    category_hits.append(pattern)
-                    score += (100.0 / total_possible)
-            
-            if category_hits:
-                found_signals[category] = category_hits
+        result = self._signal_matcher.match(files)
+        score = result['signal_hits'] * (100.0 / self._signal_matcher.signal_total)
         
-        return min(score, 100.0), found_signals
+        return min(score, 100.0), result['signals']
     
     def _pattern_matches_files(self, pattern: str, files: List[str]) -> bool:
         """
         Check if a pattern matches any file in the list.
         
+        Reference implementation of one signal test; assess_production_maturity
+        uses the compiled RuleFileMatcher, which gives the same result.
+        
         Uses case-insensitive matching to catch variations like 'Dockerfile' vs 'dockerfile'.
         For directory patterns (ending with /), checks if path starts with or contains the directory.
         """
@@ -349,6 +381,165 @@ class RepoQualityScorer:
         else:
             return 1
 
+    
+    # ------------------------------------------------------------------
+    # Batch scoring
+    # ------------------------------------------------------------------
+    
+    COMPONENTS = ['star_velocity', 'freshness', 'issue_health', 'diversity',
+                  'production_ready', 'documentation', 'usage_signal']
+    
+    def metrics_table(self, repos: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Reduce repo_data dicts to the columns score_batch() reads.
+        
+        The file list is matched once here (production signals, changelog,
+        contributing); everything after that is arithmetic on columns, so a
+        stored table can be re-scored without the files or any GitHub calls.
+        
+        Args:
+            repos: repo_data dicts as accepted by calculate_quality_score
+            
+        Returns:
+            Column name -> array (one row per repo); 'production_signals'
+            holds each repo's found-signals dict
+        """
+        now = datetime.now(timezone.utc)
+        columns = {name: [] for name in [
+            'stars', 'forks', 'age_days', 'days_since_update', 'open_issues', 'closed_issues',
+            'contributor_count', 'signal_hits', 'has_deployment', 'has_ci_cd', 'has_tests',
+            'categories_covered', 'has_changelog', 'has_contributing', 'readme_length'
+        ]}
+        signals_column = []
+        
+        for repo_data in repos:
+            files = repo_data.get('files', [])
+            if not isinstance(files, list):
+                files = []
+            matched = self._signal_matcher.match(files) if files else {'signals': {}, 'signal_hits': 0}
+            signals = matched['signals']
+            contributors = repo_data.get('contributors', [])
+            forks = repo_data.get('forks', 0)
+            readme_length = repo_data.get('readme_length', 0)
+            
+            columns['stars'].append(repo_data.get('stars', 0))
+            columns['forks'].append(forks if isinstance(forks, (int, float)) and forks >= 0 else 0)
+            columns['age_days'].append(_days_since(repo_data.get('created_at'), now))
+            columns['days_since_update'].append(_days_since(repo_data.get('updated_at'), now))
+            columns['open_issues'].append(repo_data.get('open_issues', 0))
+            columns['closed_issues'].append(repo_data.get('closed_issues', 0))
+            columns['contributor_count'].append(len(contributors) if isinstance(contributors, list) else 0)
+            columns['signal_hits'].append(matched['signal_hits'])
+            columns['has_deployment'].append('deployment' in signals)
+            columns['has_ci_cd'].append('ci_cd' in signals)
+            columns['has_tests'].append('testing' in signals)
+            columns['categories_covered'].append(len(signals))
+            columns['has_changelog'].append('CHANGELOG.md' in files or 'CHANGELOG' in files)
+            columns['has_contributing'].append('CONTRIBUTING.md' in files or 'CONTRIBUTING' in files)
+            columns['readme_length'].append(
+                readme_length if isinstance(readme_length, (int, float)) and readme_length >= 0 else 0
+            )
+            signals_column.append(signals)
+        
+        table = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        table['production_signals'] = np.array(signals_column, dtype=object)
+        return table
+    
+    def score_batch(self, table, weights: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+        """
+        Score many repositories at once from a metrics table.
+        
+        Each component is a vectorised version of its _calculate_* method
+        (threshold ladders become np.select), giving exactly the scalar
+        results; see tests/test_batch_scoring.py.
+        
+        Args:
+            table: Columns as built by metrics_table() - a dict of arrays or a
+                   DataFrame. age_days / days_since_update are NaN when unknown;
+                   confidence reads days_since_update as enhance_repo_metadata sets it
+            weights: Optional multiplier per component (e.g. {'freshness': 1.5})
+                     for re-weighting the catalogue; omitted components keep 1.0
+            
+        Returns:
+            Dict with one array per component (weighted), 'quality_score'
+            and 'confidence_level'
+        """
+        col = lambda name: np.asarray(table[name], dtype=float)
+        stars = col('stars')
+        age_days = col('age_days')
+        days = col('days_since_update')
+        
+        components = {}
+        
+        # 1. Star velocity - Max 20 points
+        age_years = np.maximum(np.nan_to_num(age_days) / 365.25, 0.5)
+        velocity = _round_like_builtin(np.minimum(stars / age_years / 1000, 1.0) * 20, 2)
+        components['star_velocity'] = np.where(np.isnan(age_days), 0.0, velocity)
+        
+        # 2. Freshness - Max 20 points
+        components['freshness'] = np.select(
+            [np.isnan(days), days < 30, days < 90, days < 180, days < 365],
+            [0.0, 20.0, 15.0, 10.0, 5.0],
+            default=0.0
+        )
+        
+        # 3. Issue health - Max 15 points
+        open_issues = col('open_issues')
+        total_issues = open_issues + col('closed_issues')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            open_ratio = np.minimum(open_issues / total_issues, 1.0)
+        components['issue_health'] = np.where(
+            total_issues == 0, 7.5, _round_like_builtin((1 - open_ratio) * 15, 2)
+        )
+        
+        # 4. Contributor diversity - Max 15 points
+        contributors = col('contributor_count')
+        contributors = np.where(contributors == 0, 1, contributors)
+        components['diversity'] = _round_like_builtin(np.minimum(contributors / 20, 1.0) * 15, 2)
+        
+        # 5. Production readiness - Max 20 points
+        production_score = np.minimum(col('signal_hits') * (100.0 / self._signal_matcher.signal_total), 100.0)
+        components['production_ready'] = _round_like_builtin(production_score * 0.20, 2)
+        
+        # 6. Documentation - Max 5 points
+        readme = col('readme_length')
+        documentation = (np.where(col('has_changelog') > 0, 2.0, 0.0)
+                         + np.where(col('has_contributing') > 0, 1.5, 0.0)
+                         + np.select([readme > 3000, readme > 1000], [1.5, 0.5], default=0.0))
+        components['documentation'] = np.minimum(documentation, 5.0)
+        
+        # 7. Usage signal - Max 5 points
+        fork_ratio = col('forks') / np.maximum(stars, 1)
+        components['usage_signal'] = _round_like_builtin(np.minimum(fork_ratio * 100, 1.0) * 5, 2)
+        
+        if weights:
+            for name, weight in weights.items():
+                components[name] = components[name] * weight
+        
+        # Summed in the scalar path's order so totals match bit for bit
+        total = np.zeros(len(stars))
+        for name in self.COMPONENTS:
+            total = total + components[name]
+        quality_score = _round_like_builtin(total, 2)
+        
+        # Confidence level (calculate_confidence_level)
+        categories = col('categories_covered')
+        has_deployment = col('has_deployment') > 0
+        has_ci_cd = col('has_ci_cd') > 0
+        has_tests = col('has_tests') > 0
+        is_active = np.where(np.isnan(days), 999, days) < 90
+        confidence = np.select(
+            [
+                (categories >= 5) & has_deployment & has_ci_cd & has_tests & is_active & (quality_score >= 70),
+                (categories >= 4) & has_ci_cd & has_tests & is_active & (quality_score >= 50),
+                (categories >= 3) & (has_ci_cd | has_tests) & (quality_score >= 50),
+                categories >= 2
+            ],
+            [5, 4, 3, 2],
+            default=1
+        )
+        
+        return {**components, 'quality_score': quality_score, 'confidence_level': confidence}
 
 def enhance_repo_metadata(repo_data: Dict) -> Dict:
     """
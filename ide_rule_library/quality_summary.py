@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Incrementally maintained quality-score summary for QualityAnalyzer.
+
+QualityAnalyzer used to collect every IDERule score into one Cypher list to
+read percentiles, then scan all rules twice more for the standard deviation,
+and recommend_thresholds repeated the scans for confidence levels and
+production signals.
+
+QualitySummary holds everything those reports need in one small, mergeable
+structure:
+
+- scores: a histogram keyed by score in hundredths. Scores are 0-100 with
+  two decimals, so the histogram is exact (percentiles equal the sorted-list
+  lookup) and stays a few thousand bins at most. Unlike a t-digest or KLL
+  sketch it also supports removal, so a re-scored rule can be swapped out;
+- confidence-level counts and production-signal counts.
+
+It is stored as JSON on one (:QualitySummary {name: 'IDERule'}) node. The
+writers apply their deltas to it inside the same transaction as the rules
+(apply_summary_delta), and QualityAnalyzer rebuilds it in one streaming
+pass when it is missing or its rule count disagrees with the database.
+"""
+
+import json
+import math
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+SUMMARY_NAME = 'IDERule'
+
+# Production-signal flags counted per scored rule (get_production_signal_stats keys)
+SIGNAL_FLAGS = ['has_ci_cd', 'has_deployment', 'has_tests', 'has_monitoring', 'has_security']
+
+PERCENTILES = [10, 25, 50, 75, 90, 95]
+
+# Rule properties add() reads
+ENTRY_FIELDS = ['repo_quality_score', 'confidence_level'] + SIGNAL_FLAGS
+
+# The same properties of rule r as a Cypher map, for writers that return previous values
+ENTRY_MAP = '{' + ', '.join(f'{field}: r.{field}' for field in ENTRY_FIELDS) + '}'
+
+# One row per rule, in the shape add() reads
+STREAM_ENTRIES_QUERY = """
+    MATCH (r:IDERule)
+    RETURN """ + ', '.join(f'r.{field} AS {field}' for field in ENTRY_FIELDS)
+
+RULE_COUNT_QUERY = """
+    MATCH (r:IDERule)
+    RETURN count(r) AS rules
+"""
+
+LOAD_SUMMARY_QUERY = """
+    MATCH (s:QualitySummary {name: $name})
+    RETURN s.summary AS summary
+"""
+
+# SET before reading takes the node's write lock, so concurrent writers
+# apply their deltas one after another
+LOCK_SUMMARY_QUERY = """
+    MATCH (s:QualitySummary {name: $name})
+    SET s.version = coalesce(s.version, 0) + 1
+    RETURN s.summary AS summary
+"""
+
+SAVE_SUMMARY_QUERY = """
+    MERGE (s:QualitySummary {name: $name})
+    SET s.summary = $summary,
+        s.updated_at = datetime()
+"""
+
+
+class QualitySummary:
+    """
+    Mergeable score histogram plus confidence and production-signal counts.
+
+    Example:
+        >>> summary = QualitySummary()
+        >>> for rule in rules:
+        ...     summary.add(rule)
+        >>> summary.distribution()['p75']
+        68.4
+        >>> summary.merge(batch_delta)
+    """
+
+    def __init__(self, rules: int = 0):
+        """
+        Initialize an empty summary.
+
+        Args:
+            rules: IDERule nodes counted (scored or not), used to detect drift
+        """
+        self.rules = rules
+        self.scores: Counter = Counter()       # score in hundredths -> rules
+        self.confidence: Counter = Counter()   # confidence level -> rules
+        self.signals: Counter = Counter()      # flag -> scored rules with it
+
+    def add(self, entry: Dict, count: int = 1):
+        """
+        Count one rule's quality fields (use count=-1 to remove them).
+
+        Args:
+            entry: Dict with repo_quality_score, confidence_level and the
+                   SIGNAL_FLAGS (missing or None values are not counted)
+            count: Multiplicity; negative removes
+        """
+        score = entry.get('repo_quality_score')
+        level = entry.get('confidence_level')
+
+        if level is not None:
+            self._bump(self.confidence, int(level), count)
+
+        if score is not None:
+            self._bump(self.scores, int(round(score * 100)), count)
+            for flag in SIGNAL_FLAGS:
+                if entry.get(flag):
+                    self._bump(self.signals, flag, count)
+            if entry.get('has_ci_cd') or entry.get('has_tests'):
+                self._bump(self.signals, 'any_production', count)
+
+    def remove(self, entry: Dict):
+        """Uncount one rule's quality fields (e.g. before it is re-scored)."""
+        self.add(entry, -1)
+
+    def merge(self, other: 'QualitySummary') -> 'QualitySummary':
+        """Add another summary (or delta) into this one; returns self."""
+        self.rules += other.rules
+        for mine, theirs in ((self.scores, other.scores), (self.confidence, other.confidence),
+                             (self.signals, other.signals)):
+            for key, count in theirs.items():
+                self._bump(mine, key, count)
+        return self
+
+    @property
+    def total(self) -> int:
+        """Rules with a quality score."""
+        return sum(self.scores.values())
+
+    def is_empty(self) -> bool:
+        """True when the summary (or delta) changes nothing."""
+        return not (self.rules or self.scores or self.confidence or self.signals)
+
+    # ------------------------------------------------------------------
+    # Reports (the QualityAnalyzer result shapes)
+    # ------------------------------------------------------------------
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Score at a percentile, as sorted_scores[int(total * percentile / 100)].
+
+        Args:
+            percentile: 0-100
+        """
+        total = self.total
+        if not total:
+            return None
+        rank = min(int(total * (percentile / 100)), total - 1)
+        seen = 0
+        for hundredths in sorted(self.scores):
+            seen += self.scores[hundredths]
+            if seen > rank:
+                return hundredths / 100
+        return None
+
+    def distribution(self) -> Dict:
+        """
+        Distribution statistics in get_quality_distribution's shape.
+
+        Returns:
+            total, mean, median, min, max, p10..p95 and std_dev
+            (population); statistics are None when nothing is scored
+        """
+        total = self.total
+        distribution = {'total': total}
+
+        if total:
+            bins = sorted(self.scores.items())
+            mean = sum(hundredths * count for hundredths, count in bins) / total / 100
+            variance = sum(count * (hundredths / 100 - mean) ** 2 for hundredths, count in bins) / total
+            distribution.update({
+                'mean': mean,
+                'min': bins[0][0] / 100,
+                'max': bins[-1][0] / 100,
+                'std_dev': math.sqrt(variance)
+            })
+        else:
+            distribution.update({'mean': None, 'min': None, 'max': None, 'std_dev': None})
+
+        for percentile in PERCENTILES:
+            distribution[f'p{percentile}'] = self.percentile(percentile)
+        distribution['median'] = distribution['p50']
+
+        return distribution
+
+    def confidence_distribution(self) -> Dict[int, int]:
+        """Rules per confidence level, in get_confidence_distribution's shape."""
+        return {level: self.confidence[level] for level in sorted(self.confidence)}
+
+    def production_signal_stats(self) -> Dict[str, int]:
+        """Signal counts over scored rules, in get_production_signal_stats' shape."""
+        stats = {'total': self.total}
+        for flag in SIGNAL_FLAGS:
+            stats[f"with_{flag[len('has_'):]}"] = self.signals[flag]
+        stats['with_any_production'] = self.signals['any_production']
+        return stats
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def to_json(self) -> str:
+        """Serialize for the QualitySummary node (Neo4j properties cannot be maps)."""
+        return json.dumps({
+            'rules': self.rules,
+            'scores': {str(key): count for key, count in self.scores.items()},
+            'confidence': {str(key): count for key, count in self.confidence.items()},
+            'signals': dict(self.signals)
+        }, sort_keys=True)
+
+    @classmethod
+    def from_json(cls, payload: str) -> 'QualitySummary':
+        """Inverse of to_json()."""
+        data = json.loads(payload)
+        summary = cls(rules=data.get('rules', 0))
+        summary.scores.update({int(key): count for key, count in data.get('scores', {}).items()})
+        summary.confidence.update({int(key): count for key, count in data.get('confidence', {}).items()})
+        summary.signals.update(data.get('signals', {}))
+        return summary
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict]) -> 'QualitySummary':
+        """Build from STREAM_ENTRIES_QUERY rows in one pass (every row is a rule)."""
+        summary = cls()
+        for entry in entries:
+            summary.rules += 1
+            summary.add(entry)
+        return summary
+
+    @staticmethod
+    def _bump(counter: Counter, key, count: int):
+        """Add to a counter, dropping keys that reach zero."""
+        value = counter[key] + count
+        if value:
+            counter[key] = value
+        else:
+            del counter[key]
+
+
+def apply_summary_delta(tx, delta: QualitySummary) -> bool:
+    """
+    Merge a writer's delta into the stored summary within its transaction.
+
+    Called from the writers' transaction functions, so the summary commits
+    (or rolls back) together with the rules. When no summary has been built
+    yet nothing is written; QualityAnalyzer builds it on first use.
+
+    Returns:
+        True if a stored summary was updated
+    """
+    if delta.is_empty():
+        return False
+
+    record = tx.run(LOCK_SUMMARY_QUERY, name=SUMMARY_NAME).single()
+    if not record or not record['summary']:
+        return False
+
+    summary = QualitySummary.from_json(record['summary']).merge(delta)
+    tx.run(SAVE_SUMMARY_QUERY, name=SUMMARY_NAME, summary=summary.to_json())
+    return True
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Query caches for EnhancedRuleQueryEngine.
+
+Two caches sit in front of the engine's expensive steps:
+
+- query embeddings: LRU keyed by embedding model + whitespace-normalised
+  query text, so a repeated or relaxed query never calls Gemini twice;
+- results: short-TTL entries keyed by the query plus its normalised
+  filters (technology order, empty-vs-None, 60 vs 60.0 do not matter).
+
+Both live in memory and, when a db_path is given, in one SQLite file, so
+repeated generate_cursorrules_v2.py runs answer locally within the TTL.
+
+Cached results can be up to result_ttl seconds older than the graph.
+Neo4jRuleWriter and the quality-score migration clear the configured
+persistent cache (invalidate_cached_results) after they write; other
+writers, such as the pattern extraction pipeline, do not, so run
+generate_cursorrules_v2.py with --no-cache (or result_ttl = 0) to bypass
+cached results.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_WHITESPACE = re.compile(r'\s+')
+
+DEFAULT_CACHE_PATH = 'cache/query_cache.sqlite'
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so formatting-only differences share an entry."""
+    return _WHITESPACE.sub(' ', query or '').strip()
+
+
+def _normalize_filter(value: Any) -> Any:
+    if isinstance(value, (list, tuple, set)):
+        return sorted(set(value)) or None
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    return value
+
+
+def result_key(kind: str, query: str, **filters) -> str:
+    """
+    Cache key for one query_rules-style call.
+
+    Args:
+        kind: Query family (e.g. 'quality', 'semantic')
+        query: Query text
+        **filters: Every argument that changes the result
+    """
+    payload = {
+        'kind': kind,
+        'query': normalize_query(query),
+        'filters': {name: _normalize_filter(value) for name, value in filters.items()}
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def cache_path(config: Dict) -> Path:
+    """Persistent cache file from the query_cache config section (relative to this package)"""
+    return Path(__file__).parent / config.get('query_cache', {}).get('path', DEFAULT_CACHE_PATH)
+
+
+def invalidate_cached_results(config: Dict):
+    """
+    Drop the persistent cache's results after new data was written.
+
+    Works across processes: a generator run started later finds no stale
+    entries. A no-op when the cache file has not been created.
+    """
+    path = cache_path(config)
+    if not path.exists():
+        return
+    cache = QueryCache(str(path))
+    try:
+        cache.invalidate_results()
+    finally:
+        cache.close()
+
+
+def _embedding_key(model: str, query: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_query(query)}".encode('utf-8')).hexdigest()
+
+
+class QueryCache:
+    """
+    Query-embedding LRU plus TTL result cache, optionally persisted to SQLite.
+
+    Thread-safe. Results are returned as fresh dict copies so callers can
+    annotate them without touching the cached entry.
+
+    Example:
+        >>> cache = QueryCache("cache/query_cache.sqlite", result_ttl=600)
+        >>> cache.get_embedding(model, "REST API error handling")   # None on first run
+        >>> cache.put_embedding(model, "REST API error handling", embedding)
+        >>> key = result_key('quality', query, min_quality_score=60, technologies=['python'])
+        >>> cache.put_results(key, rules)
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        embedding_capacity: int = 1024,
+        result_ttl: float = 600.0,
+        max_results: int = 256
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            db_path: SQLite file for persistence across runs (None = memory only)
+            embedding_capacity: Query embeddings kept (least recently used evicted)
+            result_ttl: Seconds a cached result stays valid (0 disables result caching)
+            max_results: Result entries kept in memory
+        """
+        self.embedding_capacity = embedding_capacity
+        self.result_ttl = result_ttl
+        self.max_results = max_results
+
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._results: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'embedding_hits': 0, 'embedding_misses': 0, 'result_hits': 0, 'result_misses': 0}
+
+        self._conn = None
+        if db_path:
+            path = Path(db_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_results (
+                    key TEXT PRIMARY KEY,
+                    rules TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Query embeddings
+    # ------------------------------------------------------------------
+
+    def get_embedding(self, model: str, query: str) -> Optional[List[float]]:
+        """Cached embedding for a query, or None."""
+        key = _embedding_key(model, query)
+        with self._lock:
+            embedding = self._embeddings.get(key)
+            if embedding is not None:
+                self._embeddings.move_to_end(key)
+            elif self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT embedding FROM query_embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    embedding = array('d', row[0]).tolist()
+                    self._remember_embedding(key, embedding)
+                    self._conn.execute(
+                        "UPDATE query_embeddings SET last_access = ? WHERE key = ?", (time.time(), key)
+                    )
+                    self._conn.commit()
+
+            self.stats['embedding_hits' if embedding is not None else 'embedding_misses'] += 1
+            return embedding
+
+    def put_embedding(self, model: str, query: str, embedding: List[float]):
+        """Store a query embedding."""
+        key = _embedding_key(model, query)
+        embedding = list(embedding)
+        with self._lock:
+            self._remember_embedding(key, embedding)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, model, query, embedding, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, model, normalize_query(query), array('d', embedding).tobytes(), time.time())
+                )
+                self._conn.execute("""
+                    DELETE FROM query_embeddings WHERE key IN (
+                        SELECT key FROM query_embeddings ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.embedding_capacity,))
+                self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def get_results(self, key: str) -> Optional[List[Dict]]:
+        """Unexpired cached rules for a result_key(), or None."""
+        if not self.result_ttl:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT expires_at, rules FROM query_results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], json.loads(row[1]))
+                    self._remember_results(key, entry)
+
+            if entry is None or entry[0] <= now:
+                self._results.pop(key, None)
+                self.stats['result_misses'] += 1
+                return None
+
+            self._results.move_to_end(key)
+            self.stats['result_hits'] += 1
+            return [dict(rule) for rule in entry[1]]
+
+    def put_results(self, key: str, rules: List[Dict]):
+        """Cache rules for result_ttl seconds."""
+        if not self.result_ttl:
+            return
+
+        now = time.time()
+        entry = (now + self.result_ttl, [dict(rule) for rule in rules])
+        with self._lock:
+            self._remember_results(key, entry)
+            if self._conn is not None:
+                try:
+                    payload = json.dumps(entry[1])
+                except (TypeError, ValueError):
+                    return  # Non-JSON values (e.g. driver temporal types): keep in memory only
+                self._conn.execute("DELETE FROM query_results WHERE expires_at <= ?", (now,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_results (key, rules, expires_at) VALUES (?, ?, ?)",
+                    (key, payload, entry[0])
+                )
+                self._conn.commit()
+
+    def invalidate_results(self):
+        """Drop every cached result (e.g. after new rules were written)."""
+        with self._lock:
+            self._results.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM query_results")
+                self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Housekeeping
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and entry counts."""
+        with self._lock:
+            return {
+                **self.stats,
+                'embeddings': len(self._embeddings),
+                'results': len(self._results),
+                'persistent': self._conn is not None
+            }
+
+    def close(self):
+        """Close the SQLite connection (memory entries stay usable)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _remember_embedding(self, key: str, embedding: List[float]):
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._embeddings[key] = embedding
+        self._embeddings.move_to_end(key)
+        while len(self._embeddings) > self.embedding_capacity:
+            self._embeddings.popitem(last=False)
+
+    def _remember_results(self, key: str, entry: Tuple[float, List[Dict]]):
+        """Insert into the in-memory result LRU (caller holds the lock)."""
+        self._results[key] = entry
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
@@ -2,52 +2,271 @@
 """GitHub API rate limit handler with exponential backoff"""
 
 import time
+import threading
 from github import Github, RateLimitExceededException, UnknownObjectException, GithubException
-from typing import Callable, Any
+from typing import Callable, Any, Dict, Mapping, Optional
 from datetime import datetime
 
 
+class GitHubQuotaTracker:
+    """
+    Shared GitHub quota model fed from response headers.
+    
+    Every response GitHub sends carries X-RateLimit-Remaining/-Limit/-Reset
+    (and X-RateLimit-Resource), so the quota never needs to be polled. The
+    tracker turns that into a token bucket per resource whose refill rate
+    spreads the remaining budget (minus a reserve) evenly until the reset,
+    so callers slow down ahead of time instead of draining the quota and
+    sleeping until the window resets. Secondary limits (Retry-After, or a
+    403/429 with nothing remaining) block the resource for the stated time.
+    
+    Thread-safe; use shared_quota_tracker() so ide_rule_library and
+    pattern_extraction_pipeline draw from the same budget.
+    
+    Example:
+        >>> quota = shared_quota_tracker()
+        >>> quota.acquire()                      # may wait to pace requests
+        >>> response = session.get(url)
+        >>> quota.observe(response.headers, response.status_code)
+    """
+    
+    SECONDARY_LIMIT_BACKOFF = 60  # seconds, when GitHub gives no Retry-After
+    WINDOWS = {'search': 60, 'code_search': 60}  # seconds; every other resource resets hourly
+    
+    def __init__(self, reserve: int = 100, burst: int = 20):
+        """
+        Initialize tracker.
+        
+        Args:
+            reserve: Requests per window kept back for interactive/other use
+                (at most a tenth of a resource's limit, e.g. 3 of search's 30)
+            burst: Bucket capacity, i.e. requests allowed back-to-back
+        """
+        self.reserve = reserve
+        self.burst = burst
+        self._buckets: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'observed': 0, 'acquired': 0, 'waits': 0, 'wait_seconds': 0.0, 'blocks': 0}
+    
+    def observe(self, headers: Optional[Mapping[str, str]], status: Optional[int] = None, message: str = ''):
+        """
+        Update the quota from a response's headers.
+        
+        Args:
+            headers: Response headers (case-insensitive mapping or plain dict)
+            status: HTTP status code
+            message: Error text, used to spot secondary-limit 403s
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        now = time.time()
+        resource = headers.get('x-ratelimit-resource', 'core')
+        
+        with self._lock:
+            bucket = self._bucket(resource)
+            self.stats['observed'] += 1
+            
+            if 'x-ratelimit-remaining' in headers:
+                remaining = int(headers['x-ratelimit-remaining'])
+                reset = float(headers.get('x-ratelimit-reset', bucket['reset'] or now + 3600))
+                if bucket['remaining'] is None or reset != bucket['reset']:
+                    bucket['remaining'] = remaining
+                else:
+                    # Same window: responses can arrive out of order, keep the lower count
+                    bucket['remaining'] = min(bucket['remaining'], remaining)
+                bucket['reset'] = reset
+                bucket['limit'] = int(headers.get('x-ratelimit-limit', bucket['limit'] or remaining))
+            
+            blocked_until = None
+            if 'retry-after' in headers:
+                blocked_until = now + float(headers['retry-after'])
+            elif status in (403, 429):
+                if bucket['remaining'] == 0 and bucket['reset']:
+                    blocked_until = bucket['reset']
+                elif 'secondary rate limit' in message.lower() or status == 429:
+                    blocked_until = now + self.SECONDARY_LIMIT_BACKOFF
+            if blocked_until and blocked_until > bucket['blocked_until']:
+                bucket['blocked_until'] = blocked_until
+                self.stats['blocks'] += 1
+    
+    def observe_github(self, gh: Github, resource: str = 'core'):
+        """
+        Update a resource's quota from a PyGithub client's last response.
+        
+        PyGithub records the rate-limit headers of every response it receives;
+        this reads that record without issuing a request. The record does not
+        say which resource it belongs to, so pass the one the call used.
+        """
+        requester = getattr(gh, 'requester', None) or getattr(gh, '_Github__requester', None)
+        if requester is None:
+            return
+        remaining, limit = getattr(requester, 'rate_limiting', (-1, -1))
+        reset = getattr(requester, 'rate_limiting_resettime', 0)
+        if limit < 0 or not reset:
+            return
+        self.observe({
+            'X-RateLimit-Remaining': str(remaining),
+            'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Reset': str(reset),
+            'X-RateLimit-Resource': resource
+        })
+    
+    def acquire(self, resource: str = 'core', cost: int = 1) -> float:
+        """
+        Admit one request, waiting as long as needed to stay on pace.
+        
+        Until the first response for a resource has been observed there is
+        nothing to pace against and requests are admitted immediately.
+        
+        Args:
+            resource: Rate-limit resource ('core', 'search', 'graphql', ...)
+            cost: Requests this admission stands for
+        
+        Returns:
+            float: Seconds waited
+        """
+        with self._lock:
+            now = time.time()
+            bucket = self._bucket(resource)
+            wait = 0.0
+            
+            if bucket['blocked_until'] > now:
+                wait = bucket['blocked_until'] - now
+            elif bucket['remaining'] is not None:
+                if bucket['reset'] and bucket['reset'] <= now:
+                    # Window rolled over since the last response: full quota again
+                    bucket['remaining'] = bucket['limit']
+                    bucket['reset'] = now + self.WINDOWS.get(resource, 3600)
+                    bucket['tokens'] = self.burst
+                
+                reserve = min(self.reserve, (bucket['limit'] or 0) // 10)
+                budget = bucket['remaining'] - reserve
+                window = max(bucket['reset'] - now, 1.0)
+                if budget <= 0:
+                    wait = window + 1  # Only the reserve is left: wait for the reset
+                else:
+                    rate = budget / window
+                    bucket['tokens'] = min(self.burst, bucket['tokens'] + (now - bucket['refilled_at']) * rate)
+                    bucket['tokens'] -= cost
+                    if bucket['tokens'] < 0:
+                        wait = -bucket['tokens'] / rate
+                bucket['remaining'] = max(bucket['remaining'] - cost, 0)
+            bucket['refilled_at'] = now
+            
+            self.stats['acquired'] += 1
+            if wait > 0:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds'] += wait
+        
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def remaining(self, resource: str = 'core') -> Optional[int]:
+        """Last known remaining requests, or None before any response was seen."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            return bucket['remaining'] if bucket else None
+    
+    def reset_time(self, resource: str = 'core') -> Optional[float]:
+        """Unix time the current window resets, if known."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            return bucket['reset'] if bucket else None
+    
+    def blocked_for(self, resource: str = 'core') -> float:
+        """Seconds until a secondary/exhausted-quota block lifts (0 if not blocked)."""
+        with self._lock:
+            bucket = self._buckets.get(resource)
+            return max(bucket['blocked_until'] - time.time(), 0.0) if bucket else 0.0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus the current view of each resource."""
+        with self._lock:
+            return {
+                **self.stats,
+                'wait_seconds': round(self.stats['wait_seconds'], 2),
+                'resources': {
+                    name: {'remaining': b['remaining'], 'limit': b['limit'], 'reset': b['reset']}
+                    for name, b in self._buckets.items()
+                }
+            }
+    
+    def _bucket(self, resource: str) -> Dict[str, Any]:
+        """Get or create a resource's state (caller holds the lock)."""
+        if resource not in self._buckets:
+            self._buckets[resource] = {
+                'remaining': None,
+                'limit': None,
+                'reset': None,
+                'tokens': float(self.burst),
+                'refilled_at': time.time(),
+                'blocked_until': 0.0
+            }
+        return self._buckets[resource]
+
+
+_shared_tracker = None
+_shared_lock = threading.Lock()
+
+
+def shared_quota_tracker(reserve: int = 100, burst: int = 20) -> GitHubQuotaTracker:
+    """
+    Process-wide tracker, so every GitHub client in the process shares one budget.
+    
+    Arguments only apply when the tracker is first created.
+    """
+    global _shared_tracker
+    with _shared_lock:
+        if _shared_tracker is None:
+            _shared_tracker = GitHubQuotaTracker(reserve=reserve, burst=burst)
+        return _shared_tracker
+
+
 class GitHubRateLimiter:
     """Automatic rate limit handling with exponential backoff and retries"""
     
-    def __init__(self, gh: Github, config: dict, logger):
+    def __init__(self, gh: Github, config: dict, logger, quota: Optional[GitHubQuotaTracker] = None):
         self.gh = gh
         self.config = config
         self.logger = logger
         self.threshold = config.get('rate_limit_threshold', 100)
         self.max_retries = config.get('max_retries', 5)
         self.base_delay = config.get('retry_delay_base', 2)
+        # Quota is tracked from response headers instead of polling get_rate_limit()
+        self.quota = quota or shared_quota_tracker(
+            reserve=self.threshold,
+            burst=config.get('quota_burst', 20)
+        )
     
-    def call_with_retry(self, func: Callable, *args, **kwargs) -> Any:
-        """Execute GitHub API call with automatic retry and rate limit handling"""
+    def call_with_retry(self, func: Callable, *args, resource: str = 'core', **kwargs) -> Any:
+        """
+        Execute GitHub API call with automatic retry and rate limit handling
+        
+        resource is the rate-limit bucket the call draws from ('search' for
+        search endpoints); it is not passed on to func.
+        """
         
         for attempt in range(self.max_retries):
-            # Check rate limit before call
-            try:
-                rate_limit = self.gh.get_rate_limit()
-                # Handle both old and new PyGithub API
-                if hasattr(rate_limit, 'core'):
-                    remaining = rate_limit.core.remaining
-                else:
-                    remaining = rate_limit.resources['core'].remaining
-                
-                if remaining < self.threshold:
-                    self._wait_for_rate_limit()
-            except Exception as e:
-                self.logger.debug(f"Could not check rate limit: {e}")
+            # Pace against the known quota (no extra request)
+            self.quota.acquire(resource)
             
             try:
-                return func(*args, **kwargs)
+                result = func(*args, **kwargs)
+                self.quota.observe_github(self.gh, resource)
+                return result
                 
             except RateLimitExceededException as e:
+                self.quota.observe(e.headers, e.status, str(e))
                 if attempt == self.max_retries - 1:
                     self.logger.error("Rate limit exceeded and max retries reached")
                     raise
                 
-                # Calculate exponential backoff
-                delay = self.base_delay ** (attempt + 1)
-                self.logger.warning(f"Rate limit hit, waiting {delay}s (attempt {attempt + 1}/{self.max_retries})")
-                time.sleep(delay)
+                # The next acquire() waits out a block the headers told us about;
+                # otherwise fall back to exponential backoff
+                if not self.quota.blocked_for(resource):
+                    delay = self.base_delay ** (attempt + 1)
+                    self.logger.warning(f"Rate limit hit, waiting {delay}s (attempt {attempt + 1}/{self.max_retries})")
+                    time.sleep(delay)
                 
             except UnknownObjectException as e:
                 # 404 - repo not found or private, don't retry
@@ -55,14 +274,16 @@ class GitHubRateLimiter:
                 raise
                 
             except GithubException as e:
+                self.quota.observe(e.headers, e.status, str(e))
                 if e.status == 403:
                     # Forbidden - might be rate limit or permissions
                     if 'rate limit' in str(e).lower():
                         if attempt == self.max_retries - 1:
                             raise
-                        delay = self.base_delay ** (attempt + 1)
-                        self.logger.warning(f"Rate limit (403), waiting {delay}s")
-                        time.sleep(delay)
+                        if not self.quota.blocked_for(resource):
+                            delay = self.base_delay ** (attempt + 1)
+                            self.logger.warning(f"Rate limit (403), waiting {delay}s")
+                            time.sleep(delay)
                     else:
                         # Permissions issue, don't retry
                         self.logger.debug(f"Access forbidden: {e}")
@@ -93,6 +314,14 @@ class GitHubRateLimiter:
     
     def _wait_for_rate_limit(self):
         """Wait until rate limit resets"""
+        reset_time = self.quota.reset_time()
+        if reset_time is not None:
+            wait_seconds = reset_time - time.time() + 10  # Add 10s buffer
+            if wait_seconds > 0:
+                self.logger.warning(f"Rate limit threshold reached, waiting {wait_seconds:.0f}s until reset")
+                time.sleep(wait_seconds)
+            return
+        
         try:
             rate_limit = self.gh.get_rate_limit()
             # Handle both old and new PyGithub API
@@ -113,8 +342,14 @@ class GitHubRateLimiter:
     
     def get_remaining_calls(self) -> int:
         """Get remaining API calls"""
+        remaining = self.quota.remaining()
+        if remaining is not None:
+            return remaining
+        
+        # Nothing observed yet: one /rate_limit call (free) seeds the tracker
         try:
             rate_limit = self.gh.get_rate_limit()
+            self.quota.observe_github(self.gh)
             # Handle both old and new PyGithub API
             if hasattr(rate_limit, 'core'):
                 return rate_limit.core.remaining
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Compiled matcher for rule-file priorities and production signals.
+
+The scanner used to fnmatch every tree path against every priority pattern,
+and RepoQualityScorer substring-scanned every file for every
+PRODUCTION_SIGNALS entry: O(patterns x files) Python work per repository,
+which dominates on monorepos with 100k-entry trees.
+
+RuleFileMatcher compiles all patterns up front into two prefilter regexes,
+each a prefix trie over literals (so the regex engine walks shared
+prefixes once instead of retrying every alternative at every character):
+
+- priority patterns contribute their literal prefix (the part of a glob
+  before the first wildcard, a directory prefix, or an exact path),
+  anchored at the start of a path;
+- production signals contribute their lowercased literal, unanchored.
+
+The tree is joined into one newline-separated string and each prefilter
+scans it in a single regex pass; only the rare paths that hit are checked
+against the individual patterns, and a signal stops being checked once it
+has been seen. Results are identical to the per-pattern loops (see
+tests/test_rule_file_matcher.py).
+
+Benchmark against a real tree with benchmark_rule_matcher.py.
+"""
+
+import fnmatch
+import os
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PRIORITY_KEYS = [(1, 'priority_1_files'), (2, 'priority_2_files'), (3, 'priority_3_files')]
+
+
+def _trie_regex(literals: Iterable[str]) -> str:
+    """
+    Regex matching any of the literals, shaped as a prefix trie.
+
+    Used as an existence prefilter, so a literal that is a prefix of another
+    makes the longer one redundant and the branch ends there.
+    """
+    trie: Dict = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        if '' in node:
+            return ''
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return build(trie) if trie else r'(?!)'
+
+
+def _glob_flags() -> int:
+    """Regex flags matching fnmatch.fnmatch's case handling on this platform."""
+    # fnmatch.fnmatch normcases both sides: case-insensitive on Windows only
+    return re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+
+
+def _priority_test(pattern: str, flags: int = 0) -> Tuple[str, Callable[[str], bool]]:
+    """Prefilter prefix and exact test for one priority pattern (scanner semantics)."""
+    if '*' in pattern:
+        # fnmatch: '*' also crosses '/', case-sensitive as on POSIX.
+        # The literal part before the first wildcard is a necessary prefix.
+        prefix = re.split(r'[*?\[]', pattern, maxsplit=1)[0]
+        return prefix, re.compile(fnmatch.translate(pattern), flags).match
+    if pattern.endswith('/'):
+        return pattern, lambda path: path.startswith(pattern)
+    return pattern, lambda path: path == pattern
+
+
+def _signal_test(pattern: str) -> Callable[[str], bool]:
+    """Exact test for one signal pattern against a lowercased path (scorer semantics)."""
+    pattern_lower = pattern.lower()
+    if pattern.endswith('/'):
+        # Directory at the start of the path or as any path component
+        return lambda path: path.startswith(pattern_lower) or f'/{pattern_lower}' in f'/{path}'
+    return lambda path: pattern_lower in path
+
+
+class RuleFileMatcher:
+    """
+    Single-pass matcher for rule-file priority patterns and production signals.
+
+    Example:
+        >>> matcher = RuleFileMatcher.from_config(config)
+        >>> result = matcher.match(tree_paths)
+        >>> result['rule_files']
+        [{'path': '.cursorrules', 'priority': 1, 'type': 'file'}, ...]
+        >>> result['signals']
+        {'ci_cd': ['.github/workflows/'], 'testing': ['tests/'], ...}
+    """
+
+    def __init__(
+        self,
+        priority_patterns: Optional[Dict[int, List[str]]] = None,
+        signal_patterns: Optional[Dict[str, List[str]]] = None
+    ):
+        """
+        Compile patterns.
+
+        Args:
+            priority_patterns: priority -> patterns (globs, 'dir/' prefixes or exact paths)
+            signal_patterns: category -> case-insensitive substrings ('dir/' = path component)
+        """
+        self._priority_tests = []
+        prefixes = set()
+        flags = _glob_flags()
+        for priority, patterns in sorted((priority_patterns or {}).items()):
+            for order, pattern in enumerate(patterns or []):
+                prefix, test = _priority_test(pattern, flags)
+                prefixes.add(prefix)
+                self._priority_tests.append((priority, order, test))
+        # Anchored at line starts: runs over the newline-joined tree. Only a
+        # prefilter, so it may take the glob flags for exact paths too
+        self._priority_filter = re.compile('(?m)^' + _trie_regex(prefixes), flags) if prefixes else None
+
+        self._signal_tests = []
+        for category, patterns in (signal_patterns or {}).items():
+            for pattern in patterns:
+                self._signal_tests.append((category, pattern, _signal_test(pattern)))
+        literals = {pattern.lower() for _, pattern, _ in self._signal_tests}
+        self._signal_filter = re.compile(_trie_regex(literals)) if literals else None
+
+    @classmethod
+    def from_config(cls, config: Dict, signal_patterns: Optional[Dict[str, List[str]]] = None) -> 'RuleFileMatcher':
+        """
+        Build from the scanner config's priority_N_files lists.
+
+        Args:
+            config: Loaded config.yaml
+            signal_patterns: Production signals (default: RepoQualityScorer.PRODUCTION_SIGNALS)
+        """
+        if signal_patterns is None:
+            from ide_rule_library.quality_scorer import RepoQualityScorer
+            signal_patterns = RepoQualityScorer.PRODUCTION_SIGNALS
+        priority_patterns = {priority: config.get(key, []) for priority, key in PRIORITY_KEYS}
+        return cls(priority_patterns, signal_patterns)
+
+    @property
+    def signal_total(self) -> int:
+        """Number of signal patterns (the denominator of the maturity score)."""
+        return len(self._signal_tests)
+
+    def match(self, paths: Iterable[str]) -> Dict:
+        """
+        Match every path in one pass.
+
+        Args:
+            paths: Tree paths (files; directories are implied by their files)
+
+        Returns:
+            {
+                'rule_files': [{'path', 'priority', 'type'}] ordered by priority,
+                              pattern order, then path (one entry per distinct pattern hit),
+                'signals': category -> signal patterns found, in declared order,
+                'signal_hits': number of signal patterns found
+            }
+        """
+        # The tree is joined into one newline-separated string so each prefilter
+        # is a single regex scan; Python only sees the lines that hit
+        tree = '\n'.join(paths)
+
+        priority_hits = []
+        if self._priority_filter is not None:
+            for path in self._hit_lines(self._priority_filter, tree):
+                for priority, order, test in self._priority_tests:
+                    if test(path):
+                        priority_hits.append((priority, order, path))
+
+        found = [False] * len(self._signal_tests)
+        remaining = len(found)
+        if self._signal_filter is not None:
+            for path_lower in self._hit_lines(self._signal_filter, tree.lower()):
+                for i, (_, _, test) in enumerate(self._signal_tests):
+                    if not found[i] and test(path_lower):
+                        found[i] = True
+                        remaining -= 1
+                if not remaining:
+                    break
+
+        signals: Dict[str, List[str]] = {}
+        for (category, pattern, _), hit in zip(self._signal_tests, found):
+            if hit:
+                signals.setdefault(category, []).append(pattern)
+
+        return {
+            'rule_files': [
+                {'path': path, 'priority': priority, 'type': 'file'}
+                for priority, _, path in sorted(set(priority_hits))
+            ],
+            'signals': signals,
+            'signal_hits': len(found) - remaining
+        }
+
+    @staticmethod
+    def _hit_lines(prefilter, tree: str) -> Iterator[str]:
+        """Yield each line of `tree` containing a prefilter match, once."""
+        pos = 0
+        while True:
+            found = prefilter.search(tree, pos)
+            if found is None:
+                return
+            start = tree.rfind('\n', 0, found.start()) + 1
+            end = tree.find('\n', found.end())
+            if end == -1:
+                end = len(tree)
+            yield tree[start:end]
+            pos = end + 1
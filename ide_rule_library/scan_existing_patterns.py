@@ -7,17 +7,19 @@ Optimized with tree API, progress tracking, and proper error handling.
 import os
 import sys
 import yaml
-import fnmatch
 from github import Github, GithubException, UnknownObjectException
 from neo4j import GraphDatabase
 from dotenv import load_dotenv
 from typing import List, Dict, Tuple
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 from pathlib import Path
 
 from ide_rule_library.logger import StructuredLogger
 from rate_limiter import GitHubRateLimiter
 from progress_tracker import ProgressTracker
+from rule_file_matcher import RuleFileMatcher
 from rule_extractor import RuleExtractor
 from neo4j_writer import Neo4jRuleWriter
 
@@ -64,6 +66,9 @@ class ExistingPatternScanner:
         )
         self.logger.info(f"GitHub API initialized ({self.rate_limiter.get_remaining_calls()} calls remaining)")
         
+        # Compile rule-file priority patterns and production signals once
+        self.matcher = RuleFileMatcher.from_config(self.config)
+        
         # Initialize progress tracker
         self.progress_tracker = ProgressTracker()
         
@@ -72,6 +77,12 @@ class ExistingPatternScanner:
         
         # Initialize Neo4j writer (lazy - only if extraction enabled)
         self.writer = None
+        
+        # Extracted rules waiting for the next bulk write: (repo_url, file_path, rule_data)
+        self._pending_rules = []
+        # Fully extracted repos whose rules are still queued: repo_url -> rule files found.
+        # Journaled as processed only once those rules are stored, so a crash rescans them
+        self._pending_repos = {}
     
     def get_all_patterns(self) -> List[Dict]:
         """Get all Pattern nodes from Neo4j"""
@@ -97,66 +108,38 @@ class ExistingPatternScanner:
             return parts[0], parts[1]
         return None, None
     
-    def _match_pattern(self, file_paths: set, pattern: str) -> List[str]:
-        """Match file pattern against set of paths"""
-        matches = []
-        
-        # Handle wildcard patterns
-        if '*' in pattern:
-            for path in file_paths:
-                if fnmatch.fnmatch(path, pattern):
-                    matches.append(path)
-        # Handle directory patterns
-        elif pattern.endswith('/'):
-            for path in file_paths:
-                if path.startswith(pattern):
-                    matches.append(path)
-        # Exact match
-        elif pattern in file_paths:
-            matches.append(pattern)
-        
-        return matches
-    
     def check_repo_for_rules(self, repo_url: str) -> Dict:
-        """Check repo for rule files using tree API (1 API call vs 20+)"""
+        """
+        Check repo for rule files using tree API (1 API call vs 20+)
+        
+        Safe to call from worker threads: the only shared state is the
+        GitHub client and the rate limiter's quota tracker.
+        """
         owner, repo_name = self._parse_repo_url(repo_url)
         
         if not owner or not repo_name:
             return {'found': [], 'error': 'Invalid repo URL'}
         
         try:
-            # Get repo with rate limiting
-            repo = self.rate_limiter.call_with_retry(
-                self.gh.get_repo, f"{owner}/{repo_name}"
-            )
+            # Lazy repo object: no request until the tree call below
+            repo = self.gh.get_repo(f"{owner}/{repo_name}", lazy=True)
             
-            # Get entire tree in ONE API call
-            default_branch = repo.default_branch
+            # Get entire tree in ONE API call (HEAD resolves to the default branch)
             tree = self.rate_limiter.call_with_retry(
-                repo.get_git_tree, default_branch, recursive=True
+                repo.get_git_tree, 'HEAD', recursive=True
             )
             
             # Build set of all file paths
             file_paths = {item.path for item in tree.tree if item.type == 'blob'}
             
-            # Check all priority patterns against cached tree
-            found_files = []
-            
-            for priority_num, priority_key in [(1, 'priority_1_files'), 
-                                                 (2, 'priority_2_files'), 
-                                                 (3, 'priority_3_files')]:
-                for file_pattern in self.config.get(priority_key, []):
-                    matches = self._match_pattern(file_paths, file_pattern)
-                    for match in matches:
-                        found_files.append({
-                            'path': match,
-                            'priority': priority_num,
-                            'type': 'file'
-                        })
+            # One pass over the tree for every priority pattern and production signal
+            matched = self.matcher.match(file_paths)
+            found_files = matched['rule_files']
             
             return {
                 'found': found_files,
                 'total_files': len(found_files),
+                'production_signals': matched['signals'],
                 'error': None
             }
             
@@ -180,8 +163,21 @@ class ExistingPatternScanner:
             self.logger.error(f"Unexpected error checking {repo_url}: {e}", exc_info=True)
             return {'found': [], 'error': str(e)}
     
-    def scan_all_patterns(self, dry_run: bool = True, max_repos: int = None) -> Dict:
-        """Scan all patterns for IDE rule files"""
+    def scan_all_patterns(self, dry_run: bool = True, max_repos: int = None, workers: int = None) -> Dict:
+        """
+        Scan all patterns for IDE rule files
+        
+        Trees are fetched for up to `workers` repositories at a time (all
+        drawing on the shared GitHub quota) and every finished repository is
+        journaled by the progress tracker, so an interrupted scan resumes
+        where it stopped, with earlier findings restored into the results.
+        
+        Args:
+            dry_run: Report findings only, no extraction
+            max_repos: Only scan the first N patterns
+            workers: Concurrent tree fetches (default: github.scan_workers; 1 = sequential)
+        """
+        workers = workers or self.config['github'].get('scan_workers', 8)
         
         print("\n" + "="*80)
         print("IDE RULE FILE SCANNER")
@@ -202,6 +198,7 @@ class ExistingPatternScanner:
         else:
             print("EXTRACTION MODE - Will extract and store rule files")
         
+        print(f"Workers: {workers}")
         print(f"\nGitHub API calls available: {self.rate_limiter.get_remaining_calls()}")
         print("="*80 + "\n")
         
@@ -216,64 +213,42 @@ class ExistingPatternScanner:
             'repos_found': []
         }
         
-        # Scan each pattern
-        for i, pattern in enumerate(patterns, 1):
-            repo_url = pattern['repo_url']
-            
-            # Skip if already processed (from checkpoint)
+        # Scan each repo once (several patterns often share a repository); its
+        # rules are linked to every one of those patterns
+        by_repo = {}
+        for pattern in patterns:
+            by_repo.setdefault(pattern['repo_url'], []).append(pattern)
+        
+        # Restore repos finished by an earlier run
+        pending = []
+        for repo_url, repo_patterns in by_repo.items():
+            pattern = {**repo_patterns[0], 'pattern_names': [p['pattern_name'] for p in repo_patterns]}
             if self.progress_tracker.is_processed(repo_url):
-                self.logger.info(f"Skipping {repo_url} (already processed)")
-                results['total_scanned'] += 1
-                continue
-            
-            print(f"[{i}/{len(patterns)}] {pattern['pattern_name']}")
-            print(f"  Repo: {repo_url}")
-            print(f"  Stars: {pattern['stars']:,}")
-            
-            # Check for rules
-            check_result = self.check_repo_for_rules(repo_url)
-            results['total_scanned'] += 1
-            
-            if check_result.get('error'):
-                print(f"  [ERROR] {check_result['error']}")
-                results['repos_with_errors'] += 1
-                self.progress_tracker.mark_processed(repo_url, success=False, error=check_result['error'])
-                
-            elif check_result['found']:
-                print(f"  [OK] Found {len(check_result['found'])} rule file(s):")
-                for rule_file in check_result['found']:
-                    print(f"    - {rule_file['path']} (P{rule_file['priority']})")
-                    
-                    # Track stats
-                    file_name = rule_file['path'].split('/')[-1]
-                    results['by_format'][file_name] += 1
-                    results['by_priority'][f"priority_{rule_file['priority']}"] += 1
-                
-                results['repos_with_rules'] += 1
-                results['total_rule_files'] += len(check_result['found'])
-                results['repos_found'].append({
-                    'pattern': pattern,
-                    'rules': check_result['found']
-                })
-                
-                self.progress_tracker.mark_processed(repo_url, success=True)
-                
-                # Extract rules if not dry run
-                if not dry_run:
-                    self._extract_rules(pattern, check_result['found'])
+                self._restore_result(pattern, results)
             else:
-                print(f"  - No rule files found")
-                self.progress_tracker.mark_processed(repo_url, success=True)
-            
-            print()
-            
-            # Rate limit check every 50 repos
-            if (i % 50) == 0:
-                remaining = self.rate_limiter.get_remaining_calls()
-                print(f"--- Rate limit check: {remaining} calls remaining ---\n")
-                if remaining < 100:
-                    self.logger.warning("Approaching rate limit")
-                    print("WARNING: Approaching rate limit. Consider pausing.\n")
+                pending.append(pattern)
+        
+        if results['total_scanned']:
+            print(f"Resuming: {results['total_scanned']} repos already scanned, {len(pending)} to go\n")
+        
+        try:
+            if workers <= 1:
+                for i, pattern in enumerate(pending, 1):
+                    check_result = self.check_repo_for_rules(pattern['repo_url'])
+                    self._record_result(i, len(pending), pattern, check_result, results, dry_run)
+            else:
+                self._scan_concurrently(pending, workers, results, dry_run)
+        except BaseException:
+            # Store rules still buffered so their extraction is not lost, without
+            # letting a failed write hide the original error
+            try:
+                self._flush_rules()
+            except Exception as flush_error:
+                self.logger.error(f"Failed to store buffered rules: {flush_error}")
+            raise
+        
+        # Store rules still buffered
+        self._flush_rules()
         
         # Save final checkpoint
         self.progress_tracker.save_checkpoint()
@@ -283,8 +258,110 @@ class ExistingPatternScanner:
         
         return results
     
+    def _scan_concurrently(self, pending: List[Dict], workers: int, results: Dict, dry_run: bool):
+        """Fetch and match trees in a thread pool; record results on this thread as they finish"""
+        queue = iter(pending)
+        completed = 0
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rule_scan") as executor:
+            # Keep a bounded window in flight so a stop loses little work
+            in_flight = {
+                executor.submit(self.check_repo_for_rules, pattern['repo_url']): pattern
+                for pattern in islice(queue, workers * 2)
+            }
+            
+            try:
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pattern = in_flight.pop(future)
+                        completed += 1
+                        self._record_result(completed, len(pending), pattern, future.result(), results, dry_run)
+                        
+                        next_pattern = next(queue, None)
+                        if next_pattern is not None:
+                            in_flight[executor.submit(self.check_repo_for_rules, next_pattern['repo_url'])] = next_pattern
+            except KeyboardInterrupt:
+                for future in in_flight:
+                    future.cancel()
+                print("\nInterrupted - progress is journaled, re-run to resume\n")
+                raise
+    
+    def _record_result(self, i: int, total: int, pattern: Dict, check_result: Dict, results: Dict, dry_run: bool):
+        """Print, tally and journal one repository's scan result"""
+        repo_url = pattern['repo_url']
+        
+        print(f"[{i}/{total}] {pattern['pattern_name']}")
+        print(f"  Repo: {repo_url}")
+        print(f"  Stars: {pattern['stars']:,}")
+        
+        results['total_scanned'] += 1
+        
+        if check_result.get('error'):
+            print(f"  [ERROR] {check_result['error']}")
+            results['repos_with_errors'] += 1
+            self.progress_tracker.mark_processed(repo_url, success=False, error=check_result['error'])
+            
+        elif check_result['found']:
+            print(f"  [OK] Found {len(check_result['found'])} rule file(s):")
+            for rule_file in check_result['found']:
+                print(f"    - {rule_file['path']} (P{rule_file['priority']})")
+            
+            self._tally_rules(pattern, check_result['found'], results)
+            
+            # Extract rules if not dry run
+            if not dry_run:
+                self._extract_rules(pattern, check_result['found'])
+            
+            if any(queued_url == repo_url for queued_url, _, _ in self._pending_rules):
+                self._pending_repos[repo_url] = check_result['found']
+            else:
+                self.progress_tracker.mark_processed(repo_url, success=True, result=check_result['found'])
+        else:
+            print(f"  - No rule files found")
+            self.progress_tracker.mark_processed(repo_url, success=True)
+        
+        print()
+        
+        # Rate limit check every 50 repos
+        if (i % 50) == 0:
+            remaining = self.rate_limiter.get_remaining_calls()
+            print(f"--- Rate limit check: {remaining} calls remaining ---\n")
+            if remaining < 100:
+                self.logger.warning("Approaching rate limit")
+                print("WARNING: Approaching rate limit. Consider pausing.\n")
+    
+    def _restore_result(self, pattern: Dict, results: Dict):
+        """Count a repository scanned by an earlier run, using its journaled findings"""
+        repo_url = pattern['repo_url']
+        self.logger.info(f"Skipping {repo_url} (already processed)")
+        results['total_scanned'] += 1
+        
+        if repo_url in self.progress_tracker.get_failed_items():
+            results['repos_with_errors'] += 1
+            return
+        
+        found = self.progress_tracker.get_result(repo_url)
+        if found:
+            self._tally_rules(pattern, found, results)
+    
+    @staticmethod
+    def _tally_rules(pattern: Dict, found: List[Dict], results: Dict):
+        """Add a repository's rule files to the running stats"""
+        for rule_file in found:
+            file_name = rule_file['path'].split('/')[-1]
+            results['by_format'][file_name] += 1
+            results['by_priority'][f"priority_{rule_file['priority']}"] += 1
+        
+        results['repos_with_rules'] += 1
+        results['total_rule_files'] += len(found)
+        results['repos_found'].append({
+            'pattern': pattern,
+            'rules': found
+        })
+    
     def _extract_rules(self, pattern: Dict, rule_files: List[Dict]):
-        """Extract rule files using RuleExtractor and Neo4jWriter"""
+        """Extract rule files with RuleExtractor and queue them for Neo4jRuleWriter's bulk write"""
         
         # Initialize extractor and writer if not already done
         if not self.extractor:
@@ -327,25 +404,14 @@ class ExistingPatternScanner:
             )
             
             if result['success']:
-                # Write to Neo4j
-                written = self.writer.write_rule(
-                    result['data'],
-                    pattern_name=pattern['pattern_name']
-                )
-                
-                if written:
-                    self.logger.info(f"Successfully stored {file_path}")
-                    self.progress_tracker.mark_processed(
-                        pattern['repo_url'],
-                        file_path,
-                        success=True
-                    )
-                else:
-                    self.logger.info(f"Skipped {file_path} (duplicate)")
-                    self.progress_tracker.mark_skipped(
-                        pattern['repo_url'],
-                        file_path
-                    )
+                # Queue for Neo4j; written a batch at a time, marked processed once stored
+                self._pending_rules.append((
+                    pattern['repo_url'],
+                    file_path,
+                    {**result['data'], 'pattern_names': pattern.get('pattern_names', [pattern['pattern_name']])}
+                ))
+                if len(self._pending_rules) >= self.writer.batch_size:
+                    self._flush_rules()
             else:
                 self.logger.error(f"Failed to extract {file_path}: {result.get('error')}")
                 self.progress_tracker.mark_processed(
@@ -355,6 +421,39 @@ class ExistingPatternScanner:
                     error=result.get('error')
                 )
     
+    def _flush_rules(self):
+        """Bulk-write queued rules and record each file's outcome"""
+        if not self._pending_rules:
+            return
+        
+        pending, self._pending_rules = self._pending_rules, []
+        repos, self._pending_repos = self._pending_repos, {}
+        try:
+            stats = self.writer.write_rules_bulk(rule for _, _, rule in pending)
+        except Exception:
+            # Keep them queued for the next flush; unjournaled repos are rescanned on resume
+            self._pending_rules = pending + self._pending_rules
+            self._pending_repos = {**repos, **self._pending_repos}
+            raise
+        
+        skipped = set(stats['skipped_ids'])
+        failed = set(stats['failed_ids'])
+        for repo_url, file_path, rule in pending:
+            if rule['id'] in failed:
+                self.progress_tracker.mark_processed(repo_url, file_path, success=False, error="Neo4j write failed")
+            elif rule['id'] in skipped:
+                self.logger.info(f"Skipped {file_path} (duplicate)")
+                self.progress_tracker.mark_skipped(repo_url, file_path)
+            else:
+                self.logger.info(f"Successfully stored {file_path}")
+                self.progress_tracker.mark_processed(repo_url, file_path, success=True)
+        
+        for repo_url, found in repos.items():
+            self.progress_tracker.mark_processed(repo_url, success=True, result=found)
+        
+        print(f"  [DB] Stored {stats['created']} rule(s), skipped {stats['skipped']} duplicate(s)"
+              + (f", {stats['failed']} failed" if stats['failed'] else "") + "\n")
+    
     def _print_summary(self, results: Dict, dry_run: bool):
         """Print scan summary"""
         print("\n" + "="*80)
@@ -417,6 +516,7 @@ def main():
     parser = argparse.ArgumentParser(description='Scan Pattern repositories for IDE rule files')
     parser.add_argument('--extract', action='store_true', help='Extract rules (default is dry run)')
     parser.add_argument('--max', type=int, help='Maximum number of repos to scan')
+    parser.add_argument('--workers', type=int, help='Concurrent repo scans (default: github.scan_workers in config)')
     parser.add_argument('--clear-checkpoint', action='store_true', help='Clear progress checkpoint and start fresh')
     
     args = parser.parse_args()
@@ -432,7 +532,8 @@ def main():
         # Run scan
         results = scanner.scan_all_patterns(
             dry_run=not args.extract,
-            max_repos=args.max
+            max_repos=args.max,
+            workers=args.workers
         )
         
         # Save results to JSON
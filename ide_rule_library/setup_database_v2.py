@@ -199,18 +199,21 @@ def run_base_setup(session):
         else:
             raise
     
-    # Create text index for content_hash
-    print("\nCreating text index on content_hash...")
+    # Create uniqueness constraint for content_hash (backs Neo4jRuleWriter.write_rules_bulk's MERGE;
+    # its index replaces the plain ide_rule_hash index, which cannot coexist with it)
+    print("\nCreating uniqueness constraint on content_hash...")
     try:
+        session.run("DROP INDEX ide_rule_hash IF EXISTS")
         session.run("""
-            CREATE INDEX ide_rule_hash IF NOT EXISTS
-            FOR (r:IDERule) ON (r.content_hash)
+            CREATE CONSTRAINT ide_rule_content_hash IF NOT EXISTS
+            FOR (r:IDERule) REQUIRE r.content_hash IS UNIQUE
         """)
-        print("[OK] Index 'ide_rule_hash' created")
+        print("[OK] Constraint 'ide_rule_content_hash' created")
     except Exception as e:
-        if "equivalent index already exists" in str(e).lower():
-            print("[OK] Index 'ide_rule_hash' already exists")
+        if "equivalent constraint already exists" in str(e).lower():
+            print("[OK] Constraint 'ide_rule_content_hash' already exists")
         else:
+            print("[ERROR] Could not create constraint - remove duplicate content_hash rules first")
             raise
     
     # Create constraint for unique rule IDs
@@ -226,6 +229,20 @@ def run_base_setup(session):
             print("[OK] Constraint 'ide_rule_id' already exists")
         else:
             raise
+    
+    # One summary node per name (QualityAnalyzer MERGEs it on rebuild)
+    print("\nCreating uniqueness constraint on QualitySummary name...")
+    try:
+        session.run("""
+            CREATE CONSTRAINT quality_summary_name IF NOT EXISTS
+            FOR (s:QualitySummary) REQUIRE s.name IS UNIQUE
+        """)
+        print("[OK] Constraint 'quality_summary_name' created")
+    except Exception as e:
+        if "equivalent constraint already exists" in str(e).lower():
+            print("[OK] Constraint 'quality_summary_name' already exists")
+        else:
+            raise
 
 
 if __name__ == '__main__':
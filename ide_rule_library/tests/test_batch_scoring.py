@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Batch Scoring Tests
+
+Tests RepoQualityScorer.score_batch against the scalar scorer.
+Verifies every component, the quality score and the confidence level are
+identical to calculate_quality_score / enhance_repo_metadata on random
+repositories and on threshold boundaries, that weights scale components,
+that a DataFrame-style table and an empty table are accepted, and that
+re-scoring a 10k-repo table is fast.
+"""
+
+import random
+import sys
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ide_rule_library.quality_scorer import RepoQualityScorer, enhance_repo_metadata
+
+SIGNAL_FILES = [
+    'Dockerfile', 'docker-compose.yml', '.github/workflows/ci.yml', 'tests/test_app.py',
+    'jest.config.js', 'prometheus.yml', 'sentry.properties', '.github/dependabot.yml',
+    'SECURITY.md', 'k8s/deploy.yaml', 'CHANGELOG.md', 'CONTRIBUTING.md', 'README.md', 'src/main.py'
+]
+
+
+def random_repo(rng: random.Random, now: datetime) -> dict:
+    """repo_data dict with the kinds of values the fetchers produce"""
+    repo = {
+        'stars': rng.choice([0, 1, 499, 500, rng.randint(0, 200000)]),
+        'forks': rng.choice([0, rng.randint(0, 20000)]),
+        'open_issues': rng.choice([0, rng.randint(0, 500)]),
+        'closed_issues': rng.choice([0, rng.randint(0, 5000)]),
+        'contributors': ['c'] * rng.choice([0, 1, 19, 20, rng.randint(0, 60)]),
+        'files': rng.sample(SIGNAL_FILES, rng.randint(0, len(SIGNAL_FILES))),
+        'readme_length': rng.choice([0, 1000, 1001, 3000, 3001, rng.randint(0, 10000)])
+    }
+    created = now - timedelta(days=rng.randint(0, 4000), seconds=rng.randint(0, 86399))
+    updated = now - timedelta(days=rng.choice([29, 30, 89, 90, 364, 365, rng.randint(0, 900)]), hours=1)
+    date_style = rng.choice(['datetime', 'iso', 'missing'])
+    if date_style == 'datetime':
+        repo['created_at'], repo['updated_at'] = created, updated
+    elif date_style == 'iso':
+        repo['created_at'] = created.isoformat().replace('+00:00', 'Z')
+        repo['updated_at'] = updated.isoformat().replace('+00:00', 'Z')
+    return repo
+
+
+def scalar_result(scorer: RepoQualityScorer, repo: dict) -> dict:
+    """Components, quality score and confidence as the per-repo path gives them"""
+    quality_score, breakdown = scorer.calculate_quality_score(dict(repo))
+
+    # Confidence as enhance_repo_metadata computes it, which needs datetimes
+    data = dict(repo)
+    for field in ('created_at', 'updated_at'):
+        value = data.pop(field, None)
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                continue
+        if isinstance(value, datetime):
+            data[field] = value
+    data = enhance_repo_metadata(data)
+    return {**breakdown, 'quality_score': quality_score, 'confidence_level': data['confidence_level']}
+
+
+class TestBatchScoring(unittest.TestCase):
+    """Test parity and behaviour of the vectorised scorer"""
+
+    def setUp(self):
+        self.scorer = RepoQualityScorer()
+
+    def assert_parity(self, repos):
+        batch = self.scorer.score_batch(self.scorer.metrics_table(repos))
+        for i, repo in enumerate(repos):
+            expected = scalar_result(self.scorer, repo)
+            actual = {name: batch[name][i].item() for name in expected}
+            self.assertEqual(actual, expected, msg=f"repo {i}: {repo}")
+
+    def test_random_repos_match_scalar(self):
+        """2000 random repositories score identically"""
+        rng = random.Random(18)
+        now = datetime.now(timezone.utc)
+        self.assert_parity([random_repo(rng, now) for _ in range(2000)])
+
+    def test_boundaries_and_bad_values(self):
+        """Ladder edges, missing data and invalid values match"""
+        now = datetime.now(timezone.utc)
+        repos = [
+            {},
+            {'stars': 5, 'forks': -3, 'readme_length': 'long', 'contributors': 'many', 'files': 'x'},
+            {'stars': 0, 'forks': 10, 'created_at': 'not a date', 'updated_at': 12345},
+            {'stars': 1000, 'created_at': now - timedelta(days=182), 'updated_at': now - timedelta(days=29)},
+            {'stars': 1000, 'created_at': now - timedelta(days=183), 'updated_at': now - timedelta(days=30)},
+            {'open_issues': 7, 'closed_issues': 0, 'contributors': ['a'] * 20, 'readme_length': 3001,
+             'files': SIGNAL_FILES, 'updated_at': now - timedelta(days=1)},
+        ]
+        self.assert_parity(repos)
+
+    def test_weights_scale_components(self):
+        """Weights multiply components and flow into the total"""
+        now = datetime.now(timezone.utc)
+        repos = [random_repo(random.Random(seed), now) for seed in range(50)]
+        table = self.scorer.metrics_table(repos)
+        plain = self.scorer.score_batch(table)
+        weighted = self.scorer.score_batch(table, weights={'freshness': 2.0, 'usage_signal': 0.0})
+
+        np.testing.assert_array_equal(weighted['freshness'], plain['freshness'] * 2.0)
+        np.testing.assert_array_equal(weighted['usage_signal'], np.zeros(50))
+        np.testing.assert_array_equal(weighted['diversity'], plain['diversity'])
+        np.testing.assert_allclose(
+            weighted['quality_score'],
+            plain['quality_score'] + plain['freshness'] - plain['usage_signal'],
+            atol=0.011
+        )
+
+    def test_table_inputs(self):
+        """Mapping-of-columns tables (e.g. a DataFrame) and empty tables work"""
+        now = datetime.now(timezone.utc)
+        repos = [random_repo(random.Random(seed), now) for seed in range(5)]
+        table = self.scorer.metrics_table(repos)
+        as_lists = {name: list(values) for name, values in table.items() if name != 'production_signals'}
+
+        np.testing.assert_array_equal(
+            self.scorer.score_batch(as_lists)['quality_score'], self.scorer.score_batch(table)['quality_score']
+        )
+        empty = self.scorer.score_batch(self.scorer.metrics_table([]))
+        self.assertEqual(len(empty['quality_score']), 0)
+        self.assertEqual(len(empty['confidence_level']), 0)
+
+    def test_rescoring_is_fast(self):
+        """Re-scoring a 10k-repo table takes well under a second"""
+        now = datetime.now(timezone.utc)
+        rng = random.Random(7)
+        table = self.scorer.metrics_table([random_repo(rng, now) for _ in range(500)])
+        table = {name: np.tile(values, 20) for name, values in table.items()}
+
+        start = time.perf_counter()
+        result = self.scorer.score_batch(table)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(result['quality_score']), 10000)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Embedding Backend Tests
+
+Tests the local HashedTfidfBackend, backend selection and its use by
+EnhancedRuleQueryEngine.
+Verifies vectors are deterministic, unit length and rank related texts
+above unrelated ones, that fitting IDF weights changes (and persists) the
+model version, and that a local backend needs no GEMINI_API_KEY.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ide_rule_library.embedding_backends import (
+    GeminiEmbeddingBackend,
+    HashedTfidfBackend,
+    get_embedding_backend
+)
+from ide_rule_library.enhanced_query_engine import EnhancedRuleQueryEngine
+
+TEXTS = [
+    "Use connection pooling for database access",
+    "Configure connection pooling for the database",
+    "Write unit tests for React components",
+    ""
+]
+
+
+class TestHashedTfidfBackend(unittest.TestCase):
+    """Test the local backend's vectors"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+    def test_vectors_are_deterministic_and_normalised(self):
+        """Same text, same vector in a fresh instance; rows are unit length, empty text is zero"""
+        matrix = HashedTfidfBackend(dimensions=64).embed_matrix(TEXTS)
+        again = HashedTfidfBackend(dimensions=64).embed(TEXTS[:1])
+
+        self.assertEqual(matrix.shape, (4, 64))
+        np.testing.assert_allclose(np.linalg.norm(matrix[:3], axis=1), 1.0, rtol=1e-5)
+        self.assertFalse(matrix[3].any())
+        np.testing.assert_allclose(again[0], matrix[0], rtol=1e-6)
+
+    def test_related_texts_rank_higher(self):
+        """Texts sharing terms are more similar than unrelated ones"""
+        matrix = HashedTfidfBackend().embed_matrix(TEXTS)
+
+        self.assertGreater(matrix[0] @ matrix[1], matrix[0] @ matrix[2])
+
+    def test_fit_changes_and_persists_version(self):
+        """Fitted IDF weights give a new model version that a reload reproduces"""
+        idf_path = Path(self.tmp_dir) / 'idf.json'
+        backend = HashedTfidfBackend(dimensions=64, idf_path=str(idf_path))
+        unfitted = backend.model_version
+
+        backend.fit(TEXTS)
+        reloaded = HashedTfidfBackend(dimensions=64, idf_path=str(idf_path))
+
+        self.assertEqual(unfitted, 'v1-d64-tf')
+        self.assertNotEqual(backend.model_version, unfitted)
+        self.assertEqual(reloaded.model_version, backend.model_version)
+        np.testing.assert_allclose(reloaded.embed_matrix(TEXTS), backend.embed_matrix(TEXTS))
+
+    def test_large_batch(self):
+        """Ten thousand texts embed as one matrix"""
+        texts = [f"pattern {i} uses retry with backoff for service {i % 97}" for i in range(10000)]
+
+        matrix = HashedTfidfBackend().embed_matrix(texts)
+
+        self.assertEqual(matrix.shape, (10000, 768))
+        self.assertEqual(matrix.dtype, np.float32)
+
+
+class TestBackendSelection(unittest.TestCase):
+    """Test get_embedding_backend"""
+
+    def test_environment_selects_backend(self):
+        """EMBEDDING_BACKEND picks the backend; LOCAL_EMBEDDING_DIMENSIONS its width"""
+        with patch.dict(os.environ, {'EMBEDDING_BACKEND': 'local', 'LOCAL_EMBEDDING_DIMENSIONS': '128'}):
+            backend = get_embedding_backend()
+        with patch.dict(os.environ, {}, clear=True):
+            default = get_embedding_backend()
+
+        self.assertIsInstance(backend, HashedTfidfBackend)
+        self.assertEqual(backend.dimensions, 128)
+        self.assertFalse(backend.remote)
+        self.assertIsInstance(default, GeminiEmbeddingBackend)
+        self.assertEqual(default.model_id, 'models/text-embedding-004@2026-01')
+
+    def test_unknown_backend(self):
+        """An unknown name raises ValueError"""
+        with self.assertRaises(ValueError):
+            get_embedding_backend('word2vec')
+
+
+class TestEngineWithLocalBackend(unittest.TestCase):
+    """Test EnhancedRuleQueryEngine query embeddings from a local backend"""
+
+    def test_query_embedding_is_local(self):
+        """No API key or Gemini call; the cache is keyed by the local model id"""
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.run.return_value = []
+        backend = HashedTfidfBackend(dimensions=32)
+
+        with patch.dict(os.environ, {}, clear=True), \
+                patch('ide_rule_library.enhanced_query_engine.call_gemini_embedding_with_retry') as gemini:
+            engine = EnhancedRuleQueryEngine(Mock(session=Mock(return_value=session)), Mock(),
+                                             embedding_backend=backend)
+            embedding = engine._embed_query("error handling")
+
+        gemini.assert_not_called()
+        self.assertEqual(len(embedding), 32)
+        self.assertEqual(engine.cache.get_embedding(backend.model_id, "error handling"), embedding)
+
+
+if __name__ == '__main__':
+    unittest.main()
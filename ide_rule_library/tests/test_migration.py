@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Quality Score Migration Tests
+
+Tests the set-based QualityScoreMigration against a stubbed Neo4j driver.
+Verifies that a migration is one streamed read plus one UNWIND write per
+batch, that each repository is scored once and matches
+enhance_repo_metadata, that rules without a Pattern are skipped, that
+checkpoints are written per committed batch and honoured on resume, and
+that a 10k-rule library migrates well inside a minute.
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ide_rule_library import migrate_quality_scores
+from ide_rule_library.migrate_quality_scores import QualityScoreMigration, parse_repo_dates, score_repo
+from ide_rule_library.quality_scorer import enhance_repo_metadata
+
+
+def pattern_row(rule_id, pattern_key, stars=1000):
+    """Row as returned by MIGRATION_QUERY"""
+    if pattern_key is None:
+        return {'id': rule_id, 'pattern_key': None}
+    return {
+        'id': rule_id,
+        'pattern_key': pattern_key,
+        'name': pattern_key,
+        'html_url': f'https://github.com/o/{pattern_key}',
+        'stars': stars,
+        'forks': stars // 10,
+        'created_at': '2023-01-01T00:00:00Z',
+        'updated_at': datetime(2025, 12, 1),        # naive: taken as UTC
+        'open_issues': 5,
+        'closed_issues': 50,
+        'contributors': ['a', 'b', 'c'],
+        'files': ['Dockerfile', '.github/workflows/ci.yml', 'tests/test_x.py', 'README.md'],
+        'readme_length': None                       # missing property
+    }
+
+
+class FakeDriver:
+    """Serves MIGRATION_QUERY rows and records UNWIND write batches"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.batches = []
+        self.fail_batches = set()
+
+        self.session = MagicMock()
+        self.session.run.side_effect = lambda query, **params: iter([dict(row) for row in self.rows])
+        self.session.execute_write.side_effect = self.execute_write
+        self.driver = MagicMock()
+        self.driver.session.return_value.__enter__.return_value = self.session
+
+    def execute_write(self, fn, rows):
+        self.batches.append(rows)
+        if len(self.batches) in self.fail_batches:
+            raise Exception("TransientError")
+        return len(rows)
+
+
+class TestScoring(unittest.TestCase):
+    """Test per-repository scoring helpers"""
+
+    def test_parse_repo_dates(self):
+        """ISO strings, naive datetimes and driver temporals become aware datetimes"""
+        native = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        repo = parse_repo_dates({
+            'created_at': '2023-01-01T00:00:00Z',
+            'updated_at': Mock(to_native=Mock(return_value=native))
+        })
+        self.assertEqual(repo['created_at'], datetime(2023, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(repo['updated_at'], native)
+
+        repo = parse_repo_dates({'created_at': 'yesterday', 'updated_at': datetime(2024, 1, 1)})
+        self.assertIsNone(repo['created_at'])
+        self.assertEqual(repo['updated_at'].tzinfo, timezone.utc)
+
+    def test_score_repo_matches_enhance_repo_metadata(self):
+        """Same score and confidence; map fields JSON-encoded for Neo4j"""
+        row = pattern_row('r1', 'p1')
+        del row['id'], row['pattern_key'], row['readme_length']
+        repo = parse_repo_dates(row)
+
+        quality = score_repo(dict(repo))
+        expected = enhance_repo_metadata(dict(repo))
+
+        self.assertEqual(quality['repo_quality_score'], expected['repo_quality_score'])
+        self.assertEqual(quality['confidence_level'], expected['confidence_level'])
+        self.assertEqual(json.loads(quality['quality_breakdown']), expected['quality_breakdown'])
+        self.assertEqual(json.loads(quality['production_signals']), expected['production_signals'])
+        self.assertEqual(quality['contributor_count'], 3)
+
+
+class TestSetBasedMigration(unittest.TestCase):
+    """Test run_migration"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.checkpoint = Path(self.tmp_dir) / 'migration_checkpoint.json'
+
+    def _migration(self, rows):
+        fake = FakeDriver(rows)
+        return fake, QualityScoreMigration(fake.driver, Mock(), checkpoint_file=str(self.checkpoint))
+
+    def test_one_read_and_batched_writes(self):
+        """One read, each repository scored once, one write per batch, orphans skipped"""
+        rows = [pattern_row(f'r{i}', f'p{i % 3}') for i in range(7)] + [pattern_row('orphan', None)]
+        fake, migration = self._migration(rows)
+
+        with patch.object(migrate_quality_scores, 'score_repo', wraps=score_repo) as scored:
+            migration.run_migration(batch_size=3, workers=1)
+
+        fake.session.run.assert_called_once()
+        self.assertEqual(scored.call_count, 3)
+        self.assertEqual([len(batch) for batch in fake.batches], [3, 3, 1])
+        self.assertEqual(migration.stats['migrated'], 7)
+        self.assertEqual(migration.stats['skipped'], 1)
+
+        written = {row['id']: row for batch in fake.batches for row in batch}
+        self.assertEqual(written['r0']['repo_quality_score'], written['r3']['repo_quality_score'])
+        self.assertNotIn('orphan', written)
+
+    def test_checkpoint_per_batch_and_resume(self):
+        """A failed batch is not checkpointed; the re-run writes only what is left"""
+        rows = [pattern_row(f'r{i}', f'p{i}') for i in range(6)]
+        fake, migration = self._migration(rows)
+        fake.fail_batches = {2}
+
+        migration.run_migration(batch_size=2, workers=1)
+
+        with open(self.checkpoint) as f:
+            self.assertEqual(sorted(json.load(f)['processed_ids']), ['r0', 'r1', 'r4', 'r5'])
+        self.assertEqual(migration.stats['errors'], 2)
+
+        fake, migration = self._migration(rows)
+        migration.run_migration(batch_size=2, workers=1)
+        self.assertEqual([[row['id'] for row in batch] for batch in fake.batches], [['r2', 'r3']])
+
+    def test_dry_run_writes_nothing(self):
+        """Dry run scores everything but opens no write transaction or checkpoint"""
+        fake, migration = self._migration([pattern_row(f'r{i}', 'p') for i in range(5)])
+
+        migration.run_migration(dry_run=True, workers=1)
+
+        self.assertEqual(fake.batches, [])
+        self.assertEqual(migration.stats['migrated'], 5)
+        self.assertFalse(self.checkpoint.exists())
+
+    def test_process_pool_matches_in_process(self):
+        """Pool scoring gives the same rows as in-process scoring"""
+        rows = [pattern_row(f'r{i}', f'p{i}', stars=100 * i + 1) for i in range(12)]
+        serial, migration = self._migration(rows)
+        migration.run_migration(batch_size=100, workers=1)
+
+        self.checkpoint.unlink()
+        pooled, migration = self._migration(rows)
+        with patch.object(migrate_quality_scores, 'MIN_PARALLEL_REPOS', 0):
+            migration.run_migration(batch_size=100, workers=2)
+
+        self.assertEqual(serial.batches, pooled.batches)
+
+    def test_ten_thousand_rules_under_a_minute(self):
+        """A 10k-rule library (2k repositories) migrates in 20 transactions, well under a minute"""
+        rows = [pattern_row(f'r{i:05d}', f'p{i % 2000}', stars=i) for i in range(10000)]
+        fake, migration = self._migration(rows)
+
+        start = time.perf_counter()
+        migration.run_migration(batch_size=500, workers=1)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(fake.batches), 20)
+        self.assertEqual(migration.stats['migrated'], 10000)
+        self.assertLess(elapsed, 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
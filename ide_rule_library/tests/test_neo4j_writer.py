@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Neo4j Rule Writer Tests
+
+Tests Neo4jRuleWriter.write_rules_bulk against a stubbed driver that keeps
+a set of stored content hashes.
+Verifies client-side deduplication (against the database and within the
+call), batching by neo4j.batch_size with one transaction per batch,
+created/skipped/failed reporting, that a repeated bulk write is a no-op,
+that an id constraint violation fails only the conflicting rule, and that
+writes clear cached query results.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from neo4j.exceptions import ConstraintError
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from neo4j_writer import Neo4jRuleWriter, RULE_PROPERTIES
+
+
+def make_rule(n, content_hash=None):
+    """Extractor-shaped rule dict"""
+    rule = {key: f'{key}-{n}' for key in RULE_PROPERTIES}
+    rule.update({
+        'id': f'repo:rule{n}.md',
+        'content_hash': content_hash or f'hash{n}',
+        'extracted_date': '2026-01-01T00:00:00',
+        'trade_offs': {'not': 'stored'}
+    })
+    return rule
+
+
+class FakeDatabase:
+    """Stands in for Neo4j: MERGE semantics over a set of content hashes, unique ids"""
+
+    def __init__(self, hashes=(), patterns=('p1',)):
+        self.hashes = set(hashes)
+        self.ids = {}  # id -> content_hash
+        self.patterns = set(patterns)
+        self.batches = []
+        self.fail_batches = set()
+
+        self.session = MagicMock()
+        self.session.run.side_effect = lambda query, **params: [{'hash': h} for h in sorted(self.hashes)]
+        self.session.execute_write.side_effect = self.execute_write
+        self.driver = MagicMock()
+        self.driver.session.return_value.__enter__.return_value = self.session
+
+    def execute_write(self, fn, rows):
+        self.batches.append(rows)
+        if len(self.batches) in self.fail_batches:
+            raise Exception("TransientError")
+        for row in rows:
+            if self.ids.get(row['id'], row['content_hash']) != row['content_hash']:
+                raise ConstraintError(f"IDERule already exists with id {row['id']}")
+        outcomes = []
+        for row in rows:
+            created = row['content_hash'] not in self.hashes
+            self.hashes.add(row['content_hash'])
+            self.ids.setdefault(row['id'], row['content_hash'])
+            outcomes.append({'id': row['id'], 'created': created,
+                             'linked': created and bool(self.patterns & set(row['pattern_names']))})
+        return outcomes
+
+
+class TestWriteRulesBulk(unittest.TestCase):
+    """Test bulk, idempotent ingestion"""
+
+    def setUp(self):
+        self.db = FakeDatabase(hashes={'hash0'})
+        config = {'neo4j': {'batch_size': 2, 'duplicate_check': True}}
+        self.writer = Neo4jRuleWriter(self.db.driver, config, Mock())
+
+    def test_dedupes_and_batches(self):
+        """Known and repeated hashes are skipped before any write; the rest go in batch_size chunks"""
+        rules = [make_rule(0), make_rule(1), make_rule(2), make_rule(3, 'hash1'), make_rule(4), make_rule(5)]
+
+        stats = self.writer.write_rules_bulk(rules, pattern_name='p1')
+
+        self.assertEqual((stats['created'], stats['skipped'], stats['failed']), (4, 2, 0))
+        self.assertEqual(stats['skipped_ids'], ['repo:rule0.md', 'repo:rule3.md'])
+        self.assertEqual(stats['batches'], 2)
+        self.assertEqual([len(batch) for batch in self.db.batches], [2, 2])
+        self.db.session.run.assert_called_once()  # Hash preload only; no per-rule queries
+
+        row = self.db.batches[0][0]
+        self.assertEqual(set(row['props']), set(RULE_PROPERTIES))
+        self.assertEqual(row['extracted_date'], '2026-01-01T00:00:00')
+        self.assertEqual(row['pattern_names'], ['p1'])
+
+    def test_rerun_is_noop(self):
+        """A second write of the same rules creates nothing and opens no transaction"""
+        rules = [make_rule(n) for n in range(1, 4)]
+        self.writer.write_rules_bulk(rules)
+        batches = len(self.db.batches)
+
+        stats = self.writer.write_rules_bulk(rules)
+
+        self.assertEqual((stats['created'], stats['skipped']), (0, 3))
+        self.assertEqual(len(self.db.batches), batches)
+
+    def test_concurrent_writer_race(self):
+        """A hash stored after the preload is reported skipped by the MERGE"""
+        self.writer.load_known_hashes()
+        self.db.hashes.add('hash1')
+
+        stats = self.writer.write_rules_bulk([make_rule(1), make_rule(2)])
+
+        self.assertEqual((stats['created'], stats['skipped'], stats['skipped_ids']), (1, 1, ['repo:rule1.md']))
+
+    def test_failed_batch_and_links(self):
+        """A failed batch is reported and not cached; per-rule pattern names override the default"""
+        self.db.fail_batches = {1}
+        rules = [make_rule(1), make_rule(2), {**make_rule(3), 'pattern_name': 'missing'}]
+
+        stats = self.writer.write_rules_bulk(rules, pattern_name='p1')
+
+        self.assertEqual(stats['failed_ids'], ['repo:rule1.md', 'repo:rule2.md'])
+        self.assertEqual((stats['created'], stats['linked']), (1, 0))
+        self.assertNotIn('hash1', self.writer.load_known_hashes())
+        self.assertEqual(self.db.batches[1][0]['pattern_names'], ['missing'])
+
+    def test_edited_rule_fails_alone(self):
+        """A changed rule file (stored id, new hash) fails by itself; the rest of its batch is written"""
+        self.db.ids['repo:rule1.md'] = 'old-hash1'
+        self.db.hashes.add('old-hash1')
+
+        stats = self.writer.write_rules_bulk([make_rule(1), make_rule(2), make_rule(3)])
+
+        self.assertEqual((stats['created'], stats['failed'], stats['failed_ids']), (2, 1, ['repo:rule1.md']))
+        self.assertEqual([[row['id'] for row in batch] for batch in self.db.batches],
+                         [['repo:rule1.md', 'repo:rule2.md'], ['repo:rule1.md'], ['repo:rule2.md'], ['repo:rule3.md']])
+        self.assertNotIn('hash1', self.writer.load_known_hashes())
+        self.assertIn('hash2', self.writer.load_known_hashes())
+
+    def test_rule_links_to_several_patterns(self):
+        """A rule's pattern_names list is passed through for patterns sharing its repository"""
+        stats = self.writer.write_rules_bulk([{**make_rule(1), 'pattern_names': ['p1', 'p2']}], pattern_name='p3')
+
+        self.assertEqual(self.db.batches[0][0]['pattern_names'], ['p1', 'p2'])
+        self.assertEqual(stats['linked'], 1)
+
+    @patch('neo4j_writer.invalidate_cached_results')
+    def test_created_rules_clear_query_cache(self, invalidate):
+        """Only a bulk write that creates rules clears the cached query results"""
+        self.writer.write_rules_bulk([make_rule(0)])
+        invalidate.assert_not_called()
+
+        self.writer.write_rules_bulk([make_rule(1)])
+        invalidate.assert_called_once_with(self.writer.config)
+
+
+if __name__ == '__main__':
+    unittest.main()
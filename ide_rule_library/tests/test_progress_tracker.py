@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Progress Tracker Tests
+
+Tests the journaled checkpoint used by scan_existing_patterns.py.
+Verifies that items recorded after the last checkpoint survive a crash,
+that a torn trailing journal line is ignored and cut off before the next
+run appends, and that compaction neither loses nor double-counts items.
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from progress_tracker import ProgressTracker
+
+
+class TestProgressTrackerJournal(unittest.TestCase):
+    """Test checkpoint + journal recovery"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.checkpoint = str(Path(self.tmp_dir) / 'progress.json')
+
+    def test_resume_without_checkpoint_save(self):
+        """Items are recovered from the journal when the process dies before save_checkpoint()"""
+        tracker = ProgressTracker(self.checkpoint)
+        tracker.mark_processed('repo/a', success=True, result=[{'path': '.cursorrules', 'priority': 1}])
+        tracker.mark_processed('repo/b', success=False, error='Access forbidden')
+        tracker.mark_skipped('repo/c', 'AGENTS.md')
+
+        resumed = ProgressTracker(self.checkpoint)
+
+        self.assertTrue(resumed.is_processed('repo/a'))
+        self.assertTrue(resumed.is_processed('repo/c', 'AGENTS.md'))
+        self.assertEqual(resumed.get_result('repo/a'), [{'path': '.cursorrules', 'priority': 1}])
+        self.assertEqual(resumed.get_failed_items(), {'repo/b': 'Access forbidden'})
+        stats = resumed.get_stats()
+        self.assertEqual((stats['successful'], stats['failed'], stats['skipped']), (1, 1, 1))
+
+    def test_torn_journal_line_is_ignored(self):
+        """A partial line from a crash mid-write is dropped"""
+        tracker = ProgressTracker(self.checkpoint)
+        tracker.mark_processed('repo/a')
+        with open(tracker.journal_file, 'a') as f:
+            f.write('{"seq": 2, "key": "repo/b", "sta')
+
+        resumed = ProgressTracker(self.checkpoint)
+
+        self.assertTrue(resumed.is_processed('repo/a'))
+        self.assertFalse(resumed.is_processed('repo/b'))
+        self.assertEqual(resumed.get_stats()['total_attempted'], 1)
+
+    def test_resume_after_torn_line_keeps_new_entries(self):
+        """Entries journaled by the run after a torn write survive the next resume"""
+        tracker = ProgressTracker(self.checkpoint)
+        for i in range(3):
+            tracker.mark_processed(f"r{i}")
+        with open(tracker.journal_file, 'a') as f:
+            f.write('{"seq": 4, "key": "r3", "sta')
+
+        resumed = ProgressTracker(self.checkpoint)
+        for i in range(4, 7):
+            resumed.mark_processed(f"r{i}")
+
+        reloaded = ProgressTracker(self.checkpoint)
+
+        self.assertEqual(sorted(reloaded.processed), ['r0', 'r1', 'r2', 'r4', 'r5', 'r6'])
+        self.assertEqual(reloaded.get_stats()['total_attempted'], 6)
+
+    def test_compaction_empties_journal(self):
+        """Every compact_every items the checkpoint is rewritten and the journal removed"""
+        tracker = ProgressTracker(self.checkpoint, compact_every=3)
+        for i in range(4):
+            tracker.mark_processed(f'repo/{i}')
+
+        self.assertTrue(Path(self.checkpoint).exists())
+        self.assertEqual(len(tracker.journal_file.read_text().splitlines()), 1)
+        self.assertEqual(ProgressTracker(self.checkpoint).get_stats()['total_attempted'], 4)
+
+    def test_stale_journal_is_not_double_counted(self):
+        """Journal entries already folded into the checkpoint are skipped on replay"""
+        tracker = ProgressTracker(self.checkpoint)
+        tracker.mark_processed('repo/a')
+        tracker.mark_processed('repo/b')
+        journal = tracker.journal_file.read_text()
+        tracker.save_checkpoint()
+        # Crash between the checkpoint rename and the journal removal
+        tracker.journal_file.write_text(journal)
+
+        resumed = ProgressTracker(self.checkpoint)
+
+        self.assertEqual(resumed.get_stats()['total_attempted'], 2)
+
+    def test_clear_checkpoint(self):
+        """Clearing removes both files and all state"""
+        tracker = ProgressTracker(self.checkpoint)
+        tracker.mark_processed('repo/a')
+        tracker.save_checkpoint()
+        tracker.mark_processed('repo/b')
+
+        tracker.clear_checkpoint()
+
+        self.assertFalse(Path(self.checkpoint).exists())
+        self.assertFalse(tracker.journal_file.exists())
+        self.assertFalse(ProgressTracker(self.checkpoint).is_processed('repo/a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Quality Summary Tests
+
+Tests QualitySummary and the QualityAnalyzer / writer code that maintains it.
+Verifies percentiles, mean and standard deviation equal the sorted-list
+computation they replace, that removal and merging keep the summary exact,
+that writers' deltas reach the stored summary only when one exists, and
+that the analyzer serves every report from one stored summary, rebuilding
+it in a single pass when it is missing or its rule count has drifted.
+"""
+
+import math
+import random
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ide_rule_library import quality_summary
+from ide_rule_library.exceptions import MissingDataError
+from ide_rule_library.migrate_quality_scores import write_quality_batch
+from ide_rule_library.neo4j_writer import write_rule_batch
+from ide_rule_library.quality_analysis import QualityAnalyzer
+from ide_rule_library.quality_summary import QualitySummary, apply_summary_delta
+
+
+def random_entries(n, seed=19):
+    """Rule entries as STREAM_ENTRIES_QUERY returns them; some unscored"""
+    rng = random.Random(seed)
+    entries = []
+    for _ in range(n):
+        scored = rng.random() < 0.9
+        entries.append({
+            'repo_quality_score': round(rng.uniform(5, 95), 2) if scored else None,
+            'confidence_level': rng.randint(1, 5) if scored else None,
+            'has_ci_cd': scored and rng.random() < 0.5,
+            'has_deployment': scored and rng.random() < 0.3,
+            'has_tests': scored and rng.random() < 0.6,
+            'has_monitoring': scored and rng.random() < 0.1,
+            'has_security': scored and rng.random() < 0.2
+        })
+    return entries
+
+
+class FakeTx:
+    """Transaction stub holding one stored summary"""
+
+    def __init__(self, stored=None, update_rows=()):
+        self.stored = stored
+        self.update_rows = list(update_rows)
+        self.queries = []
+
+    def run(self, query, **params):
+        self.queries.append(query)
+        if query is quality_summary.LOCK_SUMMARY_QUERY:
+            return Mock(single=Mock(return_value={'summary': self.stored} if self.stored else None))
+        if query is quality_summary.SAVE_SUMMARY_QUERY:
+            self.stored = params['summary']
+            return Mock()
+        return self.update_rows
+
+
+class TestQualitySummary(unittest.TestCase):
+    """Test the summary against the full-scan computation"""
+
+    def setUp(self):
+        self.entries = random_entries(2001)
+        self.summary = QualitySummary.from_entries(self.entries)
+
+    def test_distribution_matches_sorted_scores(self):
+        """Percentiles are exact; mean and std_dev match a full pass"""
+        scores = sorted(e['repo_quality_score'] for e in self.entries if e['repo_quality_score'] is not None)
+        mean = sum(scores) / len(scores)
+
+        distribution = self.summary.distribution()
+
+        self.assertEqual(distribution['total'], len(scores))
+        for percentile in quality_summary.PERCENTILES:
+            self.assertEqual(distribution[f'p{percentile}'], scores[int(len(scores) * (percentile / 100))])
+        self.assertEqual(distribution['median'], distribution['p50'])
+        self.assertEqual((distribution['min'], distribution['max']), (scores[0], scores[-1]))
+        self.assertAlmostEqual(distribution['mean'], mean, places=9)
+        self.assertAlmostEqual(distribution['std_dev'],
+                               math.sqrt(sum((s - mean) ** 2 for s in scores) / len(scores)), places=9)
+        self.assertEqual(self.summary.rules, 2001)
+
+    def test_confidence_and_signal_counts(self):
+        """Counts equal the per-rule CASE sums"""
+        scored = [e for e in self.entries if e['repo_quality_score'] is not None]
+
+        stats = self.summary.production_signal_stats()
+
+        self.assertEqual(stats['with_ci_cd'], sum(1 for e in scored if e['has_ci_cd']))
+        self.assertEqual(stats['with_security'], sum(1 for e in scored if e['has_security']))
+        self.assertEqual(stats['with_any_production'], sum(1 for e in scored if e['has_ci_cd'] or e['has_tests']))
+        self.assertEqual(sum(self.summary.confidence_distribution().values()), len(scored))
+        self.assertEqual(list(self.summary.confidence_distribution()), [1, 2, 3, 4, 5])
+
+    def test_remove_and_merge_are_exact(self):
+        """Halves merge back to the whole; removing a half leaves the other"""
+        first = QualitySummary.from_entries(self.entries[:1000])
+        second = QualitySummary.from_entries(self.entries[1000:])
+
+        merged = QualitySummary.from_json(first.to_json()).merge(second)
+        self.assertEqual(merged.to_json(), self.summary.to_json())
+
+        for entry in self.entries[:1000]:
+            self.summary.remove(entry)
+        self.summary.rules -= 1000
+        self.assertEqual(self.summary.to_json(), second.to_json())
+
+    def test_empty(self):
+        """No scored rules: zero total and no statistics"""
+        distribution = QualitySummary(rules=3).distribution()
+
+        self.assertEqual(distribution['total'], 0)
+        self.assertIsNone(distribution['p50'])
+        self.assertIsNone(distribution['std_dev'])
+
+
+class TestSummaryDeltas(unittest.TestCase):
+    """Test writers' transaction functions"""
+
+    def test_delta_needs_stored_summary(self):
+        """Without a stored summary nothing is written; with one, the delta is merged"""
+        delta = QualitySummary.from_entries(random_entries(10))
+
+        tx = FakeTx()
+        self.assertFalse(apply_summary_delta(tx, delta))
+        self.assertIsNone(tx.stored)
+
+        tx = FakeTx(stored=QualitySummary(rules=5).to_json())
+        self.assertTrue(apply_summary_delta(tx, delta))
+        self.assertEqual(QualitySummary.from_json(tx.stored).rules, 15)
+        self.assertFalse(apply_summary_delta(FakeTx(), QualitySummary()))
+
+    def test_quality_batch_swaps_previous_values(self):
+        """A re-scored rule's old values are removed and its new ones added"""
+        old = {'repo_quality_score': 40.0, 'confidence_level': 2, 'has_ci_cd': False, 'has_tests': True}
+        stored = QualitySummary.from_entries([old, {}])
+        rows = [
+            {'id': 'r1', 'repo_quality_score': 80.5, 'confidence_level': 4, 'has_ci_cd': True},
+            {'id': 'r2', 'repo_quality_score': 60.0, 'confidence_level': 3},
+            {'id': 'gone', 'repo_quality_score': 10.0, 'confidence_level': 1}
+        ]
+        tx = FakeTx(stored=stored.to_json(), update_rows=[
+            {'id': 'r1', 'previous': old},
+            {'id': 'r2', 'previous': {field: None for field in quality_summary.ENTRY_FIELDS}}
+        ])
+
+        self.assertEqual(write_quality_batch(tx, rows), 2)
+
+        summary = QualitySummary.from_json(tx.stored)
+        self.assertEqual(summary.rules, 2)
+        self.assertEqual(summary.distribution()['min'], 60.0)
+        self.assertEqual(summary.distribution()['max'], 80.5)
+        self.assertEqual(summary.confidence_distribution(), {3: 1, 4: 1})
+        self.assertEqual(summary.production_signal_stats()['with_tests'], 0)
+        self.assertEqual(summary.production_signal_stats()['with_ci_cd'], 1)
+
+    def test_bulk_rule_write_counts_created_rules(self):
+        """Created rules add to the rule count; MERGE no-ops do not"""
+        tx = FakeTx(stored=QualitySummary(rules=1).to_json(), update_rows=[
+            {'id': 'a', 'created': True, 'linked': True},
+            {'id': 'b', 'created': False, 'linked': False}
+        ])
+
+        write_rule_batch(tx, [{}, {}])
+
+        self.assertEqual(QualitySummary.from_json(tx.stored).rules, 2)
+
+
+class TestQualityAnalyzer(unittest.TestCase):
+    """Test reports served from the stored summary"""
+
+    def setUp(self):
+        self.entries = random_entries(500)
+        self.stored = QualitySummary.from_entries(self.entries).to_json()
+        self.rule_count = 500
+
+        self.session = MagicMock()
+        self.session.__enter__.return_value = self.session
+        self.session.run.side_effect = self._run
+        self.driver = Mock(session=Mock(return_value=self.session))
+        self.analyzer = QualityAnalyzer(self.driver, Mock())
+
+    def _run(self, query, **params):
+        if query is quality_summary.LOAD_SUMMARY_QUERY:
+            return Mock(single=Mock(return_value={'summary': self.stored} if self.stored else None))
+        if query is quality_summary.RULE_COUNT_QUERY:
+            return Mock(single=Mock(return_value={'rules': self.rule_count}))
+        if query is quality_summary.STREAM_ENTRIES_QUERY:
+            return iter([dict(entry) for entry in self.entries])
+        if query is quality_summary.SAVE_SUMMARY_QUERY:
+            self.stored = params['summary']
+            return Mock()
+        raise AssertionError(f"Unexpected query: {query}")
+
+    def _queries(self):
+        return [c.args[0] for c in self.session.run.call_args_list]
+
+    def test_reports_use_one_summary_read(self):
+        """recommend_thresholds and the report getters never scan rules"""
+        recommendations = self.analyzer.recommend_thresholds()
+        self.analyzer.get_smart_threshold(90)
+        self.analyzer.get_confidence_distribution()
+
+        self.assertEqual(self._queries(), [quality_summary.LOAD_SUMMARY_QUERY, quality_summary.RULE_COUNT_QUERY])
+        distribution = QualitySummary.from_json(self.stored).distribution()
+        self.assertEqual(recommendations['strict']['min_quality_score'], distribution['p75'])
+        self.assertEqual(recommendations['minimal']['min_quality_score'], distribution['p10'])
+
+    def test_rebuilds_when_missing_or_stale(self):
+        """A missing summary, or one whose rule count drifted, is rebuilt in one pass"""
+        expected = self.stored
+
+        self.stored = None
+        self.analyzer.get_quality_distribution()
+        self.assertIn(quality_summary.STREAM_ENTRIES_QUERY, self._queries())
+        self.assertEqual(self.stored, expected)
+
+        self.session.run.reset_mock()
+        self.rule_count = 501
+        self.analyzer.load_summary(refresh=True)
+        self.assertEqual(self._queries().count(quality_summary.STREAM_ENTRIES_QUERY), 1)
+
+    def test_no_scored_rules(self):
+        """An unscored library still raises MissingDataError"""
+        self.entries = [{} for _ in range(3)]
+        self.stored = None
+        self.rule_count = 3
+
+        with self.assertRaises(MissingDataError):
+            self.analyzer.get_quality_distribution()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Query Cache Tests
+
+Tests QueryCache and its use by EnhancedRuleQueryEngine against a stubbed
+Neo4j driver and embedding call.
+Verifies filter normalisation, LRU and TTL eviction, persistence across
+instances, invalidation by writers in another process, and that repeated
+or relaxed queries reuse the query embedding, the pre-built Cypher
+templates and cached results.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ide_rule_library.enhanced_query_engine import EnhancedRuleQueryEngine, quality_query_template
+from ide_rule_library.exceptions import NoRulesFoundError
+from ide_rule_library.query_cache import QueryCache, invalidate_cached_results, result_key
+
+EMBEDDING = [0.1, 0.2, 0.3]
+
+
+class TestQueryCache(unittest.TestCase):
+    """Test key normalisation, eviction and persistence"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.db_path = str(Path(self.tmp_dir) / 'query_cache.sqlite')
+
+    def test_result_key_normalisation(self):
+        """Whitespace, technology order, empty lists and int/float do not change the key"""
+        a = result_key('quality', 'REST  api\n', technologies=['python', 'flask'], min_quality_score=60,
+                       project_size=None)
+        b = result_key('quality', 'REST api', technologies=['flask', 'python'], min_quality_score=60.0,
+                       project_size=None)
+        c = result_key('quality', 'REST api', technologies=['flask'], min_quality_score=60.0, project_size=None)
+
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+        self.assertEqual(result_key('semantic', 'q', technologies=[]), result_key('semantic', 'q', technologies=None))
+
+    def test_embedding_lru(self):
+        """The least recently used embedding is evicted"""
+        cache = QueryCache(embedding_capacity=2)
+        cache.put_embedding('m', 'a', [1.0])
+        cache.put_embedding('m', 'b', [2.0])
+        cache.get_embedding('m', 'a')
+        cache.put_embedding('m', 'c', [3.0])
+
+        self.assertEqual(cache.get_embedding('m', 'a'), [1.0])
+        self.assertIsNone(cache.get_embedding('m', 'b'))
+        self.assertIsNone(cache.get_embedding('other-model', 'a'))
+
+    def test_result_ttl(self):
+        """Results expire after result_ttl seconds and are returned as copies"""
+        now = [1000.0]
+        with patch('ide_rule_library.query_cache.time.time', lambda: now[0]):
+            cache = QueryCache(result_ttl=60)
+            cache.put_results('k', [{'id': 'r1'}])
+
+            hit = cache.get_results('k')
+            hit[0]['id'] = 'mutated'
+            self.assertEqual(cache.get_results('k'), [{'id': 'r1'}])
+
+            now[0] += 61
+            self.assertIsNone(cache.get_results('k'))
+
+    def test_persistence_across_instances(self):
+        """A new process sees embeddings and unexpired results"""
+        cache = QueryCache(self.db_path)
+        cache.put_embedding('m', 'query', EMBEDDING)
+        cache.put_results('k', [{'id': 'r1', 'technologies': ['python']}])
+        cache.close()
+
+        reopened = QueryCache(self.db_path)
+        self.addCleanup(reopened.close)
+
+        self.assertEqual(reopened.get_embedding('m', 'query'), EMBEDDING)
+        self.assertEqual(reopened.get_results('k'), [{'id': 'r1', 'technologies': ['python']}])
+
+    def test_writer_invalidation(self):
+        """invalidate_cached_results clears the configured file's results but keeps embeddings"""
+        cache = QueryCache(self.db_path)
+        cache.put_embedding('m', 'query', EMBEDDING)
+        cache.put_results('k', [{'id': 'r1'}])
+        cache.close()
+
+        invalidate_cached_results({'query_cache': {'path': self.db_path}})
+        invalidate_cached_results({'query_cache': {'path': str(Path(self.tmp_dir) / 'missing.sqlite')}})
+
+        reopened = QueryCache(self.db_path)
+        self.addCleanup(reopened.close)
+        self.assertIsNone(reopened.get_results('k'))
+        self.assertEqual(reopened.get_embedding('m', 'query'), EMBEDDING)
+        self.assertFalse((Path(self.tmp_dir) / 'missing.sqlite').exists())
+
+
+class TestEngineCaching(unittest.TestCase):
+    """Test EnhancedRuleQueryEngine with the cache"""
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.session.__enter__.return_value = self.session
+        self.session.run.side_effect = self._run
+        self.driver = Mock(session=Mock(return_value=self.session))
+        self.rows = [{'id': f'r{i}', 'repo_quality_score': 80, 'confidence_level': 4} for i in range(2)]
+
+        with patch.dict(os.environ, {'GEMINI_API_KEY': 'x'}), \
+                patch('ide_rule_library.enhanced_query_engine.genai'):
+            self.engine = EnhancedRuleQueryEngine(self.driver, Mock())
+        self.engine._quality_data_available = True
+
+        patcher = patch('ide_rule_library.enhanced_query_engine.call_gemini_embedding_with_retry',
+                        return_value=EMBEDDING)
+        self.embed = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, cypher, **params):
+        return [dict(row) for row in self.rows]
+
+    def _vector_queries(self):
+        return [c for c in self.session.run.call_args_list if 'queryNodes' in c.args[0]]
+
+    def test_repeated_query_is_served_from_cache(self):
+        """The second identical query makes no embedding call and no database query"""
+        first = self.engine.query_rules("error handling", technologies=['python'])
+        second = self.engine.query_rules("error  handling ", technologies=['python'])
+
+        self.assertEqual(first, second)
+        self.embed.assert_called_once()
+        self.assertEqual(len(self._vector_queries()), 1)
+
+    def test_fallback_embeds_once(self):
+        """The whole relaxation ladder costs one embedding and one vector query"""
+        self.rows = []
+
+        with self.assertRaises(NoRulesFoundError):
+            self.engine.query_rules_with_fallback("error handling", min_results=5)
+
+        self.embed.assert_called_once()
+        self.assertEqual(len(self._vector_queries()), 1)
+
+    def test_templates_are_reused(self):
+        """The same filter combination yields the identical Cypher text, values as parameters"""
+        self.engine.query_rules("a", project_type='api')
+        self.engine.query_rules("b", project_type='cli')
+
+        first, second = self._vector_queries()
+        self.assertIs(first.args[0], second.args[0])
+        self.assertIs(first.args[0], quality_query_template(True, False, False, True, False))
+        self.assertEqual(second.kwargs['project_type'], 'cli')
+
+
+if __name__ == '__main__':
+    unittest.main()
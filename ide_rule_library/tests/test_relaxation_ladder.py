@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Relaxation Ladder Tests
+
+Tests query_rules_with_fallback's single-pass ladder against a stubbed
+Neo4j driver and embedding call.
+Verifies each level filters and orders the candidate pool as its Cypher
+query would (including null properties), that the first level with enough
+rules is reported, and that one embedding and one vector query are made
+however far the ladder relaxes.
+"""
+
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ide_rule_library.enhanced_query_engine import CandidatePool, EnhancedRuleQueryEngine, relaxation_ladder
+from ide_rule_library.exceptions import NoRulesFoundError, QueryError
+
+
+def rule(rule_id, score, quality=80, confidence=4, days=30, ci=True, tests=True,
+         project_sizes=None, team_sizes=None):
+    """Candidate row as returned by the pool query"""
+    return {
+        'id': rule_id,
+        'score': score,
+        'repo_quality_score': quality,
+        'confidence_level': confidence,
+        'days_since_update': days,
+        'has_ci_cd': ci,
+        'has_tests': tests,
+        'suitable_project_sizes': [] if project_sizes is None else project_sizes,
+        'suitable_team_sizes': [] if team_sizes is None else team_sizes
+    }
+
+
+CANDIDATES = [
+    rule('strict-a', 0.90, quality=85),
+    rule('strict-b', 0.95, quality=70),
+    rule('no-signals', 0.99, quality=90, ci=False, tests=None),     # fails strict only
+    rule('stale', 0.80, quality=65, days=500),                       # relaxed allows 730 days
+    rule('large-only', 0.85, quality=75, project_sizes=['large']),   # context filter until minimal
+    rule('ancient', 0.70, quality=45, confidence=2, days=5000),      # minimal only
+    rule('unscored', 0.97, quality=None, confidence=None),           # semantic only
+    rule('low', 0.60, quality=20, confidence=1),                     # semantic only
+]
+
+
+class TestCandidatePool(unittest.TestCase):
+    """Test the in-memory level filters"""
+
+    def setUp(self):
+        self.pool = CandidatePool(CANDIDATES)
+        self.ladder = relaxation_ladder(60.0, 3, 365, True, 'small', None)
+
+    def _ids(self, level):
+        return [r['id'] for r in self.pool.select(level, top_k=10)]
+
+    def test_strict_level(self):
+        """Strict filters apply every condition, ordered by quality then similarity"""
+        self.assertEqual(self._ids(self.ladder[0]), ['strict-a', 'strict-b'])
+
+    def test_relaxed_and_minimal_levels(self):
+        """Each level admits exactly what its Cypher query would"""
+        self.assertEqual(self._ids(self.ladder[1]), ['no-signals', 'strict-a', 'strict-b', 'stale'])
+        self.assertEqual(
+            self._ids(self.ladder[2]),
+            ['no-signals', 'strict-a', 'large-only', 'strict-b', 'stale', 'ancient']
+        )
+
+    def test_semantic_level(self):
+        """No quality filters: similarity order, missing scores defaulted"""
+        rules = self.pool.select(self.ladder[3], top_k=3)
+
+        self.assertEqual([r['id'] for r in rules], ['no-signals', 'unscored', 'strict-b'])
+        self.assertEqual((rules[1]['repo_quality_score'], rules[1]['confidence_level']), (0, 1))
+        self.assertIsNone(CANDIDATES[6]['repo_quality_score'])
+
+    def test_top_k_and_empty_pool(self):
+        """top_k truncates after ordering; an empty pool yields nothing at any level"""
+        self.assertEqual([r['id'] for r in self.pool.select(self.ladder[2], top_k=2)], ['no-signals', 'strict-a'])
+        for level in self.ladder:
+            self.assertEqual(CandidatePool([]).select(level, top_k=5), [])
+
+
+class TestQueryRulesWithFallback(unittest.TestCase):
+    """Test the engine's single-pass fallback"""
+
+    def setUp(self):
+        self.session = MagicMock()
+        self.session.__enter__.return_value = self.session
+        self.session.run.side_effect = lambda cypher, **params: [dict(row) for row in self.rows]
+        self.driver = Mock(session=Mock(return_value=self.session))
+        self.rows = CANDIDATES
+
+        with patch.dict(os.environ, {'GEMINI_API_KEY': 'x'}), \
+                patch('ide_rule_library.enhanced_query_engine.genai'):
+            self.engine = EnhancedRuleQueryEngine(self.driver, Mock())
+        self.engine._quality_data_available = True
+
+        patcher = patch('ide_rule_library.enhanced_query_engine.call_gemini_embedding_with_retry',
+                        return_value=[0.1, 0.2, 0.3])
+        self.embed = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _vector_queries(self):
+        return [c for c in self.session.run.call_args_list if 'queryNodes' in c.args[0]]
+
+    def test_strict_level_satisfies(self):
+        """Enough strict rules: no relaxation"""
+        rules = self.engine.query_rules_with_fallback("api", min_results=3, top_k=5)
+
+        self.assertEqual([r['id'] for r in rules], ['strict-a', 'large-only', 'strict-b'])
+        self.assertEqual({r['relaxation_level'] for r in rules}, {'strict'})
+
+    def test_relaxes_in_one_query(self):
+        """Deep relaxation still makes one embedding call and one vector query"""
+        rules = self.engine.query_rules_with_fallback("api", project_size='small', min_results=6, top_k=10)
+
+        self.assertEqual(len(rules), 6)
+        self.assertEqual(rules[0]['relaxation_level'], 'minimal')
+        self.embed.assert_called_once()
+        (call,) = self._vector_queries()
+        self.assertEqual(call.kwargs['pool_size'], 30)
+        self.assertNotIn('repo_quality_score >=', call.args[0])
+
+    def test_semantic_level_and_no_quality_data(self):
+        """The last level returns whatever it finds; without quality data it is the only level"""
+        rules = self.engine.query_rules_with_fallback("api", min_results=20, top_k=4)
+        self.assertEqual([r['relaxation_level'] for r in rules], ['semantic'] * 4)
+
+        self.engine._quality_data_available = False
+        rules = self.engine.query_rules_with_fallback("api", min_results=1, top_k=1)
+        self.assertEqual((rules[0]['id'], rules[0]['relaxation_level']), ('no-signals', 'semantic'))
+
+    def test_errors(self):
+        """Empty query and empty pool raise"""
+        with self.assertRaises(QueryError):
+            self.engine.query_rules_with_fallback("  ")
+
+        self.rows = []
+        with self.assertRaises(NoRulesFoundError):
+            self.engine.query_rules_with_fallback("api")
+
+    def test_repeated_call_is_cached(self):
+        """The same request with the same level is answered from the result cache"""
+        first = self.engine.query_rules_with_fallback("api", min_results=6, top_k=10)
+        second = self.engine.query_rules_with_fallback("api ", min_results=6, top_k=10)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self._vector_queries()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
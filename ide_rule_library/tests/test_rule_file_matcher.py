@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Rule File Matcher Tests
+
+Tests RuleFileMatcher against the per-pattern loops it replaced.
+Verifies priority globs, directory prefixes and exact paths keep the
+scanner's case-sensitive semantics, that globs follow fnmatch's
+case-insensitive matching where the platform normcases paths, that production signals keep the
+scorer's case-insensitive substring/path-component semantics (including
+overlapping and duplicated signal patterns), and that the benchmark's
+parity check passes on a generated monorepo tree.
+"""
+
+import ntpath
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import yaml
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from quality_scorer import RepoQualityScorer
+from rule_file_matcher import RuleFileMatcher
+from benchmark_rule_matcher import legacy_rule_files, legacy_signals, run_benchmark, synthetic_tree
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config.yaml'
+
+TREE = [
+    '.cursorrules',
+    'sub/.cursorrules',                      # exact pattern: root only
+    '.CURSORRULES',                          # priority matching is case-sensitive
+    '.cursor/rules/backend.mdc',
+    '.cursor/rules/nested/frontend.mdc',     # fnmatch '*' crosses '/'
+    '.cursor/rules/notes.md',
+    '.ai/prompt.txt',
+    '.sourcegraph/a/b/check.rule.md',
+    '.github/copilot-instructions.md',
+    '.github/dependabot.yml',                # overlaps the 'dependabot.yml' signal
+    'src/tests/test_main.py',                # 'tests/' as a path component
+    'contests/readme.txt',                   # ...but not as a suffix of a name
+    'deploy/DockerFile',                     # signals are case-insensitive
+    'deploy/docker-compose.yaml',            # listed twice in PRODUCTION_SIGNALS
+    'lib/.ruff.toml',
+    'Makefile',
+]
+
+
+class TestRuleFileMatcher(unittest.TestCase):
+    """Test parity with the per-pattern implementations"""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(CONFIG_PATH, 'r') as f:
+            cls.config = yaml.safe_load(f)
+        cls.scorer = RepoQualityScorer()
+        cls.matcher = RuleFileMatcher.from_config(cls.config, RepoQualityScorer.PRODUCTION_SIGNALS)
+
+    def _sorted(self, rule_files):
+        return sorted(rule_files, key=lambda r: (r['priority'], r['path']))
+
+    def test_priority_matches(self):
+        """Globs, directory prefixes and exact paths match as before"""
+        result = self.matcher.match(TREE)
+
+        self.assertEqual(self._sorted(result['rule_files']), self._sorted(legacy_rule_files(self.config, TREE)))
+        paths = [r['path'] for r in result['rule_files']]
+        self.assertIn('.cursor/rules/nested/frontend.mdc', paths)
+        self.assertIn('.sourcegraph/a/b/check.rule.md', paths)
+        self.assertNotIn('sub/.cursorrules', paths)
+        self.assertNotIn('.CURSORRULES', paths)
+        self.assertEqual(result['rule_files'][0], {'path': '.cursorrules', 'priority': 1, 'type': 'file'})
+
+    def test_case_insensitive_platform(self):
+        """Where normcase folds case (Windows), globs match like fnmatch.fnmatch; exact paths do not"""
+        tree = TREE + ['.Cursor/Rules/API.MDC']
+        with patch('os.path.normcase', ntpath.normcase):
+            matcher = RuleFileMatcher.from_config(self.config, RepoQualityScorer.PRODUCTION_SIGNALS)
+            result = matcher.match(tree)
+            legacy = legacy_rule_files(self.config, tree)
+
+        self.assertEqual(self._sorted(result['rule_files']), self._sorted(legacy))
+        paths = [r['path'] for r in result['rule_files']]
+        self.assertIn('.Cursor/Rules/API.MDC', paths)
+        self.assertNotIn('.CURSORRULES', paths)
+
+    def test_production_signals(self):
+        """Signals and score equal the per-signal scan"""
+        score, signals = self.scorer.assess_production_maturity(TREE)
+
+        self.assertEqual(signals, legacy_signals(self.scorer, TREE))
+        self.assertEqual(signals['deployment'], ['Dockerfile', 'docker-compose.yaml', 'Makefile', 'docker-compose.yaml'])
+        self.assertIn('tests/', signals['testing'])
+        self.assertNotIn('test/', signals.get('testing', []))
+        self.assertEqual(signals['security'], ['dependabot.yml', '.github/dependabot.yml'])
+        total = sum(len(patterns) for patterns in RepoQualityScorer.PRODUCTION_SIGNALS.values())
+        hits = sum(len(patterns) for patterns in signals.values())
+        self.assertAlmostEqual(score, hits * 100.0 / total)
+
+    def test_empty_tree(self):
+        """No paths, no matches"""
+        result = self.matcher.match([])
+
+        self.assertEqual(result, {'rule_files': [], 'signals': {}, 'signal_hits': 0})
+        self.assertEqual(self.scorer.assess_production_maturity([]), (0.0, {}))
+
+    def test_generated_monorepo_parity(self):
+        """The benchmark's parity check passes on a generated tree"""
+        result = run_benchmark(synthetic_tree(5000) + TREE, self.config, repeat=1)
+
+        self.assertEqual(result['paths'], 5000 + len(TREE))
+        self.assertGreater(result['rule_files'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
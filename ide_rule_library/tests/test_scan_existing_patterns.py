@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Existing Pattern Scanner Tests
+
+Tests ExistingPatternScanner's queued rule writes against a real
+ProgressTracker and a mocked extractor and Neo4jRuleWriter.
+Verifies that a repository is journaled as processed only once its
+extracted rules are stored, so a crash or failed bulk write leaves it to
+be rescanned on resume rather than losing its rules, and that a repository
+shared by several patterns is scanned once with its rules linked to all.
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from collections import defaultdict
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from progress_tracker import ProgressTracker
+
+try:
+    from scan_existing_patterns import ExistingPatternScanner
+except ImportError as e:
+    raise unittest.SkipTest(f"Scanner dependencies not available: {e}")
+
+FOUND = [{'path': '.cursorrules', 'priority': 1}, {'path': 'AGENTS.md', 'priority': 2}]
+
+
+def make_pattern(n):
+    return {'pattern_name': f'pattern{n}', 'repo_url': f'https://github.com/o/repo{n}', 'stars': 100}
+
+
+class TestQueuedRuleJournal(unittest.TestCase):
+    """Test repos are journaled after their queued rules are written"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.checkpoint = str(Path(self.tmp_dir) / 'progress.json')
+
+        self.scanner = ExistingPatternScanner.__new__(ExistingPatternScanner)
+        self.scanner.progress_tracker = ProgressTracker(self.checkpoint)
+        self.scanner.logger = Mock()
+        self.scanner.config = {'github': {}}
+        self.scanner.rate_limiter = Mock(**{'get_remaining_calls.return_value': 5000})
+        self.scanner.extractor = Mock()
+        self.scanner.extractor.extract_rule_file.side_effect = lambda repo_url, path, stars: {
+            'success': True, 'data': {'id': f'{repo_url}:{path}'}
+        }
+        self.scanner.writer = Mock(batch_size=50)
+        self.scanner.writer.write_rules_bulk.side_effect = lambda rules: {
+            'created': len(list(rules)), 'skipped': 0, 'failed': 0, 'skipped_ids': [], 'failed_ids': []
+        }
+        self.scanner._pending_rules = []
+        self.scanner._pending_repos = {}
+        self.results = {
+            'total_scanned': 0, 'repos_with_rules': 0, 'total_rule_files': 0,
+            'by_format': defaultdict(int), 'by_priority': defaultdict(int),
+            'repos_with_errors': 0, 'repos_found': []
+        }
+
+    def record(self, n):
+        self.scanner._record_result(n, 3, make_pattern(n), {'found': FOUND}, self.results, dry_run=False)
+
+    def test_crash_before_flush_rescans_repos(self):
+        """Repos whose rules were only queued are not processed after a crash"""
+        self.record(0)
+        self.record(1)
+
+        self.assertEqual(len(self.scanner._pending_rules), 4)
+        resumed = ProgressTracker(self.checkpoint)
+        self.assertFalse(resumed.is_processed(make_pattern(0)['repo_url']))
+
+        self.scanner._flush_rules()
+
+        resumed = ProgressTracker(self.checkpoint)
+        self.assertTrue(resumed.is_processed(make_pattern(1)['repo_url']))
+        self.assertTrue(resumed.is_processed(make_pattern(1)['repo_url'], 'AGENTS.md'))
+        self.assertEqual(resumed.get_result(make_pattern(0)['repo_url']), FOUND)
+
+    def test_failed_bulk_write_keeps_rules_queued(self):
+        """An exception from write_rules_bulk leaves rules and repos pending for the next flush"""
+        self.record(0)
+        write = self.scanner.writer.write_rules_bulk.side_effect
+        self.scanner.writer.write_rules_bulk.side_effect = Exception("ServiceUnavailable")
+
+        with self.assertRaises(Exception):
+            self.scanner._flush_rules()
+
+        self.assertEqual(len(self.scanner._pending_rules), 2)
+        self.assertFalse(self.scanner.progress_tracker.is_processed(make_pattern(0)['repo_url']))
+
+        self.scanner.writer.write_rules_bulk.side_effect = write
+        self.scanner._flush_rules()
+
+        self.assertTrue(self.scanner.progress_tracker.is_processed(make_pattern(0)['repo_url']))
+        self.assertEqual(self.scanner._pending_rules, [])
+
+    def test_shared_repo_links_every_pattern(self):
+        """Patterns sharing a repository trigger one scan; its rules carry every pattern name"""
+        written = []
+        self.scanner.writer.write_rules_bulk.side_effect = lambda rules: written.extend(rules) or {
+            'created': len(written), 'skipped': 0, 'failed': 0, 'skipped_ids': [], 'failed_ids': []
+        }
+        self.scanner.get_all_patterns = Mock(return_value=[
+            make_pattern(0), {**make_pattern(0), 'pattern_name': 'other'}, make_pattern(1)
+        ])
+        self.scanner.check_repo_for_rules = Mock(return_value={'found': FOUND[:1]})
+
+        self.scanner.scan_all_patterns(dry_run=False, workers=1)
+
+        self.assertEqual(self.scanner.check_repo_for_rules.call_count, 2)
+        self.assertEqual([rule['pattern_names'] for rule in written], [['pattern0', 'other'], ['pattern1']])
+
+    def test_failed_flush_keeps_original_error(self):
+        """A bulk write failing during an interrupted scan does not replace the interrupt"""
+        self.scanner.get_all_patterns = Mock(return_value=[make_pattern(0), make_pattern(1)])
+        self.scanner.check_repo_for_rules = Mock(side_effect=[{'found': FOUND}, KeyboardInterrupt()])
+        self.scanner.writer.write_rules_bulk.side_effect = Exception("ServiceUnavailable")
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.scanner.scan_all_patterns(dry_run=False, workers=1)
+
+        self.assertEqual(len(self.scanner._pending_rules), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -38,6 +38,8 @@ class GeminiConfig(BaseModel):
     api_key_env: str = "GEMINI_API_KEY"
     model_name: str = "gemini-2.5-flash"
     max_retries: int = Field(default=3, ge=1, le=10)
+    response_cache_path: Optional[str] = Field(default="cache/llm_responses.sqlite", description="Persistent prompt/response cache (None = disabled)")
+    response_cache_max_mb: float = Field(default=256, gt=0, le=10240, description="Cached response size kept before LRU eviction")
     
 
 
@@ -47,6 +49,9 @@ class Neo4jConfig(BaseModel):
     uri: str = "bolt://localhost:7688"  # Default to spec-engine-neo4j
     user: str = "neo4j"
     password_env: str = "NEO4J_PASSWORD"
+    write_behind: bool = Field(default=True, description="Buffer writes and flush as UNWIND batches")
+    batch_size: int = Field(default=200, ge=1, le=10000, description="Buffered rows per flush / UNWIND batch")
+    flush_interval: float = Field(default=5.0, ge=0, le=300, description="Seconds between background flushes (0 = size/close only)")
     
     @field_validator('uri')
     @classmethod
@@ -71,6 +76,9 @@ class GitHubConfig(BaseModel):
     token_env: str = "GITHUB_TOKEN"
     max_repos_per_query: int = Field(default=100, ge=1, le=1000)
     rate_limit_pause: int = Field(default=60, ge=0, le=3600, description="Seconds to wait on rate limit")
+    async_fetch: bool = Field(default=True, description="Fetch README/tree/dependencies/rule files concurrently")
+    max_connections: int = Field(default=10, ge=1, le=64, description="Pooled HTTP connections for the concurrent fetcher")
+    snapshot_cache_dir: Optional[str] = Field(default="cache/snapshots", description="On-disk RepoSnapshot cache (None = disabled)")
 
 
 class PatternExtractionConfig(BaseModel):
@@ -80,6 +88,7 @@ class PatternExtractionConfig(BaseModel):
     pattern_critic_enabled: bool = True
     quality_judge_enabled: bool = True
     trajectory_logging_enabled: bool = True
+    max_workers: int = Field(default=1, ge=1, le=32, description="Repositories extracted in parallel (1 = sequential)")
 
 
 class PipelineConfig(BaseModel):
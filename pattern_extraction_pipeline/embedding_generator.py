@@ -1,11 +1,14 @@
 """
 Embedding Generator for Pattern Knowledge Graph
 
-Generates semantic embeddings for patterns using Gemini text-embedding-004.
+Generates semantic embeddings for patterns using Gemini text-embedding-004
+or a local backend (see ide_rule_library/embedding_backends.py).
 Handles batching, caching, rate limiting, and error recovery.
+Cached embeddings live in a memory-mapped EmbeddingStore.
 """
 
 import os
+import sys
 import json
 import time
 from typing import List, Dict, Optional, Tuple
@@ -16,51 +19,114 @@ from dotenv import load_dotenv
 from functools import lru_cache
 import hashlib
 
+try:
+    from pattern_extraction_pipeline.embedding_store import EmbeddingStore, migrate_json_cache
+    from pattern_extraction_pipeline.rate_limiter import TokenRateLimiter
+except ImportError:
+    from embedding_store import EmbeddingStore, migrate_json_cache
+    from rate_limiter import TokenRateLimiter
+
+try:
+    from ide_rule_library.embedding_backends import EmbeddingBackend, GeminiEmbeddingBackend, get_embedding_backend
+except ImportError:
+    # Run as a script from pattern_extraction_pipeline/: make the repo root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from ide_rule_library.embedding_backends import EmbeddingBackend, GeminiEmbeddingBackend, get_embedding_backend
+
 load_dotenv()
 
 
 class EmbeddingGenerator:
     """
-    Wrapper for Gemini embedding API with caching and rate limiting.
+    Wrapper for an embedding backend with caching and rate limiting.
+    
+    The class constants describe the default Gemini backend; an instance's
+    MODEL_NAME / MODEL_VERSION / EMBEDDING_DIMENSIONS / BATCH_SIZE are those
+    of the backend it was built with.
     """
     
-    # Model configuration
+    # Model configuration (Gemini backend)
     MODEL_NAME = "models/text-embedding-004"
     EMBEDDING_DIMENSIONS = 768
     MODEL_VERSION = "2026-01"
     
-    # Rate limiting (free tier: 1500 requests/day ≈ 60/hour ≈ 1/minute for safety)
+    # Rate limiting: sliding one-minute window over requests and (estimated) tokens.
+    # A batch request counts once against REQUESTS_PER_MINUTE and carries up to
+    # BATCH_SIZE texts, so throughput is bounded by tokens rather than calls.
     REQUESTS_PER_MINUTE = 60
-    MIN_DELAY_SECONDS = 60 / REQUESTS_PER_MINUTE
+    TOKENS_PER_MINUTE = 30000
+    BATCH_SIZE = 100  # batchEmbedContents maximum
+    CHARS_PER_TOKEN = 4
     
     # Retry configuration
     MAX_RETRIES = 3
     RETRY_DELAY_BASE = 2  # Exponential backoff: 2s, 4s, 8s
     
-    def __init__(self, cache_dir: Optional[str] = None):
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        backend: Optional[EmbeddingBackend] = None
+    ):
         """
         Initialize embedding generator.
         
         Args:
-            cache_dir: Directory for caching embeddings (default: ./embedding_cache)
+            cache_dir: Directory for the embedding store (default: ./embedding_cache).
+                Legacy <sha256>.json files found there are imported on first use.
+                Non-Gemini backends keep their store in a subdirectory named
+                after the backend, so vectors of different models never mix.
+            requests_per_minute: Request quota (default: REQUESTS_PER_MINUTE)
+            tokens_per_minute: Token quota (default: TOKENS_PER_MINUTE)
+            backend: Embedding backend (default: EMBEDDING_BACKEND environment
+                variable, else Gemini)
         """
-        # Configure Gemini API
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY not found in environment")
+        if backend is None and (os.getenv("EMBEDDING_BACKEND") or "gemini").lower() == GeminiEmbeddingBackend.name:
+            backend = GeminiEmbeddingBackend(
+                model_name=self.MODEL_NAME,
+                dimensions=self.EMBEDDING_DIMENSIONS,
+                model_version=self.MODEL_VERSION,
+                batch_size=self.BATCH_SIZE
+            )
+        self.backend = backend or get_embedding_backend()
+        self.MODEL_NAME = self.backend.model_name
+        self.MODEL_VERSION = self.backend.model_version
+        self.EMBEDDING_DIMENSIONS = self.backend.dimensions
+        self.BATCH_SIZE = self.backend.batch_size
         
-        genai.configure(api_key=api_key)
+        # Configure Gemini API
+        if self.backend.remote:
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise ValueError("GEMINI_API_KEY not found in environment")
+            
+            genai.configure(api_key=api_key)
         
-        # Setup cache
+        # Setup cache (Gemini vectors keep the original layout)
         self.cache_dir = Path(cache_dir) if cache_dir else Path("./embedding_cache")
-        self.cache_dir.mkdir(exist_ok=True)
+        store_dir = self.cache_dir
+        if self.backend.name != GeminiEmbeddingBackend.name:
+            store_dir = self.cache_dir / self.backend.name / self.backend.model_version
+        self.store = EmbeddingStore(str(store_dir), dimensions=self.EMBEDDING_DIMENSIONS)
+        
+        # One-off import of the old one-file-per-embedding cache
+        if store_dir == self.cache_dir and len(self.store) == 0 and any(self.cache_dir.glob("*.json")):
+            counts = migrate_json_cache(str(self.cache_dir), self.store)
+            print(f"Migrated {counts['imported']} cached embeddings into {self.cache_dir}")
         
         # Track rate limiting
-        self.last_request_time = 0
+        self.rate_limiter = TokenRateLimiter(
+            max_calls=requests_per_minute or self.REQUESTS_PER_MINUTE,
+            max_tokens=tokens_per_minute or self.TOKENS_PER_MINUTE,
+            period=60,
+            name="gemini_embeddings"
+        )
         self.request_count = 0
         
         print(f"EmbeddingGenerator initialized:")
-        print(f"  Model: {self.MODEL_NAME}")
+        print(f"  Backend: {self.backend.name}")
+        print(f"  Model: {self.MODEL_NAME} ({self.MODEL_VERSION})")
         print(f"  Dimensions: {self.EMBEDDING_DIMENSIONS}")
         print(f"  Cache: {self.cache_dir}")
     
@@ -68,53 +134,25 @@ class EmbeddingGenerator:
         """Generate cache key from text hash."""
         return hashlib.sha256(text.encode()).hexdigest()
     
-    def _get_cache_path(self, cache_key: str) -> Path:
-        """Get cache file path for key."""
-        return self.cache_dir / f"{cache_key}.json"
-    
     def _load_from_cache(self, text: str) -> Optional[List[float]]:
         """Load embedding from cache if exists."""
-        cache_key = self._get_cache_key(text)
-        cache_path = self._get_cache_path(cache_key)
-        
-        if cache_path.exists():
-            try:
-                with open(cache_path, 'r') as f:
-                    data = json.load(f)
-                    return data['embedding']
-            except Exception as e:
-                print(f"Warning: Cache read failed: {e}")
-                return None
-        
-        return None
+        cached = self.store.get(self._get_cache_key(text))
+        return cached.tolist() if cached is not None else None
     
     def _save_to_cache(self, text: str, embedding: List[float]):
         """Save embedding to cache."""
-        cache_key = self._get_cache_key(text)
-        cache_path = self._get_cache_path(cache_key)
-        
         try:
-            with open(cache_path, 'w') as f:
-                json.dump({
-                    'text': text[:200],  # Store truncated text for reference
-                    'embedding': embedding,
-                    'model': self.MODEL_NAME,
-                    'dimensions': len(embedding),
-                    'timestamp': datetime.now().isoformat()
-                }, f)
+            self.store.put(self._get_cache_key(text), embedding, model=self.backend.model_id, text=text)
         except Exception as e:
             print(f"Warning: Cache write failed: {e}")
     
-    def _rate_limit(self):
-        """Enforce rate limiting between requests."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.MIN_DELAY_SECONDS:
-            sleep_time = self.MIN_DELAY_SECONDS - time_since_last
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+    def _estimate_tokens(self, texts: List[str]) -> int:
+        """Rough token count for quota accounting (~4 characters per token)."""
+        return sum(len(text) // self.CHARS_PER_TOKEN + 1 for text in texts)
+    
+    def _rate_limit(self, tokens: int = 1):
+        """Wait until a request carrying `tokens` fits the request and token budgets."""
+        self.rate_limiter.wait_if_needed(tokens)
         self.request_count += 1
     
     def generate_embedding(self, text: str, use_cache: bool = True) -> Tuple[List[float], Dict]:
@@ -137,6 +175,7 @@ class EmbeddingGenerator:
             cached = self._load_from_cache(text)
             if cached is not None:
                 return cached, {
+                    'backend': self.backend.name,
                     'model': self.MODEL_NAME,
                     'model_version': self.MODEL_VERSION,
                     'dimensions': len(cached),
@@ -155,6 +194,7 @@ class EmbeddingGenerator:
         duration_ms = int((time.time() - start_time) * 1000)
         
         return embedding, {
+            'backend': self.backend.name,
             'model': self.MODEL_NAME,
             'model_version': self.MODEL_VERSION,
             'dimensions': len(embedding),
@@ -176,19 +216,35 @@ class EmbeddingGenerator:
         Raises:
             Exception if all retries exhausted
         """
+        return self._embed_with_retry([text])[0]
+    
+    def _embed_with_retry(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed up to BATCH_SIZE texts in one backend call, with exponential backoff retry.
+        
+        Local backends run in-process: no quota accounting and no retries.
+        
+        Args:
+            texts: Texts to embed
+        
+        Returns:
+            Embedding vectors, in input order
+        
+        Raises:
+            Exception if all retries exhausted
+        """
+        if not self.backend.remote:
+            return self.backend.embed(texts, task_type="retrieval_document")
+        
+        tokens = self._estimate_tokens(texts)
+        
         for attempt in range(self.MAX_RETRIES):
             try:
                 # Rate limit before request
-                self._rate_limit()
-                
-                # Call Gemini API
-                result = genai.embed_content(
-                    model=self.MODEL_NAME,
-                    content=text,
-                    task_type="retrieval_document"
-                )
+                self._rate_limit(tokens)
                 
-                return result['embedding']
+                # One API request (a list is sent as one batchEmbedContents request)
+                return self.backend.embed(texts, task_type="retrieval_document")
             
             except Exception as e:
                 error_msg = str(e)
@@ -221,38 +277,87 @@ class EmbeddingGenerator:
         """
         Generate embeddings for multiple texts.
         
+        The cache is checked once for the whole list; the misses (deduplicated)
+        are then sent in batch requests of up to BATCH_SIZE texts, throttled by
+        the request and token budgets.
+        
         Args:
             texts: List of texts to embed
             use_cache: Whether to use cached embeddings
             show_progress: Whether to print progress
         
         Returns:
-            List of (embedding, metadata) tuples
+            List of (embedding, metadata) tuples, in input order
+            (embedding is None and metadata has 'error' for failed texts)
         """
-        results = []
+        results = [None] * len(texts)
         total = len(texts)
-        cache_hits = 0
         
-        for i, text in enumerate(texts, 1):
-            if show_progress and i % 10 == 0:
-                print(f"Progress: {i}/{total} embeddings generated ({cache_hits} cache hits)")
+        # One cache lookup for the whole batch
+        keys = [self._get_cache_key(text) for text in texts]
+        cached = self.store.get_many(keys) if use_cache else {}
+        
+        pending = {}  # cache key -> indices of texts still to embed
+        for i, key in enumerate(keys):
+            if key in cached:
+                results[i] = (cached[key].tolist(), self._metadata(True, 0))
+            else:
+                pending.setdefault(key, []).append(i)
+        cache_hits = total - sum(len(indices) for indices in pending.values())
+        
+        # Embed the misses in API-sized batches
+        miss_keys = list(pending)
+        embedded = 0
+        for start in range(0, len(miss_keys), self.BATCH_SIZE):
+            batch_keys = miss_keys[start:start + self.BATCH_SIZE]
+            batch_texts = [texts[pending[key][0]] for key in batch_keys]
+            start_time = time.time()
             
             try:
-                embedding, metadata = self.generate_embedding(text, use_cache)
-                results.append((embedding, metadata))
-                
-                if metadata['cache_hit']:
-                    cache_hits += 1
-            
+                embeddings = self._embed_with_retry(batch_texts)
             except Exception as e:
-                print(f"Error processing text {i}: {e}")
-                results.append((None, {'error': str(e)}))
+                print(f"Error processing batch of {len(batch_texts)} texts: {e}")
+                for key in batch_keys:
+                    for i in pending[key]:
+                        results[i] = (None, {'error': str(e)})
+                continue
+            
+            if use_cache:
+                try:
+                    self.store.put_many(
+                        (key, embedding, self.backend.model_id, text)
+                        for key, embedding, text in zip(batch_keys, embeddings, batch_texts)
+                    )
+                except Exception as e:
+                    print(f"Warning: Cache write failed: {e}")
+            
+            duration_ms = int((time.time() - start_time) * 1000)
+            for key, embedding in zip(batch_keys, embeddings):
+                for i in pending[key]:
+                    results[i] = (embedding, self._metadata(False, duration_ms))
+            
+            embedded += len(batch_keys)
+            if show_progress:
+                print(f"Progress: {embedded}/{len(miss_keys)} new embeddings generated ({cache_hits} cache hits)")
         
         if show_progress:
-            print(f"Batch complete: {total} texts, {cache_hits} cache hits, {total - cache_hits} API calls")
+            calls = -(-len(miss_keys) // self.BATCH_SIZE)
+            print(f"Batch complete: {total} texts, {cache_hits} cache hits, {calls} {self.backend.name} calls")
         
         return results
     
+    def _metadata(self, cache_hit: bool, duration_ms: int) -> Dict:
+        """Embedding metadata in the shape generate_embedding returns."""
+        return {
+            'backend': self.backend.name,
+            'model': self.MODEL_NAME,
+            'model_version': self.MODEL_VERSION,
+            'dimensions': self.EMBEDDING_DIMENSIONS,
+            'cache_hit': cache_hit,
+            'duration_ms': duration_ms,
+            'timestamp': datetime.now().isoformat()
+        }
+    
     def prepare_pattern_text(self, pattern: Dict) -> str:
         """
         Prepare pattern data for embedding.
@@ -298,12 +403,12 @@ class EmbeddingGenerator:
     
     def get_stats(self) -> Dict:
         """Get statistics about embedding generation."""
-        cache_files = list(self.cache_dir.glob("*.json"))
-        
         return {
             'total_requests': self.request_count,
-            'cached_embeddings': len(cache_files),
-            'cache_directory': str(self.cache_dir),
+            'rate_limiter': self.rate_limiter.get_stats(),
+            'cached_embeddings': len(self.store),
+            'cache_directory': str(self.store.store_dir),
+            'backend': self.backend.name,
             'model': self.MODEL_NAME,
             'model_version': self.MODEL_VERSION,
             'dimensions': self.EMBEDDING_DIMENSIONS
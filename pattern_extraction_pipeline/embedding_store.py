@@ -0,0 +1,344 @@
+"""
+Embedding Store
+
+Single-file vector store for cached embeddings. Vectors are appended as
+float32 rows to one flat file that is memory-mapped for reads, and a small
+SQLite index maps each text hash to its row. This replaces one JSON file per
+embedding: lookups no longer parse 768 floats from text, stats no longer
+glob a directory, and the whole store can be handed to NumPy without copying.
+
+Layout:
+    <store_dir>/vectors.f32     float32 rows, EMBEDDING_DIMENSIONS wide
+    <store_dir>/index.sqlite    key -> row, plus model/text preview
+
+Migrate an existing JSON cache with:
+    python embedding_store.py migrate --from ./embedding_cache --to ./embedding_cache
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.sqlite"
+DTYPE = np.float32
+
+
+class EmbeddingStore:
+    """
+    Memory-mapped float32 embedding store with a hash -> row index.
+
+    Thread-safe: writes and remaps are guarded by a lock. Rows returned by
+    get() and load_matrix() are read-only views into the mapped file.
+
+    Example:
+        >>> store = EmbeddingStore("./embedding_cache", dimensions=768)
+        >>> store.put(key, embedding, model="models/text-embedding-004")
+        >>> store.get(key)            # np.ndarray view, no parsing
+        >>> keys, matrix = store.load_matrix()
+    """
+
+    def __init__(self, store_dir: str, dimensions: int = 768):
+        """
+        Open (or create) a store.
+
+        Args:
+            store_dir: Directory holding vectors.f32 and index.sqlite
+            dimensions: Vector width; must match an existing store
+
+        Raises:
+            ValueError: If the existing store has different dimensions
+        """
+        self.store_dir = Path(store_dir)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.dimensions = dimensions
+        self.row_bytes = dimensions * np.dtype(DTYPE).itemsize
+        self.vectors_path = self.store_dir / VECTORS_FILE
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.store_dir / INDEX_FILE), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                row INTEGER NOT NULL UNIQUE,
+                model TEXT,
+                text TEXT,
+                created_at TEXT NOT NULL
+            )
+        """)
+        self._check_dimensions()
+        self._conn.commit()
+
+        self._index = dict(self._conn.execute("SELECT key, row FROM embeddings"))
+        self._rows = self._recover_rows()
+        self._mmap = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def keys(self) -> List[str]:
+        """All stored keys, in row order."""
+        with self._lock:
+            return sorted(self._index, key=self._index.get)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Read one vector.
+
+        Returns:
+            Read-only float32 view of the row, or None if not stored
+        """
+        with self._lock:
+            row = self._index.get(key)
+            if row is None:
+                return None
+            return self._mapped()[row]
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Read several vectors with one lock acquisition.
+
+        Returns:
+            Dict of key -> read-only row view for the keys that are stored
+        """
+        with self._lock:
+            vectors = self._mapped()
+            return {key: vectors[self._index[key]] for key in keys if key in self._index}
+
+    def load_matrix(self, keys: Optional[Sequence[str]] = None) -> Tuple[List[str], np.ndarray]:
+        """
+        Load vectors as one (n, dimensions) matrix.
+
+        Without keys the whole store is returned as a zero-copy view of the
+        mapped file; with keys, the stored subset is gathered into a new array.
+
+        Args:
+            keys: Keys to load (default: all)
+
+        Returns:
+            (keys, matrix) with matrix[i] belonging to keys[i]
+        """
+        with self._lock:
+            vectors = self._mapped()
+            if keys is None:
+                by_row = sorted(self._index.items(), key=lambda item: item[1])
+                if len(by_row) == self._rows:
+                    return [key for key, _ in by_row], vectors
+                rows = [row for _, row in by_row]
+                return [key for key, _ in by_row], vectors[rows]
+
+            found = [key for key in keys if key in self._index]
+            return found, vectors[[self._index[key] for key in found]]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(self, key: str, vector, model: Optional[str] = None, text: Optional[str] = None):
+        """Store one vector (overwriting the row if the key exists)."""
+        self.put_many([(key, vector, model, text)])
+
+    def put_many(self, items: Iterable[Tuple[str, object, Optional[str], Optional[str]]]) -> int:
+        """
+        Bulk write: new rows are appended in one write, the index in one transaction.
+
+        Args:
+            items: (key, vector, model, text) tuples
+
+        Returns:
+            Number of vectors written
+
+        Raises:
+            ValueError: If a vector has the wrong number of dimensions
+        """
+        items = list(items)
+        if not items:
+            return 0
+
+        matrix = np.asarray([vector for _, vector, _, _ in items], dtype=DTYPE)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions}-dimensional vectors, got shape {matrix.shape}")
+
+        now = datetime.now().isoformat()
+        with self._lock:
+            appended = []
+            overwrites = []
+            batch_rows = {}
+            index_rows = []
+            for (key, _, model, text), vector in zip(items, matrix):
+                row = self._index.get(key, batch_rows.get(key))
+                if row is None:
+                    row = self._rows + len(appended)
+                    appended.append(vector)
+                    batch_rows[key] = row
+                elif row >= self._rows:
+                    appended[row - self._rows] = vector  # Repeated key within this batch
+                else:
+                    overwrites.append((row, vector))
+                index_rows.append((key, row, model, text[:200] if text else None, now))
+
+            with open(self.vectors_path, 'r+b' if self.vectors_path.exists() else 'w+b') as f:
+                for row, vector in overwrites:
+                    f.seek(row * self.row_bytes)
+                    f.write(vector.tobytes())
+                if appended:
+                    f.seek(self._rows * self.row_bytes)
+                    f.write(np.stack(appended).tobytes())
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, row, model, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                index_rows
+            )
+            self._conn.commit()
+
+            self._index.update(batch_rows)
+            self._rows += len(appended)
+            return len(items)
+
+    def close(self):
+        """Release the memory map and index connection."""
+        with self._lock:
+            self._mmap = None
+            self._conn.close()
+
+    def get_stats(self) -> Dict:
+        """Entry count and on-disk size."""
+        with self._lock:
+            return {
+                'entries': len(self._index),
+                'rows': self._rows,
+                'dimensions': self.dimensions,
+                'vectors_bytes': self._rows * self.row_bytes,
+                'store_directory': str(self.store_dir)
+            }
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _mapped(self) -> np.ndarray:
+        """Read-only map of all complete rows, remapped after appends (caller holds the lock)."""
+        if self._rows == 0:
+            return np.empty((0, self.dimensions), dtype=DTYPE)
+        if self._mmap is None or self._mmap.shape[0] != self._rows:
+            self._mmap = np.memmap(self.vectors_path, dtype=DTYPE, mode='r', shape=(self._rows, self.dimensions))
+        return self._mmap
+
+    def _check_dimensions(self):
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'dimensions'").fetchone()
+        if row is None:
+            self._conn.execute("INSERT INTO meta (name, value) VALUES ('dimensions', ?)", (str(self.dimensions),))
+        elif int(row[0]) != self.dimensions:
+            raise ValueError(f"Store at {self.store_dir} holds {row[0]}-dimensional vectors, not {self.dimensions}")
+
+    def _recover_rows(self) -> int:
+        """Row count from the vectors file, dropping a partial row left by an interrupted write."""
+        if not self.vectors_path.exists():
+            return 0
+        size = self.vectors_path.stat().st_size
+        rows = size // self.row_bytes
+        if size % self.row_bytes:
+            with open(self.vectors_path, 'r+b') as f:
+                f.truncate(rows * self.row_bytes)
+        # Index entries pointing past the end lost their vector: forget them
+        lost = [key for key, row in self._index.items() if row >= rows]
+        if lost:
+            self._conn.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key in lost])
+            self._conn.commit()
+            for key in lost:
+                del self._index[key]
+        return rows
+
+
+def migrate_json_cache(json_dir: str, store: EmbeddingStore, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Import a legacy one-JSON-file-per-embedding cache into a store.
+
+    File stems are the sha256 text hashes EmbeddingGenerator uses as keys.
+    Keys already in the store are skipped, so the migration can be re-run.
+
+    Args:
+        json_dir: Directory of <sha256>.json cache files
+        store: Destination store
+        batch_size: Vectors per bulk write
+
+    Returns:
+        {'imported': n, 'skipped': n, 'invalid': n}
+    """
+    counts = {'imported': 0, 'skipped': 0, 'invalid': 0}
+    batch = []
+
+    for path in Path(json_dir).glob("*.json"):
+        key = path.stem
+        if key in store:
+            counts['skipped'] += 1
+            continue
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            embedding = data['embedding']
+        except (OSError, ValueError, KeyError, TypeError):
+            counts['invalid'] += 1
+            continue
+        if len(embedding) != store.dimensions:
+            counts['invalid'] += 1
+            continue
+
+        batch.append((key, embedding, data.get('model'), data.get('text')))
+        if len(batch) >= batch_size:
+            counts['imported'] += store.put_many(batch)
+            batch = []
+
+    if batch:
+        counts['imported'] += store.put_many(batch)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding store maintenance")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate = subparsers.add_parser('migrate', help="Import a legacy JSON embedding cache")
+    migrate.add_argument('--from', dest='source', default='./embedding_cache', help="Directory of <sha256>.json files")
+    migrate.add_argument('--to', dest='target', default='./embedding_cache', help="Store directory")
+    migrate.add_argument('--dimensions', type=int, default=768)
+
+    stats = subparsers.add_parser('stats', help="Show store statistics")
+    stats.add_argument('store_dir', nargs='?', default='./embedding_cache')
+    stats.add_argument('--dimensions', type=int, default=768)
+
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        store = EmbeddingStore(args.target, dimensions=args.dimensions)
+        counts = migrate_json_cache(args.source, store)
+        print(f"Migrated {args.source} -> {args.target}: "
+              f"{counts['imported']} imported, {counts['skipped']} already present, {counts['invalid']} invalid")
+        print(f"Store now holds {len(store)} embeddings")
+        store.close()
+    else:
+        store = EmbeddingStore(args.store_dir, dimensions=args.dimensions)
+        for key, value in store.get_stats().items():
+            print(f"  {key}: {value}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
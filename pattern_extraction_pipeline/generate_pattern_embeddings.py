@@ -1,37 +1,66 @@
 """
 Generate Pattern Embeddings for Knowledge Graph
 
-Batch processes all Pattern nodes in Neo4j, generates embeddings using Gemini,
+Batch processes all Pattern nodes in Neo4j, generates embeddings using the
+configured backend (Gemini or local, see ide_rule_library/embedding_backends.py),
 and stores them back in the graph with metadata.
+
+Patterns whose embedding_model / embedding_version differ from the active
+backend count as stale and are re-embedded, so switching backends (or
+refitting the local IDF) re-indexes the graph on the next run.
 """
 
 import os
 import sys
 from typing import List, Dict, Optional
 from datetime import datetime
+from pathlib import Path
 import argparse
 from dotenv import load_dotenv
 from neo4j import GraphDatabase
 from embedding_generator import EmbeddingGenerator
+try:
+    from ide_rule_library.embedding_backends import BACKENDS, HashedTfidfBackend, get_embedding_backend
+except ImportError:
+    # Run as a script from pattern_extraction_pipeline/: make the repo root importable
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from ide_rule_library.embedding_backends import BACKENDS, HashedTfidfBackend, get_embedding_backend
 
 load_dotenv()
 
+# Patterns needing a (new) embedding. Untagged embeddings predate the tags
+# and are taken to be the Gemini default model's.
+NEEDS_EMBEDDING = """(p.embedding IS NULL
+           OR coalesce(p.embedding_model, $legacy_model) <> $model
+           OR coalesce(p.embedding_version, $legacy_version) <> $version)"""
+
+PATTERN_COLUMNS = """p.name AS name,
+                   p.reasoning AS reasoning,
+                   p.description AS description,
+                   p.stars AS stars,
+                   p.confidence AS confidence,
+                   p.source_repo AS source_repo,
+                   elementId(p) AS element_id"""
+
+VECTOR_INDEX_NAME = "pattern_embeddings"
+
 
 class PatternEmbeddingPipeline:
     """
     Pipeline for generating and storing pattern embeddings in Neo4j.
     """
     
-    def __init__(self, batch_size: int = 50, force_regenerate: bool = False):
+    def __init__(self, batch_size: int = 100, force_regenerate: bool = False, backend=None):
         """
         Initialize the embedding pipeline.
         
         Args:
             batch_size: Number of patterns to process per batch
             force_regenerate: If True, regenerate embeddings even if they exist
+            backend: EmbeddingBackend (default: EMBEDDING_BACKEND environment variable, else Gemini)
         """
         # Initialize embedding generator
-        self.generator = EmbeddingGenerator()
+        self.generator = EmbeddingGenerator(backend=backend)
         
         # Connect to Neo4j
         neo4j_uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -50,20 +79,37 @@ class PatternEmbeddingPipeline:
         print(f"  Neo4j: {neo4j_uri}")
         print(f"  Batch size: {batch_size}")
         print(f"  Force regenerate: {force_regenerate}")
+        print(f"  Embedding model: {self.generator.backend.model_id}")
     
     def close(self):
         """Close database connection."""
         self.driver.close()
     
+    def _model_params(self) -> Dict[str, str]:
+        """Query parameters identifying the active embedding model."""
+        return {
+            'model': self.generator.MODEL_NAME,
+            'version': self.generator.MODEL_VERSION,
+            'legacy_model': EmbeddingGenerator.MODEL_NAME,
+            'legacy_version': EmbeddingGenerator.MODEL_VERSION
+        }
+    
     def get_pattern_count(self) -> Dict[str, int]:
-        """Get count of patterns with and without embeddings."""
+        """
+        Get count of patterns with and without embeddings.
+        
+        'stale' counts patterns embedded by a different model or version
+        than the active backend (included in with_embeddings).
+        """
         with self.driver.session() as session:
             result = session.run("""
                 MATCH (p:Pattern)
                 RETURN count(p) AS total,
                        count(p.embedding) AS with_embeddings,
-                       count(p) - count(p.embedding) AS without_embeddings
-            """)
+                       count(p) - count(p.embedding) AS without_embeddings,
+                       sum(CASE WHEN p.embedding IS NOT NULL AND """ + NEEDS_EMBEDDING + """
+                           THEN 1 ELSE 0 END) AS stale
+            """, **self._model_params())
             record = result.single()
             return dict(record)
     
@@ -72,7 +118,9 @@ class PatternEmbeddingPipeline:
         Fetch a batch of patterns from Neo4j.
         
         Args:
-            skip: Number of patterns to skip
+            skip: Number of patterns to skip. Without force_regenerate only
+                  patterns still needing an embedding are listed, so processed
+                  ones drop out and skip counts the failures ahead of the batch
             limit: Number of patterns to fetch
         
         Returns:
@@ -83,37 +131,67 @@ class PatternEmbeddingPipeline:
                 # Get all patterns regardless of embedding status
                 query = """
                     MATCH (p:Pattern)
-                    RETURN p.name AS name,
-                           p.reasoning AS reasoning,
-                           p.description AS description,
-                           p.stars AS stars,
-                           p.confidence AS confidence,
-                           p.source_repo AS source_repo,
-                           elementId(p) AS element_id
+                    RETURN """ + PATTERN_COLUMNS + """
                     ORDER BY p.name
                     SKIP $skip
                     LIMIT $limit
                 """
             else:
-                # Only get patterns without embeddings
+                # Only get patterns without a current embedding
                 query = """
                     MATCH (p:Pattern)
-                    WHERE p.embedding IS NULL
-                    RETURN p.name AS name,
-                           p.reasoning AS reasoning,
-                           p.description AS description,
-                           p.stars AS stars,
-                           p.confidence AS confidence,
-                           p.source_repo AS source_repo,
-                           elementId(p) AS element_id
+                    WHERE """ + NEEDS_EMBEDDING + """
+                    RETURN """ + PATTERN_COLUMNS + """
                     ORDER BY p.name
                     SKIP $skip
                     LIMIT $limit
                 """
             
-            result = session.run(query, skip=skip, limit=limit)
+            result = session.run(query, skip=skip, limit=limit, **self._model_params())
             return [dict(record) for record in result]
     
+    def get_all_pattern_texts(self) -> List[str]:
+        """Embedding text of every pattern (the corpus for fitting local IDF weights)."""
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (p:Pattern)
+                RETURN """ + PATTERN_COLUMNS)
+            return [self.generator.prepare_pattern_text(dict(record)) for record in result]
+    
+    def sync_vector_index(self) -> bool:
+        """
+        Recreate the pattern_embeddings vector index if its width no longer
+        matches the active backend (a Neo4j vector index has fixed dimensions).
+        
+        Returns:
+            True if the index was recreated
+        """
+        dimensions = self.generator.EMBEDDING_DIMENSIONS
+        with self.driver.session() as session:
+            record = session.run("""
+                SHOW INDEXES YIELD name, options
+                WHERE name = $name
+                RETURN options
+            """, name=VECTOR_INDEX_NAME).single()
+            if record is None:
+                return False  # No Neo4j vector index in use (e.g. local PatternVectorIndex only)
+            
+            current = (record['options'] or {}).get('indexConfig', {}).get('vector.dimensions')
+            if current == dimensions:
+                return False
+            
+            print(f"Recreating vector index {VECTOR_INDEX_NAME}: {current} -> {dimensions} dimensions")
+            session.run(f"DROP INDEX {VECTOR_INDEX_NAME} IF EXISTS")
+            session.run(f"""
+                CREATE VECTOR INDEX {VECTOR_INDEX_NAME} IF NOT EXISTS
+                FOR (p:Pattern) ON p.embedding
+                OPTIONS {{indexConfig: {{
+                    `vector.dimensions`: $dimensions,
+                    `vector.similarity_function`: 'cosine'
+                }}}}
+            """, dimensions=dimensions)
+            return True
+    
     def update_pattern_embedding(
         self,
         element_id: str,
@@ -144,6 +222,29 @@ class PatternEmbeddingPipeline:
                 date=metadata['timestamp']
             )
     
+    def update_pattern_embeddings(self, updates: List[Dict]) -> int:
+        """
+        Update many pattern nodes in one UNWIND write.
+        
+        Args:
+            updates: Dicts with element_id, embedding, model, version, date
+        
+        Returns:
+            Number of pattern nodes updated
+        """
+        with self.driver.session() as session:
+            record = session.run("""
+                UNWIND $updates AS update
+                MATCH (p:Pattern)
+                WHERE elementId(p) = update.element_id
+                SET p.embedding = update.embedding,
+                    p.embedding_model = update.model,
+                    p.embedding_version = update.version,
+                    p.embedding_date = datetime(update.date)
+                RETURN count(p) AS updated
+            """, updates=updates).single()
+            return record['updated'] if record else 0
+    
     def process_batch(self, patterns: List[Dict]) -> Dict[str, int]:
         """
         Process a batch of patterns: generate embeddings and update Neo4j.
@@ -165,30 +266,41 @@ class PatternEmbeddingPipeline:
             text = self.generator.prepare_pattern_text(pattern)
             texts.append(text)
         
-        # Generate embeddings (batch)
+        # Generate embeddings (one cache check, misses sent as batch requests)
         results = self.generator.generate_batch(texts, use_cache=True, show_progress=False)
         
-        # Update Neo4j with embeddings
+        # Collect successful embeddings for a single Neo4j write
+        updates = []
+        embedded = []
         for pattern, (embedding, metadata) in zip(patterns, results):
             if embedding is None:
                 print(f"  ✗ Failed: {pattern['name']} - {metadata.get('error', 'Unknown error')}")
                 stats['failed'] += 1
                 continue
             
-            try:
-                self.update_pattern_embedding(
-                    element_id=pattern['element_id'],
-                    embedding=embedding,
-                    metadata=metadata
-                )
-                
-                cache_indicator = "📦" if metadata.get('cache_hit') else "🔄"
-                print(f"  ✓ {cache_indicator} {pattern['name']} ({metadata['duration_ms']}ms)")
-                stats['success'] += 1
-            
-            except Exception as e:
-                print(f"  ✗ Failed to update Neo4j: {pattern['name']} - {e}")
-                stats['failed'] += 1
+            updates.append({
+                'element_id': pattern['element_id'],
+                'embedding': embedding,
+                'model': metadata['model'],
+                'version': metadata['model_version'],
+                'date': metadata['timestamp']
+            })
+            embedded.append((pattern, metadata))
+        
+        if not updates:
+            return stats
+        
+        try:
+            self.update_pattern_embeddings(updates)
+        except Exception as e:
+            print(f"  ✗ Failed to update Neo4j for {len(updates)} patterns - {e}")
+            stats['failed'] += len(updates)
+            return stats
+        
+        for pattern, metadata in embedded:
+            cache_indicator = "📦" if metadata.get('cache_hit') else "🔄"
+            print(f"  ✓ {cache_indicator} {pattern['name']} ({metadata['duration_ms']}ms)")
+        stats['success'] += len(updates)
         
         return stats
     
@@ -200,24 +312,29 @@ class PatternEmbeddingPipeline:
         print("PATTERN EMBEDDING GENERATION PIPELINE")
         print("="*70)
         
+        # A backend with a different width needs a matching vector index
+        self.sync_vector_index()
+        
         # Get initial counts
         counts = self.get_pattern_count()
         total_patterns = counts['total']
         with_embeddings = counts['with_embeddings']
         without_embeddings = counts['without_embeddings']
+        stale = counts['stale']
         
         print(f"\nInitial Status:")
         print(f"  Total patterns: {total_patterns}")
         print(f"  With embeddings: {with_embeddings}")
         print(f"  Without embeddings: {without_embeddings}")
+        print(f"  Embedded by another model/version: {stale}")
         
-        if without_embeddings == 0 and not self.force_regenerate:
+        if without_embeddings + stale == 0 and not self.force_regenerate:
             print("\n✓ All patterns already have embeddings!")
             print("  Use --force to regenerate all embeddings.")
             return
         
         # Determine how many to process
-        to_process = total_patterns if self.force_regenerate else without_embeddings
+        to_process = total_patterns if self.force_regenerate else without_embeddings + stale
         
         print(f"\nProcessing {to_process} patterns...")
         print(f"Batch size: {self.batch_size}")
@@ -231,8 +348,9 @@ class PatternEmbeddingPipeline:
             batch_num = (processed // self.batch_size) + 1
             print(f"Batch {batch_num}: Processing patterns {processed+1}-{min(processed+self.batch_size, to_process)}...")
             
-            # Fetch batch
-            patterns = self.get_patterns_batch(processed, self.batch_size)
+            # Fetch batch (re-embedded patterns leave the needs-embedding set)
+            skip = processed if self.force_regenerate else total_stats['failed']
+            patterns = self.get_patterns_batch(skip, self.batch_size)
             
             if not patterns:
                 break
@@ -272,11 +390,12 @@ class PatternEmbeddingPipeline:
         
         print("\n✓ Pipeline complete!")
         
-        if final_counts['without_embeddings'] == 0:
+        if final_counts['without_embeddings'] + final_counts['stale'] == 0:
             print("\n✓ All patterns now have embeddings!")
             print("  Next step: Run test_vector_search.py to validate")
         else:
-            print(f"\n⚠ Warning: {final_counts['without_embeddings']} patterns still missing embeddings")
+            missing = final_counts['without_embeddings'] + final_counts['stale']
+            print(f"\n⚠ Warning: {missing} patterns still missing current embeddings")
             print("  Review errors above and re-run if needed")
 
 
@@ -288,23 +407,48 @@ def main():
     parser.add_argument(
         '--batch-size',
         type=int,
-        default=50,
-        help='Number of patterns to process per batch (default: 50)'
+        default=100,
+        help='Number of patterns to process per batch (default: 100, one embedding request)'
     )
     parser.add_argument(
         '--force',
         action='store_true',
         help='Force regenerate embeddings even if they exist'
     )
+    parser.add_argument(
+        '--backend',
+        choices=sorted(BACKENDS),
+        help='Embedding backend (default: EMBEDDING_BACKEND environment variable, else gemini)'
+    )
+    parser.add_argument(
+        '--fit-idf',
+        metavar='PATH',
+        help='Local backend: fit IDF weights on all pattern texts, save them to PATH '
+             '(set LOCAL_EMBEDDING_IDF to it for queries) and re-embed'
+    )
     
     args = parser.parse_args()
     
     try:
+        backend = get_embedding_backend(args.backend)
+        if args.fit_idf:
+            if not isinstance(backend, HashedTfidfBackend):
+                parser.error("--fit-idf needs the local backend (--backend local)")
+            backend.idf_path = Path(args.fit_idf)
+        
         pipeline = PatternEmbeddingPipeline(
             batch_size=args.batch_size,
-            force_regenerate=args.force
+            force_regenerate=args.force,
+            backend=backend
         )
         
+        if args.fit_idf:
+            texts = pipeline.get_all_pattern_texts()
+            backend.fit(texts)
+            # The store and metadata follow the new model version
+            pipeline.generator = EmbeddingGenerator(backend=backend)
+            print(f"Fitted IDF on {len(texts)} patterns: {backend.model_id}")
+        
         pipeline.run()
         pipeline.close()
         
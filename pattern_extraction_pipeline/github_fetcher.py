@@ -0,0 +1,516 @@
+"""
+GitHub Fetch Layer
+
+Concurrent per-repository fetching for the extraction pipeline.
+Resolves README, structure, dependencies, contributors and IDE rule files
+into a single RepoSnapshot using one recursive tree listing plus a second
+round of concurrent content requests, instead of ~15 sequential PyGithub calls.
+Requests are blocking calls on a shared thread pool and HTTP session; there
+is no event loop.
+With a SnapshotCache attached, unchanged repositories are served from disk
+after a single conditional head-commit probe.
+"""
+
+import json
+import logging
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = "https://api.github.com"
+
+# Dependency manifests in order of preference (first match wins)
+DEPENDENCY_FILES = ["package.json", "requirements.txt"]
+
+DEFAULT_RULE_FILE_PATTERNS = [
+    ".cursorrules",
+    ".aiderules",
+    ".windsurfrules",
+    "CLAUDE.md",
+    "AI_INSTRUCTIONS.md",
+    "AI_GUIDELINES.md",
+    ".github/copilot-instructions.md"
+]
+
+README_MAX_CHARS = 5000
+MAX_CONTRIBUTORS = 50
+
+
+@dataclass
+class RepoSnapshot:
+    """
+    Everything the pipeline needs to know about one repository.
+
+    Built once per repo and shared by pattern extraction, quality metrics
+    and IDE rule extraction, so no stage re-fetches the same data.
+    """
+    full_name: str
+    html_url: str
+    default_branch: str = "main"
+    commit_sha: Optional[str] = None
+    tree_sha: Optional[str] = None
+
+    # Metadata carried over from the search result (no extra API calls)
+    stars: int = 0
+    forks: int = 0
+    watchers: int = 0
+    open_issues: int = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    description: str = ""
+    language: str = ""
+    has_license: bool = False
+
+    # Fetched content
+    readme: Optional[str] = None
+    files: List[str] = field(default_factory=list)
+    file_sizes: Dict[str, int] = field(default_factory=dict, repr=False)
+    directories: List[str] = field(default_factory=list)
+    tree_truncated: bool = False
+    dependencies: Dict[str, Any] = field(default_factory=dict)
+    rule_files: List[Dict[str, str]] = field(default_factory=list)
+    contributors: List[str] = field(default_factory=list)
+    contributor_count: int = 0
+
+    # Bookkeeping
+    includes_rule_files: bool = False
+    from_cache: bool = False
+    api_calls: int = 0
+    fetch_time_seconds: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def has_readme(self) -> bool:
+        return bool(self.readme)
+
+    @property
+    def root_directories(self) -> List[str]:
+        """Top-level directories, as returned by get_contents("") (complete even if the tree was truncated)."""
+        return [d for d in self.directories if '/' not in d]
+
+    @property
+    def root_files(self) -> List[str]:
+        """Top-level files, as returned by get_contents("")."""
+        return [f for f in self.files if '/' not in f]
+
+    def to_repo_data(self) -> Dict[str, Any]:
+        """
+        Build the repo_data dict consumed by enhance_repo_metadata
+        and EnhancedRuleExtractor.
+        """
+        return {
+            'name': self.full_name,
+            'stars': self.stars,
+            'forks': self.forks,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'open_issues': self.open_issues,
+            'html_url': self.html_url,
+            'contributors': self.contributors[:MAX_CONTRIBUTORS],
+            'files': list(self.files),
+            'readme_length': len(self.readme) if self.readme else 0
+        }
+
+
+class ThreadPoolGitHubFetcher:
+    """
+    Thread-pool fetch layer over a pooled HTTP session.
+
+    Round 1 (concurrent): recursive tree, README, first contributors page.
+    If GitHub truncated the tree, the top-level contents listing is fetched
+    so root files and directories are still complete.
+    Round 2 (concurrent): dependency manifests and IDE rule files that the
+    tree shows actually exist, plus the contributor total when paginated.
+
+    Each request is a blocking requests call submitted to one bounded,
+    long-lived thread pool, so the keep-alive connection pool is shared across
+    every probe and every repository. fetch_snapshot is safe to call from
+    several extraction workers at once.
+
+    Example:
+        >>> fetcher = ThreadPoolGitHubFetcher(token=os.getenv("GITHUB_TOKEN"))
+        >>> snapshot = fetcher.fetch_snapshot(repo)
+        >>> snapshot.readme, snapshot.root_directories, snapshot.rule_files
+    """
+
+    def __init__(self, token: Optional[str] = None, max_connections: int = 10,
+                 timeout: float = 30.0, rule_file_patterns: Optional[List[str]] = None,
+                 max_file_size: int = 100000, api_url: str = GITHUB_API_URL,
+                 cache=None, quota=None):
+        """
+        Initialize fetcher.
+
+        Args:
+            token: GitHub token (unauthenticated if None)
+            max_connections: Size of the HTTP connection pool / concurrent requests
+            timeout: Per-request timeout in seconds
+            rule_file_patterns: IDE rule file paths to look for
+            max_file_size: Skip rule files at or above this size (bytes)
+            api_url: GitHub API base URL
+            cache: Optional SnapshotCache for reuse within and across runs
+            quota: Optional GitHubQuotaTracker; requests are paced by it and
+                report their rate-limit headers back to it
+        """
+        self.api_url = api_url.rstrip('/')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.rule_file_patterns = list(rule_file_patterns or DEFAULT_RULE_FILE_PATTERNS)
+        self.max_file_size = max_file_size
+        self.cache = cache
+        self.quota = quota
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            'Accept': 'application/vnd.github+json',
+            'X-GitHub-Api-Version': '2022-11-28'
+        })
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="github_fetch")
+
+        logger.info(f"ThreadPoolGitHubFetcher initialized ({max_connections} pooled connections)")
+
+    def close(self):
+        """Release pooled connections and worker threads."""
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def fetch_snapshots(self, repos, include_rule_files: bool = True) -> List[RepoSnapshot]:
+        """Fetch snapshots for several repos concurrently."""
+        repos = list(repos)
+        if not repos:
+            return []
+        # Requests still go through the shared pool; these threads only wait on them
+        with ThreadPoolExecutor(max_workers=min(len(repos), self.max_connections),
+                                thread_name_prefix="github_snapshot") as pool:
+            return list(pool.map(lambda repo: self.fetch_snapshot(repo, include_rule_files), repos))
+
+    def fetch_snapshot(self, repo, include_rule_files: bool = True) -> RepoSnapshot:
+        """
+        Fetch everything the pipeline needs for one repository.
+
+        Individual probe failures are recorded in snapshot.errors rather than
+        raised, mirroring the graceful degradation of the per-call fetchers.
+
+        Args:
+            repo: PyGithub Repository object (metadata only is read from it)
+            include_rule_files: Also download IDE rule files found in the tree
+
+        Returns:
+            RepoSnapshot
+        """
+        start_time = time.time()
+        if self.cache is None:
+            return self._fetch_full(repo, include_rule_files, start_time)
+
+        current = self.cache.get_current(repo.full_name)
+        if current is not None and (current.includes_rule_files or not include_rule_files):
+            self.cache.record_hit()
+            return current
+
+        snapshot, commit_sha, validators = self._revalidate(repo, include_rule_files)
+        if snapshot is not None:
+            snapshot.fetch_time_seconds = time.time() - start_time
+            self.cache.record_revalidated()
+            self.cache.remember(snapshot)
+            return snapshot
+
+        self.cache.record_miss()
+        snapshot = self._fetch_full(repo, include_rule_files, start_time, commit_sha)
+        if commit_sha:
+            snapshot.api_calls += 1
+        self.cache.store(snapshot, validators.get('etag'), validators.get('last_modified'))
+        return snapshot
+
+    def _revalidate(self, repo, include_rule_files: bool):
+        """
+        Conditionally probe the head commit and reuse the stored snapshot.
+
+        Returns:
+            (snapshot or None, head commit SHA or None, validators dict)
+        """
+        entry = self.cache.get_validators(repo.full_name)
+        headers = {'Accept': 'application/vnd.github.sha'}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        branch = repo.default_branch or "main"
+        response = self._get(f"/repos/{repo.full_name}/commits/{quote(branch, safe='')}",
+                             headers=headers).result()
+        if response is None:
+            return None, None, {}
+
+        if response.status_code == 304 and entry:
+            commit_sha, validators = entry['sha'], entry
+        elif response.status_code == 200:
+            commit_sha = response.text.strip()
+            validators = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified')
+            }
+        else:
+            return None, None, {}
+
+        if not entry or entry.get('sha') != commit_sha:
+            return None, commit_sha, validators
+
+        snapshot = self.cache.load(repo.full_name, commit_sha, RepoSnapshot)
+        if snapshot is None or (include_rule_files and not snapshot.includes_rule_files):
+            return None, commit_sha, validators
+
+        # Search-result metadata may have moved even though the code did not
+        fresh = self._snapshot_from_repo(repo)
+        for name in ('html_url', 'default_branch', 'stars', 'forks', 'watchers', 'open_issues',
+                     'created_at', 'updated_at', 'description', 'language', 'has_license'):
+            setattr(snapshot, name, getattr(fresh, name))
+        snapshot.from_cache = True
+        snapshot.api_calls = 1
+        return snapshot, commit_sha, validators
+
+    def _fetch_full(self, repo, include_rule_files: bool, start_time: float,
+                          commit_sha: Optional[str] = None) -> RepoSnapshot:
+        """Fetch every probe for a repository (no cache involved)."""
+        snapshot = self._snapshot_from_repo(repo)
+        snapshot.commit_sha = commit_sha
+        snapshot.includes_rule_files = include_rule_files
+        repo_path = f"/repos/{snapshot.full_name}"
+
+        # Pin the tree to the probed commit so snapshot and cache key agree
+        tree_ref = commit_sha or snapshot.default_branch
+
+        # Round 1: tree, README and contributors in parallel
+        tree_resp, readme_resp, contrib_resp = self._gather([
+            self._get(f"{repo_path}/git/trees/{quote(tree_ref, safe='')}",
+                      params={'recursive': '1'}),
+            self._get(f"{repo_path}/readme", raw=True),
+            self._get(f"{repo_path}/contributors", params={'per_page': str(MAX_CONTRIBUTORS)})
+        ])
+        snapshot.api_calls += 3
+
+        self._apply_tree(snapshot, tree_resp)
+        if snapshot.tree_truncated:
+            # The recursive listing stops early on large repos; the root listing does not
+            root_resp = self._get(f"{repo_path}/contents", params={'ref': tree_ref}).result()
+            snapshot.api_calls += 1
+            self._apply_root_listing(snapshot, root_resp)
+        self._apply_readme(snapshot, readme_resp)
+        count_needed = self._apply_contributors(snapshot, contrib_resp)
+
+        # Round 2: only the files the tree says exist, plus contributor total
+        dependency_paths = self._existing_paths(snapshot, DEPENDENCY_FILES)
+        rule_paths = self._rule_file_candidates(snapshot) if include_rule_files else []
+
+        tasks = [self._get(f"{repo_path}/contents/{quote(path)}", raw=True,
+                           params={'ref': tree_ref})
+                 for path in dependency_paths + rule_paths]
+        if count_needed:
+            tasks.append(self._get(f"{repo_path}/contributors", params={'per_page': '1'}))
+
+        responses = self._gather(tasks)
+        snapshot.api_calls += len(tasks)
+
+        dependency_responses = responses[:len(dependency_paths)]
+        rule_responses = responses[len(dependency_paths):len(dependency_paths) + len(rule_paths)]
+
+        self._apply_dependencies(snapshot, dict(zip(dependency_paths, dependency_responses)))
+        self._apply_rule_files(snapshot, list(zip(rule_paths, rule_responses)))
+        if count_needed:
+            self._apply_contributor_count(snapshot, responses[-1])
+
+        snapshot.fetch_time_seconds = time.time() - start_time
+        logger.debug(f"Snapshot for {snapshot.full_name}: {snapshot.api_calls} calls "
+                     f"in {snapshot.fetch_time_seconds:.2f}s")
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _get(self, path: str, params: Optional[Dict] = None, raw: bool = False,
+             headers: Optional[Dict[str, str]] = None) -> Future:
+        """
+        Submit a GET to the shared pool.
+
+        Returns:
+            Future resolving to the response, or to None on transport errors
+        """
+        headers = dict(headers or {})
+        if raw:
+            headers['Accept'] = 'application/vnd.github.raw'
+        url = f"{self.api_url}{path}"
+
+        def request():
+            if self.quota:
+                self.quota.acquire()
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                logger.warning(f"GitHub request failed for {url}: {e}")
+                return None
+            if self.quota:
+                message = response.text[:200] if response.status_code in (403, 429) else ''
+                self.quota.observe(response.headers, response.status_code, message)
+            return response
+
+        return self._executor.submit(request)
+
+    @staticmethod
+    def _gather(futures: List[Future]) -> List[Optional[requests.Response]]:
+        """Wait for submitted requests, keeping their order."""
+        return [future.result() for future in futures]
+
+    # ------------------------------------------------------------------
+    # Response handling
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _snapshot_from_repo(repo) -> RepoSnapshot:
+        """Copy search-result metadata into a new snapshot."""
+        return RepoSnapshot(
+            full_name=repo.full_name,
+            html_url=repo.html_url,
+            default_branch=repo.default_branch or "main",
+            stars=repo.stargazers_count,
+            forks=repo.forks_count,
+            watchers=repo.watchers_count,
+            open_issues=repo.open_issues_count,
+            created_at=repo.created_at,
+            updated_at=repo.updated_at,
+            description=repo.description or "",
+            language=repo.language or "",
+            has_license=bool(repo.license)
+        )
+
+    @staticmethod
+    def _error(response: Optional[requests.Response]) -> str:
+        if response is None:
+            return "request failed"
+        return f"HTTP {response.status_code}"
+
+    def _apply_tree(self, snapshot: RepoSnapshot, response):
+        if response is None or response.status_code != 200:
+            # 409 = empty repository; anything else is a real failure
+            if response is None or response.status_code != 409:
+                snapshot.errors['tree'] = self._error(response)
+            return
+
+        data = response.json()
+        snapshot.tree_sha = data.get('sha')
+        snapshot.tree_truncated = bool(data.get('truncated'))
+        for item in data.get('tree', []):
+            if item.get('type') == 'blob':
+                snapshot.files.append(item['path'])
+                snapshot.file_sizes[item['path']] = item.get('size', 0)
+            elif item.get('type') == 'tree':
+                snapshot.directories.append(item['path'])
+
+    def _apply_root_listing(self, snapshot: RepoSnapshot, response):
+        """Add top-level entries a truncated tree left out."""
+        if response is None or response.status_code != 200:
+            snapshot.errors['root_listing'] = self._error(response)
+            return
+
+        files, directories = set(snapshot.files), set(snapshot.directories)
+        for item in response.json():
+            if item.get('type') == 'file' and item['path'] not in files:
+                snapshot.files.append(item['path'])
+                snapshot.file_sizes[item['path']] = item.get('size', 0)
+            elif item.get('type') == 'dir' and item['path'] not in directories:
+                snapshot.directories.append(item['path'])
+
+    def _apply_readme(self, snapshot: RepoSnapshot, response):
+        if response is not None and response.status_code == 200:
+            snapshot.readme = response.content.decode('utf-8', errors='ignore')[:README_MAX_CHARS]
+        elif response is None or response.status_code != 404:
+            snapshot.errors['readme'] = self._error(response)
+
+    def _apply_contributors(self, snapshot: RepoSnapshot, response) -> bool:
+        """Record contributor logins; returns True if the total needs a second call."""
+        if response is None or response.status_code != 200:
+            if response is not None and response.status_code == 403 and \
+                    'too large' in response.text:
+                # Very large project - estimate like QualityMetricsCalculator does
+                snapshot.contributor_count = min(
+                    max(snapshot.stars // 100, snapshot.forks // 10), 1000
+                )
+            elif response is None or response.status_code != 204:
+                snapshot.errors['contributors'] = self._error(response)
+            return False
+
+        snapshot.contributors = [c['login'] for c in response.json() if c.get('login')]
+        snapshot.contributor_count = len(snapshot.contributors)
+        return 'rel="next"' in response.headers.get('Link', '')
+
+    def _apply_contributor_count(self, snapshot: RepoSnapshot, response):
+        """Read the total from the last-page link of a per_page=1 listing."""
+        if response is None or response.status_code != 200:
+            return
+        match = re.search(r'[?&]page=(\d+)>;\s*rel="last"', response.headers.get('Link', ''))
+        if match:
+            snapshot.contributor_count = int(match.group(1))
+
+    def _existing_paths(self, snapshot: RepoSnapshot, candidates: List[str]) -> List[str]:
+        """Candidates present in the tree (all of them if the tree is unusable)."""
+        if snapshot.tree_truncated or 'tree' in snapshot.errors:
+            return list(candidates)
+        existing = set(snapshot.files)
+        return [path for path in candidates if path in existing]
+
+    def _rule_file_candidates(self, snapshot: RepoSnapshot) -> List[str]:
+        patterns = list(self.rule_file_patterns)
+        for name in snapshot.root_files:
+            if name.startswith('CLAUDE') and name.endswith('.md') and name not in patterns:
+                patterns.append(name)
+
+        sizes = snapshot.file_sizes
+        return [path for path in self._existing_paths(snapshot, patterns)
+                if path not in sizes or 0 < sizes[path] < self.max_file_size]
+
+    def _apply_dependencies(self, snapshot: RepoSnapshot, responses: Dict[str, Any]):
+        package_json = responses.get('package.json')
+        if package_json is not None and package_json.status_code == 200:
+            try:
+                snapshot.dependencies = json.loads(package_json.content)
+                return
+            except ValueError:
+                pass
+
+        requirements = responses.get('requirements.txt')
+        if requirements is not None and requirements.status_code == 200:
+            snapshot.dependencies = {
+                "requirements": requirements.content.decode('utf-8', errors='ignore')
+            }
+
+    def _apply_rule_files(self, snapshot: RepoSnapshot, responses):
+        for path, response in responses:
+            if response is None or response.status_code != 200:
+                continue
+            content = response.content
+            if not 0 < len(content) < self.max_file_size:
+                continue
+            snapshot.rule_files.append({
+                'path': path,
+                'content': content.decode('utf-8', errors='ignore'),
+                'format': path.split('.')[-1] if '.' in path else 'md'
+            })
+            logger.info(f"Found IDE rule file: {path} ({len(content)} bytes)")
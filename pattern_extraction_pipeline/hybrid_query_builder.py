@@ -33,6 +33,11 @@ class HybridQueryBuilder:
     2. Graph traversal for structural filtering (narrow down)
     3. Enrichment with related data (technologies, constraints)
     4. Ranking by composite score
+    
+    Step 1 runs either in Neo4j (db.index.vector.queryNodes on the
+    pattern_embeddings index) or, when a PatternVectorIndex is supplied,
+    in-process: the builder then needs the query embedding up front and
+    passes the ranked candidates to Cypher as $candidates.
     """
     
     # Confidence level ordering for filtering
@@ -42,14 +47,52 @@ class HybridQueryBuilder:
         'low': 1
     }
     
-    def __init__(self):
-        """Initialize query builder."""
-        pass
+    def __init__(self, vector_index=None):
+        """
+        Initialize query builder.
+        
+        Args:
+            vector_index: Optional PatternVectorIndex used instead of the Neo4j vector index
+        """
+        self.vector_index = vector_index
+    
+    def _vector_step(self, node: str = 'p', top_k_param: str = '$top_k',
+                     embedding_param: str = '$embedding', carry: str = '') -> str:
+        """Cypher yielding `node, score` from whichever vector backend is configured."""
+        if self.vector_index is not None:
+            return f"""
+            UNWIND $candidates AS candidate
+            MATCH ({node}:Pattern) WHERE elementId({node}) = candidate.element_id
+            WITH {carry}{node}, candidate.score AS score
+            """
+        return f"""
+            CALL db.index.vector.queryNodes('pattern_embeddings', {top_k_param}, {embedding_param})
+            YIELD node AS {node}, score
+            """
+    
+    def _add_candidates(
+        self,
+        params: Dict,
+        embedding: Optional[List[float]],
+        top_k: int,
+        min_similarity: float = 0.0,
+        exclude: Optional[str] = None
+    ):
+        """Run the local vector search and attach its results as $candidates."""
+        if self.vector_index is None:
+            return
+        if embedding is None:
+            raise ValueError("embedding is required when a local vector index is configured")
+        params['candidates'] = [
+            {'element_id': pattern['element_id'], 'score': score}
+            for pattern, score in self.vector_index.search(embedding, top_k, min_similarity, exclude=exclude)
+        ]
     
     def build_semantic_search(
         self,
         top_k: int = 20,
-        min_similarity: float = 0.0
+        min_similarity: float = 0.0,
+        embedding: Optional[List[float]] = None
     ) -> Tuple[str, Dict]:
         """
         Build vector similarity search query.
@@ -57,15 +100,13 @@ class HybridQueryBuilder:
         Args:
             top_k: Number of top similar patterns to retrieve
             min_similarity: Minimum similarity threshold (0-1)
+            embedding: Query embedding (required with a local vector index)
         
         Returns:
             (cypher_query, parameters_dict)
         """
         query = """
-            // Step 1: Vector similarity search
-            CALL db.index.vector.queryNodes('pattern_embeddings', $top_k, $embedding)
-            YIELD node AS p, score
-            WHERE score >= $min_similarity
+            // Step 1: Vector similarity search""" + self._vector_step() + """WHERE score >= $min_similarity
             RETURN p, score
             ORDER BY score DESC
         """
@@ -75,6 +116,7 @@ class HybridQueryBuilder:
             'min_similarity': min_similarity,
             # 'embedding' will be provided at query execution
         }
+        self._add_candidates(params, embedding, top_k, min_similarity)
         
         return query, params
     
@@ -82,7 +124,8 @@ class HybridQueryBuilder:
         self,
         constraints: QueryConstraints,
         top_k: int = 10,
-        semantic_top_k: int = 20
+        semantic_top_k: int = 20,
+        embedding: Optional[List[float]] = None
     ) -> Tuple[str, Dict]:
         """
         Build hybrid search query (semantic + structural).
@@ -91,16 +134,14 @@ class HybridQueryBuilder:
             constraints: Structural constraints for filtering
             top_k: Number of final results to return
             semantic_top_k: Number of candidates from vector search
+            embedding: Query embedding (required with a local vector index)
         
         Returns:
             (cypher_query, parameters_dict)
         """
         # Start with vector search
         query_parts = ["""
-            // Step 1: Semantic vector search (cast wide net)
-            CALL db.index.vector.queryNodes('pattern_embeddings', $semantic_top_k, $embedding)
-            YIELD node AS p, score
-        """]
+            // Step 1: Semantic vector search (cast wide net)""" + self._vector_step(top_k_param='$semantic_top_k')]
         
         # Build WHERE clauses for filtering
         where_clauses = []
@@ -108,6 +149,7 @@ class HybridQueryBuilder:
             'semantic_top_k': semantic_top_k,
             'top_k': top_k
         }
+        self._add_candidates(params, embedding, semantic_top_k)
         
         # Confidence filter
         if constraints.min_confidence:
@@ -199,7 +241,8 @@ class HybridQueryBuilder:
         self,
         min_similarity: float = 0.7,
         top_k: int = 15,
-        exclude_techs: Optional[List[str]] = None
+        exclude_techs: Optional[List[str]] = None,
+        embedding: Optional[List[float]] = None
     ) -> Tuple[str, Dict]:
         """
         Build query for cross-pattern discovery (conceptual similarity without tech constraints).
@@ -208,15 +251,13 @@ class HybridQueryBuilder:
             min_similarity: Minimum semantic similarity (higher = more similar)
             top_k: Number of results to return
             exclude_techs: Technologies to exclude (optional)
+            embedding: Query embedding (required with a local vector index)
         
         Returns:
             (cypher_query, parameters_dict)
         """
         query = """
-            // Step 1: High-similarity semantic search (no tech filtering)
-            CALL db.index.vector.queryNodes('pattern_embeddings', $top_k, $embedding)
-            YIELD node AS p, score
-            WHERE score >= $min_similarity
+            // Step 1: High-similarity semantic search (no tech filtering)""" + self._vector_step() + """WHERE score >= $min_similarity
             
             // Step 2: Get technologies without filtering
             OPTIONAL MATCH (p)-[:USES]->(t:Technology)
@@ -226,6 +267,7 @@ class HybridQueryBuilder:
             'top_k': top_k,
             'min_similarity': min_similarity
         }
+        self._add_candidates(params, embedding, top_k, min_similarity)
         
         # Optional: exclude certain technologies
         if exclude_techs:
@@ -322,10 +364,9 @@ class HybridQueryBuilder:
             MATCH (p1:Pattern {name: $pattern_name})
             WHERE p1.embedding IS NOT NULL
             
-            // Step 2: Find similar patterns via vector search
-            CALL db.index.vector.queryNodes('pattern_embeddings', $top_k_plus_one, p1.embedding)
-            YIELD node AS p2, score
-            WHERE p2 <> p1
+            // Step 2: Find similar patterns via vector search""" + self._vector_step(
+            node='p2', top_k_param='$top_k_plus_one', embedding_param='p1.embedding', carry='p1, '
+        ) + """WHERE p2 <> p1
                 AND score >= $min_similarity
             
             // Step 3: Find shared technologies
@@ -354,6 +395,15 @@ class HybridQueryBuilder:
             'top_k_plus_one': top_k + 1,  # +1 to account for excluding self
             'min_similarity': min_similarity
         }
+        if self.vector_index is not None:
+            reference = self.vector_index.vector_for(pattern_name)
+            params['candidates'] = [] if reference is None else [
+                {'element_id': pattern['element_id'], 'score': score}
+                for pattern, score in self.vector_index.search(
+                    reference, top_k, min_similarity,
+                    exclude=self.vector_index.element_id_for(pattern_name)
+                )
+            ]
         
         return query, params
     
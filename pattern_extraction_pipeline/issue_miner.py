@@ -9,7 +9,7 @@ import google.generativeai as genai
 from neo4j import GraphDatabase
 
 class IssueMiner:
-    def __init__(self):
+    def __init__(self, llm_cache=None):
         self.github = Github(os.getenv("GITHUB_TOKEN"))
         
         # Configure Google Gemini with direct API key (disable Cloud SDK auth)
@@ -26,6 +26,9 @@ class IssueMiner:
         genai.configure(api_key=api_key)
         self.llm = genai.GenerativeModel('gemini-2.5-flash')
         
+        # Optional LLMResponseCache: re-mining unchanged issues costs no quota
+        self.llm_cache = llm_cache
+        
         self.neo4j = GraphDatabase.driver(
             os.getenv("NEO4J_URI", "bolt://localhost:7687"),
             auth=(os.getenv("NEO4J_USER", "neo4j"), 
@@ -171,11 +174,13 @@ Be conservative - only classify as anti-pattern if clear evidence of pattern fai
 """
         
         try:
-            # Use Gemini to generate response
-            response = self.llm.generate_content(prompt)
+            # Use Gemini to generate response (served from cache when available)
+            if self.llm_cache:
+                response_text = self.llm_cache.generate(self.llm, prompt)
+            else:
+                response_text = self.llm.generate_content(prompt).text
             
             # Extract JSON from response
-            response_text = response.text
             
             # Try to extract JSON (Gemini might wrap it in markdown code blocks)
             if '```json' in response_text:
@@ -200,6 +205,8 @@ Be conservative - only classify as anti-pattern if clear evidence of pattern fai
             
         except Exception as e:
             print(f"    LLM analysis error: {e}")
+            if self.llm_cache:
+                self.llm_cache.reject(self.llm, prompt)
             return None
     
     def _store_issue(self, analysis):
@@ -399,7 +406,12 @@ if __name__ == "__main__":
     
     choice = input("\nEnter choice (1-3): ").strip()
     
-    miner = IssueMiner()
+    try:
+        from pattern_extraction_pipeline.llm_cache import LLMResponseCache
+    except ImportError:
+        from llm_cache import LLMResponseCache
+    
+    miner = IssueMiner(llm_cache=LLMResponseCache())
     
     if choice == "1":
         repo_name = input("Repository (e.g., microsoft/vscode): ").strip()
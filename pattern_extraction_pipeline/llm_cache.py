@@ -0,0 +1,200 @@
+"""
+LLM Response Cache
+
+Content-addressed, persistent cache for Gemini responses. Entries are keyed
+by model name plus a hash of the whitespace-normalised prompt, so re-running
+extraction, validation, judging or issue mining over unchanged inputs costs
+no LLM quota.
+
+Stored in a single SQLite file with least-recently-used eviction once the
+total response size exceeds max_size_mb.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so indentation-only prompt changes share an entry."""
+    return _WHITESPACE.sub(' ', prompt).strip()
+
+
+def prompt_key(model_name: str, prompt: str) -> str:
+    """Cache key for a model/prompt pair."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_prompt(prompt).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def model_name_of(llm) -> str:
+    """Model identifier of a genai.GenerativeModel (e.g. 'models/gemini-2.5-flash')."""
+    return str(getattr(llm, 'model_name', None) or type(llm).__name__)
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed prompt -> response cache with LRU eviction.
+
+    Thread-safe: one connection guarded by a lock, shared by the extractor,
+    its critic/judge worker threads and the issue miner.
+
+    Example:
+        >>> cache = LLMResponseCache("cache/llm_responses.sqlite")
+        >>> text = cache.generate(llm, prompt)   # miss: calls Gemini
+        >>> text = cache.generate(llm, prompt)   # hit: no API call
+        >>> cache.get_stats()
+        {'hits': 1, 'misses': 1, ...}
+    """
+
+    def __init__(self, db_path: str = "cache/llm_responses.sqlite", max_size_mb: float = 256):
+        """
+        Initialize cache.
+
+        Args:
+            db_path: SQLite file (parent directory created if missing)
+            max_size_mb: Total response size kept before LRU eviction
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        logger.info(f"LLMResponseCache initialised: {self.db_path} (max {max_size_mb} MB)")
+
+    def generate(self, llm, prompt: str, rate_limiter=None) -> str:
+        """
+        Return the response text for a prompt, calling the model only on a miss.
+
+        Callers that cannot use the text (e.g. invalid JSON) should reject()
+        it so the next run asks the model again.
+
+        Args:
+            llm: genai.GenerativeModel
+            prompt: Prompt text
+            rate_limiter: Optional RateLimiter waited on before a model call (hits are free)
+
+        Returns:
+            Response text
+        """
+        model_name = model_name_of(llm)
+        cached = self.get(model_name, prompt)
+        if cached is not None:
+            return cached
+
+        if rate_limiter:
+            rate_limiter.wait_if_needed()
+        text = llm.generate_content(prompt).text
+        self.put(model_name, prompt, text)
+        return text
+
+    def reject(self, llm, prompt: str):
+        """Drop the cached response for a prompt after the caller failed to use it."""
+        self.discard(model_name_of(llm), prompt)
+
+    def get(self, model_name: str, prompt: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Returns:
+            Response text, or None on miss
+        """
+        key = prompt_key(model_name, prompt)
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, model_name: str, prompt: str, response: str):
+        """Store a response, evicting least-recently-used entries if over budget."""
+        key = prompt_key(model_name, prompt)
+        size = len(response.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_name, response, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def discard(self, model_name: str, prompt: str):
+        """Remove an entry (e.g. a response that turned out to be unparseable)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (prompt_key(model_name, prompt),))
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            entries, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': entries,
+                'size_bytes': total_size
+            }
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self):
+        """Drop least-recently-used entries until under budget (caller holds the lock)."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        excess = total - self.max_size_bytes
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+        logger.debug(f"Evicted {len(doomed)} cached LLM responses ({freed} bytes)")
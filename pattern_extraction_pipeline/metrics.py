@@ -6,6 +6,7 @@ Provides counters and timers for monitoring operation success/failure rates and
 """
 
 from collections import defaultdict
+import threading
 import time
 from typing import Dict, Optional
 import logging
@@ -22,6 +23,9 @@ class Metrics:
     - Start/stop timers for operations
     - Generate summary reports
     
+    Counters and timers are safe to update from concurrent extraction
+    workers; running timers are tracked per thread.
+    
     Example:
         >>> metrics = Metrics()
         >>> metrics.increment('rules_extracted')
@@ -43,6 +47,7 @@ class Metrics:
         self.timers = {}
         self._timer_history = defaultdict(list)
         self._start_time = time.time()
+        self._lock = threading.Lock()
     
     def increment(self, metric_name: str, value: int = 1):
         """
@@ -52,7 +57,8 @@ class Metrics:
             metric_name: Name of the metric (e.g., 'rules_extracted')
             value: Amount to increment (default: 1)
         """
-        self.counters[metric_name] += value
+        with self._lock:
+            self.counters[metric_name] += value
         logger.debug(f"Metric '{metric_name}' incremented by {value} (now: {self.counters[metric_name]})")
     
     def set(self, metric_name: str, value: int):
@@ -73,7 +79,7 @@ class Metrics:
         Args:
             timer_name: Name of the operation
         """
-        self.timers[timer_name] = time.time()
+        self.timers[(threading.get_ident(), timer_name)] = time.time()
         logger.debug(f"Timer '{timer_name}' started")
     
     def end_timer(self, timer_name: str) -> Optional[float]:
@@ -86,18 +92,19 @@ class Metrics:
         Returns:
             float: Duration in seconds, or None if timer not found
         """
-        if timer_name not in self.timers:
+        started_at = self.timers.pop((threading.get_ident(), timer_name), None)
+        if started_at is None:
             logger.warning(f"Timer '{timer_name}' not found (not started?)")
             return None
         
-        duration = time.time() - self.timers[timer_name]
-        del self.timers[timer_name]
-        
-        # Store duration in history for averaging
-        self._timer_history[timer_name].append(duration)
+        duration = time.time() - started_at
         
-        # Also store as a counter for the latest duration
-        self.counters[f"{timer_name}.duration_ms"] = int(duration * 1000)
+        with self._lock:
+            # Store duration in history for averaging
+            self._timer_history[timer_name].append(duration)
+            
+            # Also store as a counter for the latest duration
+            self.counters[f"{timer_name}.duration_ms"] = int(duration * 1000)
         
         logger.debug(f"Timer '{timer_name}' ended: {duration:.3f}s")
         return duration
@@ -0,0 +1,355 @@
+"""
+Neo4j Write-Behind Buffer
+
+Collects pattern upserts, IDE rule links and validation/judge score updates
+and writes them as parameterised UNWIND batches inside managed write
+transactions, instead of one session and round trip per row.
+
+Buffers are flushed when the pending row count reaches batch_size, every
+flush_interval seconds from a background thread, and on close(). Within a
+flush, patterns are written before the rules and scores that MATCH them.
+A batch that fails is put back in the buffer and retried by the next flush
+(close() makes the last attempt), together with any rule and score rows for
+the patterns it held; rows_failed counts failed attempts and rows_lost the
+rows still unwritten when close() gave up.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List
+
+from pattern_extraction_pipeline.exceptions import DatabaseWriteError
+
+logger = logging.getLogger(__name__)
+
+
+PATTERN_UPSERT_QUERY = """
+UNWIND $rows AS row
+
+// MERGE pattern node by source_repo (handles both create and update)
+MERGE (p:Pattern {source_repo: row.source_repo})
+ON CREATE SET
+    p.name = row.pattern_name,
+    p.confidence = row.confidence,
+    p.stars = row.stars,
+    p.reasoning = row.reasoning,
+    p.quality_score = row.quality_score,
+    p.freshness_score = row.freshness_score,
+    p.maintenance_score = row.maintenance_score,
+    p.validation_score = 0.0,
+    p.needs_review = true,
+    p.critic_notes = "Validation pending...",
+    p.judge_score = 0.0,
+    p.judge_feedback = "Judge evaluation pending...",
+    p.extraction_status = row.extraction_status,
+    p.has_readme = row.has_readme,
+    p.has_structure = row.has_structure,
+    p.has_dependencies = row.has_dependencies,
+    p.has_quality_metrics = row.has_quality_metrics,
+    p.extracted_at = datetime()
+ON MATCH SET
+    p.name = row.pattern_name,
+    p.confidence = row.confidence,
+    p.stars = row.stars,
+    p.reasoning = row.reasoning,
+    p.quality_score = row.quality_score,
+    p.freshness_score = row.freshness_score,
+    p.maintenance_score = row.maintenance_score,
+    p.extraction_status = row.extraction_status,
+    p.has_readme = row.has_readme,
+    p.has_structure = row.has_structure,
+    p.has_dependencies = row.has_dependencies,
+    p.has_quality_metrics = row.has_quality_metrics,
+    p.extracted_at = datetime()
+
+// MERGE requirement node and relationship
+MERGE (r:Requirement {type: row.req_type, domain: row.req_domain})
+MERGE (r)-[:SOLVED_BY]->(p)
+
+// MERGE constraints with weights
+FOREACH (constraint IN row.constraints |
+    MERGE (c:Constraint {rule: constraint.rule})
+    MERGE (p)-[req:REQUIRES]->(c)
+    SET req.criticality = constraint.criticality,
+        req.enforcement = constraint.enforcement,
+        req.violation_impact = constraint.violation_impact,
+        req.reasoning = constraint.reasoning
+)
+
+// MERGE technologies with weights
+FOREACH (tech IN row.technologies |
+    MERGE (t:Technology {name: tech.name})
+    MERGE (p)-[u:USES]->(t)
+    SET u.role = tech.role,
+        u.criticality = tech.criticality,
+        u.adoption_confidence = tech.adoption_confidence,
+        u.can_substitute = tech.can_substitute
+)
+
+RETURN count(*) AS written
+"""
+
+RULE_LINK_QUERY = """
+UNWIND $rows AS row
+
+// Find the Pattern node
+MATCH (p:Pattern {name: row.pattern_name, source_repo: row.source_repo})
+
+// Create or merge IDERule node
+MERGE (r:IDERule {id: row.rule_id})
+ON CREATE SET
+    r.source_repo = row.source_repo,
+    r.file_path = row.file_path,
+    r.file_format = row.file_format,
+    r.content = row.content,
+    r.purpose = row.purpose,
+    r.categories = row.categories,
+    r.key_practices = row.key_practices,
+    r.technologies = row.technologies,
+    r.project_types = row.project_types,
+    r.ide_types = row.ide_types,
+    r.repo_quality_score = row.repo_quality_score,
+    r.confidence_level = row.confidence_level,
+    r.quality_breakdown_json = row.quality_breakdown_json,
+    r.has_ci_cd = row.has_ci_cd,
+    r.has_tests = row.has_tests,
+    r.extracted_date = datetime()
+ON MATCH SET
+    r.content = row.content,
+    r.purpose = row.purpose,
+    r.categories = row.categories,
+    r.key_practices = row.key_practices,
+    r.technologies = row.technologies,
+    r.project_types = row.project_types,
+    r.repo_quality_score = row.repo_quality_score,
+    r.confidence_level = row.confidence_level,
+    r.quality_breakdown_json = row.quality_breakdown_json,
+    r.extracted_date = datetime()
+
+// Create relationship
+MERGE (p)-[:HAS_IDE_RULES]->(r)
+
+RETURN count(*) AS written
+"""
+
+VALIDATION_UPDATE_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Pattern {name: row.pattern_name})
+SET p.validation_score = row.validation_score,
+    p.needs_review = row.needs_review,
+    p.critic_notes = row.critic_notes,
+    p.validated_at = datetime()
+RETURN count(*) AS written
+"""
+
+JUDGE_UPDATE_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Pattern {name: row.pattern_name})
+SET p.judge_score = row.judge_score,
+    p.judge_feedback = row.judge_feedback,
+    p.judged_at = datetime()
+RETURN count(*) AS written
+"""
+
+# Flush order: rules and score updates MATCH patterns written earlier in the same flush
+WRITE_QUERIES = {
+    'pattern': PATTERN_UPSERT_QUERY,
+    'rule': RULE_LINK_QUERY,
+    'validation': VALIDATION_UPDATE_QUERY,
+    'judge': JUDGE_UPDATE_QUERY
+}
+
+
+def run_batch(tx, query: str, rows: List[Dict[str, Any]]) -> int:
+    """
+    Transaction function: run one UNWIND query over a batch of rows.
+
+    Returns:
+        Number of rows that matched/were written
+    """
+    record = tx.run(query, rows=rows).single()
+    return record['written'] if record else 0
+
+
+class Neo4jBatchWriter:
+    """
+    Thread-safe write-behind buffer for pipeline writes.
+
+    Example:
+        >>> writer = Neo4jBatchWriter(driver, batch_size=200, flush_interval=5.0)
+        >>> writer.add('pattern', row)     # returns immediately
+        >>> writer.close()                  # flushes anything still pending
+    """
+
+    def __init__(self, driver, batch_size: int = 200, flush_interval: float = 5.0):
+        """
+        Initialize writer.
+
+        Args:
+            driver: Neo4j driver
+            batch_size: Pending rows that trigger a flush; also the UNWIND chunk size
+            flush_interval: Seconds between background flushes (0 = size/close only)
+        """
+        self.driver = driver
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._buffers = {kind: [] for kind in WRITE_QUERIES}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._retry_at = 0.0  # Size-triggered flushes back off after a failure
+
+        self.stats = {
+            'rows_written': {kind: 0 for kind in WRITE_QUERIES},
+            'rows_unmatched': 0,
+            'rows_failed': 0,
+            'rows_lost': 0,
+            'batches': 0,
+            'flushes': 0
+        }
+
+        self._stop = threading.Event()
+        self._thread = None
+        if flush_interval > 0:
+            self._thread = threading.Thread(target=self._flush_loop, name="neo4j_write_behind", daemon=True)
+            self._thread.start()
+
+        logger.info(f"Neo4jBatchWriter initialized (batch_size={batch_size}, flush_interval={flush_interval}s)")
+
+    def add(self, kind: str, row: Dict[str, Any]):
+        """
+        Queue one row for writing.
+
+        Args:
+            kind: One of 'pattern', 'rule', 'validation', 'judge'
+            row: Query parameters for the row
+
+        Raises:
+            ValueError: If kind is unknown
+            DatabaseWriteError: If the writer has been closed
+        """
+        if kind not in WRITE_QUERIES:
+            raise ValueError(f"Unknown write kind: {kind}")
+
+        with self._lock:
+            if self._closed:
+                raise DatabaseWriteError(f"Neo4jBatchWriter is closed; cannot queue {kind} row")
+            self._buffers[kind].append(row)
+            pending = sum(len(rows) for rows in self._buffers.values())
+
+        if pending >= self.batch_size and time.monotonic() >= self._retry_at:
+            try:
+                self.flush()
+            except DatabaseWriteError as e:
+                # The batch holds other callers' rows too; report via stats, not this caller
+                logger.error(f"Size-triggered Neo4j flush failed: {e}")
+
+    def pending(self) -> int:
+        """Number of rows waiting to be written."""
+        with self._lock:
+            return sum(len(rows) for rows in self._buffers.values())
+
+    def flush(self) -> int:
+        """
+        Write all pending rows now.
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            DatabaseWriteError: If any batch failed after the driver's retries
+                (its rows, and rows for patterns it held, stay buffered for the next flush)
+        """
+        with self._flush_lock:
+            with self._lock:
+                buffers = self._buffers
+                self._buffers = {kind: [] for kind in WRITE_QUERIES}
+
+            if not any(buffers.values()):
+                return 0
+
+            written = 0
+            failed = {}
+            deferred = {}
+            with self.driver.session() as session:
+                for kind, query in WRITE_QUERIES.items():
+                    rows = buffers[kind]
+                    if kind != 'pattern' and failed.get('pattern'):
+                        # Rows for a Pattern whose upsert just failed would MATCH nothing and be dropped
+                        missing = {row.get('pattern_name') for row in failed['pattern']}
+                        deferred[kind] = [row for row in rows if row['pattern_name'] in missing]
+                        rows = [row for row in rows if row['pattern_name'] not in missing]
+                    for start in range(0, len(rows), self.batch_size):
+                        batch = rows[start:start + self.batch_size]
+                        try:
+                            # Managed transaction: transient errors are retried by the driver
+                            matched = session.execute_write(run_batch, query, batch)
+                        except Exception as e:
+                            logger.error(f"Neo4j batch write failed ({kind}, {len(batch)} rows): {e}")
+                            failed.setdefault(kind, []).extend(batch)
+                            continue
+
+                        written += len(batch)
+                        with self._lock:
+                            self.stats['batches'] += 1
+                            self.stats['rows_written'][kind] += len(batch)
+                            self.stats['rows_unmatched'] += max(len(batch) - matched, 0)
+                        if matched < len(batch):
+                            logger.warning(f"{len(batch) - matched} {kind} row(s) matched no Pattern node")
+
+            with self._lock:
+                self.stats['flushes'] += 1
+                self.stats['rows_failed'] += sum(len(rows) for rows in failed.values())
+                # Requeue ahead of rows added meanwhile, keeping write order
+                for kind in WRITE_QUERIES:
+                    self._buffers[kind][:0] = failed.get(kind, []) + deferred.get(kind, [])
+
+            logger.debug(f"Flushed {written} rows to Neo4j")
+            if failed:
+                self._retry_at = time.monotonic() + max(self.flush_interval, 1.0)
+                summary = ', '.join(f"{len(rows)} {kind}" for kind, rows in failed.items())
+                raise DatabaseWriteError(f"Failed to write buffered rows to Neo4j (kept for retry): {summary}")
+            return written
+
+    def close(self):
+        """
+        Stop the background flusher and write anything still pending.
+
+        Raises:
+            DatabaseWriteError: If rows could not be written (counted in rows_lost)
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        try:
+            self.flush()
+        except DatabaseWriteError:
+            with self._lock:
+                lost = sum(len(rows) for rows in self._buffers.values())
+                self.stats['rows_lost'] += lost
+                self._buffers = {kind: [] for kind in WRITE_QUERIES}
+            raise DatabaseWriteError(f"{lost} buffered row(s) could not be written to Neo4j")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write counters."""
+        with self._lock:
+            return {
+                **self.stats,
+                'rows_written': dict(self.stats['rows_written']),
+                'pending': sum(len(rows) for rows in self._buffers.values())
+            }
+
+    def _flush_loop(self):
+        """Background time-based flush."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Background Neo4j flush failed: {e}")
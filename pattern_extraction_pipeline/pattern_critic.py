@@ -41,7 +41,7 @@ class PatternCritic:
     NEEDS_REVIEW_THRESHOLD = 0.7  # Patterns below this score need human review
     ACCEPTABLE_THRESHOLD = 0.8    # Patterns above this are considered good
     
-    def __init__(self):
+    def __init__(self, llm_cache=None):
         """Initialise critic with Gemini Flash model."""
         from dotenv import load_dotenv
         load_dotenv(override=True)
@@ -58,6 +58,9 @@ class PatternCritic:
         # Use Flash for fast, cost-effective validation
         self.llm = genai.GenerativeModel('gemini-2.5-flash')
         
+        # Optional LLMResponseCache: unchanged patterns are not re-sent to Gemini
+        self.llm_cache = llm_cache
+        
         logger.info("PatternCritic initialised with gemini-2.5-flash")
     
     @llm_retry
@@ -80,8 +83,10 @@ class PatternCritic:
         prompt = self._build_validation_prompt(pattern)
         
         try:
-            response = self.llm.generate_content(prompt)
-            response_text = response.text
+            if self.llm_cache:
+                response_text = self.llm_cache.generate(self.llm, prompt)
+            else:
+                response_text = self.llm.generate_content(prompt).text
             
             # Extract JSON from response
             if '```json' in response_text:
@@ -104,6 +109,8 @@ class PatternCritic:
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse critic response: {e}")
+            if self.llm_cache:
+                self.llm_cache.reject(self.llm, prompt)
             logger.debug(f"Response text: {response_text[:500]}")
             # Fallback: assume needs review
             return 0.5, True, f"Critic parsing error: {str(e)}"
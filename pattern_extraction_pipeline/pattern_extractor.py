@@ -4,8 +4,10 @@
 import os
 import json
 import time
+import threading
 import yaml
 from datetime import datetime
+from itertools import islice
 from concurrent.futures import ThreadPoolExecutor
 from github import Github, GithubException, RateLimitExceededException
 import google.generativeai as genai
@@ -60,6 +62,12 @@ except ImportError as e:
     IDE_RULE_LIBRARY_AVAILABLE = False
     logger.warning(f"IDE Rule Library not available - rule extraction will be skipped: {e}")
 
+try:
+    from ide_rule_library.rate_limiter import shared_quota_tracker
+    GITHUB_QUOTA_AVAILABLE = True
+except ImportError:
+    GITHUB_QUOTA_AVAILABLE = False
+
 # Import custom exceptions, rate limiter, and metrics
 from pattern_extraction_pipeline.exceptions import (
     IntegrationError,
@@ -70,8 +78,15 @@ from pattern_extraction_pipeline.exceptions import (
     GitHubAPIError
 )
 from pattern_extraction_pipeline.rate_limiter import RateLimiter
+from pattern_extraction_pipeline.github_fetcher import ThreadPoolGitHubFetcher
+from pattern_extraction_pipeline.snapshot_cache import SnapshotCache
+from pattern_extraction_pipeline.neo4j_batch_writer import Neo4jBatchWriter, WRITE_QUERIES
+from pattern_extraction_pipeline.llm_cache import LLMResponseCache
 from pattern_extraction_pipeline.metrics import Metrics
 
+# Search results are consumed one API page at a time (PyGithub default per_page)
+SEARCH_PAGE_SIZE = 30
+
 # Retry decorator configurations
 # GitHub API: Handle rate limits and transient errors
 github_retry = retry(
@@ -127,17 +142,58 @@ class PatternExtractor:
                     'stars': int
                 }
         """
-        with self.neo4j.session() as session:
-            result = session.run("""
-                MATCH (p:Pattern {source_repo: $repo_url})
-                RETURN p.name as name, 
-                       p.extracted_at as extracted_at,
-                       p.quality_score as quality_score,
-                       p.stars as stars
-                LIMIT 1
-            """, repo_url=repo_url)
-            record = result.single()
-            return dict(record) if record else None
+        return self._check_repos_exist([repo_url]).get(repo_url)
+    
+    def _check_repos_exist(self, repo_urls):
+        """
+        Check many repositories in one Neo4j round trip.
+        
+        Answers (including "not analyzed") are cached for the rest of the run,
+        so only URLs not seen before are sent to the database.
+        
+        Args:
+            repo_urls: Repository URLs to check
+        
+        Returns:
+            dict: repo_url -> pattern details (as _check_if_repo_exists) for
+                  repositories that have already been analyzed
+        """
+        with self._existing_lock:
+            pending = [url for url in dict.fromkeys(repo_urls) if url not in self._existing_repos]
+        
+        if pending:
+            found = {}
+            with self.neo4j.session() as session:
+                result = session.run("""
+                    UNWIND $urls AS url
+                    MATCH (p:Pattern {source_repo: url})
+                    WITH url, head(collect(p)) AS p
+                    RETURN url AS source_repo,
+                           p.name as name,
+                           p.extracted_at as extracted_at,
+                           p.quality_score as quality_score,
+                           p.stars as stars
+                """, urls=pending)
+                for record in result:
+                    details = dict(record)
+                    found[details.pop('source_repo')] = details
+            
+            with self._existing_lock:
+                for url in pending:
+                    self._existing_repos[url] = found.get(url)
+        
+        with self._existing_lock:
+            return {url: self._existing_repos[url] for url in repo_urls if self._existing_repos.get(url)}
+    
+    def _remember_existing(self, repo_url, pattern):
+        """Record a pattern stored in this run so later duplicates are skipped without a query."""
+        with self._existing_lock:
+            self._existing_repos[repo_url] = {
+                'name': pattern.get('pattern_name'),
+                'extracted_at': datetime.now(),
+                'quality_score': pattern.get('quality_score', 0),
+                'stars': pattern.get('stars', 0)
+            }
     
     def __init__(self, progress_callback=None, config_path=None):
         # Warn about proper resource management
@@ -166,6 +222,25 @@ class PatternExtractor:
         if not github_token:
             raise ValueError(f"{self.config.github.token_env} not found in environment")
         self.github = Github(auth=Auth.Token(github_token))
+        # Same header-fed quota as ide_rule_library's GitHubRateLimiter
+        self.github_quota = shared_quota_tracker() if GITHUB_QUOTA_AVAILABLE else None
+        
+        # Concurrent fetch layer: one RepoSnapshot per repo instead of ~15 sequential calls
+        if self.config.github.async_fetch:
+            # Snapshot cache: unchanged repos are revalidated, not re-downloaded
+            cache_dir = self.config.github.snapshot_cache_dir
+            self.snapshot_cache = SnapshotCache(cache_dir) if cache_dir else None
+            self.github_fetcher = ThreadPoolGitHubFetcher(
+                token=github_token,
+                max_connections=self.config.github.max_connections,
+                rule_file_patterns=self.config.rule_extraction.file_patterns,
+                max_file_size=self.config.rule_extraction.max_file_size,
+                cache=self.snapshot_cache,
+                quota=self.github_quota
+            )
+        else:
+            self.snapshot_cache = None
+            self.github_fetcher = None
         
         # Configure Google Gemini with direct API key (disable Cloud SDK auth)
         from dotenv import load_dotenv
@@ -182,11 +257,28 @@ class PatternExtractor:
         genai.configure(api_key=api_key)
         self.llm = genai.GenerativeModel(self.config.gemini.model_name)
         
+        # Response cache shared by extraction, critic and judge: unchanged prompts cost no quota
+        cache_path = self.config.gemini.response_cache_path
+        if cache_path:
+            self.llm_cache = LLMResponseCache(cache_path, max_size_mb=self.config.gemini.response_cache_max_mb)
+        else:
+            self.llm_cache = None
+        
         self.neo4j = GraphDatabase.driver(
             self.config.neo4j.uri,
             auth=(self.config.neo4j.user, os.getenv(self.config.neo4j.password_env, "password"))
         )
         
+        # Write-behind buffer: patterns, rules and scores go out as UNWIND batches
+        if self.config.neo4j.write_behind:
+            self.neo4j_writer = Neo4jBatchWriter(
+                self.neo4j,
+                batch_size=self.config.neo4j.batch_size,
+                flush_interval=self.config.neo4j.flush_interval
+            )
+        else:
+            self.neo4j_writer = None
+        
         # Quality metrics calculator
         if QUALITY_METRICS_AVAILABLE:
             self.quality_calculator = QualityMetricsCalculator()
@@ -195,7 +287,7 @@ class PatternExtractor:
         
         # Pattern critic for async validation
         if PATTERN_CRITIC_AVAILABLE:
-            self.critic = PatternCritic()
+            self.critic = PatternCritic(llm_cache=self.llm_cache)
             self.critic_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="critic_judge")
         else:
             self.critic = None
@@ -203,7 +295,7 @@ class PatternExtractor:
         
         # Quality judge for advanced evaluation
         if QUALITY_JUDGE_AVAILABLE:
-            self.judge = QualityJudge()
+            self.judge = QualityJudge(llm_cache=self.llm_cache)
         else:
             self.judge = None
         
@@ -232,6 +324,15 @@ class PatternExtractor:
             name="gemini_api"
         )
         
+        # Parallel extraction workers (1 = sequential)
+        pattern_config = self.config.pattern_extraction
+        self.max_workers = pattern_config.max_workers if pattern_config else 1
+        self._stats_lock = threading.Lock()
+        
+        # Run-scoped cache of "already analyzed?" answers (repo_url -> details or None)
+        self._existing_repos = {}
+        self._existing_lock = threading.Lock()
+        
         # Metrics collection
         self.metrics = Metrics(name="pattern_extractor")
         logger.info("Metrics collection initialized")
@@ -268,6 +369,26 @@ class PatternExtractor:
         
         This method is idempotent - safe to call multiple times.
         """
+        if hasattr(self, 'critic_executor') and self.critic_executor:
+            try:
+                self.critic_executor.shutdown(wait=True, cancel_futures=False)
+                logger.info("Critic executor shutdown")
+            except Exception as e:
+                logger.warning(f"Error shutting down critic executor: {e}")
+            finally:
+                self.critic_executor = None
+        
+        # Flush buffered writes (including results from finished validations) before the driver goes
+        if hasattr(self, 'neo4j_writer') and self.neo4j_writer:
+            try:
+                self.neo4j_writer.close()
+                logger.info("Neo4j write buffer flushed")
+            except Exception as e:
+                logger.error(f"Error flushing Neo4j write buffer: {e}")
+                print(f"[ERROR] Neo4j write buffer not fully stored: {e}")
+            finally:
+                self.neo4j_writer = None
+        
         if hasattr(self, 'neo4j') and self.neo4j:
             try:
                 self.neo4j.close()
@@ -277,14 +398,23 @@ class PatternExtractor:
             finally:
                 self.neo4j = None
         
-        if hasattr(self, 'critic_executor') and self.critic_executor:
+        if hasattr(self, 'github_fetcher') and self.github_fetcher:
             try:
-                self.critic_executor.shutdown(wait=True, cancel_futures=False)
-                logger.info("Critic executor shutdown")
+                self.github_fetcher.close()
+                logger.info("GitHub fetcher closed")
             except Exception as e:
-                logger.warning(f"Error shutting down critic executor: {e}")
+                logger.warning(f"Error closing GitHub fetcher: {e}")
             finally:
-                self.critic_executor = None
+                self.github_fetcher = None
+        
+        if hasattr(self, 'llm_cache') and self.llm_cache:
+            try:
+                self.llm_cache.close()
+                logger.info("LLM response cache closed")
+            except Exception as e:
+                logger.warning(f"Error closing LLM response cache: {e}")
+            finally:
+                self.llm_cache = None
     
     def __del__(self):
         """
@@ -368,7 +498,7 @@ Generate a COMPLETELY NEW, SIMPLE query for the same concept:
 
 Return ONLY the new query, nothing else."""
 
-                response = self.llm.generate_content(refine_prompt)
+                response = self._generate_content(refine_prompt)
                 search_query = response.text.strip()
                 
             except Exception as e:
@@ -410,7 +540,7 @@ Return ONLY the new query, nothing else."""
         
         Args:
             search_query: GitHub search (e.g., "topic:file-manager stars:>5000")
-            limit: Max repos to analyze
+            limit: Max repos to analyze (already-analyzed repos do not count)
             validate: Whether to validate and refine query first
             min_results: Minimum results required if validating
             domain: Domain name for trajectory logging
@@ -423,6 +553,10 @@ Return ONLY the new query, nothing else."""
         if self.trajectory_logger:
             self.trajectory_logger.start_extraction(domain, search_query, limit)
         
+        # Snapshots are shared within a run; the on-disk layer revalidates across runs
+        if self.snapshot_cache:
+            self.snapshot_cache.clear_memory()
+        
         # Validate query first
         if validate:
             status, search_query, result_count = self.validate_and_refine_query(search_query, min_results)
@@ -430,12 +564,10 @@ Return ONLY the new query, nothing else."""
                 print(f"[WARNING] Query still only returns {result_count} results, proceeding anyway...")
         
         print(f"Searching GitHub: {search_query}")
-        repos = list(self.github.search_repositories(query=search_query))[:limit]
-        print(f"Found {len(repos)} repos")
         
         patterns = []
         extraction_stats = {
-            'total': len(repos),
+            'total': 0,
             'successful': 0,
             'partial': 0,
             'failed': 0,
@@ -443,269 +575,429 @@ Return ONLY the new query, nothing else."""
             'errors': []
         }
         
-        for i, repo in enumerate(repos, 1):
-            print(f"\n[{i}/{len(repos)}] Analyzing {repo.full_name}...")
-            
-            # Check if repository already analyzed
-            existing = self._check_if_repo_exists(repo.html_url)
-            if existing and not force_reanalyse:
-                # Handle null extracted_at
-                date_str = existing['extracted_at'].strftime('%Y-%m-%d') if existing.get('extracted_at') else 'unknown date'
-                print(f"  [SKIP] Already analyzed on {date_str}")
-                print(f"         Quality: {existing.get('quality_score', 0):.2f}, Stars: {existing.get('stars', 0)}")
-                extraction_stats['skipped'] += 1
-                
-                # Log trajectory skip
-                if self.trajectory_logger:
-                    self.trajectory_logger.log_repository_skipped(
-                        repo.full_name, 
-                        existing.get('extracted_at'),
-                        existing.get('quality_score', 0)
-                    )
-                continue
-            
-            # Start repository trajectory
-            if self.trajectory_logger:
-                self.trajectory_logger.start_repository(repo.full_name, repo.html_url, repo.stargazers_count)
+        # Search pages are read lazily and known repos filtered per page; pagination
+        # stops at `limit`, and the list gives progress its real denominator
+        with self._existing_lock:
+            self._existing_repos = {}
+        candidates = list(self._iter_candidate_repos(search_query, limit, extraction_stats, force_reanalyse))
+        total = len(candidates)
+        
+        if self.max_workers > 1:
+            # Bounded worker pool: repos overlap their network waits while the
+            # shared rate limiters keep the overall API budget unchanged.
+            print(f"Processing with up to {self.max_workers} parallel workers")
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="extract") as executor:
+                futures = [
+                    executor.submit(self._process_repository, repo, i, total,
+                                    extraction_stats, force_reanalyse)
+                    for i, repo in enumerate(candidates, 1)
+                ]
+                # Collect in search order so results match the sequential path
+                for future in futures:
+                    pattern = future.result()
+                    if pattern:
+                        patterns.append(pattern)
+        else:
+            for i, repo in enumerate(candidates, 1):
+                pattern = self._process_repository(repo, i, total, extraction_stats, force_reanalyse)
+                if pattern:
+                    patterns.append(pattern)
+        
+        # Make this run's patterns durable before reporting (validation results follow on close)
+        if self.neo4j_writer:
+            try:
+                self.neo4j_writer.flush()
+            except DatabaseWriteError as e:
+                # Failed rows stay buffered; close() retries them and the summary reports them
+                logger.error(f"Failed to flush extracted patterns: {e}")
+        
+        # Print extraction statistics
+        self._print_extraction_stats(extraction_stats)
+        
+        # Finish trajectory logging
+        if self.trajectory_logger:
+            trajectory_file = self.trajectory_logger.finish_extraction()
+            print(f"\nTrajectory saved: {trajectory_file}")
+        
+        return patterns
+        
+    def _iter_candidate_repos(self, search_query, limit, extraction_stats, force_reanalyse=False):
+        """
+        Lazily stream search results that still need analysis.
+        
+        Search pages are requested only as they are consumed. Each page is
+        checked against Neo4j in one batched query, so already-analyzed repos
+        cost no GitHub or LLM work and pagination stops once `limit` repos
+        have been yielded.
+        
+        Args:
+            search_query: GitHub search query
+            limit: Max repos to yield (skipped repos do not count)
+            extraction_stats: Run statistics dict ('total' and 'skipped' are updated)
+            force_reanalyse: Yield repos even if already analyzed
+        
+        Yields:
+            PyGithub Repository objects, in search order
+        """
+        if limit <= 0:
+            return
+        
+        results = iter(self.github.search_repositories(query=search_query))
+        yielded = 0
+        while True:
+            # Each page is one search API call: pace it against the 30/min search quota
+            if self.github_quota:
+                self.github_quota.acquire('search')
+            page = list(islice(results, SEARCH_PAGE_SIZE))
+            if self.github_quota:
+                self.github_quota.observe_github(self.github, 'search')
+            if not page:
+                return
             
-            # Track what data we successfully fetch
-            data_availability = {
-                'readme': False,
-                'structure': False,
-                'dependencies': False,
-                'quality_metrics': False
-            }
+            existing = {}
+            if not force_reanalyse:
+                try:
+                    existing = self._check_repos_exist([repo.html_url for repo in page])
+                except Exception as precheck_error:
+                    logger.warning(f"Batch existence check failed, checking per repo: {precheck_error}")
             
-            try:
-                # Calculate quality metrics (non-critical) - default to mid-range on 0-100 scale
-                quality_metrics = {'composite_score': 50.0, 'freshness_score': 50.0, 'maintenance_score': 50.0}
-                if self.quality_calculator:
-                    try:
-                        quality_metrics = self.quality_calculator.calculate_quality_score(repo)
-                        data_availability['quality_metrics'] = True
-                        print(f"  Quality: {quality_metrics['composite_score']:.2f} "
-                              f"({self.quality_calculator.get_quality_tier(quality_metrics['composite_score'])})")
-                        
-                        # Log quality metrics
-                        if self.trajectory_logger:
-                            self.trajectory_logger.log_quality_metrics(
-                                repo.full_name,
-                                quality_metrics['composite_score'],
-                                quality_metrics['freshness_score'],
-                                quality_metrics['maintenance_score']
-                            )
-                    except Exception as qm_error:
-                        logger.warning(f"Quality metrics calculation failed: {qm_error}")
+            for repo in page:
+                self._record_outcome(extraction_stats, 'total')
+                if repo.html_url in existing:
+                    self._report_skip(repo, existing[repo.html_url], extraction_stats)
+                    continue
                 
-                # Fetch repo data with graceful degradation
-                readme = "No README available"
+                yield repo
+                yielded += 1
+                if yielded >= limit:
+                    return
+    
+    def _process_repository(self, repo, position, total, extraction_stats, force_reanalyse=False):
+        """
+        Run the full extraction path for one repository.
+        
+        Safe to call from extraction worker threads: outcome counts go through
+        _record_outcome, trajectory events are recorded against this repo, and
+        the repo's console lines are printed as one block when it finishes so
+        parallel workers do not interleave them.
+        
+        Args:
+            repo: PyGithub Repository object
+            position: 1-based position of the repo among this run's candidates
+            total: Number of candidate repos in this extraction run
+            extraction_stats: Shared statistics dict for the run
+            force_reanalyse: Whether to re-analyze repositories already processed
+        
+        Returns:
+            Extracted pattern dict, or None if skipped or failed
+        """
+        output = [f"\n[{position}/{total}] Analyzing {repo.full_name}..."]
+        try:
+            return self._analyze_repository(repo, extraction_stats, force_reanalyse, output)
+        finally:
+            self._print_block(output)
+    
+    def _analyze_repository(self, repo, extraction_stats, force_reanalyse, output):
+        """
+        Extraction path behind _process_repository.
+        
+        Args:
+            repo: PyGithub Repository object
+            extraction_stats: Shared statistics dict for the run
+            force_reanalyse: Whether to re-analyze repositories already processed
+            output: Console lines for this repo (appended to, printed by the caller)
+        
+        Returns:
+            Extracted pattern dict, or None if skipped or failed
+        """
+        # Check if repository already analyzed (answered from the run cache after the batch precheck)
+        existing = None if force_reanalyse else self._check_if_repo_exists(repo.html_url)
+        if existing:
+            self._report_skip(repo, existing, extraction_stats, output)
+            return None
+        
+        # Start repository trajectory
+        if self.trajectory_logger:
+            self.trajectory_logger.start_repository(repo.full_name, repo.html_url, repo.stargazers_count)
+        
+        # Track what data we successfully fetch
+        data_availability = {
+            'readme': False,
+            'structure': False,
+            'dependencies': False,
+            'quality_metrics': False
+        }
+        
+        try:
+            # Fetch README, tree and dependencies in one concurrent round (None = per-call fallback)
+            snapshot = self._fetch_snapshot(repo, include_rule_files=False)
+            
+            # Calculate quality metrics (non-critical) - default to mid-range on 0-100 scale
+            quality_metrics = {'composite_score': 50.0, 'freshness_score': 50.0, 'maintenance_score': 50.0}
+            if self.quality_calculator:
                 try:
-                    start_time = time.time()
-                    readme = self._fetch_readme(repo)
-                    response_time = time.time() - start_time
-                    data_availability['readme'] = readme != "No README found"
-                    if data_availability['readme']:
-                        print(f"  README: {len(readme)} chars")
-                    
-                    # Log GitHub API call
-                    if self.trajectory_logger:
-                        self.trajectory_logger.log_github_api_call(
-                            "fetch_readme", repo.full_name, data_availability['readme'], response_time
-                        )
-                except Exception as readme_error:
-                    logger.warning(f"README fetch failed: {readme_error}")
-                    print(f"  [WARN] README unavailable, continuing...")
+                    quality_metrics = self.quality_calculator.calculate_quality_score(repo, snapshot)
+                    data_availability['quality_metrics'] = True
+                    output.append(f"  Quality: {quality_metrics['composite_score']:.2f} "
+                                  f"({self.quality_calculator.get_quality_tier(quality_metrics['composite_score'])})")
                     
-                    # Log failed API call
+                    # Log quality metrics
                     if self.trajectory_logger:
-                        self.trajectory_logger.log_github_api_call(
-                            "fetch_readme", repo.full_name, False, 0, str(readme_error)
+                        self.trajectory_logger.log_quality_metrics(
+                            repo.full_name,
+                            quality_metrics['composite_score'],
+                            quality_metrics['freshness_score'],
+                            quality_metrics['maintenance_score']
                         )
+                except Exception as qm_error:
+                    logger.warning(f"Quality metrics calculation failed: {qm_error}")
+            
+            # Fetch repo data with graceful degradation
+            readme = "No README available"
+            try:
+                start_time = time.time()
+                readme = self._fetch_readme(repo, snapshot)
+                response_time = time.time() - start_time
+                data_availability['readme'] = readme != "No README found"
+                if data_availability['readme']:
+                    output.append(f"  README: {len(readme)} chars")
                 
-                structure = {"directories": []}
-                try:
-                    start_time = time.time()
-                    structure = self._analyze_structure(repo)
-                    response_time = time.time() - start_time
-                    data_availability['structure'] = len(structure.get('directories', [])) > 0
-                    if data_availability['structure']:
-                        print(f"  Structure: {len(structure['directories'])} directories")
-                    
-                    # Log GitHub API call
-                    if self.trajectory_logger:
-                        self.trajectory_logger.log_github_api_call(
-                            "analyze_structure", repo.full_name, data_availability['structure'], response_time
-                        )
-                except Exception as struct_error:
-                    logger.warning(f"Structure analysis failed: {struct_error}")
-                    print(f"  [WARN] Structure analysis unavailable, continuing...")
-                    
-                    # Log failed API call
-                    if self.trajectory_logger:
-                        self.trajectory_logger.log_github_api_call(
-                            "analyze_structure", repo.full_name, False, 0, str(struct_error)
-                        )
+                # Log GitHub API call
+                if self.trajectory_logger:
+                    self.trajectory_logger.log_github_api_call(
+                        "fetch_readme", repo.full_name, data_availability['readme'], response_time
+                    )
+            except Exception as readme_error:
+                logger.warning(f"README fetch failed: {readme_error}")
+                output.append(f"  [WARN] README unavailable, continuing...")
                 
-                deps = {}
-                try:
-                    deps = self._fetch_dependencies(repo)
-                    data_availability['dependencies'] = bool(deps)
-                    if data_availability['dependencies']:
-                        print(f"  Dependencies: found")
-                except Exception as deps_error:
-                    logger.warning(f"Dependencies fetch failed: {deps_error}")
+                # Log failed API call
+                if self.trajectory_logger:
+                    self.trajectory_logger.log_github_api_call(
+                        "fetch_readme", repo.full_name, False, 0, str(readme_error)
+                    )
+            
+            structure = {"directories": []}
+            try:
+                start_time = time.time()
+                structure = self._analyze_structure(repo, snapshot)
+                response_time = time.time() - start_time
+                data_availability['structure'] = len(structure.get('directories', [])) > 0
+                if data_availability['structure']:
+                    output.append(f"  Structure: {len(structure['directories'])} directories")
                 
-                # Check if we have enough data for LLM extraction
-                has_readme = data_availability['readme']
-                has_structure = data_availability['structure']
+                # Log GitHub API call
+                if self.trajectory_logger:
+                    self.trajectory_logger.log_github_api_call(
+                        "analyze_structure", repo.full_name, data_availability['structure'], response_time
+                    )
+            except Exception as struct_error:
+                logger.warning(f"Structure analysis failed: {struct_error}")
+                output.append(f"  [WARN] Structure analysis unavailable, continuing...")
                 
-                if not has_readme and not has_structure:
-                    print(f"  [SKIP] Insufficient data (no README or structure)")
-                    extraction_stats['failed'] += 1
-                    extraction_stats['errors'].append({
-                        'repo': repo.full_name,
-                        'reason': 'No README or structure data available'
-                    })
-                    continue
+                # Log failed API call
+                if self.trajectory_logger:
+                    self.trajectory_logger.log_github_api_call(
+                        "analyze_structure", repo.full_name, False, 0, str(struct_error)
+                    )
+            
+            deps = {}
+            try:
+                deps = self._fetch_dependencies(repo, snapshot)
+                data_availability['dependencies'] = bool(deps)
+                if data_availability['dependencies']:
+                    output.append(f"  Dependencies: found")
+            except Exception as deps_error:
+                logger.warning(f"Dependencies fetch failed: {deps_error}")
+            
+            # Check if we have enough data for LLM extraction
+            has_readme = data_availability['readme']
+            has_structure = data_availability['structure']
+            
+            if not has_readme and not has_structure:
+                output.append(f"  [SKIP] Insufficient data (no README or structure)")
+                self._record_outcome(extraction_stats, 'failed', repo.full_name,
+                                     'No README or structure data available')
+                return None
+            
+            # LLM analysis (critical - must succeed)
+            try:
+                start_time = time.time()
+                pattern = self._extract_with_llm(
+                    repo_name=repo.full_name,
+                    repo_url=repo.html_url,
+                    stars=repo.stargazers_count,
+                    readme=readme,
+                    structure=structure,
+                    dependencies=deps
+                )
+                response_time = time.time() - start_time
                 
-                # LLM analysis (critical - must succeed)
-                try:
-                    start_time = time.time()
-                    pattern = self._extract_with_llm(
-                        repo_name=repo.full_name,
-                        repo_url=repo.html_url,
-                        stars=repo.stargazers_count,
-                        readme=readme,
-                        structure=structure,
-                        dependencies=deps
+                # Log LLM extraction
+                if self.trajectory_logger:
+                    self.trajectory_logger.log_llm_extraction(
+                        repo.full_name, True, response_time,
+                        pattern.get('pattern_name'), pattern.get('confidence')
                     )
-                    response_time = time.time() - start_time
-                    
-                    # Log LLM extraction
-                    if self.trajectory_logger:
-                        self.trajectory_logger.log_llm_extraction(
-                            repo.full_name, True, response_time,
-                            pattern.get('pattern_name'), pattern.get('confidence')
-                        )
-                except Exception as llm_error:
-                    response_time = time.time() - start_time if 'start_time' in locals() else 0
-                    print(f"  [ERROR] LLM extraction failed: {llm_error}")
-                    extraction_stats['failed'] += 1
-                    extraction_stats['errors'].append({
-                        'repo': repo.full_name,
-                        'reason': f'LLM extraction error: {str(llm_error)[:100]}'
-                    })
-                    
-                    # Log failed LLM extraction
-                    if self.trajectory_logger:
-                        self.trajectory_logger.log_llm_extraction(
-                            repo.full_name, False, response_time, error=str(llm_error)
-                        )
-                        self.trajectory_logger.finish_repository("failed")
-                    
-                    continue
+            except Exception as llm_error:
+                response_time = time.time() - start_time if 'start_time' in locals() else 0
+                output.append(f"  [ERROR] LLM extraction failed: {llm_error}")
+                self._record_outcome(extraction_stats, 'failed', repo.full_name,
+                                     f'LLM extraction error: {str(llm_error)[:100]}')
+                
+                # Log failed LLM extraction
+                if self.trajectory_logger:
+                    self.trajectory_logger.log_llm_extraction(
+                        repo.full_name, False, response_time, error=str(llm_error)
+                    )
+                    self.trajectory_logger.finish_repository("failed")
                 
-                # Add quality metrics to pattern
-                pattern['quality_score'] = quality_metrics['composite_score']
-                pattern['freshness_score'] = quality_metrics['freshness_score']
-                pattern['maintenance_score'] = quality_metrics['maintenance_score']
+                return None
+            
+            # Add quality metrics to pattern
+            pattern['quality_score'] = quality_metrics['composite_score']
+            pattern['freshness_score'] = quality_metrics['freshness_score']
+            pattern['maintenance_score'] = quality_metrics['maintenance_score']
+            
+            # Add extraction metadata
+            pattern['extraction_status'] = 'partial' if not all(data_availability.values()) else 'complete'
+            pattern['data_availability'] = data_availability
+            
+            # Store in graph (critical - must succeed)
+            try:
+                start_time = time.time()
+                # Queued rows are only stored by a later flush (see _print_extraction_stats)
+                stored = "queued" if self._store_pattern(pattern) is None else "stored"
+                self._remember_existing(repo.html_url, pattern)
+                response_time = time.time() - start_time
                 
-                # Add extraction metadata
-                pattern['extraction_status'] = 'partial' if not all(data_availability.values()) else 'complete'
-                pattern['data_availability'] = data_availability
+                # Log Neo4j storage
+                if self.trajectory_logger:
+                    self.trajectory_logger.log_neo4j_storage(
+                        pattern['pattern_name'], True, response_time
+                    )
                 
-                # Store in graph (critical - must succeed)
-                try:
-                    start_time = time.time()
-                    self._store_pattern(pattern)
-                    response_time = time.time() - start_time
-                    patterns.append(pattern)
-                    
-                    # Log Neo4j storage
+                # Track success type
+                if pattern['extraction_status'] == 'complete':
+                    self._record_outcome(extraction_stats, 'successful')
+                    output.append(f"  [OK] Pattern: {pattern['pattern_name']} (complete data, {stored})")
                     if self.trajectory_logger:
-                        self.trajectory_logger.log_neo4j_storage(
-                            pattern['pattern_name'], True, response_time
-                        )
-                    
-                    # Track success type
-                    if pattern['extraction_status'] == 'complete':
-                        extraction_stats['successful'] += 1
-                        print(f"  [OK] Pattern: {pattern['pattern_name']} (complete data)")
-                        if self.trajectory_logger:
-                            self.trajectory_logger.finish_repository("successful")
-                    else:
-                        extraction_stats['partial'] += 1
-                        missing = [k for k, v in data_availability.items() if not v]
-                        print(f"  [OK] Pattern: {pattern['pattern_name']} (partial - missing: {', '.join(missing)})")
-                        if self.trajectory_logger:
-                            self.trajectory_logger.finish_repository("partial")
-                    
-                    # Prepare repository context for judge
-                    repo_context = {
-                        'description': repo.description or '',
-                        'readme': readme[:1000] if readme != "No README available" else '',
-                        'stars': repo.stargazers_count,
-                        'language': repo.language or 'Unknown'
-                    }
-                    
-                    # Trigger async validation and judge evaluation (non-blocking)
-                    self._validate_pattern_async(pattern, repo_context)
-                    
-                    # Notify callback if provided
-                    if self.progress_callback:
-                        self.progress_callback(pattern)
-                        
-                except Exception as store_error:
-                    response_time = time.time() - start_time if 'start_time' in locals() else 0
-                    print(f"  [ERROR] Failed to store pattern: {store_error}")
-                    extraction_stats['failed'] += 1
-                    extraction_stats['errors'].append({
-                        'repo': repo.full_name,
-                        'reason': f'Storage error: {str(store_error)[:100]}'
-                    })
-                    
-                    # Log failed storage
+                        self.trajectory_logger.finish_repository("successful")
+                else:
+                    self._record_outcome(extraction_stats, 'partial')
+                    missing = [k for k, v in data_availability.items() if not v]
+                    output.append(f"  [OK] Pattern: {pattern['pattern_name']} "
+                                  f"(partial - missing: {', '.join(missing)}, {stored})")
                     if self.trajectory_logger:
-                        self.trajectory_logger.log_neo4j_storage(
-                            pattern.get('pattern_name', 'unknown'), False, response_time, str(store_error)
-                        )
-                        self.trajectory_logger.finish_repository("failed")
-                    
-                    continue
+                        self.trajectory_logger.finish_repository("partial")
                 
-            except Exception as e:
-                print(f"  [ERROR] Unexpected error: {type(e).__name__}: {e}")
-                logger.error(f"Unexpected error processing {repo.full_name}", exc_info=True)
-                extraction_stats['failed'] += 1
-                extraction_stats['errors'].append({
-                    'repo': repo.full_name,
-                    'reason': f'Unexpected error: {str(e)[:100]}'
-                })
+                # Prepare repository context for judge
+                repo_context = {
+                    'description': repo.description or '',
+                    'readme': readme[:1000] if readme != "No README available" else '',
+                    'stars': repo.stargazers_count,
+                    'language': repo.language or 'Unknown'
+                }
+                
+                # Trigger async validation and judge evaluation (non-blocking)
+                self._validate_pattern_async(pattern, repo_context)
+                
+                # Notify callback if provided
+                if self.progress_callback:
+                    self.progress_callback(pattern)
+                
+                return pattern
+            
+            except Exception as store_error:
+                response_time = time.time() - start_time if 'start_time' in locals() else 0
+                output.append(f"  [ERROR] Failed to store pattern: {store_error}")
+                self._record_outcome(extraction_stats, 'failed', repo.full_name,
+                                     f'Storage error: {str(store_error)[:100]}')
                 
-                # Log failed repository
+                # Log failed storage
                 if self.trajectory_logger:
+                    self.trajectory_logger.log_neo4j_storage(
+                        pattern.get('pattern_name', 'unknown'), False, response_time, str(store_error)
+                    )
                     self.trajectory_logger.finish_repository("failed")
                 
-                continue
+                return None
         
-        # Print extraction statistics
-        self._print_extraction_stats(extraction_stats)
+        except Exception as e:
+            output.append(f"  [ERROR] Unexpected error: {type(e).__name__}: {e}")
+            logger.error(f"Unexpected error processing {repo.full_name}", exc_info=True)
+            self._record_outcome(extraction_stats, 'failed', repo.full_name,
+                                 f'Unexpected error: {str(e)[:100]}')
+            
+            # Log failed repository
+            if self.trajectory_logger:
+                self.trajectory_logger.finish_repository("failed")
+            
+            return None
+
+
+    def _report_skip(self, repo, existing, extraction_stats, output=None):
+        """
+        Report and count a repository skipped because it was already analyzed.
         
-        # Finish trajectory logging
+        Args:
+            repo: PyGithub Repository object
+            existing: Pattern details from _check_repos_exist
+            extraction_stats: Run statistics dict
+            output: Console lines of the repo being processed to append to
+                (None prints the report, with the repository name, as its own block)
+        """
+        lines = output if output is not None else [f"\n{repo.full_name}"]
+        # Handle null extracted_at
+        date_str = existing['extracted_at'].strftime('%Y-%m-%d') if existing.get('extracted_at') else 'unknown date'
+        lines.append(f"  [SKIP] Already analyzed on {date_str}")
+        lines.append(f"         Quality: {existing.get('quality_score') or 0:.2f}, Stars: {existing.get('stars') or 0}")
+        if output is None:
+            self._print_block(lines)
+        self._record_outcome(extraction_stats, 'skipped')
+        
+        # Log trajectory skip
         if self.trajectory_logger:
-            trajectory_file = self.trajectory_logger.finish_extraction()
-            print(f"\nTrajectory saved: {trajectory_file}")
-        
-        return patterns
+            self.trajectory_logger.log_repository_skipped(
+                repo.full_name, 
+                existing.get('extracted_at'),
+                existing.get('quality_score', 0)
+            )
+    
+    @staticmethod
+    def _print_block(lines):
+        """Print lines in a single write, so concurrent workers' blocks stay whole."""
+        if lines:
+            print('\n'.join(lines) + '\n', end='', flush=True)
+    
+    def _record_outcome(self, extraction_stats, outcome, repo_name=None, reason=None):
+        """
+        Record a repository outcome in the shared extraction statistics.
         
+        Args:
+            extraction_stats: Statistics dict from extract_patterns
+            outcome: 'total' (repo considered), 'successful', 'partial', 'failed' or 'skipped'
+            repo_name: Repository name (recorded with failures)
+            reason: Failure reason (recorded with failures)
+        """
+        with self._stats_lock:
+            extraction_stats[outcome] += 1
+            if reason:
+                extraction_stats['errors'].append({
+                    'repo': repo_name,
+                    'reason': reason
+                })
+    
     def _print_extraction_stats(self, stats):
         """Print detailed extraction statistics."""
         print("\n" + "="*60)
         print("EXTRACTION STATISTICS")
         print("="*60)
+        # With the write-behind buffer, extracted patterns are counted when queued
+        queued = ", queued for Neo4j" if self.neo4j_writer else ""
         print(f"Total repositories processed: {stats['total']}")
-        print(f"  Successful (complete data): {stats['successful']}")
-        print(f"  Partial (missing some data): {stats['partial']}")
+        print(f"  Successful (complete data{queued}): {stats['successful']}")
+        print(f"  Partial (missing some data{queued}): {stats['partial']}")
         print(f"  Failed: {stats['failed']}")
         print(f"  Skipped (duplicates): {stats['skipped']}")
         
@@ -724,11 +1016,59 @@ Return ONLY the new query, nothing else."""
             if len(stats['errors']) > 10:
                 print(f"  ... and {len(stats['errors']) - 10} more")
         
+        if self.snapshot_cache:
+            cache_stats = self.snapshot_cache.get_stats()
+            print(f"\nSnapshot cache: {cache_stats['revalidated']} unchanged (reused), "
+                  f"{cache_stats['misses']} fetched, {cache_stats['memory_hits']} in-run hits")
+        
+        if self.llm_cache:
+            llm_stats = self.llm_cache.get_stats()
+            print(f"LLM response cache: {llm_stats['hits']} hits, {llm_stats['misses']} misses "
+                  f"({llm_stats['hit_rate']:.0%} hit rate, {llm_stats['entries']} entries)")
+        
+        if self.neo4j_writer:
+            write_stats = self.neo4j_writer.get_stats()
+            print(f"Neo4j writes: {write_stats['rows_written']['pattern']} patterns stored, "
+                  f"{sum(write_stats['rows_written'].values())} rows written, "
+                  f"{write_stats['rows_failed']} failed attempts")
+            if write_stats['pending']:
+                print(f"[WARNING] {write_stats['pending']} row(s) not yet stored in Neo4j "
+                      f"(retried on close; patterns above may be missing from the graph)")
+        
         print("="*60)
     
+    def _fetch_snapshot(self, repo, include_rule_files=True):
+        """
+        Fetch a RepoSnapshot through the concurrent fetch layer.
+        
+        Args:
+            repo: PyGithub Repository object
+            include_rule_files: Also download IDE rule files found in the tree
+        
+        Returns:
+            RepoSnapshot, or None when github.async_fetch is disabled or failed
+            (callers then fall back to per-call PyGithub fetches)
+        """
+        if not self.github_fetcher:
+            return None
+        
+        try:
+            snapshot = self.github_fetcher.fetch_snapshot(repo, include_rule_files=include_rule_files)
+            logger.debug(f"Snapshot for {repo.full_name}: {snapshot.api_calls} API calls "
+                         f"in {snapshot.fetch_time_seconds:.2f}s")
+            if snapshot.errors:
+                logger.warning(f"Partial snapshot for {repo.full_name}: {snapshot.errors}")
+            return snapshot
+        except Exception as e:
+            logger.warning(f"Concurrent fetch failed for {repo.full_name}, falling back to per-call fetches: {e}")
+            return None
+    
     @github_retry
-    def _fetch_readme(self, repo):
+    def _fetch_readme(self, repo, snapshot=None):
         """Fetch README content with retry logic for rate limits."""
+        if snapshot is not None and 'readme' not in snapshot.errors:
+            return snapshot.readme or "No README found"
+        
         try:
             logger.debug(f"Fetching README for {repo.full_name}")
             readme = repo.get_readme()
@@ -744,8 +1084,11 @@ Return ONLY the new query, nothing else."""
             return "No README found"
     
     @github_retry
-    def _analyze_structure(self, repo):
+    def _analyze_structure(self, repo, snapshot=None):
         """Analyze repo file structure with retry logic."""
+        if snapshot is not None and 'tree' not in snapshot.errors:
+            return {"directories": snapshot.root_directories[:20]}  # Top 20 dirs
+        
         try:
             logger.debug(f"Analyzing structure for {repo.full_name}")
             contents = repo.get_contents("")
@@ -760,8 +1103,11 @@ Return ONLY the new query, nothing else."""
             logger.error(f"Unexpected error analyzing structure for {repo.full_name}: {e}")
             return {"directories": []}
     
-    def _fetch_dependencies(self, repo):
+    def _fetch_dependencies(self, repo, snapshot=None):
         """Fetch package.json or requirements.txt."""
+        if snapshot is not None:
+            return snapshot.dependencies
+        
         try:
             # Try package.json (Node.js)
             pkg = repo.get_contents("package.json")
@@ -776,7 +1122,7 @@ Return ONLY the new query, nothing else."""
         except:
             return {}
     
-    def _scan_for_rule_files(self, repo):
+    def _scan_for_rule_files(self, repo, snapshot=None):
         """
         Scan repository for IDE rule files.
         
@@ -788,12 +1134,19 @@ Return ONLY the new query, nothing else."""
         - AI_INSTRUCTIONS.md / AI_GUIDELINES.md
         - .github/copilot-instructions.md
         
+        Args:
+            repo: PyGithub Repository object
+            snapshot: Optional RepoSnapshot whose rule files were already fetched
+        
         Returns:
             list: List of dicts with {'path': str, 'content': str, 'format': str}
         """
         if not IDE_RULE_LIBRARY_AVAILABLE:
             return []
         
+        if snapshot is not None:
+            return list(snapshot.rule_files)
+        
         rule_files = []
         rule_patterns = [
             '.cursorrules',
@@ -832,7 +1185,7 @@ Return ONLY the new query, nothing else."""
         
         return rule_files
     
-    def _extract_and_link_rules(self, pattern, repo, rule_files):
+    def _extract_and_link_rules(self, pattern, repo, rule_files, snapshot=None):
         """
         Extract IDE rules and link them to the pattern.
         
@@ -840,35 +1193,39 @@ Return ONLY the new query, nothing else."""
             pattern: The pattern dict with pattern_name
             repo: PyGithub Repository object
             rule_files: List of rule file dicts from _scan_for_rule_files
+            snapshot: Optional RepoSnapshot providing contributors and file list
         """
         if not IDE_RULE_LIBRARY_AVAILABLE or not self.rule_extractor:
             return
         
         # Prepare repo metadata for quality scoring
         from ide_rule_library.quality_scorer import enhance_repo_metadata
-        repo_data = {
-            'name': repo.full_name,
-            'stars': repo.stargazers_count,
-            'forks': repo.forks_count,
-            'created_at': repo.created_at,
-            'updated_at': repo.updated_at,
-            'open_issues': repo.open_issues_count,
-            'html_url': repo.html_url
-        }
-        
-        # Get contributors (with error handling)
-        try:
-            contributors = [c.login for c in repo.get_contributors()[:50]]  # Limit to 50
-            repo_data['contributors'] = contributors
-        except:
-            repo_data['contributors'] = []
-        
-        # Get file list for production signals
-        try:
-            contents = repo.get_contents("")
-            repo_data['files'] = [f.path for f in contents if not f.type == "dir"]
-        except:
-            repo_data['files'] = []
+        if snapshot is not None:
+            repo_data = snapshot.to_repo_data()
+        else:
+            repo_data = {
+                'name': repo.full_name,
+                'stars': repo.stargazers_count,
+                'forks': repo.forks_count,
+                'created_at': repo.created_at,
+                'updated_at': repo.updated_at,
+                'open_issues': repo.open_issues_count,
+                'html_url': repo.html_url
+            }
+            
+            # Get contributors (with error handling)
+            try:
+                contributors = [c.login for c in repo.get_contributors()[:50]]  # Limit to 50
+                repo_data['contributors'] = contributors
+            except:
+                repo_data['contributors'] = []
+            
+            # Get file list for production signals
+            try:
+                contents = repo.get_contents("")
+                repo_data['files'] = [f.path for f in contents if not f.type == "dir"]
+            except:
+                repo_data['files'] = []
         
         # Enhance with quality scoring
         enhanced_repo = enhance_repo_metadata(repo_data)
@@ -979,80 +1336,65 @@ Return ONLY the new query, nothing else."""
             pattern_name: Name of the pattern
             source_repo: Repository URL
             rule: Rule dict from EnhancedRuleExtractor
+        
+        Queued on the write-behind buffer when enabled (flushed after the
+        pattern it links to).
+        """
+        row = {
+            'pattern_name': pattern_name,
+            'source_repo': source_repo,
+            'rule_id': f"{source_repo}:{rule['file_path']}",
+            'file_path': rule['file_path'],
+            'file_format': rule.get('file_format', 'unknown'),
+            'content': rule.get('content', ''),
+            'purpose': rule.get('purpose', ''),
+            'categories': rule.get('categories', []),
+            'key_practices': rule.get('key_practices', []),
+            'technologies': rule.get('technologies', []),
+            'project_types': rule.get('project_types', []),
+            'ide_types': rule.get('ide_types', ['cursor']),
+            'repo_quality_score': rule.get('repo_quality_score', 0),
+            'confidence_level': rule.get('confidence_level', 3),
+            'quality_breakdown_json': json.dumps(rule.get('quality_breakdown', {})),
+            'has_ci_cd': rule.get('has_ci_cd', False),
+            'has_tests': rule.get('has_tests', False)
+        }
+        
+        written = self._write('rule', row)
+        if written is None:
+            logger.debug(f"Queued rule {row['rule_id']} for pattern {pattern_name}")
+        elif written:
+            logger.info(f"Linked rule {row['rule_id']} to pattern {pattern_name}")
+        else:
+            logger.warning(f"Failed to link rule to pattern {pattern_name}")
+    
+    def _write(self, kind, row):
+        """
+        Write one row through the write-behind buffer, or immediately if disabled.
+        
+        Args:
+            kind: 'pattern', 'rule', 'validation' or 'judge' (see neo4j_batch_writer)
+            row: Query parameters for the row
+        
+        Returns:
+            None if queued, otherwise the number of rows matched/written
         """
+        if self.neo4j_writer:
+            self.neo4j_writer.add(kind, row)
+            return None
+        
         with self.neo4j.session() as session:
-            # Create IDERule node and link to Pattern
-            query = """
-            // Find the Pattern node
-            MATCH (p:Pattern {name: $pattern_name, source_repo: $source_repo})
-            
-            // Create or merge IDERule node
-            MERGE (r:IDERule {id: $rule_id})
-            ON CREATE SET
-                r.source_repo = $source_repo,
-                r.file_path = $file_path,
-                r.file_format = $file_format,
-                r.content = $content,
-                r.purpose = $purpose,
-                r.categories = $categories,
-                r.key_practices = $key_practices,
-                r.technologies = $technologies,
-                r.project_types = $project_types,
-                r.ide_types = $ide_types,
-                r.repo_quality_score = $repo_quality_score,
-                r.confidence_level = $confidence_level,
-                r.quality_breakdown_json = $quality_breakdown_json,
-                r.has_ci_cd = $has_ci_cd,
-                r.has_tests = $has_tests,
-                r.extracted_date = datetime()
-            ON MATCH SET
-                r.content = $content,
-                r.purpose = $purpose,
-                r.categories = $categories,
-                r.key_practices = $key_practices,
-                r.technologies = $technologies,
-                r.project_types = $project_types,
-                r.repo_quality_score = $repo_quality_score,
-                r.confidence_level = $confidence_level,
-                r.quality_breakdown_json = $quality_breakdown_json,
-                r.extracted_date = datetime()
-            
-            // Create relationship
-            MERGE (p)-[:HAS_IDE_RULES]->(r)
-            
-            RETURN r.id as rule_id
-            """
-            
-            # Prepare parameters
-            import json
-            params = {
-                'pattern_name': pattern_name,
-                'source_repo': source_repo,
-                'rule_id': f"{source_repo}:{rule['file_path']}",
-                'file_path': rule['file_path'],
-                'file_format': rule.get('file_format', 'unknown'),
-                'content': rule.get('content', ''),
-                'purpose': rule.get('purpose', ''),
-                'categories': rule.get('categories', []),
-                'key_practices': rule.get('key_practices', []),
-                'technologies': rule.get('technologies', []),
-                'project_types': rule.get('project_types', []),
-                'ide_types': rule.get('ide_types', ['cursor']),
-                'repo_quality_score': rule.get('repo_quality_score', 0),
-                'confidence_level': rule.get('confidence_level', 3),
-                'quality_breakdown_json': json.dumps(rule.get('quality_breakdown', {})),
-                'has_ci_cd': rule.get('has_ci_cd', False),
-                'has_tests': rule.get('has_tests', False)
-            }
-            
-            result = session.run(query, params)
+            result = session.run(WRITE_QUERIES[kind], rows=[row])
             record = result.single()
             result.consume()  # Close the stream to prevent resource leaks
-            
-            if record:
-                logger.info(f"Linked rule {record['rule_id']} to pattern {pattern_name}")
-            else:
-                logger.warning(f"Failed to link rule to pattern {pattern_name}")
+        return record.get('written', 0) if record else 0
+    
+    def _generate_content(self, prompt):
+        """Call Gemini through the shared rate limiter, so parallel workers share one budget."""
+        wait_time = self.gemini_rate_limiter.wait_if_needed()
+        if wait_time > 0:
+            logger.info(f"Rate limited: waited {wait_time:.2f}s before Gemini call")
+        return self.llm.generate_content(prompt)
     
     @llm_retry
     def _extract_with_llm(self, **kwargs):
@@ -1128,12 +1470,33 @@ Return ONLY the new query, nothing else."""
         Be specific. If unclear, set confidence to "low".
         """
         
-        # Use Gemini to generate response
-        response = self.llm.generate_content(prompt)
+        # Use Gemini to generate response (replayed from the response cache when unchanged)
+        if self.llm_cache:
+            response_text = self.llm_cache.generate(self.llm, prompt, rate_limiter=self.gemini_rate_limiter)
+        else:
+            response_text = self._generate_content(prompt).text
         
-        # Extract JSON from response
-        response_text = response.text
+        try:
+            pattern = self._parse_llm_pattern(response_text)
+        except ValueError:
+            # Don't replay an unusable response on the next run
+            if self.llm_cache:
+                self.llm_cache.reject(self.llm, prompt)
+            raise
+        
+        # Clean output - remove verbose debug logs since we've fixed the core issue
         
+        pattern['source_repo'] = kwargs['repo_url']
+        pattern['stars'] = kwargs['stars']
+        return pattern
+    
+    def _parse_llm_pattern(self, response_text):
+        """
+        Parse the pattern JSON out of an LLM response.
+        
+        Raises:
+            ValueError: If the response is not a usable pattern
+        """
         # Try to extract JSON (Gemini might wrap it in markdown code blocks)
         if '```json' in response_text:
             response_text = response_text.split('```json')[1].split('```')[0].strip()
@@ -1170,10 +1533,6 @@ Return ONLY the new query, nothing else."""
             print(f"  [WARNING] Missing or invalid requirements, using defaults")
             pattern['requirements'] = {'type': 'general', 'domain': 'unknown'}
         
-        # Clean output - remove verbose debug logs since we've fixed the core issue
-        
-        pattern['source_repo'] = kwargs['repo_url']
-        pattern['stars'] = kwargs['stars']
         return pattern
     
     def _validate_pattern_async(self, pattern, repo_context=None):
@@ -1257,40 +1616,33 @@ Return ONLY the new query, nothing else."""
     @neo4j_retry
     def _update_pattern_validation(self, pattern_name, validation_score, needs_review, critic_notes):
         """Update pattern with validation results."""
-        with self.neo4j.session() as session:
-            session.run("""
-                MATCH (p:Pattern {name: $pattern_name})
-                SET p.validation_score = $validation_score,
-                    p.needs_review = $needs_review,
-                    p.critic_notes = $critic_notes,
-                    p.validated_at = datetime()
-            """,
-                pattern_name=pattern_name,
-                validation_score=float(validation_score),
-                needs_review=needs_review,
-                critic_notes=critic_notes
-            )
+        self._write('validation', {
+            'pattern_name': pattern_name,
+            'validation_score': float(validation_score),
+            'needs_review': needs_review,
+            'critic_notes': critic_notes
+        })
         logger.debug(f"Updated validation for pattern: {pattern_name}")
     
     @neo4j_retry
     def _update_pattern_judge_evaluation(self, pattern_name, judge_score, judge_feedback):
         """Update pattern with judge evaluation results."""
-        with self.neo4j.session() as session:
-            session.run("""
-                MATCH (p:Pattern {name: $pattern_name})
-                SET p.judge_score = $judge_score,
-                    p.judge_feedback = $judge_feedback,
-                    p.judged_at = datetime()
-            """,
-                pattern_name=pattern_name,
-                judge_score=float(judge_score),
-                judge_feedback=judge_feedback
-            )
+        self._write('judge', {
+            'pattern_name': pattern_name,
+            'judge_score': float(judge_score),
+            'judge_feedback': judge_feedback
+        })
         logger.debug(f"Updated judge evaluation for pattern: {pattern_name}")
     
     @neo4j_retry
     def _store_pattern(self, pattern):
-        """Store pattern in Neo4j with normalized data and weights with retry logic."""
+        """
+        Store pattern in Neo4j with normalized data and weights with retry logic.
+        
+        Returns:
+            None if the write was queued in the write-behind buffer, otherwise
+            the number of rows written
+        """
         logger.info(f"Storing pattern '{pattern.get('pattern_name', 'unknown')}' in Neo4j")
         # Normalize technologies with weights
         normalized_techs = []
@@ -1322,7 +1674,7 @@ Return ONLY the new query, nothing else."""
                         'can_substitute': []
                     })
             except Exception as e:
-                print(f"  Warning: Skipping malformed technology: {tech} ({e})")
+                logger.warning(f"Skipping malformed technology: {tech} ({e})")
                 continue
         
         # Normalize constraints with weights
@@ -1354,7 +1706,7 @@ Return ONLY the new query, nothing else."""
                         'reasoning': ''
                     })
             except Exception as e:
-                print(f"  Warning: Skipping malformed constraint: {c} ({e})")
+                logger.warning(f"Skipping malformed constraint: {c} ({e})")
                 continue
         
         # Get quality metrics (if available) - 0-100 scale
@@ -1386,92 +1738,25 @@ Return ONLY the new query, nothing else."""
                 'reasoning': 'No specific constraints identified'
             }]
         
-        with self.neo4j.session() as session:
-            session.run("""
-                // MERGE pattern node by source_repo (handles both create and update)
-                MERGE (p:Pattern {source_repo: $source_repo})
-                ON CREATE SET 
-                    p.name = $pattern_name,
-                    p.confidence = $confidence,
-                    p.stars = $stars,
-                    p.reasoning = $reasoning,
-                    p.quality_score = $quality_score,
-                    p.freshness_score = $freshness_score,
-                    p.maintenance_score = $maintenance_score,
-                    p.validation_score = 0.0,
-                    p.needs_review = true,
-                    p.critic_notes = "Validation pending...",
-                    p.judge_score = 0.0,
-                    p.judge_feedback = "Judge evaluation pending...",
-                    p.extraction_status = $extraction_status,
-                    p.has_readme = $has_readme,
-                    p.has_structure = $has_structure,
-                    p.has_dependencies = $has_dependencies,
-                    p.has_quality_metrics = $has_quality_metrics,
-                    p.extracted_at = datetime()
-                ON MATCH SET
-                    p.name = $pattern_name,
-                    p.confidence = $confidence,
-                    p.stars = $stars,
-                    p.reasoning = $reasoning,
-                    p.quality_score = $quality_score,
-                    p.freshness_score = $freshness_score,
-                    p.maintenance_score = $maintenance_score,
-                    p.extraction_status = $extraction_status,
-                    p.has_readme = $has_readme,
-                    p.has_structure = $has_structure,
-                    p.has_dependencies = $has_dependencies,
-                    p.has_quality_metrics = $has_quality_metrics,
-                    p.extracted_at = datetime()
-                
-                // MERGE requirement node and relationship
-                MERGE (r:Requirement {type: $req_type, domain: $req_domain})
-                MERGE (r)-[:SOLVED_BY]->(p)
-                
-                // MERGE constraints with weights
-                WITH p
-                UNWIND $constraints AS constraint
-                MERGE (c:Constraint {rule: constraint.rule})
-                MERGE (p)-[req:REQUIRES]->(c)
-                SET req.criticality = constraint.criticality,
-                    req.enforcement = constraint.enforcement,
-                    req.violation_impact = constraint.violation_impact,
-                    req.reasoning = constraint.reasoning
-                
-                // MERGE technologies with weights
-                WITH p
-                UNWIND $technologies AS tech
-                MERGE (t:Technology {name: tech.name})
-                MERGE (p)-[u:USES]->(t)
-                ON CREATE SET 
-                    u.role = tech.role,
-                    u.criticality = tech.criticality,
-                    u.adoption_confidence = tech.adoption_confidence,
-                    u.can_substitute = tech.can_substitute
-                ON MATCH SET
-                    u.role = tech.role,
-                    u.criticality = tech.criticality,
-                    u.adoption_confidence = tech.adoption_confidence,
-                    u.can_substitute = tech.can_substitute
-            """,
-                pattern_name=pattern['pattern_name'],
-                confidence=pattern.get('confidence', 'medium'),
-                source_repo=pattern['source_repo'],
-                stars=pattern['stars'],
-                reasoning=pattern.get('reasoning', ''),
-                quality_score=float(quality_score),
-                freshness_score=float(freshness_score),
-                maintenance_score=float(maintenance_score),
-                extraction_status=extraction_status,
-                has_readme=data_availability.get('readme', False),
-                has_structure=data_availability.get('structure', False),
-                has_dependencies=data_availability.get('dependencies', False),
-                has_quality_metrics=data_availability.get('quality_metrics', False),
-                req_type=pattern['requirements']['type'],
-                req_domain=pattern['requirements']['domain'],
-                constraints=normalized_constraints,
-                technologies=normalized_techs
-            )
+        return self._write('pattern', {
+            'pattern_name': pattern['pattern_name'],
+            'confidence': pattern.get('confidence', 'medium'),
+            'source_repo': pattern['source_repo'],
+            'stars': pattern['stars'],
+            'reasoning': pattern.get('reasoning', ''),
+            'quality_score': float(quality_score),
+            'freshness_score': float(freshness_score),
+            'maintenance_score': float(maintenance_score),
+            'extraction_status': extraction_status,
+            'has_readme': data_availability.get('readme', False),
+            'has_structure': data_availability.get('structure', False),
+            'has_dependencies': data_availability.get('dependencies', False),
+            'has_quality_metrics': data_availability.get('quality_metrics', False),
+            'req_type': pattern['requirements']['type'],
+            'req_domain': pattern['requirements']['domain'],
+            'constraints': normalized_constraints,
+            'technologies': normalized_techs
+        })
     
     def analyze_single_repo(self, repo_name, domain="general"):
         """
@@ -1489,10 +1774,12 @@ Return ONLY the new query, nothing else."""
         try:
             repo = self.github.get_repo(repo_name)
             
-            # Fetch repo data
-            readme = self._fetch_readme(repo)
-            structure = self._analyze_structure(repo)
-            deps = self._fetch_dependencies(repo)
+            # Fetch repo data (one concurrent snapshot when github.async_fetch is enabled)
+            rules_enabled = self.config.rule_extraction.enabled and IDE_RULE_LIBRARY_AVAILABLE
+            snapshot = self._fetch_snapshot(repo, include_rule_files=rules_enabled)
+            readme = self._fetch_readme(repo, snapshot)
+            structure = self._analyze_structure(repo, snapshot)
+            deps = self._fetch_dependencies(repo, snapshot)
             
             # LLM analysis
             pattern = self._extract_with_llm(
@@ -1510,10 +1797,10 @@ Return ONLY the new query, nothing else."""
             if (self.config.rule_extraction.enabled and
                 IDE_RULE_LIBRARY_AVAILABLE and self.rule_extractor):
                 try:
-                    rule_files = self._scan_for_rule_files(repo)
+                    rule_files = self._scan_for_rule_files(repo, snapshot)
                     if rule_files:
                         print(f"[INFO] Found {len(rule_files)} IDE rule file(s), extracting...")
-                        self._extract_and_link_rules(pattern, repo, rule_files)
+                        self._extract_and_link_rules(pattern, repo, rule_files, snapshot)
                     else:
                         logger.info(f"No IDE rules found in {repo_name}")
                         if self.progress_callback:
@@ -12,6 +12,7 @@ from pattern_query_interface import PatternQueryInterface
 from embedding_generator import EmbeddingGenerator
 from confidence_scorer import ConfidenceScorer
 from hybrid_query_builder import HybridQueryBuilder, QueryConstraints
+from vector_index import PatternVectorIndex
 
 load_dotenv()
 
@@ -27,17 +28,54 @@ class PatternQueryInterfaceSemantic(PatternQueryInterface):
     - Confidence scoring
     """
     
-    def __init__(self):
-        """Initialize with embedding generator and scoring capabilities."""
+    def __init__(self, vector_backend: Optional[str] = None):
+        """
+        Initialize with embedding generator and scoring capabilities.
+        
+        Args:
+            vector_backend: 'local' (in-process PatternVectorIndex loaded from Neo4j)
+                or 'neo4j' (pattern_embeddings vector index). Defaults to the
+                PATTERN_VECTOR_BACKEND environment variable, else 'local'.
+        """
         # Initialize parent class
         super().__init__()
         
         # Add semantic capabilities
         self.embedding_generator = EmbeddingGenerator()
         self.confidence_scorer = ConfidenceScorer()
-        self.query_builder = HybridQueryBuilder()
         
-        print("PatternQueryInterfaceSemantic initialized with vector search")
+        backend = (vector_backend or os.getenv("PATTERN_VECTOR_BACKEND", "local")).lower()
+        if backend == "local":
+            self.vector_index = PatternVectorIndex(
+                dimensions=self.embedding_generator.EMBEDDING_DIMENSIONS,
+                ivf_lists=int(os.getenv("PATTERN_VECTOR_IVF_LISTS", "0")),
+                model=self.embedding_generator.MODEL_NAME,
+                model_version=self.embedding_generator.MODEL_VERSION
+            )
+            self.vector_index.load_from_neo4j(self.neo4j)
+        elif backend == "neo4j":
+            self.vector_index = None
+        else:
+            raise ValueError(f"Unknown vector backend: {backend} (expected 'local' or 'neo4j')")
+        self.query_builder = HybridQueryBuilder(vector_index=self.vector_index)
+        
+        print(f"PatternQueryInterfaceSemantic initialized with vector search ({backend} backend)")
+    
+    def refresh_vector_index(self) -> int:
+        """
+        Pull newly embedded patterns into the local vector index.
+        
+        Returns:
+            Number of patterns added or updated (0 with the Neo4j backend)
+        """
+        if self.vector_index is None:
+            return 0
+        return self.vector_index.refresh(self.neo4j)
+    
+    def _refresh_if_stale(self):
+        """Incrementally refresh the local index once refresh_interval has passed."""
+        if self.vector_index is not None:
+            self.vector_index.maybe_refresh(self.neo4j)
     
     def close(self):
         """Close all connections."""
@@ -77,6 +115,22 @@ class PatternQueryInterfaceSemantic(PatternQueryInterface):
         Returns:
             List of patterns with similarity scores
         """
+        # Local backend: everything needed is in memory, no Bolt round trip
+        if self.vector_index is not None:
+            self._refresh_if_stale()
+            return [
+                {
+                    'name': p['name'],
+                    'reasoning': p.get('reasoning'),
+                    'description': p.get('description'),
+                    'confidence': p.get('confidence'),
+                    'stars': p.get('stars'),
+                    'source_repo': p.get('source_repo'),
+                    'semantic_similarity': score
+                }
+                for p, score in self.vector_index.search(embedding, top_k, min_similarity)
+            ]
+        
         query, params = self.query_builder.build_semantic_search(top_k, min_similarity)
         params['embedding'] = embedding
         
@@ -174,10 +228,12 @@ class PatternQueryInterfaceSemantic(PatternQueryInterface):
         embedding, embed_meta = self._embed_query(goal)
         
         # Build and execute hybrid query
+        self._refresh_if_stale()
         query, params = self.query_builder.build_hybrid_search(
             query_constraints,
             top_k=top_k,
-            semantic_top_k=semantic_top_k
+            semantic_top_k=semantic_top_k,
+            embedding=embedding
         )
         params['embedding'] = embedding
         
@@ -243,9 +299,11 @@ class PatternQueryInterfaceSemantic(PatternQueryInterface):
         embedding, embed_meta = self._embed_query(goal)
         
         # Build cross-pattern discovery query
+        self._refresh_if_stale()
         query, params = self.query_builder.build_cross_pattern_discovery(
             min_similarity=min_similarity,
-            top_k=top_k
+            top_k=top_k,
+            embedding=embedding
         )
         params['embedding'] = embedding
         
@@ -302,6 +360,7 @@ class PatternQueryInterfaceSemantic(PatternQueryInterface):
         Returns:
             Dictionary with similar patterns and metadata
         """
+        self._refresh_if_stale()
         query, params = self.query_builder.build_similar_patterns(
             pattern_name,
             top_k,
@@ -45,7 +45,7 @@ class QualityJudge:
     GOOD_THRESHOLD = 0.70
     ACCEPTABLE_THRESHOLD = 0.55
     
-    def __init__(self):
+    def __init__(self, llm_cache=None):
         """Initialise judge with Gemini Pro model."""
         from dotenv import load_dotenv
         load_dotenv(override=True)
@@ -62,6 +62,9 @@ class QualityJudge:
         # Use Pro for reasoning capability
         self.llm = genai.GenerativeModel('gemini-2.5-pro')
         
+        # Optional LLMResponseCache: unchanged patterns are not re-sent to Gemini
+        self.llm_cache = llm_cache
+        
         logger.info("QualityJudge initialised with gemini-2.5-pro")
     
     @llm_retry
@@ -84,8 +87,10 @@ class QualityJudge:
         prompt = self._build_evaluation_prompt(pattern, repo_context)
         
         try:
-            response = self.llm.generate_content(prompt)
-            response_text = response.text
+            if self.llm_cache:
+                response_text = self.llm_cache.generate(self.llm, prompt)
+            else:
+                response_text = self.llm.generate_content(prompt).text
             
             # Extract JSON from response
             if '```json' in response_text:
@@ -107,6 +112,8 @@ class QualityJudge:
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse judge response: {e}")
+            if self.llm_cache:
+                self.llm_cache.reject(self.llm, prompt)
             logger.debug(f"Response text: {response_text[:500]}")
             return 0.5, f"Judge parsing error: {str(e)}"
         
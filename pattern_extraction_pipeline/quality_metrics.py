@@ -4,6 +4,27 @@
 from datetime import datetime, timezone
 from typing import Dict
 
+import numpy as np
+
+
+def _round_like_builtin(values: np.ndarray, digits: int) -> np.ndarray:
+    """
+    Vectorised round(value, digits) that agrees with the builtin everywhere.
+    
+    Values within float noise of a rounding tie are passed to the builtin,
+    which rounds their exact decimal value; np.round alone may not.
+    
+    Kept in step with ide_rule_library.quality_scorer._round_like_builtin (a
+    local copy so the pipeline does not import that package; see
+    test_quality_metrics_batch.py for the parity test).
+    """
+    rounded = np.round(values, digits)
+    scaled = values * 10 ** digits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(float(value), digits) for value in values[near_tie]]
+    return rounded
+
 
 class QualityMetricsCalculator:
     """
@@ -11,12 +32,14 @@ class QualityMetricsCalculator:
     Goes beyond just star counts to measure actual quality.
     """
     
-    def calculate_quality_score(self, repo) -> Dict[str, float]:
+    def calculate_quality_score(self, repo, snapshot=None) -> Dict[str, float]:
         """
         Calculate composite quality score from multiple signals.
         
         Args:
             repo: PyGithub Repository object
+            snapshot: Optional RepoSnapshot; when given, README and contributor
+                data come from it instead of extra GitHub API calls
         
         Returns:
             {
@@ -29,10 +52,13 @@ class QualityMetricsCalculator:
             }
         """
         
+        # Contributors are paged once and reused by community score and raw metrics
+        contributor_count = self._get_contributor_count(repo, snapshot)
+        
         popularity = self._calculate_popularity(repo)
         maintenance = self._calculate_maintenance(repo)
         maturity = self._calculate_maturity(repo)
-        community = self._calculate_community(repo)
+        community = self._calculate_community(repo, snapshot, contributor_count)
         freshness = self._calculate_freshness(repo)
         
         # Weighted composite score (scaled to 0-100)
@@ -57,7 +83,7 @@ class QualityMetricsCalculator:
             'forks': repo.forks_count,
             'watchers': repo.watchers_count,
             'open_issues': repo.open_issues_count,
-            'contributors': self._get_contributor_count(repo),
+            'contributors': contributor_count,
             'repo_age_months': self._get_repo_age_months(repo),
             'days_since_update': self._get_days_since_update(repo)
         }
@@ -178,7 +204,7 @@ class QualityMetricsCalculator:
         
         return min(maturity_score, 1.0)
     
-    def _calculate_community(self, repo) -> float:
+    def _calculate_community(self, repo, snapshot=None, contributor_count=None) -> float:
         """
         Community score based on contributor activity and documentation.
         
@@ -195,18 +221,23 @@ class QualityMetricsCalculator:
             score += 0.1
         
         # Has README (most repos do)
-        try:
-            repo.get_readme()
-            score += 0.1
-        except:
-            pass
+        if snapshot is not None:
+            if snapshot.has_readme:
+                score += 0.1
+        else:
+            try:
+                repo.get_readme()
+                score += 0.1
+            except:
+                pass
         
         # Has license
         if repo.license:
             score += 0.15
         
         # Contributors (indicates community involvement)
-        contributor_count = self._get_contributor_count(repo)
+        if contributor_count is None:
+            contributor_count = self._get_contributor_count(repo, snapshot)
         if contributor_count >= 50:
             score += 0.15  # Large community
         elif contributor_count >= 20:
@@ -252,12 +283,15 @@ class QualityMetricsCalculator:
         delta = now - updated_at
         return delta.days
     
-    def _get_contributor_count(self, repo) -> int:
+    def _get_contributor_count(self, repo, snapshot=None) -> int:
         """
         Safely get contributor count.
         GitHub API returns 403 for repos with very large contributor lists.
         In those cases, estimate based on other metrics.
         """
+        if snapshot is not None:
+            return snapshot.contributor_count
+        
         try:
             return repo.get_contributors().totalCount
         except Exception as e:
@@ -273,6 +307,99 @@ class QualityMetricsCalculator:
                 # Other API error - default to 0
                 return 0
     
+    def score_batch(self, table) -> Dict[str, np.ndarray]:
+        """
+        Score many repositories at once from stored metrics.
+        
+        Vectorised equivalent of calculate_quality_score: each if/elif ladder
+        is an np.select over the whole column, and results equal the scalar
+        path exactly (tests/test_quality_metrics_batch.py). Everything comes
+        from the table, so re-scoring a catalogue needs no GitHub calls.
+        
+        Args:
+            table: Dict of arrays or DataFrame with the raw metrics that
+                   calculate_quality_score returns (stars, forks, watchers,
+                   open_issues, contributors, repo_age_months,
+                   days_since_update) plus has_description, has_readme and
+                   has_license flags
+        
+        Returns:
+            Dict of arrays: composite_score and the five component scores,
+            all on the 0-100 scale
+        """
+        col = lambda name: np.asarray(table[name], dtype=float)
+        stars = col('stars')
+        days = col('days_since_update')
+        
+        # Popularity
+        star_score = np.select(
+            [stars >= 100000, stars >= 50000, stars >= 20000, stars >= 10000,
+             stars >= 5000, stars >= 2000, stars >= 1000, stars >= 500],
+            [1.0, 0.95, 0.9, 0.85, 0.75, 0.65, 0.5, 0.35],
+            default=0.2
+        )
+        fork_score = np.minimum(col('forks') / np.maximum(stars, 1), 1.0) * 0.5 + 0.5
+        watcher_score = np.minimum(col('watchers') / np.maximum(stars, 1), 1.0) * 0.5 + 0.5
+        popularity = np.minimum(star_score * 0.6 + fork_score * 0.25 + watcher_score * 0.15, 1.0)
+        
+        # Maintenance
+        recency_score = np.select(
+            [days <= 7, days <= 30, days <= 90, days <= 180, days <= 365],
+            [1.0, 0.9, 0.75, 0.6, 0.4],
+            default=0.2
+        )
+        open_issues = col('open_issues')
+        issue_score = np.select(
+            [open_issues == 0, open_issues <= 10, open_issues <= 50, open_issues <= 200],
+            [0.7, 1.0, 0.85, 0.6],
+            default=0.4
+        )
+        maintenance = np.minimum(recency_score * 0.7 + issue_score * 0.3, 1.0)
+        
+        # Maturity
+        age_months = col('repo_age_months')
+        decay = np.maximum(0.5 - (age_months / 12 - 4) * 0.05, 0.3)
+        maturity = np.minimum(np.select(
+            [age_months < 3, age_months < 6, age_months < 12, age_months < 24, age_months < 36, age_months < 48],
+            [0.4, 0.6, 0.8, 1.0, 0.95, 0.85],
+            default=decay
+        ), 1.0)
+        
+        # Community (bonuses added in the scalar path's order)
+        contributors = col('contributors')
+        community = np.full(len(stars), 0.5)
+        community = community + np.where(col('has_description') > 0, 0.1, 0.0)
+        community = community + np.where(col('has_readme') > 0, 0.1, 0.0)
+        community = community + np.where(col('has_license') > 0, 0.15, 0.0)
+        community = community + np.select(
+            [contributors >= 50, contributors >= 20, contributors >= 5], [0.15, 0.1, 0.05], default=0.0
+        )
+        community = np.minimum(community, 1.0)
+        
+        # Freshness
+        freshness = np.select(
+            [days <= 30, days <= 90, days <= 180, days <= 365, days <= 730],
+            [1.0, 0.95, 0.85, 0.7, 0.5],
+            default=0.3
+        )
+        
+        composite = (
+            popularity * 0.30 +
+            maintenance * 0.25 +
+            maturity * 0.20 +
+            community * 0.15 +
+            freshness * 0.10
+        ) * 100
+        
+        return {
+            'composite_score': _round_like_builtin(composite, 1),
+            'popularity_score': _round_like_builtin(popularity * 100, 1),
+            'maintenance_score': _round_like_builtin(maintenance * 100, 1),
+            'maturity_score': _round_like_builtin(maturity * 100, 1),
+            'community_score': _round_like_builtin(community * 100, 1),
+            'freshness_score': _round_like_builtin(freshness * 100, 1)
+        }
+    
     def get_quality_tier(self, composite_score: float) -> str:
         """
         Convert composite score to human-readable tier.
@@ -6,6 +6,7 @@ Implements a sliding window algorithm with configurable limits.
 """
 
 import time
+import threading
 from collections import deque
 from typing import Optional
 import logging
@@ -18,7 +19,8 @@ class RateLimiter:
     Rate limiter using sliding window algorithm.
     
     Tracks API call timestamps and enforces rate limits by sleeping
-    when necessary to stay within quota.
+    when necessary to stay within quota. Thread-safe, so one limiter can
+    hold the budget for every extraction worker sharing it.
     
     Example:
         >>> limiter = RateLimiter(max_calls=60, period=60)  # 60 calls per minute
@@ -41,6 +43,7 @@ class RateLimiter:
         self.calls = deque()
         self._total_waits = 0
         self._total_wait_time = 0.0
+        self._lock = threading.Lock()
         
         logger.info(f"Rate limiter '{self.name}' initialized: {max_calls} calls per {period}s")
     
@@ -51,38 +54,40 @@ class RateLimiter:
         Returns:
             float: Seconds waited (0 if no wait needed)
         """
-        now = time.time()
+        # Callers queue on the lock so concurrent workers share one window
+        with self._lock:
+            now = time.time()
         
-        # Remove calls outside the sliding window
-        while self.calls and self.calls[0] < now - self.period:
-            self.calls.popleft()
+            # Remove calls outside the sliding window
+            while self.calls and self.calls[0] < now - self.period:
+                self.calls.popleft()
         
-        # Check if we need to wait
-        if len(self.calls) >= self.max_calls:
-            # Calculate wait time: time until oldest call exits the window
-            wait_time = self.period - (now - self.calls[0])
+            # Check if we need to wait
+            if len(self.calls) >= self.max_calls:
+                # Calculate wait time: time until oldest call exits the window
+                wait_time = self.period - (now - self.calls[0])
             
-            if wait_time > 0:
-                self._total_waits += 1
-                self._total_wait_time += wait_time
+                if wait_time > 0:
+                    self._total_waits += 1
+                    self._total_wait_time += wait_time
                 
-                logger.warning(
-                    f"Rate limit reached for '{self.name}': "
-                    f"{len(self.calls)}/{self.max_calls} calls in last {self.period}s. "
-                    f"Sleeping {wait_time:.2f}s..."
-                )
+                    logger.warning(
+                        f"Rate limit reached for '{self.name}': "
+                        f"{len(self.calls)}/{self.max_calls} calls in last {self.period}s. "
+                        f"Sleeping {wait_time:.2f}s..."
+                    )
                 
-                time.sleep(wait_time)
+                    time.sleep(wait_time)
                 
-                # Clean up old calls after sleeping
-                now = time.time()
-                while self.calls and self.calls[0] < now - self.period:
-                    self.calls.popleft()
+                    # Clean up old calls after sleeping
+                    now = time.time()
+                    while self.calls and self.calls[0] < now - self.period:
+                        self.calls.popleft()
         
-        # Record this call
-        self.calls.append(time.time())
+            # Record this call
+            self.calls.append(time.time())
         
-        return wait_time if 'wait_time' in locals() and wait_time > 0 else 0.0
+            return wait_time if 'wait_time' in locals() and wait_time > 0 else 0.0
     
     def get_stats(self) -> dict:
         """
@@ -112,10 +117,129 @@ class RateLimiter:
     
     def reset(self):
         """Reset rate limiter state."""
-        self.calls.clear()
+        with self._lock:
+            self.calls.clear()
+            self._total_waits = 0
+            self._total_wait_time = 0.0
+        logger.info(f"Rate limiter '{self.name}' reset")
+
+
+class TokenRateLimiter:
+    """
+    Sliding-window limiter over both requests and tokens.
+    
+    For APIs whose quota is "N requests and M tokens per minute" (e.g. Gemini
+    embeddings), so a batch request is charged for the text it carries rather
+    than a fixed per-call delay.
+    
+    Example:
+        >>> limiter = TokenRateLimiter(max_calls=100, max_tokens=30000, period=60)
+        >>> limiter.wait_if_needed(tokens=2400)  # Blocks until both budgets allow it
+        >>> # Make API call
+    """
+    
+    def __init__(self, max_calls: int, max_tokens: int, period: float, name: Optional[str] = None):
+        """
+        Initialize rate limiter.
+        
+        Args:
+            max_calls: Maximum number of requests allowed in the period
+            max_tokens: Maximum number of tokens allowed in the period
+            period: Time window in seconds
+            name: Optional name for logging purposes
+        """
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.period = period
+        self.name = name or "token_rate_limiter"
+        self.calls = deque()  # (timestamp, tokens)
+        self._window_tokens = 0
         self._total_waits = 0
         self._total_wait_time = 0.0
-        logger.info(f"Rate limiter '{self.name}' reset")
+        self._lock = threading.Lock()
+        
+        logger.info(
+            f"Token rate limiter '{self.name}' initialized: "
+            f"{max_calls} calls / {max_tokens} tokens per {period}s"
+        )
+    
+    def wait_if_needed(self, tokens: int = 1) -> float:
+        """
+        Wait until one request carrying `tokens` fits in the window.
+        
+        A request larger than max_tokens is let through once the window is
+        empty, so it is never blocked forever.
+        
+        Args:
+            tokens: Estimated tokens for the request
+        
+        Returns:
+            float: Seconds waited (0 if no wait needed)
+        """
+        waited = 0.0
+        with self._lock:
+            while True:
+                now = time.time()
+                self._expire(now)
+                
+                over_calls = len(self.calls) >= self.max_calls
+                over_tokens = self.calls and self._window_tokens + tokens > self.max_tokens
+                if not (over_calls or over_tokens):
+                    break
+                
+                # Sleep until enough of the window has expired
+                if over_calls:
+                    release_at = self.calls[len(self.calls) - self.max_calls][0]
+                else:
+                    release_at, freed = self.calls[0][0], 0
+                    for timestamp, call_tokens in self.calls:
+                        freed += call_tokens
+                        release_at = timestamp
+                        if self._window_tokens - freed + tokens <= self.max_tokens:
+                            break
+                wait_time = max(release_at + self.period - now, 0.01)
+                
+                logger.warning(
+                    f"Rate limit reached for '{self.name}': {len(self.calls)}/{self.max_calls} calls, "
+                    f"{self._window_tokens}/{self.max_tokens} tokens in last {self.period}s. "
+                    f"Sleeping {wait_time:.2f}s..."
+                )
+                time.sleep(wait_time)
+                waited += wait_time
+            
+            if waited:
+                self._total_waits += 1
+                self._total_wait_time += waited
+            
+            self.calls.append((time.time(), tokens))
+            self._window_tokens += tokens
+            return waited
+    
+    def get_stats(self) -> dict:
+        """
+        Get rate limiter statistics.
+        
+        Returns:
+            dict: Statistics including window usage and total wait time
+        """
+        with self._lock:
+            self._expire(time.time())
+            return {
+                'name': self.name,
+                'max_calls': self.max_calls,
+                'max_tokens': self.max_tokens,
+                'period': self.period,
+                'recent_calls': len(self.calls),
+                'recent_tokens': self._window_tokens,
+                'total_waits': self._total_waits,
+                'total_wait_time_seconds': round(self._total_wait_time, 2)
+            }
+    
+    def _expire(self, now: float):
+        """Drop calls outside the sliding window (caller holds the lock)."""
+        while self.calls and self.calls[0][0] <= now - self.period:
+            _, tokens = self.calls.popleft()
+            self._window_tokens -= tokens
 
 
 class MultiAPIRateLimiter:
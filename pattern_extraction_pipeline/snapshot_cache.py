@@ -0,0 +1,198 @@
+"""
+Repository Snapshot Cache
+
+Content-addressed store for RepoSnapshot objects, keyed by repository and
+head commit SHA. Each repository keeps an index with the SHA plus the
+ETag/Last-Modified validators of its head-commit probe, so a later run can
+revalidate with a conditional request (304 responses do not count against
+the GitHub rate limit) and reuse the stored snapshot when nothing changed.
+
+Within a run, snapshots are also held in memory so every stage reads the
+same fetched data without touching disk or network.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import asdict, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+
+
+class SnapshotCache:
+    """
+    Two-level RepoSnapshot cache (per-run memory + on-disk store).
+
+    Layout:
+        <cache_dir>/<owner>__<repo>/index.json   {"sha", "etag", "last_modified"}
+        <cache_dir>/<owner>__<repo>/<sha>.json   serialized RepoSnapshot
+
+    Example:
+        >>> cache = SnapshotCache("cache/snapshots")
+        >>> fetcher = ThreadPoolGitHubFetcher(token=token, cache=cache)
+        >>> fetcher.fetch_snapshot(repo)   # full fetch, stored
+        >>> fetcher.fetch_snapshot(repo)   # served from memory
+    """
+
+    def __init__(self, cache_dir: str = "cache/snapshots"):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory for stored snapshots (created on first store)
+        """
+        self.cache_dir = Path(cache_dir)
+        self._memory = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        logger.info(f"SnapshotCache initialised: {self.cache_dir}")
+
+    # ------------------------------------------------------------------
+    # Per-run memory layer
+    # ------------------------------------------------------------------
+
+    def get_current(self, full_name: str):
+        """Return the snapshot already fetched for this repo in this run, if any."""
+        with self._lock:
+            return self._memory.get(full_name)
+
+    def remember(self, snapshot):
+        """Hold a snapshot in memory for the rest of the run."""
+        with self._lock:
+            self._memory[snapshot.full_name] = snapshot
+
+    def clear_memory(self):
+        """Drop the per-run layer (e.g. between independent runs)."""
+        with self._lock:
+            self._memory.clear()
+
+    # ------------------------------------------------------------------
+    # On-disk layer
+    # ------------------------------------------------------------------
+
+    def get_validators(self, full_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored index entry for a repository.
+
+        Returns:
+            {'sha': str, 'etag': str or None, 'last_modified': str or None}, or None
+        """
+        index_path = self._repo_dir(full_name) / INDEX_FILE
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load(self, full_name: str, sha: str, snapshot_cls):
+        """
+        Load the stored snapshot for a repository at a given commit.
+
+        Args:
+            full_name: Repository full name
+            sha: Head commit SHA
+            snapshot_cls: RepoSnapshot class to rebuild into
+
+        Returns:
+            Snapshot instance, or None if missing or unreadable
+        """
+        path = self._repo_dir(full_name) / f"{sha}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        known = {f.name for f in fields(snapshot_cls)}
+        for key in ('created_at', 'updated_at'):
+            if data.get(key):
+                data[key] = datetime.fromisoformat(data[key])
+        return snapshot_cls(**{k: v for k, v in data.items() if k in known})
+
+    def store(self, snapshot, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Persist a snapshot and its revalidation data, replacing older commits.
+
+        Snapshots without a commit SHA, or with failed probes, are only kept
+        in memory so a later run fetches them again instead of reusing gaps.
+        """
+        self.remember(snapshot)
+        if not snapshot.commit_sha or snapshot.errors:
+            return
+
+        repo_dir = self._repo_dir(snapshot.full_name)
+        repo_dir.mkdir(parents=True, exist_ok=True)
+
+        data = asdict(snapshot)
+        try:
+            self._write_json(repo_dir / f"{snapshot.commit_sha}.json", data)
+            self._write_json(repo_dir / INDEX_FILE, {
+                'sha': snapshot.commit_sha,
+                'etag': etag,
+                'last_modified': last_modified
+            })
+        except OSError as e:
+            logger.warning(f"Could not cache snapshot for {snapshot.full_name}: {e}")
+            return
+
+        # Content-addressed by SHA: anything else is a stale commit
+        for stale in repo_dir.glob("*.json"):
+            if stale.name not in (INDEX_FILE, f"{snapshot.commit_sha}.json"):
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache counters for this run."""
+        with self._lock:
+            return {
+                'memory_hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'in_memory': len(self._memory)
+            }
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_revalidated(self):
+        with self._lock:
+            self.revalidated += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _repo_dir(self, full_name: str) -> Path:
+        return self.cache_dir / full_name.replace('/', '__')
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]):
+        """Write atomically so concurrent workers never read a partial file."""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Embedding Re-index Tests
+
+Tests EmbeddingGenerator and PatternEmbeddingPipeline with a local
+embedding backend against a stubbed Neo4j driver.
+Verifies the local backend needs no GEMINI_API_KEY and keeps its own
+store, that patterns embedded by another model or version are re-embedded
+(untagged vectors count as the Gemini default's), and that the vector
+index is recreated when the backend's width differs.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from pattern_extraction_pipeline.embedding_generator import EmbeddingGenerator
+from ide_rule_library.embedding_backends import HashedTfidfBackend
+
+# generate_pattern_embeddings is a script using sibling imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import generate_pattern_embeddings  # noqa: E402
+from generate_pattern_embeddings import PatternEmbeddingPipeline  # noqa: E402
+
+GEMINI = (EmbeddingGenerator.MODEL_NAME, EmbeddingGenerator.MODEL_VERSION)
+
+
+def make_pattern(i, tags=GEMINI, embedded=True):
+    return {
+        'element_id': f"4:db:{i}",
+        'name': f"Pattern {i:03d}",
+        'reasoning': f"Reasoning {i}",
+        'description': None,
+        'stars': 10,
+        'confidence': 'high',
+        'source_repo': None,
+        'embedding': [0.1] * 768 if embedded else None,
+        'embedding_model': tags[0] if tags else None,
+        'embedding_version': tags[1] if tags else None
+    }
+
+
+class FakeGraph:
+    """Serve the pipeline's queries from an in-memory list of Pattern nodes."""
+
+    def __init__(self, patterns, index_dimensions=768):
+        self.patterns = patterns
+        self.index_dimensions = index_dimensions
+        self.index_changes = []
+
+    def session(self):
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.run.side_effect = self._run
+        return session
+
+    @staticmethod
+    def _needs(p, params):
+        return (p['embedding'] is None
+                or (p['embedding_model'] or params['legacy_model']) != params['model']
+                or (p['embedding_version'] or params['legacy_version']) != params['version'])
+
+    def _run(self, query, **params):
+        if 'SHOW INDEXES' in query:
+            options = {'indexConfig': {'vector.dimensions': self.index_dimensions}}
+            return Mock(single=Mock(return_value={'options': options} if self.index_dimensions else None))
+        if 'DROP INDEX' in query or 'CREATE VECTOR INDEX' in query:
+            self.index_changes.append(params.get('dimensions', 'drop'))
+            return Mock()
+        if 'AS stale' in query:
+            embedded = [p for p in self.patterns if p['embedding'] is not None]
+            return Mock(single=Mock(return_value={
+                'total': len(self.patterns),
+                'with_embeddings': len(embedded),
+                'without_embeddings': len(self.patterns) - len(embedded),
+                'stale': sum(1 for p in embedded if self._needs(p, params))
+            }))
+        if 'UNWIND $updates' in query:
+            by_id = {p['element_id']: p for p in self.patterns}
+            for update in params['updates']:
+                by_id[update['element_id']].update({
+                    'embedding': update['embedding'],
+                    'embedding_model': update['model'],
+                    'embedding_version': update['version']
+                })
+            return Mock(single=Mock(return_value={'updated': len(params['updates'])}))
+        if 'SKIP $skip' in query:
+            rows = sorted((p for p in self.patterns if self._needs(p, params)), key=lambda p: p['name'])
+            return [dict(p) for p in rows[params['skip']:params['skip'] + params['limit']]]
+        raise AssertionError(f"Unexpected query: {query}")
+
+
+class TestLocalGenerator(unittest.TestCase):
+    """Test EmbeddingGenerator with the local backend"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+
+    def test_no_api_key_and_separate_store(self):
+        """Local embeddings need no key, make no API call and live under the backend's directory"""
+        backend = HashedTfidfBackend(dimensions=32)
+
+        with patch.dict(os.environ, {}, clear=True), \
+                patch('pattern_extraction_pipeline.embedding_generator.genai') as genai:
+            generator = EmbeddingGenerator(cache_dir=self.cache_dir, backend=backend)
+            self.addCleanup(generator.store.close)
+            results = generator.generate_batch(["alpha beta", "gamma"], show_progress=False)
+
+        genai.embed_content.assert_not_called()
+        self.assertEqual([len(embedding) for embedding, _ in results], [32, 32])
+        self.assertEqual(results[0][1]['model'], 'local/hashed-tfidf')
+        self.assertEqual(results[0][1]['model_version'], 'v1-d32-tf')
+        stats = generator.get_stats()
+        self.assertEqual(stats['cache_directory'], os.path.join(self.cache_dir, 'hashed-tfidf', 'v1-d32-tf'))
+        self.assertEqual((stats['cached_embeddings'], stats['total_requests']), (2, 0))
+
+
+class TestReindex(unittest.TestCase):
+    """Test PatternEmbeddingPipeline re-embedding on a backend change"""
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        cwd = os.getcwd()
+        os.chdir(self.work_dir)  # Default ./embedding_cache
+        self.addCleanup(os.chdir, cwd)
+
+    def _pipeline(self, graph, backend, env=None):
+        with patch.dict(os.environ, dict(env or {}, NEO4J_PASSWORD='x'), clear=True), \
+                patch.object(generate_pattern_embeddings.GraphDatabase, 'driver', return_value=graph), \
+                patch('embedding_generator.genai'):
+            pipeline = PatternEmbeddingPipeline(batch_size=4, backend=backend)
+        self.addCleanup(pipeline.generator.store.close)
+        return pipeline
+
+    def test_backend_switch_reembeds_everything(self):
+        """Gemini-tagged, untagged and missing embeddings are all replaced in one run"""
+        patterns = ([make_pattern(i) for i in range(6)] + [make_pattern(i, tags=None) for i in range(6, 9)]
+                    + [make_pattern(i, embedded=False) for i in range(9, 11)])
+        graph = FakeGraph(patterns)
+        pipeline = self._pipeline(graph, HashedTfidfBackend(dimensions=64))
+
+        pipeline.run()
+
+        self.assertEqual({(p['embedding_model'], p['embedding_version']) for p in patterns},
+                         {('local/hashed-tfidf', 'v1-d64-tf')})
+        self.assertEqual({len(p['embedding']) for p in patterns}, {64})
+        self.assertEqual(graph.index_changes, ['drop', 64])
+        self.assertEqual(pipeline.get_pattern_count()['stale'], 0)
+
+    def test_untagged_vectors_count_as_gemini(self):
+        """Under the default Gemini backend only other models' vectors are stale"""
+        patterns = [make_pattern(0), make_pattern(1, tags=None),
+                    make_pattern(2, tags=('local/hashed-tfidf', 'v1-d768-tf')), make_pattern(3, embedded=False)]
+        pipeline = self._pipeline(FakeGraph(patterns), None, env={'GEMINI_API_KEY': 'x'})
+
+        counts = pipeline.get_pattern_count()
+        batch = pipeline.get_patterns_batch(0, 10)
+
+        self.assertEqual((counts['stale'], counts['without_embeddings']), (1, 1))
+        self.assertEqual([p['name'] for p in batch], ['Pattern 002', 'Pattern 003'])
+        self.assertFalse(pipeline.sync_vector_index())
+
+
+if __name__ == '__main__':
+    unittest.main()
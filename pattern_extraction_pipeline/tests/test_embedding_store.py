@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Embedding Store Tests
+
+Tests EmbeddingStore and the legacy JSON cache migration.
+Verifies vectors round-trip as float32 rows, that bulk writes and matrix
+loads work across reopen, that a torn trailing row is recovered, that
+EmbeddingGenerator serves cache hits from the store, and that generate_batch
+sends only the misses, in batch requests throttled by TokenRateLimiter.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from pattern_extraction_pipeline.embedding_store import EmbeddingStore, migrate_json_cache
+from pattern_extraction_pipeline.rate_limiter import TokenRateLimiter
+
+DIMS = 8
+
+
+def vector(seed):
+    return [float(seed + i) / 10 for i in range(DIMS)]
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    """Test the memory-mapped store"""
+
+    def setUp(self):
+        self.store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.store_dir, ignore_errors=True)
+        self.store = self._open()
+
+    def _open(self):
+        store = EmbeddingStore(self.store_dir, dimensions=DIMS)
+        self.addCleanup(store.close)
+        return store
+
+    def test_put_and_get(self):
+        """A stored vector is read back as a float32 row"""
+        self.store.put('a', vector(1), model='m', text='hello')
+
+        row = self.store.get('a')
+
+        self.assertEqual(row.dtype, np.float32)
+        np.testing.assert_allclose(row, vector(1), rtol=1e-6)
+        self.assertIsNone(self.store.get('missing'))
+        self.assertIn('a', self.store)
+
+    def test_bulk_write_and_reopen(self):
+        """put_many appends rows that a new instance maps without parsing"""
+        self.store.put_many([(f'k{i}', vector(i), 'm', None) for i in range(50)])
+
+        reopened = self._open()
+        keys, matrix = reopened.load_matrix()
+
+        self.assertEqual(len(reopened), 50)
+        self.assertEqual(keys[:3], ['k0', 'k1', 'k2'])
+        self.assertIsInstance(matrix, np.memmap)
+        self.assertEqual(matrix.shape, (50, DIMS))
+        np.testing.assert_allclose(matrix[7], vector(7), rtol=1e-6)
+
+    def test_load_matrix_subset(self):
+        """Requested keys come back in request order; unknown keys are dropped"""
+        self.store.put_many([(f'k{i}', vector(i), None, None) for i in range(5)])
+
+        keys, matrix = self.store.load_matrix(['k3', 'nope', 'k1'])
+
+        self.assertEqual(keys, ['k3', 'k1'])
+        np.testing.assert_allclose(matrix, [vector(3), vector(1)], rtol=1e-6)
+
+    def test_overwrite_keeps_row(self):
+        """Re-storing a key rewrites its row instead of appending"""
+        self.store.put('a', vector(1))
+        self.store.put('b', vector(2))
+        self.store.put('a', vector(9))
+
+        np.testing.assert_allclose(self.store.get('a'), vector(9), rtol=1e-6)
+        self.assertEqual(self.store.get_stats()['rows'], 2)
+        self.assertEqual(os.path.getsize(Path(self.store_dir, 'vectors.f32')), 2 * DIMS * 4)
+
+    def test_wrong_dimensions(self):
+        """Vectors and stores of the wrong width are rejected"""
+        with self.assertRaises(ValueError):
+            self.store.put('a', [1.0, 2.0])
+        with self.assertRaises(ValueError):
+            EmbeddingStore(self.store_dir, dimensions=DIMS * 2)
+
+    def test_torn_write_is_recovered(self):
+        """A partial trailing row is truncated and its index entry dropped"""
+        self.store.put_many([('a', vector(1), None, None), ('b', vector(2), None, None)])
+        self.store.close()
+        path = Path(self.store_dir, 'vectors.f32')
+        with open(path, 'r+b') as f:
+            f.truncate(DIMS * 4 + 5)
+
+        reopened = self._open()
+
+        self.assertEqual(reopened.keys(), ['a'])
+        self.assertEqual(os.path.getsize(path), DIMS * 4)
+        reopened.put('c', vector(3))
+        np.testing.assert_allclose(reopened.get('c'), vector(3), rtol=1e-6)
+
+
+class TestJsonMigration(unittest.TestCase):
+    """Test import of the one-file-per-embedding cache"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        for i in range(3):
+            key = hashlib.sha256(f"text {i}".encode()).hexdigest()
+            with open(Path(self.cache_dir, f"{key}.json"), 'w') as f:
+                json.dump({'text': f"text {i}", 'embedding': vector(i), 'model': 'm'}, f)
+        with open(Path(self.cache_dir, "broken.json"), 'w') as f:
+            f.write("{not json")
+
+    def test_migrate_is_idempotent(self):
+        """Valid files are imported once; broken files are counted, not raised"""
+        store = EmbeddingStore(self.cache_dir, dimensions=DIMS)
+        self.addCleanup(store.close)
+
+        first = migrate_json_cache(self.cache_dir, store, batch_size=2)
+        second = migrate_json_cache(self.cache_dir, store)
+
+        self.assertEqual(first, {'imported': 3, 'skipped': 0, 'invalid': 1})
+        self.assertEqual(second['skipped'], 3)
+        self.assertEqual(len(store), 3)
+
+    def test_generator_reads_migrated_cache(self):
+        """EmbeddingGenerator imports the JSON cache and serves hits from the store"""
+        from pattern_extraction_pipeline.embedding_generator import EmbeddingGenerator
+
+        with patch.dict(os.environ, {'GEMINI_API_KEY': 'x'}), \
+                patch.object(EmbeddingGenerator, 'EMBEDDING_DIMENSIONS', DIMS):
+            generator = EmbeddingGenerator(cache_dir=self.cache_dir)
+        self.addCleanup(generator.store.close)
+
+        with patch('pattern_extraction_pipeline.embedding_generator.genai.embed_content') as embed:
+            embedding, metadata = generator.generate_embedding("text 1")
+
+        embed.assert_not_called()
+        self.assertTrue(metadata['cache_hit'])
+        np.testing.assert_allclose(embedding, vector(1), rtol=1e-6)
+        self.assertEqual(generator.get_stats()['cached_embeddings'], 3)
+
+
+class TestBatchGeneration(unittest.TestCase):
+    """Test batched embedding requests"""
+
+    def setUp(self):
+        from pattern_extraction_pipeline.embedding_generator import EmbeddingGenerator
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        with patch.dict(os.environ, {'GEMINI_API_KEY': 'x'}), \
+                patch.object(EmbeddingGenerator, 'EMBEDDING_DIMENSIONS', DIMS):
+            self.generator = EmbeddingGenerator(cache_dir=self.cache_dir)
+        self.generator.BATCH_SIZE = 4
+        self.addCleanup(self.generator.store.close)
+
+        patcher = patch('pattern_extraction_pipeline.embedding_generator.genai.embed_content',
+                        side_effect=self._embed)
+        self.embed = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _embed(model, content, task_type):
+        if isinstance(content, str):
+            return {'embedding': vector(len(content))}
+        return {'embedding': [vector(len(text)) for text in content]}
+
+    def test_misses_are_sent_in_batches(self):
+        """Ten new texts go out as three requests of at most BATCH_SIZE"""
+        texts = [f"text number {'x' * i}" for i in range(10)]
+
+        results = self.generator.generate_batch(texts, show_progress=False)
+
+        self.assertEqual(self.embed.call_count, 3)
+        self.assertEqual([len(call.kwargs['content']) for call in self.embed.call_args_list], [4, 4, 2])
+        for text, (embedding, metadata) in zip(texts, results):
+            np.testing.assert_allclose(embedding, vector(len(text)))
+            self.assertFalse(metadata['cache_hit'])
+        self.assertEqual(self.generator.request_count, 3)
+
+    def test_cached_and_duplicate_texts_are_not_sent(self):
+        """Cache hits and repeated texts are resolved before any request"""
+        self.generator.generate_batch(["alpha", "beta"], show_progress=False)
+        self.embed.reset_mock()
+
+        results = self.generator.generate_batch(["alpha", "gamma", "gamma", "beta"], show_progress=False)
+
+        self.embed.assert_called_once()
+        self.assertEqual(self.embed.call_args.kwargs['content'], "gamma")
+        self.assertEqual([metadata['cache_hit'] for _, metadata in results], [True, False, False, True])
+        np.testing.assert_allclose(results[2][0], vector(5))
+
+    def test_failed_request_marks_its_texts(self):
+        """A batch that exhausts its retries fails only its own texts"""
+        self.generator.MAX_RETRIES = 1
+        self.embed.side_effect = [
+            {'embedding': [vector(1)] * 4},
+            RuntimeError("boom")
+        ]
+
+        results = self.generator.generate_batch([f"t{i}" for i in range(6)], show_progress=False)
+
+        self.assertTrue(all(embedding is not None for embedding, _ in results[:4]))
+        self.assertEqual([metadata.get('error') is not None for _, metadata in results[4:]], [True, True])
+
+
+class TestTokenRateLimiter(unittest.TestCase):
+    """Test request + token window accounting"""
+
+    def setUp(self):
+        self.now = [1000.0]
+        self.sleeps = []
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now[0] += seconds
+
+        clock = Mock(time=lambda: self.now[0], sleep=sleep)
+        patcher = patch('pattern_extraction_pipeline.rate_limiter.time', clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_token_budget_blocks(self):
+        """A request that would exceed the token budget waits for the window"""
+        limiter = TokenRateLimiter(max_calls=100, max_tokens=1000, period=60)
+
+        limiter.wait_if_needed(600)
+        self.now[0] += 10
+        waited = limiter.wait_if_needed(600)
+
+        self.assertAlmostEqual(waited, 50)
+        self.assertEqual(limiter.get_stats()['recent_tokens'], 600)
+
+    def test_request_budget_blocks(self):
+        """Small requests are still capped by max_calls"""
+        limiter = TokenRateLimiter(max_calls=2, max_tokens=10**6, period=60)
+
+        limiter.wait_if_needed(1)
+        limiter.wait_if_needed(1)
+        limiter.wait_if_needed(1)
+
+        self.assertEqual(self.sleeps, [60])
+
+    def test_oversized_request_is_not_blocked_forever(self):
+        """A request above max_tokens runs once the window is empty"""
+        limiter = TokenRateLimiter(max_calls=10, max_tokens=100, period=60)
+
+        self.assertEqual(limiter.wait_if_needed(500), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
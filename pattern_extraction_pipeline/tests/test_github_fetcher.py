@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+GitHub Fetch Layer Tests
+
+Tests ThreadPoolGitHubFetcher against a stubbed HTTP session.
+Verifies a repository is resolved in two concurrent rounds, that only files
+present in the tree are probed, that a truncated tree falls back to the
+top-level contents listing for root files and directories, that unchanged repositories are served from
+the SnapshotCache after one conditional probe, and that the resulting
+RepoSnapshot replaces per-call PyGithub fetches in QualityMetricsCalculator.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import Mock
+
+from pattern_extraction_pipeline.github_fetcher import ThreadPoolGitHubFetcher, RepoSnapshot
+from pattern_extraction_pipeline.quality_metrics import QualityMetricsCalculator
+from pattern_extraction_pipeline.snapshot_cache import SnapshotCache
+
+
+def make_response(status_code=200, body=None, content=None, headers=None):
+    """Build a stub requests.Response."""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.json.return_value = body
+    if content is None and body is not None:
+        content = json.dumps(body)
+    response.content = (content or "").encode('utf-8')
+    response.text = content or ""
+    return response
+
+
+def make_repo():
+    """Build a mock PyGithub repository with search-result metadata."""
+    repo = Mock()
+    repo.full_name = "owner/project"
+    repo.html_url = "https://github.com/owner/project"
+    repo.default_branch = "main"
+    repo.stargazers_count = 1200
+    repo.forks_count = 80
+    repo.watchers_count = 1200
+    repo.open_issues_count = 12
+    repo.created_at = datetime.now(timezone.utc) - timedelta(days=900)
+    repo.updated_at = datetime.now(timezone.utc) - timedelta(days=3)
+    repo.pushed_at = repo.updated_at
+    repo.description = "Test project"
+    repo.language = "Python"
+    repo.license = Mock()
+    return repo
+
+
+TREE = {
+    'sha': 'abc123',
+    'truncated': False,
+    'tree': [
+        {'path': 'src', 'type': 'tree'},
+        {'path': 'src/app', 'type': 'tree'},
+        {'path': 'tests', 'type': 'tree'},
+        {'path': 'README.md', 'type': 'blob', 'size': 40},
+        {'path': 'requirements.txt', 'type': 'blob', 'size': 20},
+        {'path': '.cursorrules', 'type': 'blob', 'size': 30},
+        {'path': 'CLAUDE_backend.md', 'type': 'blob', 'size': 25},
+        {'path': 'src/app/main.py', 'type': 'blob', 'size': 100},
+    ]
+}
+
+
+class FakeGitHub:
+    """Route stub session.get calls to canned GitHub API responses."""
+
+    def __init__(self, api_url):
+        self.api_url = api_url
+        self.requested = []
+        self.head_sha = 'c0ffee'
+        self.routes = {
+            '/repos/owner/project/readme': make_response(content="# Project\nUsage notes"),
+            '/repos/owner/project/contents/requirements.txt': make_response(content="flask==3.0\n"),
+            '/repos/owner/project/contents/.cursorrules': make_response(content="Always write tests"),
+            '/repos/owner/project/contents/CLAUDE_backend.md': make_response(content="Backend rules"),
+        }
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        path = url.replace(self.api_url, '')
+        self.requested.append((path, dict(params or {})))
+        if path.startswith('/repos/owner/project/git/trees/'):
+            return make_response(body=TREE)
+        if path == '/repos/owner/project/commits/main':
+            etag = f'"etag-{self.head_sha}"'
+            if (headers or {}).get('If-None-Match') == etag:
+                return make_response(status_code=304)
+            return make_response(content=self.head_sha, headers={'ETag': etag})
+        if path == '/repos/owner/project/contributors':
+            if params.get('per_page') == '1':
+                return make_response(body=[{'login': 'dev0'}], headers={
+                    'Link': '<https://api.github.com/repositories/1/contributors?per_page=1&page=2>; rel="next", '
+                            '<https://api.github.com/repositories/1/contributors?per_page=1&page=73>; rel="last"'
+                })
+            return make_response(body=[{'login': f'dev{i}'} for i in range(50)],
+                                 headers={'Link': '<...&page=2>; rel="next"'})
+        return self.routes.get(path, make_response(status_code=404, content="Not Found"))
+
+
+class TestThreadPoolGitHubFetcher(unittest.TestCase):
+    """Test snapshot assembly from concurrent probes"""
+
+    def setUp(self):
+        self.fetcher = ThreadPoolGitHubFetcher(token="x", max_connections=4)
+        self.addCleanup(self.fetcher.close)
+        self.github = FakeGitHub(self.fetcher.api_url)
+        self.requested = self.github.requested
+        self.fetcher.session.get = Mock(side_effect=self.github.get)
+
+    def test_snapshot_contents(self):
+        """Tree, README, dependencies, rule files and contributors land in one snapshot"""
+        snapshot = self.fetcher.fetch_snapshot(make_repo())
+
+        self.assertEqual(snapshot.tree_sha, 'abc123')
+        self.assertEqual(snapshot.readme, "# Project\nUsage notes")
+        self.assertEqual(snapshot.root_directories, ['src', 'tests'])
+        self.assertIn('src/app/main.py', snapshot.files)
+        self.assertEqual(snapshot.dependencies, {'requirements': 'flask==3.0\n'})
+        self.assertEqual(
+            [(r['path'], r['format']) for r in snapshot.rule_files],
+            [('.cursorrules', 'cursorrules'), ('CLAUDE_backend.md', 'md')]
+        )
+        self.assertEqual(len(snapshot.contributors), 50)
+        self.assertEqual(snapshot.contributor_count, 73)
+        self.assertEqual(snapshot.errors, {})
+
+    def test_only_existing_files_are_probed(self):
+        """Round 2 requests only paths the tree listing contains"""
+        snapshot = self.fetcher.fetch_snapshot(make_repo())
+
+        content_paths = sorted(p for p, _ in self.requested if '/contents/' in p)
+        self.assertEqual(content_paths, [
+            '/repos/owner/project/contents/.cursorrules',
+            '/repos/owner/project/contents/CLAUDE_backend.md',
+            '/repos/owner/project/contents/requirements.txt',
+        ])
+        # 3 round-1 calls + 3 files + contributor total
+        self.assertEqual(snapshot.api_calls, 7)
+        self.assertEqual(len(self.requested), 7)
+
+    def test_rule_files_can_be_skipped(self):
+        """include_rule_files=False drops the rule-file probes"""
+        snapshot = self.fetcher.fetch_snapshot(make_repo(), include_rule_files=False)
+
+        self.assertEqual(snapshot.rule_files, [])
+        self.assertNotIn('/repos/owner/project/contents/.cursorrules', [p for p, _ in self.requested])
+
+    def test_missing_readme_and_transport_errors(self):
+        """404 README is not an error; transport failures are recorded, not raised"""
+        original = self.fetcher.session.get.side_effect
+
+        def failing_get(url, params=None, headers=None, timeout=None):
+            if url.endswith('/readme'):
+                return make_response(status_code=404, content="Not Found")
+            if url.endswith('/git/trees/main'):
+                import requests
+                raise requests.ConnectionError("reset")
+            return original(url, params=params, headers=headers, timeout=timeout)
+
+        self.fetcher.session.get.side_effect = failing_get
+        snapshot = self.fetcher.fetch_snapshot(make_repo())
+
+        self.assertFalse(snapshot.has_readme)
+        self.assertNotIn('readme', snapshot.errors)
+        self.assertEqual(snapshot.errors['tree'], 'request failed')
+        # Without a tree every candidate file is probed
+        self.assertEqual(snapshot.dependencies, {'requirements': 'flask==3.0\n'})
+
+    def test_truncated_tree_uses_root_listing(self):
+        """Root entries missing from a truncated tree come from the contents listing"""
+        original = self.fetcher.session.get.side_effect
+        truncated = {'sha': 'abc123', 'truncated': True, 'tree': [
+            {'path': 'src', 'type': 'tree'},
+            {'path': 'src/app/main.py', 'type': 'blob', 'size': 100},
+        ]}
+        self.github.routes['/repos/owner/project/contents'] = make_response(body=[
+            {'path': 'src', 'type': 'dir', 'size': 0},
+            {'path': 'tests', 'type': 'dir', 'size': 0},
+            {'path': 'docs', 'type': 'dir', 'size': 0},
+            {'path': 'CLAUDE_backend.md', 'type': 'file', 'size': 25},
+        ])
+
+        def truncated_get(url, params=None, headers=None, timeout=None):
+            if '/git/trees/' in url:
+                return make_response(body=truncated)
+            return original(url, params=params, headers=headers, timeout=timeout)
+
+        self.fetcher.session.get.side_effect = truncated_get
+        snapshot = self.fetcher.fetch_snapshot(make_repo())
+
+        self.assertTrue(snapshot.tree_truncated)
+        self.assertIn(('/repos/owner/project/contents', {'ref': 'main'}), self.requested)
+        self.assertEqual(snapshot.root_directories, ['src', 'tests', 'docs'])
+        self.assertEqual(snapshot.root_files, ['CLAUDE_backend.md'])
+        self.assertIn('CLAUDE_backend.md', [r['path'] for r in snapshot.rule_files])
+        self.assertNotIn('root_listing', snapshot.errors)
+
+
+class TestSnapshotCache(unittest.TestCase):
+    """Test snapshot reuse within and across runs"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.github = FakeGitHub(api_url="https://api.github.com")
+
+    def _fetcher(self):
+        """New fetcher and cache over the same directory, i.e. a new run."""
+        fetcher = ThreadPoolGitHubFetcher(token="x", max_connections=4, cache=SnapshotCache(self.cache_dir))
+        self.addCleanup(fetcher.close)
+        fetcher.session.get = Mock(side_effect=self.github.get)
+        return fetcher
+
+    def test_first_fetch_is_stored_by_commit(self):
+        """A miss fetches everything, pinned to the probed head commit"""
+        snapshot = self._fetcher().fetch_snapshot(make_repo())
+
+        self.assertEqual(snapshot.commit_sha, 'c0ffee')
+        self.assertFalse(snapshot.from_cache)
+        self.assertIn(('/repos/owner/project/git/trees/c0ffee', {'recursive': '1'}), self.github.requested)
+        self.assertEqual(snapshot.api_calls, 8)
+
+    def test_unchanged_repo_is_revalidated_not_refetched(self):
+        """A later run reuses the stored snapshot after a single 304 probe"""
+        first = self._fetcher().fetch_snapshot(make_repo())
+        self.github.requested.clear()
+
+        repo = make_repo()
+        repo.stargazers_count = 1500
+        second = self._fetcher().fetch_snapshot(repo)
+
+        self.assertEqual(self.github.requested, [('/repos/owner/project/commits/main', {})])
+        self.assertTrue(second.from_cache)
+        self.assertEqual(second.api_calls, 1)
+        self.assertEqual(second.readme, first.readme)
+        self.assertEqual(second.rule_files, first.rule_files)
+        self.assertEqual(second.contributor_count, 73)
+        self.assertEqual(second.created_at, repo.created_at)
+        # Search metadata is refreshed even when the code is unchanged
+        self.assertEqual(second.stars, 1500)
+
+    def test_new_commit_triggers_full_fetch(self):
+        """A moved head commit invalidates the stored snapshot"""
+        self._fetcher().fetch_snapshot(make_repo())
+        self.github.head_sha = 'beef42'
+
+        snapshot = self._fetcher().fetch_snapshot(make_repo())
+
+        self.assertFalse(snapshot.from_cache)
+        self.assertEqual(snapshot.commit_sha, 'beef42')
+        self.assertEqual(sorted(p.name for p in Path(self.cache_dir, 'owner__project').iterdir()),
+                         ['beef42.json', 'index.json'])
+
+    def test_same_run_reads_from_memory(self):
+        """Stages in one run share the snapshot without further requests"""
+        fetcher = self._fetcher()
+        first = fetcher.fetch_snapshot(make_repo())
+        self.github.requested.clear()
+
+        second = fetcher.fetch_snapshot(make_repo(), include_rule_files=False)
+
+        self.assertIs(second, first)
+        self.assertEqual(self.github.requested, [])
+        self.assertEqual(fetcher.cache.get_stats()['memory_hits'], 1)
+
+    def test_missing_rule_files_are_not_served_from_cache(self):
+        """A snapshot fetched without rule files is refetched when they are needed"""
+        self._fetcher().fetch_snapshot(make_repo(), include_rule_files=False)
+
+        snapshot = self._fetcher().fetch_snapshot(make_repo())
+
+        self.assertFalse(snapshot.from_cache)
+        self.assertEqual(len(snapshot.rule_files), 2)
+
+
+class TestSnapshotConsumers(unittest.TestCase):
+    """Test that snapshot consumers skip their own GitHub calls"""
+
+    def test_quality_metrics_uses_snapshot(self):
+        """calculate_quality_score reads README and contributors from the snapshot"""
+        repo = make_repo()
+        snapshot = RepoSnapshot(full_name=repo.full_name, html_url=repo.html_url,
+                                readme="# Project", contributors=['a', 'b'], contributor_count=42)
+
+        metrics = QualityMetricsCalculator().calculate_quality_score(repo, snapshot)
+
+        repo.get_readme.assert_not_called()
+        repo.get_contributors.assert_not_called()
+        self.assertEqual(metrics['contributors'], 42)
+
+    def test_to_repo_data(self):
+        """to_repo_data provides the fields enhance_repo_metadata expects"""
+        snapshot = RepoSnapshot(full_name="owner/project", html_url="https://github.com/owner/project",
+                                stars=10, files=['Dockerfile', 'src/main.py'],
+                                contributors=[f'dev{i}' for i in range(60)])
+
+        repo_data = snapshot.to_repo_data()
+
+        self.assertEqual(repo_data['name'], "owner/project")
+        self.assertEqual(len(repo_data['contributors']), 50)
+        self.assertEqual(repo_data['files'], ['Dockerfile', 'src/main.py'])
+
+
+if __name__ == '__main__':
+    unittest.main()
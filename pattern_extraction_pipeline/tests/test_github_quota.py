@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+GitHub Quota Tracker Tests
+
+Tests GitHubQuotaTracker against a mocked clock.
+Verifies requests are paced so the budget above the reserve lasts until the
+reset, that the 30/min search quota is paced separately from core and the
+remaining count never goes negative, that secondary limits block for Retry-After, that GitHubRateLimiter
+no longer polls get_rate_limit() once headers are known, and that the
+ThreadPoolGitHubFetcher reports response headers to the tracker.
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+
+from github import GithubException
+
+from ide_rule_library.rate_limiter import GitHubQuotaTracker, GitHubRateLimiter
+from pattern_extraction_pipeline.github_fetcher import ThreadPoolGitHubFetcher
+from pattern_extraction_pipeline.tests.test_github_fetcher import FakeGitHub, make_response
+
+NOW = 1_000_000.0
+
+
+def rate_headers(remaining, reset_in=1000, limit=5000, resource='core'):
+    return {
+        'X-RateLimit-Remaining': str(remaining),
+        'X-RateLimit-Limit': str(limit),
+        'X-RateLimit-Reset': str(int(NOW + reset_in)),
+        'X-RateLimit-Resource': resource
+    }
+
+
+class ClockTestCase(unittest.TestCase):
+    """Patch the rate limiter module's clock"""
+
+    def setUp(self):
+        self.now = [NOW]
+        self.sleeps = []
+
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.now[0] += seconds
+
+        clock = Mock(time=lambda: self.now[0], sleep=sleep)
+        patcher = patch('ide_rule_library.rate_limiter.time', clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestGitHubQuotaTracker(ClockTestCase):
+    """Test header-fed pacing"""
+
+    def test_unobserved_resource_is_not_paced(self):
+        """Without headers there is nothing to pace against"""
+        quota = GitHubQuotaTracker(reserve=100, burst=2)
+
+        for _ in range(10):
+            self.assertEqual(quota.acquire(), 0.0)
+        self.assertIsNone(quota.remaining())
+
+    def test_burst_then_paced(self):
+        """After the burst, requests are spaced at (remaining - reserve) / window"""
+        quota = GitHubQuotaTracker(reserve=100, burst=3)
+        quota.observe(rate_headers(remaining=600, reset_in=1000))
+
+        waits = [quota.acquire() for _ in range(5)]
+
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        # 500 spare requests over 1000s = one every 2s
+        self.assertAlmostEqual(waits[3], 2.0, places=1)
+        self.assertEqual(quota.remaining(), 595)
+
+    def test_reserve_waits_for_reset(self):
+        """When only the reserve is left the caller sleeps until the window resets"""
+        quota = GitHubQuotaTracker(reserve=100, burst=3)
+        quota.observe(rate_headers(remaining=100, reset_in=300))
+
+        waited = quota.acquire()
+
+        self.assertAlmostEqual(waited, 301)
+        # After the reset the full limit is available again
+        self.assertEqual(quota.acquire(), 0.0)
+
+    def test_out_of_order_responses_keep_lowest(self):
+        """A stale response from the same window cannot raise the count"""
+        quota = GitHubQuotaTracker()
+        quota.observe(rate_headers(remaining=900))
+        quota.observe(rate_headers(remaining=950))
+
+        self.assertEqual(quota.remaining(), 900)
+
+    def test_resources_are_separate(self):
+        """The search quota does not throttle core requests"""
+        quota = GitHubQuotaTracker(reserve=0, burst=1)
+        quota.observe(rate_headers(remaining=0, limit=30, reset_in=60, resource='search'), status=403)
+
+        self.assertEqual(quota.acquire('core'), 0.0)
+        self.assertAlmostEqual(quota.blocked_for('search'), 60)
+
+    def test_search_is_paced(self):
+        """Search keeps a reserve scaled to its limit and is spread over its one-minute window"""
+        quota = GitHubQuotaTracker(reserve=100, burst=1)
+        quota.observe(rate_headers(remaining=30, limit=30, reset_in=60, resource='search'))
+
+        waits = [quota.acquire('search') for _ in range(3)]
+
+        # Reserve is 3, not 100: after the first call 26 spare requests share the 60s
+        self.assertEqual(waits[0], 0.0)
+        self.assertAlmostEqual(waits[1], 60 / 26, places=2)
+        self.assertIsNone(quota.remaining('core'))
+
+    def test_remaining_never_negative(self):
+        """Acquiring past an exhausted quota leaves remaining at 0"""
+        quota = GitHubQuotaTracker(reserve=0, burst=5)
+        quota.observe(rate_headers(remaining=1, limit=30, reset_in=60, resource='search'))
+
+        quota.acquire('search')
+        quota.acquire('search', cost=3)
+
+        self.assertEqual(quota.remaining('search'), 0)
+
+    def test_retry_after_blocks(self):
+        """A secondary limit blocks the resource for Retry-After seconds"""
+        quota = GitHubQuotaTracker()
+        quota.observe({'Retry-After': '45'}, status=403, message="You have exceeded a secondary rate limit")
+
+        self.assertAlmostEqual(quota.blocked_for(), 45)
+        self.assertAlmostEqual(quota.acquire(), 45)
+        self.assertEqual(quota.blocked_for(), 0.0)
+
+
+class TestGitHubRateLimiter(ClockTestCase):
+    """Test the PyGithub wrapper"""
+
+    def setUp(self):
+        super().setUp()
+        self.gh = Mock()
+        self.gh.requester.rate_limiting = (4000, 5000)
+        self.gh.requester.rate_limiting_resettime = int(NOW + 3000)
+        self.quota = GitHubQuotaTracker(reserve=100, burst=20)
+        self.limiter = GitHubRateLimiter(self.gh, {'max_retries': 3}, Mock(), quota=self.quota)
+
+    def test_no_rate_limit_polling(self):
+        """Calls read the quota from PyGithub's last response instead of /rate_limit"""
+        def func():
+            remaining, limit = self.gh.requester.rate_limiting
+            self.gh.requester.rate_limiting = (remaining - 1, limit)
+            return 'ok'
+
+        for _ in range(5):
+            self.assertEqual(self.limiter.call_with_retry(func), 'ok')
+
+        self.gh.get_rate_limit.assert_not_called()
+        self.assertEqual(self.limiter.get_remaining_calls(), 3995)
+
+    def test_search_calls_use_search_bucket(self):
+        """resource='search' paces and records the call against search, not core"""
+        self.gh.requester.rate_limiting = (25, 30)
+        self.gh.requester.rate_limiting_resettime = int(NOW + 60)
+        func = Mock(return_value='ok')
+
+        self.assertEqual(self.limiter.call_with_retry(func, 'q', resource='search'), 'ok')
+
+        func.assert_called_once_with('q')
+        self.assertEqual(self.quota.remaining('search'), 25)
+        self.assertIsNone(self.quota.remaining('core'))
+
+    def test_secondary_limit_uses_retry_after(self):
+        """A 403 with Retry-After waits that long instead of exponential backoff"""
+        error = GithubException(403, {'message': "secondary rate limit"}, {'retry-after': '30'})
+        func = Mock(side_effect=[error, 'ok'])
+
+        self.assertEqual(self.limiter.call_with_retry(func), 'ok')
+        self.assertEqual(self.sleeps, [30])
+
+
+class TestFetcherQuota(unittest.TestCase):
+    """Test the REST fetcher reports to the tracker"""
+
+    def test_fetcher_observes_headers(self):
+        """Every fetcher request acquires from and reports back to the tracker"""
+        quota = Mock()
+        fetcher = ThreadPoolGitHubFetcher(token="x", max_connections=2, quota=quota)
+        self.addCleanup(fetcher.close)
+        github = FakeGitHub(fetcher.api_url)
+        github.routes['/repos/owner/project/readme'] = make_response(
+            content="# Project", headers=rate_headers(remaining=4321)
+        )
+        fetcher.session.get = Mock(side_effect=github.get)
+
+        fetcher._get('/repos/owner/project/readme', raw=True).result()
+
+        quota.acquire.assert_called_once()
+        headers, status, _ = quota.observe.call_args.args
+        self.assertEqual(headers['X-RateLimit-Remaining'], '4321')
+        self.assertEqual(status, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
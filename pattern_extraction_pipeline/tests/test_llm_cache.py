@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache Tests
+
+Tests LLMResponseCache against a stub model.
+Verifies repeated prompts are served without an API call, that keys are
+separated by model and insensitive to whitespace, that LRU eviction keeps the
+store under budget, and that unusable responses are not replayed.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+from pattern_extraction_pipeline.llm_cache import LLMResponseCache, prompt_key
+from pattern_extraction_pipeline.pattern_critic import PatternCritic
+
+
+def make_llm(text, model_name="models/gemini-2.5-flash"):
+    """Build a stub GenerativeModel returning fixed text."""
+    llm = Mock()
+    llm.model_name = model_name
+    llm.generate_content.return_value = Mock(text=text)
+    return llm
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    """Test prompt/response caching"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.db_path = str(Path(self.cache_dir, "llm.sqlite"))
+        self.cache = LLMResponseCache(self.db_path)
+        self.addCleanup(self.cache.close)
+
+    def test_repeat_prompt_is_served_from_cache(self):
+        """Second identical prompt does not call the model"""
+        llm = make_llm("answer")
+
+        first = self.cache.generate(llm, "Analyse this repo")
+        second = self.cache.generate(llm, "Analyse this repo")
+
+        self.assertEqual(first, "answer")
+        self.assertEqual(second, "answer")
+        llm.generate_content.assert_called_once()
+        stats = self.cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+
+    def test_rate_limiter_only_on_miss(self):
+        """Only calls that reach the model wait on the rate limiter"""
+        limiter = Mock()
+
+        self.cache.generate(make_llm("answer"), "prompt", rate_limiter=limiter)
+        self.cache.generate(make_llm("answer"), "prompt", rate_limiter=limiter)
+
+        limiter.wait_if_needed.assert_called_once()
+
+    def test_persists_across_instances(self):
+        """A new run reads responses stored by the previous one"""
+        self.cache.generate(make_llm("answer"), "prompt")
+
+        reopened = LLMResponseCache(self.db_path)
+        self.addCleanup(reopened.close)
+        llm = make_llm("different")
+
+        self.assertEqual(reopened.generate(llm, "prompt"), "answer")
+        llm.generate_content.assert_not_called()
+
+    def test_whitespace_normalisation(self):
+        """Indentation and line-break changes share a key"""
+        self.assertEqual(prompt_key("m", "Rate  this\n    pattern "), prompt_key("m", "Rate this pattern"))
+        self.assertNotEqual(prompt_key("m", "Rate this pattern"), prompt_key("m", "Rate that pattern"))
+
+    def test_models_are_separated(self):
+        """The same prompt to another model is a miss"""
+        self.cache.generate(make_llm("flash"), "prompt")
+        pro = make_llm("pro", model_name="models/gemini-2.5-pro")
+
+        self.assertEqual(self.cache.generate(pro, "prompt"), "pro")
+        pro.generate_content.assert_called_once()
+
+    def test_lru_eviction(self):
+        """Least-recently-used entries go first once over budget"""
+        cache = LLMResponseCache(str(Path(self.cache_dir, "small.sqlite")), max_size_mb=25 / (1024 * 1024))
+        self.addCleanup(cache.close)
+
+        cache.put("m", "a", "x" * 10)
+        cache.put("m", "b", "x" * 10)
+        cache.get("m", "a")  # 'a' is now more recent than 'b'
+        cache.put("m", "c", "x" * 10)
+
+        self.assertIsNotNone(cache.get("m", "a"))
+        self.assertIsNone(cache.get("m", "b"))
+        self.assertIsNotNone(cache.get("m", "c"))
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+        self.assertLessEqual(cache.get_stats()['size_bytes'], 25)
+
+    def test_reject_drops_entry(self):
+        """A rejected response is requested again next time"""
+        llm = make_llm("not json")
+        self.cache.generate(llm, "prompt")
+        self.cache.reject(llm, "prompt")
+
+        self.cache.generate(llm, "prompt")
+
+        self.assertEqual(llm.generate_content.call_count, 2)
+
+
+class TestCachedConsumers(unittest.TestCase):
+    """Test that LLM consumers go through the cache"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.cache = LLMResponseCache(str(Path(self.cache_dir, "llm.sqlite")))
+        self.addCleanup(self.cache.close)
+
+    def _critic(self, text):
+        critic = PatternCritic.__new__(PatternCritic)
+        critic.llm = make_llm(text)
+        critic.llm_cache = self.cache
+        return critic
+
+    def test_critic_validation_is_cached(self):
+        """Re-validating an unchanged pattern costs no API call"""
+        critic = self._critic(json.dumps({'validation_score': 0.9, 'needs_review': False}))
+        pattern = {'pattern_name': 'Service Layer', 'requirements': {'type': 'api'}}
+
+        first = critic.validate_pattern(pattern)
+        second = critic.validate_pattern(pattern)
+
+        self.assertEqual(first, second)
+        critic.llm.generate_content.assert_called_once()
+
+    def test_critic_invalid_json_is_not_cached(self):
+        """An unparseable critique is asked for again"""
+        critic = self._critic("Sorry, I cannot help")
+        pattern = {'pattern_name': 'Service Layer'}
+
+        critic.validate_pattern(pattern)
+        critic.validate_pattern(pattern)
+
+        self.assertEqual(critic.llm.generate_content.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
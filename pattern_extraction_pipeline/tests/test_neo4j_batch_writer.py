@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Neo4j Write-Behind Buffer Tests
+
+Tests Neo4jBatchWriter against a mocked driver.
+Verifies size, time and close() flushes, UNWIND batching and flush ordering,
+that failed batches (and the rows that depend on them) are kept and
+retried, and that PatternExtractor routes its writes through the buffer.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from pattern_extraction_pipeline.exceptions import DatabaseWriteError
+from pattern_extraction_pipeline.neo4j_batch_writer import (
+    Neo4jBatchWriter,
+    PATTERN_UPSERT_QUERY,
+    RULE_LINK_QUERY,
+    VALIDATION_UPDATE_QUERY
+)
+from pattern_extraction_pipeline.pattern_extractor import PatternExtractor
+
+
+def make_driver():
+    """Build a mock driver that records each execute_write batch."""
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    batches = []
+    lock = threading.Lock()
+
+    def execute_write(fn, query, rows):
+        with lock:
+            batches.append((query, list(rows)))
+        return len(rows)
+
+    session.execute_write.side_effect = execute_write
+    return driver, session, batches
+
+
+class TestNeo4jBatchWriter(unittest.TestCase):
+    """Test buffering and flush triggers"""
+
+    def setUp(self):
+        self.driver, self.session, self.batches = make_driver()
+
+    def test_flush_on_batch_size(self):
+        """Reaching batch_size writes one UNWIND batch"""
+        writer = Neo4jBatchWriter(self.driver, batch_size=3, flush_interval=0)
+        self.addCleanup(writer.close)
+
+        writer.add('pattern', {'source_repo': 'a'})
+        writer.add('pattern', {'source_repo': 'b'})
+        self.assertEqual(self.batches, [])
+
+        writer.add('pattern', {'source_repo': 'c'})
+        self.assertEqual(len(self.batches), 1)
+        query, rows = self.batches[0]
+        self.assertIs(query, PATTERN_UPSERT_QUERY)
+        self.assertIn('UNWIND $rows AS row', query)
+        self.assertEqual([r['source_repo'] for r in rows], ['a', 'b', 'c'])
+        self.assertEqual(writer.pending(), 0)
+
+    def test_patterns_flush_before_dependent_writes(self):
+        """Rules and score updates are written after the patterns they MATCH"""
+        writer = Neo4jBatchWriter(self.driver, batch_size=100, flush_interval=0)
+
+        writer.add('validation', {'pattern_name': 'p1'})
+        writer.add('rule', {'pattern_name': 'p1'})
+        writer.add('pattern', {'pattern_name': 'p1'})
+        written = writer.flush()
+
+        self.assertEqual(written, 3)
+        self.assertEqual([q for q, _ in self.batches],
+                         [PATTERN_UPSERT_QUERY, RULE_LINK_QUERY, VALIDATION_UPDATE_QUERY])
+        writer.close()
+
+    def test_large_flush_is_chunked(self):
+        """A flush writes at most batch_size rows per transaction"""
+        writer = Neo4jBatchWriter(self.driver, batch_size=4, flush_interval=0)
+        with writer._lock:
+            writer._buffers['judge'] = [{'pattern_name': f'p{i}'} for i in range(10)]
+
+        writer.flush()
+
+        self.assertEqual([len(rows) for _, rows in self.batches], [4, 4, 2])
+        self.assertEqual(writer.get_stats()['rows_written']['judge'], 10)
+        writer.close()
+
+    def test_flush_on_interval(self):
+        """The background thread flushes rows that never reach batch_size"""
+        writer = Neo4jBatchWriter(self.driver, batch_size=100, flush_interval=0.05)
+        self.addCleanup(writer.close)
+
+        writer.add('judge', {'pattern_name': 'p1'})
+        deadline = time.time() + 2
+        while not self.batches and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(len(self.batches), 1)
+
+    def test_close_flushes_and_rejects_new_rows(self):
+        """close() writes pending rows; later adds fail loudly"""
+        writer = Neo4jBatchWriter(self.driver, batch_size=100, flush_interval=0)
+        writer.add('pattern', {'source_repo': 'a'})
+
+        writer.close()
+        writer.close()  # idempotent
+
+        self.assertEqual(len(self.batches), 1)
+        with self.assertRaises(DatabaseWriteError):
+            writer.add('pattern', {'source_repo': 'b'})
+
+    def test_failed_batch_raises_on_explicit_flush(self):
+        """Failures are counted, surfaced as DatabaseWriteError and kept for the next flush"""
+        write = self.session.execute_write.side_effect
+        self.session.execute_write.side_effect = Exception("ServiceUnavailable")
+        writer = Neo4jBatchWriter(self.driver, batch_size=100, flush_interval=0)
+        writer.add('pattern', {'source_repo': 'a'})
+        writer.add('rule', {'pattern_name': 'p1'})
+
+        with self.assertRaises(DatabaseWriteError):
+            writer.flush()
+
+        stats = writer.get_stats()
+        self.assertEqual((stats['rows_failed'], stats['pending']), (2, 2))
+
+        self.session.execute_write.side_effect = write
+        writer.add('pattern', {'source_repo': 'b'})
+        writer.close()
+
+        self.assertEqual([rows for _, rows in self.batches], [
+            [{'source_repo': 'a'}, {'source_repo': 'b'}], [{'pattern_name': 'p1'}]
+        ])
+        self.assertEqual(writer.get_stats()['rows_lost'], 0)
+
+    def test_failed_pattern_defers_its_dependents(self):
+        """Rule and score rows for a pattern that failed to write are requeued, not run"""
+        write = self.session.execute_write.side_effect
+
+        def fail_patterns(fn, query, rows):
+            if query is PATTERN_UPSERT_QUERY:
+                raise Exception("ServiceUnavailable")
+            return write(fn, query, rows)
+
+        self.session.execute_write.side_effect = fail_patterns
+        writer = Neo4jBatchWriter(self.driver, batch_size=100, flush_interval=0)
+        writer.add('pattern', {'pattern_name': 'p1'})
+        writer.add('rule', {'pattern_name': 'p1'})
+        writer.add('validation', {'pattern_name': 'p1'})
+        writer.add('validation', {'pattern_name': 'p0'})
+
+        with self.assertRaises(DatabaseWriteError):
+            writer.flush()
+
+        self.assertEqual(self.batches, [(VALIDATION_UPDATE_QUERY, [{'pattern_name': 'p0'}])])
+        stats = writer.get_stats()
+        self.assertEqual((stats['rows_failed'], stats['rows_unmatched'], stats['pending']), (1, 0, 3))
+
+        self.session.execute_write.side_effect = write
+        writer.close()
+
+        self.assertEqual([q for q, _ in self.batches[1:]],
+                         [PATTERN_UPSERT_QUERY, RULE_LINK_QUERY, VALIDATION_UPDATE_QUERY])
+
+    def test_size_triggered_failure_keeps_rows(self):
+        """A failed size-triggered flush neither loses rows nor raises at the caller"""
+        self.session.execute_write.side_effect = Exception("ServiceUnavailable")
+        writer = Neo4jBatchWriter(self.driver, batch_size=2, flush_interval=0)
+        writer.add('pattern', {'source_repo': 'a'})
+        writer.add('pattern', {'source_repo': 'b'})
+        writer.add('pattern', {'source_repo': 'c'})  # Backing off: no second attempt
+
+        self.assertEqual(self.session.execute_write.call_count, 1)
+        self.assertEqual(writer.pending(), 3)
+
+        with self.assertRaises(DatabaseWriteError):
+            writer.close()
+        self.assertEqual(writer.get_stats()['rows_lost'], 3)
+
+
+class TestExtractorWriteBehind(unittest.TestCase):
+    """Test PatternExtractor writes go through the buffer"""
+
+    @patch('pattern_extraction_pipeline.pattern_extractor.GraphDatabase')
+    @patch('pattern_extraction_pipeline.pattern_extractor.Github')
+    def test_store_and_updates_are_batched(self, mock_github, mock_graph_db):
+        """Pattern, validation and judge writes share one flush on close()"""
+        driver, session, batches = make_driver()
+        mock_graph_db.driver.return_value = driver
+        mock_github.return_value = Mock()
+
+        extractor = PatternExtractor()
+        extractor.neo4j_writer.flush_interval = 0
+
+        for i in range(3):
+            extractor._store_pattern({
+                'pattern_name': f'pattern{i}',
+                'source_repo': f'https://github.com/owner/repo{i}',
+                'stars': 100,
+                'requirements': {'type': 'general', 'domain': 'test'},
+                'technologies': ['Python '],
+                'constraints': []
+            })
+        extractor._update_pattern_validation('pattern0', 0.8, False, 'ok')
+        extractor._update_pattern_judge_evaluation('pattern0', 0.9, 'good')
+
+        session.run.assert_not_called()
+        self.assertEqual(batches, [])
+
+        extractor.close()
+
+        self.assertEqual([len(rows) for _, rows in batches], [3, 1, 1])
+        pattern_rows = batches[0][1]
+        self.assertEqual(pattern_rows[0]['technologies'][0]['name'], 'python')
+        self.assertEqual(pattern_rows[0]['constraints'][0]['rule'], 'no_constraints_specified')
+        driver.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
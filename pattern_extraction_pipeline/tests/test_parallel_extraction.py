@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Parallel Extraction Tests
+
+Tests the bounded worker-pool mode of PatternExtractor.extract_patterns.
+Verifies statistics, result ordering, per-repository trajectory logging and
+console output (one block per repository, numbered against the real
+candidate count) stay correct when several repositories are processed at
+once, that
+already-analyzed repositories are filtered by one batched Neo4j query, that
+search pages are paced against the search quota, and that every Gemini
+call waits on the shared rate limiter.
+"""
+
+import io
+import json
+import re
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from ide_rule_library.rate_limiter import GitHubQuotaTracker
+from pattern_extraction_pipeline.pattern_extractor import PatternExtractor
+from pattern_extraction_pipeline.rate_limiter import RateLimiter
+from pattern_extraction_pipeline.trajectory_logger import TrajectoryLogger
+
+
+def make_repo(index):
+    """Build a mock PyGithub repository."""
+    repo = Mock()
+    repo.full_name = f"owner/repo{index}"
+    repo.html_url = f"https://github.com/owner/repo{index}"
+    repo.stargazers_count = 1000 + index
+    repo.description = "Test repository"
+    repo.language = "Python"
+    return repo
+
+
+class TestParallelExtraction(unittest.TestCase):
+    """Test concurrent per-repository extraction"""
+
+    @patch('pattern_extraction_pipeline.pattern_extractor.GraphDatabase')
+    @patch('pattern_extraction_pipeline.pattern_extractor.Github')
+    def setUp(self, mock_github, mock_graph_db):
+        mock_graph_db.driver.return_value = Mock()
+        self.github = Mock()
+        mock_github.return_value = self.github
+
+        self.extractor = PatternExtractor()
+        self.addCleanup(self.extractor.close)
+
+        self.log_dir = tempfile.mkdtemp()
+        self.extractor.trajectory_logger = TrajectoryLogger(log_dir=self.log_dir)
+        self.extractor.quality_calculator = None
+        self.extractor.critic = None
+        self.extractor.github_fetcher.close()
+        self.extractor.github_fetcher = None
+        self.extractor.snapshot_cache = None
+        self.extractor.github_quota = None
+
+        self.repos = [make_repo(i) for i in range(8)]
+        self.github.search_repositories.return_value = self.repos
+
+        # Slow, network-like fetches so workers genuinely overlap
+        def slow_readme(repo, snapshot=None):
+            time.sleep(0.05)
+            return f"README for {repo.full_name}"
+
+        def fake_llm(**kwargs):
+            time.sleep(0.05)
+            return {
+                'pattern_name': f"pattern_{kwargs['repo_name'].split('/')[-1]}",
+                'requirements': {'type': 'general', 'domain': 'test'},
+                'source_repo': kwargs['repo_url'],
+                'stars': kwargs['stars']
+            }
+
+        self.extractor._check_repos_exist = Mock(return_value={})
+        self.extractor._check_if_repo_exists = Mock(return_value=None)
+        self.extractor._fetch_readme = Mock(side_effect=slow_readme)
+        self.extractor._analyze_structure = Mock(return_value={"directories": ["src"]})
+        self.extractor._fetch_dependencies = Mock(return_value={})
+        self.extractor._extract_with_llm = Mock(side_effect=fake_llm)
+        self.extractor._store_pattern = Mock()
+
+    def _run(self, max_workers):
+        self.extractor.max_workers = max_workers
+        with patch.object(self.extractor, '_print_extraction_stats') as mock_stats:
+            patterns = self.extractor.extract_patterns("topic:test", limit=8, validate=False)
+        return patterns, mock_stats.call_args[0][0]
+
+    def test_parallel_matches_sequential(self):
+        """Worker pool returns the same patterns, in search order, as sequential mode"""
+        sequential, sequential_stats = self._run(max_workers=1)
+        parallel, parallel_stats = self._run(max_workers=4)
+
+        self.assertEqual(
+            [p['pattern_name'] for p in parallel],
+            [p['pattern_name'] for p in sequential]
+        )
+        self.assertEqual(parallel_stats['partial'], 8)
+        self.assertEqual(parallel_stats, sequential_stats)
+
+    def test_parallel_counts_failures_and_skips(self):
+        """Skips and failures from worker threads are all accounted for"""
+        self.extractor._check_repos_exist = Mock(side_effect=lambda urls: {
+            url: {'extracted_at': datetime(2025, 1, 1), 'quality_score': 70.0, 'stars': 1}
+            for url in urls if url.endswith(('repo0', 'repo1'))
+        })
+
+        def flaky_llm(**kwargs):
+            if kwargs['repo_name'].endswith('repo2'):
+                raise ValueError("Invalid JSON from LLM")
+            return {
+                'pattern_name': f"pattern_{kwargs['repo_name']}",
+                'requirements': {'type': 'general', 'domain': 'test'}
+            }
+        self.extractor._extract_with_llm = Mock(side_effect=flaky_llm)
+
+        patterns, stats = self._run(max_workers=4)
+
+        self.assertEqual(len(patterns), 5)
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['partial'], 5)
+        self.assertEqual(stats['errors'][0]['repo'], 'owner/repo2')
+
+    def test_console_blocks_do_not_interleave(self):
+        """Each repository prints one contiguous block, numbered against the candidates found"""
+        self.extractor._check_repos_exist = Mock(side_effect=lambda urls: {
+            url: {'extracted_at': datetime(2025, 1, 1), 'quality_score': 70.0, 'stars': 1}
+            for url in urls if url.endswith(('repo0', 'repo1'))
+        })
+        stdout = io.StringIO()
+
+        with redirect_stdout(stdout):
+            self._run(max_workers=4)
+
+        blocks = re.findall(r'^\[(\d+)/(\d+)\] Analyzing (\S+)\.\.\.\n((?:  .*\n)*)', stdout.getvalue(), re.M)
+        self.assertEqual(sorted(int(position) for position, _, _, _ in blocks), list(range(1, 7)))
+        self.assertEqual({total for _, total, _, _ in blocks}, {'6'})  # not the requested limit of 8
+        for _, _, name, lines in blocks:
+            self.assertEqual(lines, f"  README: 22 chars\n  Structure: 1 directories\n"
+                                    f"  [OK] Pattern: pattern_{name.split('/')[-1]} "
+                                    f"(partial - missing: dependencies, quality_metrics, stored)\n")
+
+    def test_trajectory_events_stay_with_their_repository(self):
+        """Each repository's trajectory holds only its own events, in order"""
+        with patch.object(self.extractor, '_print_extraction_stats'):
+            self.extractor.max_workers = 4
+            self.extractor.extract_patterns("topic:test", limit=8, validate=False)
+
+        trajectory_files = list(Path(self.log_dir).glob('*.json'))
+        self.assertEqual(len(trajectory_files), 1)
+        with open(trajectory_files[0], encoding='utf-8') as f:
+            trajectory = json.load(f)
+
+        self.assertEqual(trajectory['summary']['total_repos'], 8)
+        for repo in trajectory['repositories']:
+            event_types = [e['type'] for e in repo['events']]
+            self.assertEqual(event_types, ['github_api', 'github_api', 'llm_extraction', 'neo4j_storage'])
+            self.assertEqual(repo['extraction_result'], 'partial')
+            llm_event = repo['events'][2]
+            self.assertTrue(llm_event['pattern_name'].endswith(repo['repo_name'].split('/')[-1]))
+
+
+class TestExistencePrecheck(unittest.TestCase):
+    """Test the batched already-analyzed check"""
+
+    @patch('pattern_extraction_pipeline.pattern_extractor.GraphDatabase')
+    @patch('pattern_extraction_pipeline.pattern_extractor.Github')
+    def setUp(self, mock_github, mock_graph_db):
+        self.driver = MagicMock()
+        mock_graph_db.driver.return_value = self.driver
+        self.session = self.driver.session.return_value.__enter__.return_value
+        self.github = Mock()
+        mock_github.return_value = self.github
+
+        self.extractor = PatternExtractor()
+        self.addCleanup(self.extractor.close)
+        self.extractor.trajectory_logger = None
+        self.extractor.quality_calculator = None
+        self.extractor.critic = None
+        self.extractor.github_fetcher = None
+        # Search responses as PyGithub records them: 29 of 30 left this minute
+        self.github.requester.rate_limiting = (29, 30)
+        self.github.requester.rate_limiting_resettime = int(time.time()) + 60
+        self.extractor.github_quota = GitHubQuotaTracker()
+
+        def run(query, urls):
+            return [
+                {'source_repo': url, 'name': 'known', 'extracted_at': datetime(2025, 1, 1),
+                 'quality_score': 70.0, 'stars': 1}
+                for url in urls if url.endswith(('repo0', 'repo1'))
+            ]
+        self.session.run.side_effect = run
+
+    def test_one_query_for_many_repos(self):
+        """A batch is resolved in one UNWIND query and then served from memory"""
+        urls = [make_repo(i).html_url for i in range(8)]
+
+        existing = self.extractor._check_repos_exist(urls)
+
+        self.assertEqual(sorted(existing), urls[:2])
+        self.session.run.assert_called_once()
+        self.assertIn('UNWIND $urls', self.session.run.call_args[0][0])
+
+        self.assertIsNone(self.extractor._check_if_repo_exists(urls[5]))
+        self.assertEqual(self.extractor._check_if_repo_exists(urls[0])['name'], 'known')
+        self.session.run.assert_called_once()
+
+    def _run(self, search_results, limit):
+        self.github.search_repositories.return_value = search_results
+        self.extractor._fetch_readme = Mock(return_value="README")
+        self.extractor._analyze_structure = Mock(return_value={"directories": []})
+        self.extractor._fetch_dependencies = Mock(return_value={})
+        self.extractor._extract_with_llm = Mock(side_effect=lambda **kw: {
+            'pattern_name': kw['repo_name'], 'requirements': {'type': 'general', 'domain': 'test'}
+        })
+        self.extractor._store_pattern = Mock()
+
+        with patch.object(self.extractor, '_print_extraction_stats') as mock_stats:
+            patterns = self.extractor.extract_patterns("topic:test", limit=limit, validate=False)
+        return patterns, mock_stats.call_args[0][0]
+
+    def test_skipped_repos_never_reach_fetch_or_llm(self):
+        """Known repos are filtered before any GitHub or LLM work"""
+        patterns, stats = self._run([make_repo(i) for i in range(4)], limit=4)
+
+        self.assertEqual([p['pattern_name'] for p in patterns], ['owner/repo2', 'owner/repo3'])
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual(self.extractor._fetch_readme.call_count, 2)
+        self.session.run.assert_called_once()
+
+    def test_search_results_are_consumed_lazily(self):
+        """Only the search page needed to reach `limit` new repos is read"""
+        pulled = []
+
+        def search_results():
+            for i in range(100):
+                pulled.append(i)
+                yield make_repo(i)
+
+        patterns, stats = self._run(search_results(), limit=3)
+
+        # repo0/repo1 are known, so `limit` is reached at repo4
+        self.assertEqual([p['pattern_name'] for p in patterns], ['owner/repo2', 'owner/repo3', 'owner/repo4'])
+        self.assertEqual(stats['total'], 5)
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual(len(pulled), 30)
+
+    def test_search_pages_use_search_quota(self):
+        """Each search page is acquired from and reported to the search bucket, not core"""
+        quota = self.extractor.github_quota
+
+        self._run([make_repo(i) for i in range(4)], limit=4)
+
+        # Two pages (the second is the empty end of results) drawn after 29 were reported
+        self.assertEqual(quota.get_stats()['acquired'], 2)
+        self.assertEqual(quota.remaining('search'), 28)
+        self.assertIsNone(quota.remaining('core'))
+
+
+class TestGeminiRateLimit(unittest.TestCase):
+    """Test every Gemini call goes through the shared rate limiter"""
+
+    @patch('pattern_extraction_pipeline.pattern_extractor.GraphDatabase')
+    @patch('pattern_extraction_pipeline.pattern_extractor.Github')
+    def setUp(self, mock_github, mock_graph_db):
+        mock_graph_db.driver.return_value = Mock()
+        self.github = Mock()
+        mock_github.return_value = self.github
+
+        self.extractor = PatternExtractor()
+        self.addCleanup(self.extractor.close)
+        self.extractor.llm_cache = None
+        self.extractor.gemini_rate_limiter = Mock(wait_if_needed=Mock(return_value=0))
+        self.extractor.llm = Mock()
+        self.extractor.llm.generate_content.return_value = Mock(
+            text='{"pattern_name": "p", "confidence": "high", "requirements": {"type": "general"}}'
+        )
+
+    def test_extraction_and_refine_calls_are_limited(self):
+        """Pattern extraction (with or without the response cache) and query refinement wait on the limiter"""
+        kwargs = dict(repo_name='owner/repo', stars=1, repo_url='u', readme='r', structure={}, dependencies={})
+        self.extractor._extract_with_llm(**kwargs)
+
+        self.github.search_repositories.side_effect = [Mock(totalCount=0), Mock(totalCount=10)]
+        self.extractor.validate_and_refine_query("topic:none", min_results=5)
+
+        self.assertEqual(self.extractor.llm.generate_content.call_count, 2)
+        self.assertEqual(self.extractor.gemini_rate_limiter.wait_if_needed.call_count, 2)
+
+        self.extractor.llm_cache = Mock()
+        self.extractor.llm_cache.generate.return_value = self.extractor.llm.generate_content.return_value.text
+        self.extractor._extract_with_llm(**kwargs)
+        self.assertIs(self.extractor.llm_cache.generate.call_args.kwargs['rate_limiter'],
+                      self.extractor.gemini_rate_limiter)
+
+
+class TestRateLimiterThreadSafety(unittest.TestCase):
+    """Test that one RateLimiter budget holds across threads"""
+
+    def test_shared_budget_across_threads(self):
+        """Concurrent callers never exceed max_calls within the period"""
+        limiter = RateLimiter(max_calls=5, period=0.5, name="shared")
+        call_times = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(3):
+                limiter.wait_if_needed()
+                with lock:
+                    call_times.append(time.time())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        call_times.sort()
+        self.assertEqual(len(call_times), 12)
+        for i in range(len(call_times) - 5):
+            # Any 6 consecutive calls must span at least one period
+            self.assertGreaterEqual(call_times[i + 5] - call_times[i], 0.5 - 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Quality Metrics Batch Tests
+
+Tests QualityMetricsCalculator.score_batch against calculate_quality_score.
+Verifies the composite and every component score are identical for random
+repositories and for each threshold boundary, so stored raw metrics can be
+re-scored without GitHub calls, and that the rounding helper matches the
+IDE rule library's copy.
+"""
+
+import random
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import numpy as np
+
+from pattern_extraction_pipeline.quality_metrics import QualityMetricsCalculator, _round_like_builtin
+
+SCORES = ['composite_score', 'popularity_score', 'maintenance_score', 'maturity_score',
+          'community_score', 'freshness_score']
+
+
+def make_repo(stars, forks, watchers, open_issues, age_days, update_days, description, has_license):
+    """Build a mock PyGithub repository."""
+    now = datetime.now(timezone.utc)
+    repo = Mock()
+    repo.stargazers_count = stars
+    repo.forks_count = forks
+    repo.watchers_count = watchers
+    repo.open_issues_count = open_issues
+    repo.created_at = now - timedelta(days=age_days, hours=1)
+    repo.updated_at = now - timedelta(days=update_days, hours=1)
+    repo.description = description
+    repo.license = Mock() if has_license else None
+    return repo
+
+
+def make_snapshot(has_readme, contributor_count):
+    snapshot = Mock()
+    snapshot.has_readme = has_readme
+    snapshot.contributor_count = contributor_count
+    return snapshot
+
+
+class TestQualityMetricsBatch(unittest.TestCase):
+    """Test parity of the vectorised calculator with the per-repo path"""
+
+    def setUp(self):
+        self.calculator = QualityMetricsCalculator()
+
+    def assert_parity(self, cases):
+        """Score each (repo, snapshot) both ways and compare"""
+        expected = []
+        columns = {name: [] for name in ['stars', 'forks', 'watchers', 'open_issues', 'contributors',
+                                         'repo_age_months', 'days_since_update', 'has_description',
+                                         'has_readme', 'has_license']}
+        for repo, snapshot in cases:
+            result = self.calculator.calculate_quality_score(repo, snapshot)
+            expected.append({name: result[name] for name in SCORES})
+            for name in ['stars', 'forks', 'watchers', 'open_issues', 'contributors',
+                         'repo_age_months', 'days_since_update']:
+                columns[name].append(result[name])
+            columns['has_description'].append(bool(repo.description))
+            columns['has_readme'].append(snapshot.has_readme)
+            columns['has_license'].append(repo.license is not None)
+
+        batch = self.calculator.score_batch(columns)
+        for i, scores in enumerate(expected):
+            self.assertEqual({name: batch[name][i].item() for name in SCORES}, scores, msg=f"case {i}")
+
+    def test_random_repositories(self):
+        """1000 random repositories score identically"""
+        rng = random.Random(18)
+        cases = []
+        for _ in range(1000):
+            stars = rng.choice([0, 499, 500, 1000, 100000, rng.randint(0, 150000)])
+            repo = make_repo(
+                stars=stars,
+                forks=rng.randint(0, max(stars, 1) * 2),
+                watchers=rng.randint(0, max(stars, 1)),
+                open_issues=rng.choice([0, 10, 11, 50, 200, 201, rng.randint(0, 400)]),
+                age_days=rng.randint(0, 4000),
+                update_days=rng.randint(0, 1000),
+                description=rng.choice(["", "A library"]),
+                has_license=rng.random() < 0.5
+            )
+            snapshot = make_snapshot(rng.random() < 0.8, rng.choice([0, 4, 5, 19, 20, 50, rng.randint(0, 80)]))
+            cases.append((repo, snapshot))
+        self.assert_parity(cases)
+
+    def test_threshold_boundaries(self):
+        """Every ladder edge lands on the same side as the scalar path"""
+        cases = []
+        for age_days in [0, 89, 90, 179, 180, 359, 360, 719, 720, 1079, 1080, 1439, 1440, 2520, 4000]:
+            for update_days in [7, 8, 30, 31, 90, 91, 180, 181, 365, 366, 730, 731]:
+                repo = make_repo(2000, 200, 100, 10, age_days, update_days, "d", True)
+                cases.append((repo, make_snapshot(True, 20)))
+        self.assert_parity(cases)
+
+    def test_empty_table(self):
+        """An empty table yields empty score arrays"""
+        empty = {name: np.array([]) for name in ['stars', 'forks', 'watchers', 'open_issues', 'contributors',
+                                                 'repo_age_months', 'days_since_update', 'has_description',
+                                                 'has_readme', 'has_license']}
+        result = self.calculator.score_batch(empty)
+
+        self.assertEqual(sorted(result), sorted(SCORES))
+        self.assertEqual(len(result['composite_score']), 0)
+
+
+class TestRoundLikeBuiltin(unittest.TestCase):
+    """Test the local rounding helper against the builtin and ide_rule_library's copy"""
+
+    def test_parity(self):
+        """Both helpers round ties and random values exactly like round()"""
+        from ide_rule_library.quality_scorer import _round_like_builtin as scorer_round
+
+        rng = np.random.default_rng(7)
+        ties = np.arange(0, 10000) / 200  # x.xx5 steps: every other value is a tie at 2 digits
+        values = np.concatenate([ties, ties * 10, rng.uniform(0, 100, 5000)])
+        for digits in (1, 2):
+            expected = [round(float(value), digits) for value in values]
+            self.assertEqual(_round_like_builtin(values, digits).tolist(), expected)
+            self.assertEqual(scorer_round(values, digits).tolist(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
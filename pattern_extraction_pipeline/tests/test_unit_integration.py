@@ -295,6 +295,10 @@ class TestNeo4jRelationships(unittest.TestCase):
         extractor = PatternExtractor()
         self.addCleanup(extractor.close)
         
+        # Write immediately rather than through the write-behind buffer
+        extractor.neo4j_writer.close()
+        extractor.neo4j_writer = None
+        
         pattern_name = "Test Pattern"
         source_repo = "https://github.com/test/repo"
         rule = {
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Vector Index Tests
+
+Tests PatternVectorIndex against a stubbed Neo4j driver.
+Verifies top-k matches an exact cosine ranking on the Neo4j score scale,
+that IVF search finds the same neighbours when probing enough clusters,
+that refresh() only pulls re-embedded patterns (and reloads after
+deletions), and that HybridQueryBuilder swaps queryNodes for local
+candidates when given an index.
+"""
+
+import unittest
+from unittest.mock import MagicMock, Mock
+
+import numpy as np
+
+from pattern_extraction_pipeline.hybrid_query_builder import HybridQueryBuilder, QueryConstraints
+from pattern_extraction_pipeline.vector_index import PatternVectorIndex
+
+DIMS = 16
+
+
+def make_record(i, vector, date="2026-01-01T00:00:00Z"):
+    return {
+        'element_id': f"4:db:{i}",
+        'name': f"Pattern {i}",
+        'reasoning': None,
+        'description': None,
+        'confidence': 'high',
+        'stars': 100 + i,
+        'source_repo': f"https://github.com/o/r{i}",
+        'embedding': list(vector),
+        'embedding_date': date
+    }
+
+
+class FakeDriver:
+    """Serve LOAD_QUERY/COUNT_QUERY from an in-memory list of pattern records."""
+
+    def __init__(self, records):
+        self.records = records
+        self.load_calls = []
+
+    def session(self):
+        session = MagicMock()
+        session.__enter__.return_value = session
+        session.run.side_effect = self._run
+        return session
+
+    def _run(self, query, since=None, dimensions=None, model=None, version=None):
+        if 'count(p)' in query:
+            return Mock(single=Mock(return_value={'total': len(self.records)}))
+        self.load_calls.append(since)
+        return [r for r in self.records if since is None or r['embedding_date'] > since]
+
+
+class TestPatternVectorIndex(unittest.TestCase):
+    """Test local cosine search"""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.vectors = rng.normal(size=(300, DIMS)).astype(np.float32)
+        self.driver = FakeDriver([make_record(i, v) for i, v in enumerate(self.vectors)])
+
+    def _exact(self, query, k):
+        normed = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        cosine = normed @ (query / np.linalg.norm(query))
+        order = np.argsort(-cosine)[:k]
+        return [f"Pattern {i}" for i in order], (1 + cosine[order]) / 2
+
+    def test_top_k_matches_exact_ranking(self):
+        """argpartition top-k equals a full sort, scored as (1 + cos) / 2"""
+        index = PatternVectorIndex(dimensions=DIMS)
+        index.load_from_neo4j(self.driver)
+        query = self.vectors[42] + 0.1
+
+        results = index.search(query, top_k=10)
+
+        names, scores = self._exact(query, 10)
+        self.assertEqual([p['name'] for p, _ in results], names)
+        np.testing.assert_allclose([s for _, s in results], scores, rtol=1e-5)
+        self.assertEqual(results[0][0]['element_id'], "4:db:42")
+
+    def test_min_similarity_and_exclude(self):
+        """Scores below the threshold and the excluded element are dropped"""
+        index = PatternVectorIndex(dimensions=DIMS)
+        index.load_from_neo4j(self.driver)
+
+        results = index.search(self.vectors[5], top_k=300, min_similarity=0.6, exclude="4:db:5")
+
+        self.assertTrue(all(score >= 0.6 for _, score in results))
+        self.assertNotIn("4:db:5", [p['element_id'] for p, _ in results])
+
+    def test_ivf_finds_exact_neighbours(self):
+        """With nprobe covering the nearest clusters the best match is unchanged"""
+        index = PatternVectorIndex(dimensions=DIMS, ivf_lists=8, nprobe=4)
+        index.load_from_neo4j(self.driver)
+
+        self.assertEqual(sum(len(rows) for rows in index._lists), 300)
+        for i in (0, 17, 123):
+            results = index.search(self.vectors[i], top_k=5)
+            self.assertEqual(results[0][0]['name'], f"Pattern {i}")
+
+    def test_incremental_refresh(self):
+        """refresh() queries from the newest embedding date and upserts rows"""
+        index = PatternVectorIndex(dimensions=DIMS)
+        index.load_from_neo4j(self.driver)
+        self.driver.records[3] = make_record(3, -self.vectors[3], date="2026-02-01T00:00:00Z")
+        self.driver.records.append(make_record(300, self.vectors[0], date="2026-02-01T00:00:00Z"))
+
+        updated = index.refresh(self.driver)
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.driver.load_calls[-1], "2026-01-01T00:00:00Z")
+        self.assertEqual(len(index), 301)
+        self.assertEqual(index.search(-self.vectors[3], top_k=1)[0][0]['name'], "Pattern 3")
+
+    def test_deletion_triggers_reload(self):
+        """A shrinking pattern count cannot be applied incrementally"""
+        index = PatternVectorIndex(dimensions=DIMS)
+        index.load_from_neo4j(self.driver)
+        del self.driver.records[10:20]
+
+        index.refresh(self.driver)
+
+        self.assertEqual(len(index), 290)
+        self.assertEqual(self.driver.load_calls[-1], None)
+
+
+class TestHybridQueryBuilderBackend(unittest.TestCase):
+    """Test the local index as a query builder backend"""
+
+    def setUp(self):
+        vectors = np.eye(DIMS, dtype=np.float32)[:4]
+        self.index = PatternVectorIndex(dimensions=DIMS)
+        self.index.load_from_neo4j(FakeDriver([make_record(i, v) for i, v in enumerate(vectors)]))
+        self.query = np.eye(DIMS, dtype=np.float32)[1]
+
+    def test_default_uses_neo4j_index(self):
+        """Without an index the query still calls queryNodes"""
+        query, params = HybridQueryBuilder().build_semantic_search(top_k=5)
+
+        self.assertIn("db.index.vector.queryNodes", query)
+        self.assertNotIn('candidates', params)
+
+    def test_semantic_search_uses_candidates(self):
+        """With an index, ranked candidates replace the vector procedure"""
+        query, params = HybridQueryBuilder(self.index).build_semantic_search(
+            top_k=2, min_similarity=0.6, embedding=self.query
+        )
+
+        self.assertNotIn("queryNodes", query)
+        self.assertIn("UNWIND $candidates", query)
+        self.assertEqual(params['candidates'], [{'element_id': "4:db:1", 'score': 1.0}])
+
+    def test_hybrid_and_similar_patterns(self):
+        """Hybrid search filters candidates; similar-pattern search excludes the reference"""
+        builder = HybridQueryBuilder(self.index)
+
+        query, params = builder.build_hybrid_search(QueryConstraints(min_stars=50), semantic_top_k=3,
+                                                    embedding=self.query)
+        self.assertIn("WITH p, candidate.score AS score", query)
+        self.assertEqual(len(params['candidates']), 3)
+
+        query, params = builder.build_similar_patterns("Pattern 1", top_k=2, min_similarity=0.0)
+        self.assertIn("WITH p1, p2, candidate.score AS score", query)
+        self.assertNotIn("4:db:1", [c['element_id'] for c in params['candidates']])
+        self.assertEqual(len(params['candidates']), 2)
+
+    def test_embedding_required_with_index(self):
+        """Building a local-backend query without the embedding is an error"""
+        with self.assertRaises(ValueError):
+            HybridQueryBuilder(self.index).build_cross_pattern_discovery()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@
 import os
 import json
 import time
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
@@ -26,6 +27,10 @@ class TrajectoryLogger:
     - Critic validation results
     
     Trajectories stored as JSON files for post-analysis.
+    
+    Safe to share between extraction worker threads: each thread records
+    into the repository it started, so per-repository event order is kept
+    even when several repositories are processed concurrently.
     """
     
     def __init__(self, log_dir: str = "logs/trajectories"):
@@ -42,6 +47,10 @@ class TrajectoryLogger:
         self.current_trajectory: Optional[Dict] = None
         self.trajectory_start_time: Optional[float] = None
         
+        # Guards trajectory mutation; thread-local tracks each worker's repository
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        
         logger.info(f"TrajectoryLogger initialised: {self.log_dir}")
     
     def start_extraction(self, domain: str, search_query: str, limit: int) -> str:
@@ -58,6 +67,7 @@ class TrajectoryLogger:
         """
         trajectory_id = f"{domain}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         self.trajectory_start_time = time.time()
+        self._local.repo = None
         
         self.current_trajectory = {
             "trajectory_id": trajectory_id,
@@ -108,7 +118,22 @@ class TrajectoryLogger:
             "data": data
         }
         
-        self.current_trajectory["events"].append(event)
+        with self._lock:
+            self.current_trajectory["events"].append(event)
+    
+    def _current_repo(self) -> Optional[Dict]:
+        """
+        Get the repository record the calling thread is working on.
+        
+        Falls back to the most recently started repository for threads that
+        never called start_repository (e.g. background validation).
+        """
+        repo_data = getattr(self._local, "repo", None)
+        if repo_data is not None:
+            return repo_data
+        
+        repositories = self.current_trajectory["repositories"]
+        return repositories[-1] if repositories else None
     
     def start_repository(self, repo_name: str, repo_url: str, stars: int):
         """Start processing a repository."""
@@ -129,7 +154,9 @@ class TrajectoryLogger:
             "errors": []
         }
         
-        self.current_trajectory["repositories"].append(repo_data)
+        with self._lock:
+            self.current_trajectory["repositories"].append(repo_data)
+        self._local.repo = repo_data
         
         self.log_event("repository_started", {
             "repo": repo_name,
@@ -160,8 +187,8 @@ class TrajectoryLogger:
             data["error"] = str(error)[:200]  # Truncate long errors
         
         # Update repository data
-        if self.current_trajectory["repositories"]:
-            current_repo = self.current_trajectory["repositories"][-1]
+        current_repo = self._current_repo()
+        if current_repo:
             current_repo["events"].append({
                 "type": "github_api",
                 "operation": operation,
@@ -211,8 +238,8 @@ class TrajectoryLogger:
             data["error"] = str(error)[:200]
         
         # Update repository data
-        if self.current_trajectory["repositories"]:
-            current_repo = self.current_trajectory["repositories"][-1]
+        current_repo = self._current_repo()
+        if current_repo:
             current_repo["events"].append({
                 "type": "llm_extraction",
                 "success": success,
@@ -237,8 +264,8 @@ class TrajectoryLogger:
         }
         
         # Update repository data
-        if self.current_trajectory["repositories"]:
-            current_repo = self.current_trajectory["repositories"][-1]
+        current_repo = self._current_repo()
+        if current_repo:
             current_repo["data_fetched"]["quality_metrics"] = True
             current_repo["quality_metrics"] = data
         
@@ -257,8 +284,8 @@ class TrajectoryLogger:
             data["error"] = str(error)[:200]
         
         # Update repository data
-        if self.current_trajectory["repositories"]:
-            current_repo = self.current_trajectory["repositories"][-1]
+        current_repo = self._current_repo()
+        if current_repo:
             current_repo["events"].append({
                 "type": "neo4j_storage",
                 "success": success,
@@ -282,8 +309,8 @@ class TrajectoryLogger:
         }
         
         # Update repository data
-        if self.current_trajectory["repositories"]:
-            current_repo = self.current_trajectory["repositories"][-1]
+        current_repo = self._current_repo()
+        if current_repo:
             current_repo["events"].append({
                 "type": "critic_validation",
                 "validation_score": validation_score,
@@ -309,8 +336,9 @@ class TrajectoryLogger:
             'quality_score': round(quality_score, 3)
         }
         
-        self.current_trajectory['skipped_repositories'].append(data)
-        self.current_trajectory["summary"]["skipped"] += 1
+        with self._lock:
+            self.current_trajectory['skipped_repositories'].append(data)
+            self.current_trajectory["summary"]["skipped"] += 1
         self.log_event("repository_skipped", data)
     
     def finish_repository(self, extraction_status: str):
@@ -320,22 +348,24 @@ class TrajectoryLogger:
         Args:
             extraction_status: 'successful', 'partial', or 'failed'
         """
-        if not self.current_trajectory["repositories"]:
+        current_repo = self._current_repo()
+        if not current_repo:
             return
         
-        current_repo = self.current_trajectory["repositories"][-1]
+        self._local.repo = None
         current_repo["finished_at"] = datetime.now().isoformat()
         current_repo["total_time_seconds"] = time.time() - current_repo["start_time"]
         current_repo["extraction_result"] = extraction_status
         
         # Update summary
-        self.current_trajectory["summary"]["total_repos"] += 1
-        if extraction_status == "successful":
-            self.current_trajectory["summary"]["successful"] += 1
-        elif extraction_status == "partial":
-            self.current_trajectory["summary"]["partial"] += 1
-        else:
-            self.current_trajectory["summary"]["failed"] += 1
+        with self._lock:
+            self.current_trajectory["summary"]["total_repos"] += 1
+            if extraction_status == "successful":
+                self.current_trajectory["summary"]["successful"] += 1
+            elif extraction_status == "partial":
+                self.current_trajectory["summary"]["partial"] += 1
+            else:
+                self.current_trajectory["summary"]["failed"] += 1
         
         self.log_event("repository_finished", {
             "repo": current_repo["repo_name"],
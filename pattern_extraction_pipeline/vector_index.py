@@ -0,0 +1,323 @@
+"""
+In-Process Pattern Vector Index
+
+Local replacement for Neo4j's `pattern_embeddings` vector index. Pattern
+embeddings are held as an L2-normalised float32 matrix, so cosine top-k is
+one matrix-vector product plus argpartition: sub-millisecond for thousands
+of patterns, no Bolt round trip, and it also works on Neo4j editions without
+vector index support.
+
+For large corpora an optional IVF partition (spherical k-means over the
+rows) restricts each query to the nprobe closest clusters.
+
+Scores use the same scale as db.index.vector.queryNodes with cosine
+similarity, (1 + cos) / 2, so existing min_similarity thresholds still apply.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Pattern properties kept next to each vector so semantic-only search needs no graph access
+PATTERN_FIELDS = ('name', 'reasoning', 'description', 'confidence', 'stars', 'source_repo')
+
+LOAD_QUERY = """
+    MATCH (p:Pattern)
+    WHERE size(p.embedding) = $dimensions
+      AND ($model IS NULL OR p.embedding_model = $model)
+      AND ($version IS NULL OR p.embedding_version = $version)
+      AND ($since IS NULL OR p.embedding_date > datetime($since))
+    RETURN elementId(p) AS element_id,
+           p.name AS name,
+           p.reasoning AS reasoning,
+           p.description AS description,
+           p.confidence AS confidence,
+           p.stars AS stars,
+           p.source_repo AS source_repo,
+           p.embedding AS embedding,
+           toString(p.embedding_date) AS embedding_date
+"""
+
+COUNT_QUERY = """
+    MATCH (p:Pattern)
+    WHERE size(p.embedding) = $dimensions
+      AND ($model IS NULL OR p.embedding_model = $model)
+      AND ($version IS NULL OR p.embedding_version = $version)
+    RETURN count(p) AS total
+"""
+
+
+class PatternVectorIndex:
+    """
+    Brute-force / IVF cosine index over Pattern embeddings.
+
+    Example:
+        >>> index = PatternVectorIndex()
+        >>> index.load_from_neo4j(driver)
+        >>> index.search(query_embedding, top_k=20, min_similarity=0.5)
+        [({'element_id': ..., 'name': ..., ...}, 0.91), ...]
+        >>> index.refresh(driver)   # pulls only re-embedded patterns
+    """
+
+    def __init__(
+        self,
+        dimensions: int = 768,
+        ivf_lists: int = 0,
+        nprobe: int = 8,
+        refresh_interval: float = 300.0,
+        model: Optional[str] = None,
+        model_version: Optional[str] = None
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            dimensions: Embedding width
+            ivf_lists: Number of IVF clusters (0 = exact brute-force search)
+            nprobe: Clusters scanned per query when IVF is enabled
+            refresh_interval: Seconds before maybe_refresh() pulls updates
+            model: Only load vectors with this embedding_model (None = any);
+                   vectors from other backends are not comparable
+            model_version: Only load vectors with this embedding_version (None = any)
+        """
+        self.dimensions = dimensions
+        self.ivf_lists = ivf_lists
+        self.nprobe = nprobe
+        self.refresh_interval = refresh_interval
+        self.model = model
+        self.model_version = model_version
+
+        self._matrix = np.empty((0, dimensions), dtype=np.float32)
+        self._patterns: List[Dict] = []
+        self._row_of: Dict[str, int] = {}
+        self._name_row: Dict[str, int] = {}
+        self._since: Optional[str] = None
+        self._refreshed_at = 0.0
+
+        self._centroids = None
+        self._assign = None
+        self._lists: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load_from_neo4j(self, driver) -> int:
+        """
+        Replace the index contents with every embedded Pattern.
+
+        Returns:
+            Number of patterns loaded
+        """
+        with driver.session() as session:
+            records = [dict(record) for record in session.run(LOAD_QUERY, since=None, **self._filters())]
+
+        self._matrix = np.empty((0, self.dimensions), dtype=np.float32)
+        self._patterns = []
+        self._row_of = {}
+        self._name_row = {}
+        self._since = None
+        self._add(records)
+
+        if self.ivf_lists:
+            self.build_ivf()
+        self._refreshed_at = time.time()
+        logger.info(f"PatternVectorIndex loaded {len(self)} embeddings")
+        return len(self)
+
+    def refresh(self, driver) -> int:
+        """
+        Pull patterns embedded since the last load/refresh.
+
+        Falls back to a full reload when patterns have disappeared from the
+        graph, since deletions cannot be seen incrementally.
+
+        Returns:
+            Number of patterns added or updated
+        """
+        with driver.session() as session:
+            total = session.run(COUNT_QUERY, **self._filters()).single()['total']
+            records = [dict(record) for record in session.run(LOAD_QUERY, since=self._since, **self._filters())]
+
+        new_rows = sum(1 for record in records if record['element_id'] not in self._row_of)
+        if total != len(self) + new_rows:
+            logger.info("Embedded pattern count changed unexpectedly; reloading vector index")
+            self.load_from_neo4j(driver)
+            return len(self)
+
+        changed = self._add(records)
+        if self.ivf_lists and changed:
+            if self._centroids is None:
+                self.build_ivf()
+            else:
+                self._assign_rows(changed)
+        self._refreshed_at = time.time()
+        if records:
+            logger.info(f"PatternVectorIndex refreshed {len(records)} embeddings")
+        return len(records)
+
+    def _filters(self) -> Dict:
+        """Query parameters selecting the vectors this index accepts."""
+        return {'dimensions': self.dimensions, 'model': self.model, 'version': self.model_version}
+
+    def maybe_refresh(self, driver) -> int:
+        """Refresh if the index is older than refresh_interval."""
+        if time.time() - self._refreshed_at < self.refresh_interval:
+            return 0
+        return self.refresh(driver)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        embedding: List[float],
+        top_k: int = 20,
+        min_similarity: float = 0.0,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[Dict, float]]:
+        """
+        Cosine top-k search.
+
+        Args:
+            embedding: Query vector
+            top_k: Number of results
+            min_similarity: Minimum score (Neo4j vector index scale, 0-1)
+            exclude: Element id to leave out (e.g. the reference pattern)
+
+        Returns:
+            List of (pattern dict, score), best first
+        """
+        if not len(self) or top_k <= 0:
+            return []
+
+        query = self._normalise(np.asarray(embedding, dtype=np.float32).reshape(1, -1))[0]
+        rows = self._candidate_rows(query, top_k + (1 if exclude else 0))
+        cosine = self._matrix[rows] @ query if rows is not None else self._matrix @ query
+
+        k = min(top_k + (1 if exclude else 0), len(cosine))
+        top = np.argpartition(-cosine, k - 1)[:k]
+        top = top[np.argsort(-cosine[top])]
+
+        results = []
+        for position in top:
+            row = rows[position] if rows is not None else position
+            score = float((1.0 + cosine[position]) / 2.0)
+            pattern = self._patterns[row]
+            if score < min_similarity or pattern['element_id'] == exclude:
+                continue
+            results.append((pattern, score))
+        return results[:top_k]
+
+    def vector_for(self, name: str) -> Optional[np.ndarray]:
+        """Normalised embedding of a pattern by name, if indexed."""
+        row = self._name_row.get(name)
+        return None if row is None else self._matrix[row]
+
+    def element_id_for(self, name: str) -> Optional[str]:
+        """Element id of a pattern by name, if indexed."""
+        row = self._name_row.get(name)
+        return None if row is None else self._patterns[row]['element_id']
+
+    # ------------------------------------------------------------------
+    # IVF
+    # ------------------------------------------------------------------
+
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0):
+        """
+        Partition rows with spherical k-means.
+
+        Args:
+            n_lists: Cluster count (default: ivf_lists, capped at the row count)
+            iterations: k-means iterations
+            seed: Random seed for the initial centroids
+        """
+        n = len(self)
+        n_lists = min(n_lists or self.ivf_lists or int(np.sqrt(n)) or 1, n)
+        if n_lists == 0:
+            self._centroids = None
+            return
+
+        rng = np.random.default_rng(seed)
+        centroids = self._matrix[rng.choice(n, n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(self._matrix @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, self._matrix)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = self._normalise(sums)
+
+        self._centroids = centroids
+        self._assign = np.argmax(self._matrix @ centroids.T, axis=1)
+        self._rebuild_lists()
+
+    def _assign_rows(self, rows: List[int]):
+        """Place new or updated rows into their nearest existing cluster."""
+        rows = np.asarray(rows)
+        nearest = np.argmax(self._matrix[rows] @ self._centroids.T, axis=1)
+        if len(self._assign) < len(self):
+            self._assign = np.concatenate([self._assign, np.zeros(len(self) - len(self._assign), dtype=self._assign.dtype)])
+        self._assign[rows] = nearest
+        self._rebuild_lists()
+
+    def _rebuild_lists(self):
+        order = np.argsort(self._assign, kind='stable')
+        bounds = np.searchsorted(self._assign[order], np.arange(len(self._centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+
+    def _candidate_rows(self, query: np.ndarray, k: int) -> Optional[np.ndarray]:
+        """Rows in the nprobe closest clusters, or None for a full scan."""
+        if self._centroids is None or self.nprobe >= len(self._centroids):
+            return None
+        probe = np.argpartition(-(self._centroids @ query), self.nprobe - 1)[:self.nprobe]
+        rows = np.concatenate([self._lists[i] for i in probe])
+        return rows if len(rows) >= k else None
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _add(self, records: List[Dict]) -> List[int]:
+        """Upsert records; returns the rows touched."""
+        valid = [r for r in records if r.get('embedding') and len(r['embedding']) == self.dimensions]
+        if not valid:
+            return []
+
+        vectors = self._normalise(np.asarray([r['embedding'] for r in valid], dtype=np.float32))
+        touched = []
+        appended = []
+        for record, vector in zip(valid, vectors):
+            pattern = {'element_id': record['element_id'], **{f: record.get(f) for f in PATTERN_FIELDS}}
+            row = self._row_of.get(record['element_id'])
+            if row is None:
+                row = len(self._patterns)
+                self._patterns.append(pattern)
+                self._row_of[record['element_id']] = row
+                appended.append(vector)
+            else:
+                self._patterns[row] = pattern
+                self._matrix[row] = vector
+            self._name_row[pattern['name']] = row
+            touched.append(row)
+
+            if record.get('embedding_date') and (self._since is None or record['embedding_date'] > self._since):
+                self._since = record['embedding_date']
+
+        if appended:
+            self._matrix = np.vstack([self._matrix, np.asarray(appended, dtype=np.float32)])
+        return touched
+
+    @staticmethod
+    def _normalise(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
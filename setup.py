@@ -22,6 +22,7 @@ setup(
         "tenacity>=8.2.3",
         "pyyaml>=6.0",
         "pydantic>=2.0.0",
+        "numpy>=1.24",
     ],
     extras_require={
         "dev": [